@@ -0,0 +1,370 @@
+"""Measures the time and memory that the SDK itself adds around model calls, end to end.
+
+The fake model answers instantly, so everything a run spends is framework overhead: building model
+input, tool and handoff plumbing, output validation, tracing and event streaming. Each scenario is
+run with `Runner.run` and `Runner.run_streamed`, with tracing off and on:
+
+- `text`: a single turn that answers with a message.
+- `tools`: an agent with 50 function tools that calls 3 of them per turn, for 3 turns.
+- `structured_output`: a tool call, then a final output validated against a Pydantic model.
+- `handoffs`: a chain of 5 agents that hand off to the next one.
+- `mcp`: calls to tools of a local MCP server over stdio (`benchmarks.mcp_stub_server`).
+
+With tracing on, spans go to a processor that exports them and throws them away, so the cost of
+building and serializing spans is included but nothing is sent anywhere.
+
+For each scenario the benchmark reports the overhead per turn of a single run, the peak memory
+allocated by a run, and, with 1 to 1000 concurrent runs, the throughput in turns per second and
+the 99th percentile of the event-loop lag. Results can be stored as a baseline and compared with
+later runs on the same machine, to catch regressions in the runner:
+
+    uv run python -m benchmarks.framework_overhead --save-baseline
+    uv run python -m benchmarks.framework_overhead --compare
+
+Timings vary between machines, so a baseline is only meaningful on the machine that recorded it. On
+shared or throttled machines, runs can differ by a few tens of percent; raise `--threshold` there.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from agents import Agent, RunConfig, Runner, Tool, function_tool, set_trace_processors
+from agents.items import TResponseOutputItem
+from agents.mcp import MCPServer, MCPServerStdio
+from agents.tracing import Span, Trace, TracingProcessor
+from tests.fake_model import FakeModel
+from tests.test_responses import (
+    get_final_output_message,
+    get_function_tool_call,
+    get_handoff_tool_call,
+    get_text_message,
+)
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "framework_overhead.json"
+
+SCENARIOS = ("text", "tools", "structured_output", "handoffs", "mcp")
+
+# For each metric, whether a higher value is better, and the smallest change that isn't noise
+METRICS = {
+    "turn_overhead_us": (False, 20.0),
+    "peak_kib": (False, 4.0),
+    "throughput": (True, 0.0),
+    "lag_p99_ms": (False, 1.0),
+}
+
+
+class DiscardingProcessor(TracingProcessor):
+    """Exports spans and traces like a real processor would, then drops them."""
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        trace.export()
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        pass
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        span.export()
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+class Answer(BaseModel):
+    title: str
+    score: float
+    tags: list[str]
+
+
+def make_tools(count: int) -> list[Tool]:
+    def make_tool(index: int) -> Tool:
+        def tool(query: str, limit: int = 10) -> str:
+            return f"{index}:{query}:{limit}"
+
+        return function_tool(
+            tool,
+            name_override=f"tool_{index}",
+            description_override=f"Tool number {index}.",
+        )
+
+    return [make_tool(index) for index in range(count)]
+
+
+TOOLS = make_tools(50)
+
+
+@dataclass
+class Scenario:
+    agent: Agent[Any]
+    model: FakeModel
+    turns: int
+
+
+def build_scenario(name: str, tracing: bool, mcp_server: MCPServer | None) -> Scenario:
+    """Returns a fresh agent whose model is scripted for one run of the scenario."""
+    model = FakeModel(tracing_enabled=tracing)
+    outputs: list[list[TResponseOutputItem]]
+    if name == "text":
+        agent = Agent[Any](name="text", instructions="Answer.", model=model)
+        outputs = [[get_text_message("done")]]
+    elif name == "tools":
+        agent = Agent(name="tools", instructions="Use the tools.", model=model, tools=TOOLS)
+        arguments = json.dumps({"query": "benchmark", "limit": 5})
+        outputs = [
+            [get_function_tool_call(f"tool_{index}", arguments) for index in (turn, 10, 49)]
+            for turn in range(3)
+        ]
+        outputs.append([get_text_message("done")])
+    elif name == "structured_output":
+        agent = Agent(name="structured", model=model, tools=TOOLS[:5], output_type=Answer)
+        answer = Answer(title="benchmark", score=0.5, tags=["a", "b", "c"])
+        outputs = [
+            [get_function_tool_call("tool_0", json.dumps({"query": "benchmark"}))],
+            [get_final_output_message(answer.model_dump_json())],
+        ]
+    elif name == "handoffs":
+        chain = [Agent[Any](name=f"agent_{index}", model=model) for index in range(5)]
+        for agent, next_agent in zip(chain, chain[1:]):
+            agent.handoffs = [next_agent]
+        agent = chain[0]
+        outputs = [[get_handoff_tool_call(next_agent)] for next_agent in chain[1:]]
+        outputs.append([get_text_message("done")])
+    elif name == "mcp":
+        assert mcp_server is not None
+        agent = Agent(name="mcp", model=model, mcp_servers=[mcp_server])
+        outputs = [
+            [get_function_tool_call("echo", json.dumps({"text": "benchmark"}))],
+            [get_function_tool_call("lookup", json.dumps({"key": "benchmark"}))],
+            [get_text_message("done")],
+        ]
+    else:
+        raise ValueError(f"Unknown scenario {name}")
+    model.add_multiple_turn_outputs(list(outputs))
+    return Scenario(agent=agent, model=model, turns=len(outputs))
+
+
+async def run_scenario(
+    name: str, streamed: bool, tracing: bool, mcp_server: MCPServer | None
+) -> int:
+    """Runs the scenario once, and returns its number of turns."""
+    scenario = build_scenario(name, tracing, mcp_server)
+    run_config = RunConfig(tracing_disabled=not tracing)
+    if streamed:
+        result = Runner.run_streamed(
+            scenario.agent, input="start", run_config=run_config, max_turns=scenario.turns
+        )
+        async for _ in result.stream_events():
+            pass
+    else:
+        await Runner.run(
+            scenario.agent, input="start", run_config=run_config, max_turns=scenario.turns
+        )
+    return scenario.turns
+
+
+async def measure_overhead(run: Callable[[], Awaitable[int]], repeat: int) -> float:
+    """Returns the median time per turn of a single run, in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        turns = await run()
+        samples.append((time.perf_counter() - start) / turns)
+    return statistics.median(samples) * 1e6
+
+
+async def measure_peak_memory(run: Callable[[], Awaitable[int]]) -> float:
+    """Returns the peak memory allocated while a run was in progress, in KiB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        await run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+async def monitor_lag(lags: list[float], interval: float = 0.001) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def measure_concurrency(
+    run: Callable[[], Awaitable[int]], concurrency: int, rounds: int
+) -> tuple[float, float]:
+    """Returns the throughput in turns per second and the p99 event-loop lag in milliseconds of
+    `concurrency` runs at once: the best throughput and the median lag of a few rounds, which are
+    much less noisy than a single round.
+    """
+    throughputs, lag_p99s = [], []
+    for _ in range(rounds):
+        lags: list[float] = []
+        monitor = asyncio.create_task(monitor_lag(lags))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        turns = await asyncio.gather(*(run() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        monitor.cancel()
+
+        lags.sort()
+        throughputs.append(sum(turns) / elapsed)
+        lag_p99s.append(lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0)
+    return max(throughputs), statistics.median(lag_p99s) * 1000
+
+
+async def benchmark(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    mcp_server: MCPServer | None = None
+    if "mcp" in args.scenarios:
+        mcp_server = MCPServerStdio(
+            {"command": sys.executable, "args": ["-m", "benchmarks.mcp_stub_server"]},
+            cache_tools_list=True,
+        )
+        await mcp_server.connect()
+
+    results: dict[str, dict[str, float]] = {}
+    try:
+        for name in args.scenarios:
+            for streamed in (False, True):
+                for tracing in args.tracing:
+                    key = f"{name}/{'streamed' if streamed else 'run'}/tracing-{tracing}"
+
+                    def run(
+                        name: str = name, streamed: bool = streamed, tracing: bool = tracing == "on"
+                    ) -> Awaitable[int]:
+                        return run_scenario(name, streamed, tracing, mcp_server)
+
+                    # Warm up caches (schemas, imports, connections) before measuring
+                    for _ in range(3):
+                        await run()
+                    metrics = {
+                        "turn_overhead_us": await measure_overhead(run, args.repeat),
+                        "peak_kib": await measure_peak_memory(run),
+                    }
+                    for concurrency in args.concurrency:
+                        throughput, lag_p99 = await measure_concurrency(
+                            run, concurrency, args.rounds
+                        )
+                        metrics[f"throughput@{concurrency}"] = throughput
+                        metrics[f"lag_p99_ms@{concurrency}"] = lag_p99
+                    results[key] = {metric: round(value, 3) for metric, value in metrics.items()}
+                    print_row(key, metrics, args.concurrency)
+    finally:
+        if mcp_server is not None:
+            await mcp_server.cleanup()
+    return results
+
+
+def print_header(concurrency: list[int]) -> None:
+    columns = [f"{'scenario':<40}", f"{'turn (us)':>10}", f"{'peak KiB':>9}"]
+    for level in concurrency:
+        columns.append(f"{f'turns/s@{level}':>14}")
+        columns.append(f"{f'lag p99@{level}':>13}")
+    print(" ".join(columns))
+
+
+def print_row(key: str, metrics: dict[str, float], concurrency: list[int]) -> None:
+    columns = [
+        f"{key:<40}",
+        f"{metrics['turn_overhead_us']:>10.1f}",
+        f"{metrics['peak_kib']:>9.1f}",
+    ]
+    for level in concurrency:
+        columns.append(f"{metrics[f'throughput@{level}']:>14.0f}")
+        columns.append(f"{metrics[f'lag_p99_ms@{level}']:>13.2f}")
+    print(" ".join(columns))
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """Returns a description of each metric that is worse than in the baseline by more than
+    `threshold` (a fraction).
+    """
+    regressions = []
+    for key, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = baseline.get(key, {}).get(metric)
+            if not previous:
+                continue
+            higher_is_better, noise = METRICS[metric.split("@")[0]]
+            if abs(value - previous) <= noise:
+                continue
+            change = (value - previous) / previous
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{key} {metric}: {previous:.2f} -> {value:.2f} ({change:+.0%})")
+    return regressions
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--tracing", nargs="+", choices=("off", "on"), default=["off", "on"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results.")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.3,
+        help="The relative change of a metric that counts as a regression.",
+    )
+    args = parser.parse_args()
+
+    set_trace_processors([DiscardingProcessor()])
+    print_header(args.concurrency)
+    results = await benchmark(args)
+
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions compared with {args.baseline}:")
+            print("\n".join(f"  {regression}" for regression in regressions))
+            sys.exit(1)
+        print(f"\nNo regressions compared with {args.baseline}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                "repeat": args.repeat,
+                "rounds": args.rounds,
+                "concurrency": args.concurrency,
+            },
+            "results": results,
+        }
+        args.baseline.write_text(json.dumps(data, indent=2) + "\n")
+        print(f"\nSaved the baseline to {args.baseline}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""Compares the cost of isolating a large run input by deep-copying it (what the runner used to do,
+twice per run) with freezing it once.
+
+The input is a long history of messages, some of which carry large base64 images. For each
+strategy the benchmark reports the median wall time and the peak memory allocated while isolating
+the input, and then the end-to-end time of a `Runner.run` call with an input guardrail.
+
+Run with:
+
+    uv run python -m benchmarks.input_isolation
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import copy
+import os
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    InputGuardrail,
+    RunContextWrapper,
+    Runner,
+    TResponseInputItem,
+)
+from agents.util._frozen import freeze
+from tests.fake_model import FakeModel
+from tests.test_responses import get_text_message
+
+
+def make_input(messages: int, images: int, image_bytes: int) -> list[TResponseInputItem]:
+    image_url = "data:image/png;base64," + base64.b64encode(os.urandom(image_bytes)).decode()
+    items: list[TResponseInputItem] = []
+    for index in range(messages):
+        content: list[Any] = [{"type": "input_text", "text": f"message {index} " * 20}]
+        if index < images:
+            # Each image gets its own string, like images decoded from separate files would.
+            content.append({"type": "input_image", "image_url": image_url[:-1] + str(index % 10)})
+        items.append({"role": "user", "content": content})
+    return items
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def _guardrail(
+    context: RunContextWrapper[Any], agent: Agent[Any], input: str | list[TResponseInputItem]
+) -> GuardrailFunctionOutput:
+    return GuardrailFunctionOutput(output_info=None, tripwire_triggered=False)
+
+
+async def time_run(run_input: list[TResponseInputItem], repeat: int) -> float:
+    model = FakeModel()
+    agent = Agent(
+        name="bench", model=model, input_guardrails=[InputGuardrail(guardrail_function=_guardrail)]
+    )
+    times = []
+    for _ in range(repeat):
+        model.set_next_output([get_text_message("done")])
+        start = time.perf_counter()
+        await Runner.run(agent, input=run_input)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--image-bytes", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    run_input = make_input(args.messages, args.images, args.image_bytes)
+    print(
+        f"input: {args.messages} messages, {args.images} images of "
+        f"{args.image_bytes / 1_000_000:.1f} MB (before base64)\n"
+    )
+
+    strategies: dict[str, Callable[[], Any]] = {
+        "2x deepcopy": lambda: (copy.deepcopy(run_input), copy.deepcopy(run_input)),
+        "freeze once": lambda: freeze(run_input),
+    }
+    print(f"{'strategy':<14} {'time (ms)':>10} {'peak alloc (MB)':>16}")
+    for name, fn in strategies.items():
+        elapsed, peak = measure(fn, args.repeat)
+        print(f"{name:<14} {elapsed * 1000:>10.2f} {peak / 1_000_000:>16.2f}")
+
+    elapsed = await time_run(run_input, args.repeat)
+    print(f"\nRunner.run with an input guardrail: {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
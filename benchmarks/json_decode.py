@@ -0,0 +1,132 @@
+"""Compares the old and new ways of decoding and validating large JSON payloads from the model.
+
+- `tool arguments`: the arguments of a function tool with a large list of records and a long
+  string. The old path parsed the JSON into a dict with `json.loads()` and then validated it by
+  calling the parameters model; the new one validates the JSON string directly.
+- `MCP arguments`: MCP tool inputs are only parsed, since the server validates them. Compares
+  `json.loads()` with the codec's `loads()`, which uses orjson if it's installed.
+- `structured output`: creating the output schema of a new agent (e.g. a clone made per request)
+  and validating a large list of records, which is wrapped in an object. The old path built a new
+  `TypeAdapter` per schema; the new one shares cached validators.
+
+For each path the benchmark reports the median time per call and the peak memory allocated by one
+call.
+
+Run with:
+
+    uv run python -m benchmarks.json_decode
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+from agents import AgentOutputSchema
+from agents.function_schema import function_schema
+from agents.strict_schema import ensure_strict_json_schema
+from agents.util import _json
+
+
+class Record(BaseModel):
+    id: int
+    name: str
+    score: float
+    tags: list[str]
+
+
+def save_records(records: list[Record], notes: str, overwrite: bool = False) -> str:
+    """Save records to the database.
+
+    Args:
+        records: The records to save.
+        notes: Notes about the records.
+        overwrite: Whether to overwrite existing records.
+    """
+    return "saved"
+
+
+def make_records(count: int) -> list[dict[str, Any]]:
+    return [
+        {"id": i, "name": f"record {i}", "score": i / 7, "tags": ["a", "b", f"t{i % 10}"]}
+        for i in range(count)
+    ]
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> tuple[float, int]:
+    fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def report(label: str, old: Callable[[], Any], new: Callable[[], Any], repeat: int) -> None:
+    old_time, old_peak = measure(old, repeat)
+    new_time, new_peak = measure(new, repeat)
+    print(f"{label}:")
+    for name, seconds, peak in (("old", old_time, old_peak), ("new", new_time, new_peak)):
+        print(f"  {name}  {seconds * 1e6:>10.0f} us/call  {peak / 1024:>9.0f} KiB peak")
+    print(f"  speedup: {old_time / new_time:.2f}x\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--string-kib", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    arguments = json.dumps({"records": records, "notes": "x" * (args.string_kib * 1024)})
+    output = json.dumps({"response": records})
+    schema = function_schema(save_records)
+    model = schema.params_pydantic_model
+    print(f"{len(arguments) / 1024:.0f} KiB of tool arguments, {args.records} records\n")
+
+    def old_tool_path() -> Any:
+        json_data = json.loads(arguments)
+        return schema.to_call_args(model(**json_data))
+
+    def new_tool_path() -> Any:
+        return schema.to_call_args(_json.validate_model_json(model, arguments))
+
+    report("tool arguments", old_tool_path, new_tool_path, args.repeat)
+
+    orjson_note = "with orjson" if importlib.util.find_spec("orjson") else "orjson not installed"
+    report(
+        f"MCP arguments ({orjson_note})",
+        lambda: json.loads(arguments),
+        lambda: _json.loads(arguments),
+        args.repeat,
+    )
+
+    def old_output_path() -> Any:
+        OutputType = TypedDict("OutputType", {"response": list[Record]})  # noqa: UP013
+        adapter = TypeAdapter(OutputType)
+        ensure_strict_json_schema(adapter.json_schema())
+        return adapter.validate_json(output)["response"]
+
+    def new_output_path() -> Any:
+        return AgentOutputSchema(list[Record]).validate_json(output)
+
+    report("structured output (new schema per run)", old_output_path, new_output_path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""A local MCP server over stdio with a few trivial tools, used by `benchmarks.framework_overhead`
+to measure the SDK's MCP tool path without any real work behind it.
+"""
+
+from __future__ import annotations
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("stub", log_level="WARNING")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Return the text unchanged."""
+    return text
+
+
+@mcp.tool()
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+@mcp.tool()
+def lookup(key: str, limit: int = 10) -> str:
+    """Look up a key."""
+    return f"{key}:{limit}"
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
@@ -0,0 +1,139 @@
+"""Measures how long it takes a new process to define many function tools and create their
+schemas, with and without the function schema cache on disk.
+
+The benchmark generates a module with a few hundred `@function_tool` functions, with documented
+parameters of various types. In fresh processes, it times importing the module (tools create their
+schemas lazily, so this is cheap) and then reading every tool's schema, like a service that sends
+all its tools to a model would:
+
+- `no disk cache`: every schema is created from scratch (docstrings parsed, models and JSON
+  schemas generated), like before the cache existed.
+- `cold disk cache`: the first process with an empty cache directory, which also fills it.
+- `warm disk cache`: later processes, e.g. other pods of the same image, that read the schemas.
+
+Run with:
+
+    uv run python -m benchmarks.schema_cold_start
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+TYPES = ["str", "int", "float", "bool", "list[str]", "list[int]", "Literal['a', 'b', 'c']"]
+
+PRELUDE = """\
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+from agents import function_tool
+
+
+class Filters(BaseModel):
+    tags: list[str]
+    limit: int = 10
+
+"""
+
+TIMER = """\
+import sys
+import time
+
+sys.path.insert(0, sys.argv[1])
+import agents  # noqa: F401  (importing the SDK isn't part of the measurement)
+
+start = time.perf_counter()
+import generated_tools
+
+imported = time.perf_counter()
+for name in dir(generated_tools):
+    if name.startswith("tool_"):
+        getattr(generated_tools, name).params_json_schema
+
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def generate_tools(count: int) -> str:
+    functions = [PRELUDE]
+    for index in range(count):
+        params = [(f"param_{i}", TYPES[(index + i) % len(TYPES)]) for i in range(1 + index % 5)]
+        if index % 4 == 0:
+            params.append(("filters", "Filters | None"))
+        signature = ", ".join(f"{name}: {annotation}" for name, annotation in params)
+        args = "".join(f"        {name}: The {name.replace('_', ' ')}.\n" for name, _ in params)
+        functions.append(
+            f"@function_tool\n"
+            f"def tool_{index}({signature}) -> str:\n"
+            f'    """Tool number {index}, which looks something up.\n\n'
+            f"    Args:\n{args}"
+            f'    """\n'
+            f"    return {str(index)!r}\n\n"
+        )
+    return "\n".join(functions)
+
+
+def time_import(module_dir: Path, cache_dir: Path | None) -> tuple[float, float]:
+    env = dict(os.environ)
+    env.pop("OPENAI_AGENTS_SCHEMA_CACHE_DIR", None)
+    if cache_dir is not None:
+        env["OPENAI_AGENTS_SCHEMA_CACHE_DIR"] = str(cache_dir)
+    # Don't let bytecode caching of the generated module skew the first process
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    output = subprocess.run(
+        [sys.executable, "-c", TIMER, str(module_dir)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    import_time, schemas_time = output.strip().splitlines()[-1].split()
+    return float(import_time), float(schemas_time)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        module_dir = Path(temp_dir) / "module"
+        module_dir.mkdir()
+        (module_dir / "generated_tools.py").write_text(generate_tools(args.tools))
+
+        no_cache = [time_import(module_dir, None) for _ in range(args.repeat)]
+        cold, warm = [], []
+        for run in range(args.repeat):
+            cache_dir = Path(temp_dir) / f"cache-{run}"
+            cold.append(time_import(module_dir, cache_dir))
+            warm.append(time_import(module_dir, cache_dir))
+
+    print(f"{args.tools} function tools in a new process (median of {args.repeat}):\n")
+    print(f"{'':<16} {'import':>12} {'schemas':>12} {'total':>12}")
+    baseline = statistics.median(sum(sample) for sample in no_cache)
+    for label, samples in (
+        ("no disk cache", no_cache),
+        ("cold disk cache", cold),
+        ("warm disk cache", warm),
+    ):
+        import_time = statistics.median(sample[0] for sample in samples) * 1000
+        schemas_time = statistics.median(sample[1] for sample in samples) * 1000
+        total = statistics.median(sum(sample) for sample in samples)
+        print(
+            f"{label:<16} {import_time:>9.1f} ms {schemas_time:>9.1f} ms {total * 1000:>9.1f} ms"
+            f"  {baseline / total:>5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
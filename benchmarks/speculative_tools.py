@@ -0,0 +1,113 @@
+"""Measures how much speculative tool execution shortens streamed turns with slow tool calls.
+
+The fake model streams several function calls, taking a while to "generate" each one, followed by
+a short message. Tool calls take a while to run, the earlier ones longest. Without speculative
+execution, tools only start after the whole response has been streamed; with it, each tool starts
+as soon as its call has been streamed.
+
+Run with:
+
+    uv run python -m benchmarks.speculative_tools
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemDoneEvent,
+)
+
+from agents import Agent, RunConfig, Runner, function_tool
+from agents.items import TResponseStreamEvent
+from tests.fake_model import FakeModel, get_response_obj
+from tests.test_responses import get_text_message
+
+
+class StreamingFakeModel(FakeModel):
+    """Streams each output item after a delay, then the completed response."""
+
+    def __init__(self, item_delay: float) -> None:
+        super().__init__()
+        self.item_delay = item_delay
+
+    async def stream_response(
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        output = self.get_next_output()
+        assert isinstance(output, list)
+        for index, item in enumerate(output):
+            await asyncio.sleep(self.item_delay)
+            yield ResponseOutputItemDoneEvent(
+                item=item, output_index=index, type="response.output_item.done"
+            )
+        yield ResponseCompletedEvent(type="response.completed", response=get_response_obj(output))
+
+
+async def run_once(calls: int, item_delay: float, tool_delay: float, speculative: bool) -> float:
+    @function_tool
+    async def fetch(key: str, delay: float) -> str:
+        await asyncio.sleep(delay)
+        return key
+
+    model = StreamingFakeModel(item_delay)
+    model.add_multiple_turn_outputs(
+        [
+            [
+                ResponseFunctionToolCall(
+                    id=f"call_{index}",
+                    call_id=f"call_{index}",
+                    type="function_call",
+                    name="fetch",
+                    arguments=json.dumps(
+                        {"key": str(index), "delay": tool_delay * (calls - index) / calls}
+                    ),
+                )
+                for index in range(calls)
+            ]
+            + [get_text_message("fetching")],
+            [get_text_message("done")],
+        ]
+    )
+    agent = Agent(name="bench", model=model, tools=[fetch])
+
+    start = time.perf_counter()
+    result = Runner.run_streamed(
+        agent, input="go", run_config=RunConfig(speculative_tool_execution=speculative)
+    )
+    async for _ in result.stream_events():
+        pass
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=4)
+    parser.add_argument("--item-delay", type=float, default=0.05)
+    parser.add_argument("--tool-delay", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print(
+        f"{args.calls} tool calls, {args.item_delay * 1000:.0f} ms to stream each, "
+        f"up to {args.tool_delay * 1000:.0f} ms to run each\n"
+    )
+    for speculative in (False, True):
+        times = [
+            await run_once(args.calls, args.item_delay, args.tool_delay, speculative)
+            for _ in range(args.repeat)
+        ]
+        label = "speculative" if speculative else "after stream"
+        print(f"{label:<14} p50 run time: {statistics.median(times) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
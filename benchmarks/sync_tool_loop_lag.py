@@ -0,0 +1,97 @@
+"""Measures event-loop lag while many runs call blocking synchronous tools.
+
+Several runs execute concurrently. In each turn, the fake model asks for a mix of tool calls: a tool
+that blocks on I/O (simulated with `time.sleep`) and a quick lookup. A monitor task sleeps for 1 ms
+in a loop and records how late it wakes up. With the "inline" policy the blocking tool stalls the
+loop for every run; with the default "thread" policy it doesn't.
+
+Run with:
+
+    uv run python -m benchmarks.sync_tool_loop_lag
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from agents import Agent, Runner, Tool, ToolExecution, function_tool
+from tests.fake_model import FakeModel
+from tests.test_responses import get_function_tool_call, get_text_message
+
+
+def make_tools(execution: ToolExecution, block_seconds: float) -> list[Tool]:
+    def fetch_blocking(key: str) -> str:
+        time.sleep(block_seconds)
+        return key
+
+    def lookup(key: str) -> str:
+        return key.upper()
+
+    return [
+        function_tool(fetch_blocking, execution=execution),
+        function_tool(lookup, execution=execution),
+    ]
+
+
+async def run_agent(tools: list[Tool], turns: int) -> None:
+    model = FakeModel()
+    agent = Agent(name="bench", model=model, tools=tools)
+    model.add_multiple_turn_outputs(
+        [
+            [
+                get_function_tool_call("fetch_blocking", json.dumps({"key": "a"})),
+                get_function_tool_call("lookup", json.dumps({"key": "b"})),
+            ]
+            for _ in range(turns)
+        ]
+    )
+    model.set_next_output([get_text_message("done")])
+    await Runner.run(agent, input="go", max_turns=turns + 1)
+
+
+async def monitor(lags: list[float], interval: float = 0.001) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def measure(execution: ToolExecution, runs: int, turns: int, block: float) -> None:
+    tools = make_tools(execution, block)
+    lags: list[float] = []
+    monitor_task = asyncio.create_task(monitor(lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(run_agent(tools, turns) for _ in range(runs)))
+    elapsed = time.perf_counter() - start
+    monitor_task.cancel()
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)]
+    print(
+        f"{execution:<8} {elapsed * 1000:>10.0f} {statistics.median(lags) * 1000:>10.2f} "
+        f"{p99 * 1000:>10.2f} {lags[-1] * 1000:>10.2f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--block-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.runs} concurrent runs, {args.turns} turns each, blocking tool takes "
+        f"{args.block_ms:.0f} ms\n"
+    )
+    print(f"{'policy':<8} {'total (ms)':>10} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}")
+    for execution in ("inline", "thread"):
+        await measure(execution, args.runs, args.turns, args.block_ms / 1000)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
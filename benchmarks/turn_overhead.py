@@ -0,0 +1,90 @@
+"""Measures how the SDK's per-turn overhead changes as the conversation history grows.
+
+Each turn, the fake model emits a batch of tool calls with sizeable arguments, so the history grows
+by several items per turn. If the runner re-materialized the whole history on every turn, the time
+spent between model calls would grow linearly with the turn number; with the append-only transcript
+it should stay flat.
+
+Run with:
+
+    uv run python -m benchmarks.turn_overhead
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any
+
+from agents import Agent, Runner, function_tool
+from tests.fake_model import FakeModel
+from tests.test_responses import get_function_tool_call, get_text_message
+
+
+class TimedFakeModel(FakeModel):
+    """A fake model that records when each turn's model call starts."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.call_times: list[float] = []
+
+    async def get_response(self, *args: Any, **kwargs: Any):
+        self.call_times.append(time.perf_counter())
+        return await super().get_response(*args, **kwargs)
+
+
+@function_tool
+def lookup(query: str) -> str:
+    """Look something up.
+
+    Args:
+        query: The query.
+    """
+    return query * 4
+
+
+async def run_once(turns: int, calls_per_turn: int, payload_size: int) -> list[float]:
+    model = TimedFakeModel()
+    agent = Agent(name="bench", model=model, tools=[lookup])
+    arguments = json.dumps({"query": "x" * payload_size})
+    model.add_multiple_turn_outputs(
+        [[get_function_tool_call("lookup", arguments) for _ in range(calls_per_turn)]] * turns
+    )
+    model.set_next_output([get_text_message("done")])
+
+    await Runner.run(agent, input="start", max_turns=turns + 1)
+    times = model.call_times
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--calls-per-turn", type=int, default=5)
+    parser.add_argument("--payload-size", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    samples: list[list[float]] = []
+    for _ in range(args.repeat):
+        samples.append(await run_once(args.turns, args.calls_per_turn, args.payload_size))
+
+    per_turn = [statistics.median(turn) for turn in zip(*samples)]
+    print(f"{'turn':>6} {'history items':>14} {'overhead (ms)':>14}")
+    step = max(1, len(per_turn) // 10)
+    for index in range(0, len(per_turn), step):
+        history_items = 1 + 2 * args.calls_per_turn * (index + 1)
+        print(f"{index + 2:>6} {history_items:>14} {per_turn[index] * 1000:>14.3f}")
+
+    first, last = per_turn[: len(per_turn) // 4], per_turn[-len(per_turn) // 4 :]
+    print(
+        f"\nmedian overhead, first quarter: {statistics.median(first) * 1000:.3f} ms; "
+        f"last quarter: {statistics.median(last) * 1000:.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,19 +1,37 @@
 import logging
 import sys
-from typing import Literal
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Literal, Optional, Union
 
 from openai import AsyncOpenAI
 
 from . import _config
 from .agent import Agent, ToolsToFinalOutputFunction, ToolsToFinalOutputResult
 from .agent_output import AgentOutputSchema
+from .checkpoint import (
+    CheckpointStore,
+    FileCheckpointStore,
+    RunCheckpoint,
+    SQLiteCheckpointStore,
+)
 from .computer import AsyncComputer, Button, Computer, Environment
+from .context_strategy import (
+    ContextMetrics,
+    ContextStrategy,
+    PruningStrategy,
+    SlidingWindowStrategy,
+    SummarizingStrategy,
+)
 from .exceptions import (
     AgentsException,
+    CircuitOpenError,
     InputGuardrailTripwireTriggered,
     MaxTurnsExceeded,
     ModelBehaviorError,
     OutputGuardrailTripwireTriggered,
+    PreviousResponseNotFoundError,
+    ToolTimeoutError,
     UserError,
 )
 from .guardrail import (
@@ -40,11 +58,23 @@ from .items import (
 )
 from .lifecycle import AgentHooks, RunHooks
 from .model_settings import ModelSettings
+from .models.hedging import HedgedModel
 from .models.interface import Model, ModelProvider, ModelTracing
+from .models.load_balancing import Endpoint, LoadBalancedModel, LoadBalancedProvider
 from .models.openai_chatcompletions import OpenAIChatCompletionsModel
 from .models.openai_provider import OpenAIProvider
 from .models.openai_responses import OpenAIResponsesModel
-from .result import RunResult, RunResultStreaming
+from .models.rate_limit import RateLimitedModel, RateLimitedModelProvider, RateLimiter
+from .models.record_replay import (
+    RecordingModel,
+    RecordingModelProvider,
+    ReplayModel,
+    ReplayModelProvider,
+)
+from .models.response_cache import CachingModel, CachingModelProvider, ResponseCache
+from .models.retry import CircuitBreaker, RetryingModel, RetryPolicy
+from .models.single_flight import SingleFlightGroup, SingleFlightModel, SingleFlightModelProvider
+from .result import RunManyItem, RunManyResult, RunResult, RunResultStreaming
 from .run import RunConfig, Runner
 from .run_context import RunContextWrapper, TContext
 from .stream_events import (
@@ -53,16 +83,31 @@ from .stream_events import (
     RunItemStreamEvent,
     StreamEvent,
 )
+from .token_estimation import (
+    TokenEstimator,
+    Tokenizer,
+    estimate_tokens,
+    set_default_tokenizer,
+    tiktoken_tokenizer,
+)
 from .tool import (
     ComputerTool,
     FileSearchTool,
     FunctionTool,
     FunctionToolResult,
     Tool,
+    ToolExecution,
     WebSearchTool,
     default_tool_error_function,
     function_tool,
 )
+from .tool_cache import (
+    InMemoryToolCache,
+    SQLiteToolCache,
+    ToolCache,
+    ToolCacheBackend,
+    ToolCacheScope,
+)
 from .tracing import (
     AgentSpanData,
     CustomSpanData,
@@ -100,6 +145,7 @@ from .tracing import (
     transcription_span,
 )
 from .usage import Usage
+from .util import _schema_cache, _tool_execution
 from .version import __version__
 
 
@@ -138,6 +184,22 @@ def set_default_openai_api(api: Literal["chat_completions", "responses"]) -> Non
     _config.set_default_openai_api(api)
 
 
+def set_tool_process_pool(executor: Optional[ProcessPoolExecutor]) -> None:
+    """Set the process pool used to run function tools with the "process" execution policy. By
+    default, a `ProcessPoolExecutor` with default settings is created when it is first needed.
+    """
+    _tool_execution.set_process_pool(executor)
+
+
+def set_function_schema_cache_dir(directory: Union[str, Path, None]) -> None:
+    """Set the directory where the schemas of function tools are cached, so that new processes
+    don't have to parse docstrings and generate JSON schemas again, which speeds up cold starts.
+    Schemas are always cached in memory; pass None to stop caching them on disk. Defaults to the
+    `OPENAI_AGENTS_SCHEMA_CACHE_DIR` environment variable.
+    """
+    _schema_cache.set_schema_cache_dir(directory)
+
+
 def enable_verbose_stdout_logging():
     """Enables verbose logging to stdout. This is useful for debugging."""
     logger = logging.getLogger("openai.agents")
@@ -157,7 +219,41 @@ __all__ = [
     "OpenAIChatCompletionsModel",
     "OpenAIProvider",
     "OpenAIResponsesModel",
+    "CachingModel",
+    "HedgedModel",
+    "RetryPolicy",
+    "RetryingModel",
+    "CircuitBreaker",
+    "RateLimiter",
+    "RateLimitedModel",
+    "RateLimitedModelProvider",
+    "SingleFlightGroup",
+    "SingleFlightModel",
+    "SingleFlightModelProvider",
+    "Endpoint",
+    "LoadBalancedModel",
+    "LoadBalancedProvider",
+    "RecordingModel",
+    "RecordingModelProvider",
+    "ReplayModel",
+    "ReplayModelProvider",
+    "CachingModelProvider",
+    "ResponseCache",
     "AgentOutputSchema",
+    "CheckpointStore",
+    "FileCheckpointStore",
+    "RunCheckpoint",
+    "SQLiteCheckpointStore",
+    "TokenEstimator",
+    "Tokenizer",
+    "estimate_tokens",
+    "set_default_tokenizer",
+    "tiktoken_tokenizer",
+    "ContextStrategy",
+    "ContextMetrics",
+    "SlidingWindowStrategy",
+    "PruningStrategy",
+    "SummarizingStrategy",
     "Computer",
     "AsyncComputer",
     "Environment",
@@ -167,6 +263,9 @@ __all__ = [
     "OutputGuardrailTripwireTriggered",
     "MaxTurnsExceeded",
     "ModelBehaviorError",
+    "PreviousResponseNotFoundError",
+    "CircuitOpenError",
+    "ToolTimeoutError",
     "UserError",
     "InputGuardrail",
     "InputGuardrailResult",
@@ -195,6 +294,8 @@ __all__ = [
     "RunContextWrapper",
     "TContext",
     "RunResult",
+    "RunManyItem",
+    "RunManyResult",
     "RunResultStreaming",
     "RunConfig",
     "RawResponsesStreamEvent",
@@ -202,12 +303,18 @@ __all__ = [
     "AgentUpdatedStreamEvent",
     "StreamEvent",
     "FunctionTool",
+    "ToolExecution",
     "FunctionToolResult",
     "ComputerTool",
     "FileSearchTool",
     "Tool",
     "WebSearchTool",
     "function_tool",
+    "ToolCache",
+    "ToolCacheBackend",
+    "ToolCacheScope",
+    "InMemoryToolCache",
+    "SQLiteToolCache",
     "Usage",
     "add_trace_processor",
     "agent_span",
@@ -243,6 +350,8 @@ __all__ = [
     "set_default_openai_key",
     "set_default_openai_client",
     "set_default_openai_api",
+    "set_tool_process_pool",
+    "set_function_schema_cache_dir",
     "set_tracing_export_api_key",
     "enable_verbose_stdout_logging",
     "gen_trace_id",
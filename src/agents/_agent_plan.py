@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+from .agent import Agent
+from .agent_output import AgentOutputSchema
+from .handoffs import Handoff, handoff
+
+
+@dataclass
+class AgentPlan:
+    """The parts of a run that only depend on an agent's definition, compiled once and reused
+    across turns and runs.
+
+    Converted tool params and response formats aren't part of the plan: they depend on the API of
+    the model, and on tools that may change per run (like MCP tools) or be rearranged by the
+    request layout. The models memoize them by the identity of the objects they're given instead.
+    """
+
+    fingerprint: tuple[Any, ...]
+    """The agent attributes the plan was compiled from. If they change, the plan is recompiled."""
+
+    output_schema: AgentOutputSchema | None
+    """The output schema of the agent, or None if the output is plain text."""
+
+    handoffs: list[Handoff]
+    """The agent's handoffs, with plain `Agent` handoffs converted to `Handoff` objects."""
+
+
+def _fingerprint(agent: Agent[Any]) -> tuple[Any, ...]:
+    # The plan keeps every handoff target alive, so the ids below can't be reused while it exists.
+    handoff_keys = tuple(
+        (id(item), item.name, item.handoff_description) if isinstance(item, Agent) else id(item)
+        for item in agent.handoffs
+    )
+    return (agent.output_type, handoff_keys)
+
+
+def _compile(agent: Agent[Any], fingerprint: tuple[Any, ...]) -> AgentPlan:
+    if agent.output_type is None or agent.output_type is str:
+        output_schema = None
+    else:
+        output_schema = AgentOutputSchema(agent.output_type)
+
+    handoffs: list[Handoff] = []
+    for handoff_item in agent.handoffs:
+        if isinstance(handoff_item, Handoff):
+            handoffs.append(handoff_item)
+        elif isinstance(handoff_item, Agent):
+            handoffs.append(handoff(handoff_item))
+
+    return AgentPlan(fingerprint=fingerprint, output_schema=output_schema, handoffs=handoffs)
+
+
+_cache_ids = itertools.count()
+
+
+class AgentPlanCache:
+    """Caches an `AgentPlan` per agent instance. A plan is recompiled automatically when the
+    agent's output type or handoffs change, and can be dropped explicitly with `invalidate()`.
+
+    Plans hold the handoffs of their agent, and through them the agents handed off to, so they are
+    stored on the agent itself rather than in the cache: agents that hand off to each other can
+    then still be garbage collected. The cache only keeps weak references to the agents that have
+    a plan, so that it can drop all of them.
+    """
+
+    def __init__(self) -> None:
+        self._attribute = f"_agent_plan_{next(_cache_ids)}"
+        self._agents: dict[int, weakref.ref[Agent[Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, agent: Agent[Any]) -> AgentPlan:
+        fingerprint = _fingerprint(agent)
+        plan: AgentPlan | None = agent.__dict__.get(self._attribute)
+        agent_id = id(agent)
+        agent_ref = self._agents.get(agent_id)
+        # A copy of an agent also copies its plan, but isn't tracked by the cache
+        if plan is not None and agent_ref is not None and agent_ref() is agent:
+            if plan.fingerprint == fingerprint:
+                return plan
+
+        plan = _compile(agent, fingerprint)
+
+        def _remove(_: weakref.ref[Agent[Any]]) -> None:
+            with self._lock:
+                current = self._agents.get(agent_id)
+                if current is not None and current() is None:
+                    del self._agents[agent_id]
+
+        with self._lock:
+            agent.__dict__[self._attribute] = plan
+            if agent_ref is None or agent_ref() is not agent:
+                self._agents[agent_id] = weakref.ref(agent, _remove)
+        return plan
+
+    def invalidate(self, agent: Agent[Any] | None = None) -> None:
+        """Drop the cached plan for the given agent, or for all agents if none is given."""
+        with self._lock:
+            if agent is None:
+                agents = [ref() for ref in self._agents.values()]
+                self._agents.clear()
+            else:
+                agent_ref = self._agents.pop(id(agent), None)
+                agents = [agent] if agent_ref is not None and agent_ref() is agent else []
+            for cached_agent in agents:
+                if cached_agent is not None:
+                    cached_agent.__dict__.pop(self._attribute, None)
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+
+AGENT_PLAN_CACHE = AgentPlanCache()
+"""The process-wide plan cache used by `Runner`."""
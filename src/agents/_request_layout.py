@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import dataclasses
+import functools
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from .agent_output import AgentOutputSchema
+from .handoffs import Handoff
+from .items import TResponseInputItem
+from .logger import logger
+from .tool import ComputerTool, FunctionTool, Tool
+from .tracing import custom_span
+from .usage import Usage
+from .util._canonical import canonical_json
+from .util._identity_memo import IdentityMemo, field_values
+
+RequestSection = Literal["tools", "instructions", "input"]
+"""The sections of a model request, in the order providers put them in the prompt."""
+
+
+def describe_tool(tool: Tool) -> dict[str, Any]:
+    """Returns the parts of a tool that the model sees. The tool's implementation isn't included."""
+    if isinstance(tool, FunctionTool):
+        return {
+            "type": "function",
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.params_json_schema,
+            "strict": tool.strict_json_schema,
+        }
+    if isinstance(tool, ComputerTool):
+        return {
+            "type": "computer",
+            "environment": tool.computer.environment,
+            "dimensions": tool.computer.dimensions,
+        }
+    return {"type": tool.name, "config": tool}
+
+
+def describe_handoff(handoff: Handoff) -> dict[str, Any]:
+    """Returns the parts of a handoff that the model sees."""
+    return {
+        "name": handoff.tool_name,
+        "description": handoff.tool_description,
+        "parameters": handoff.input_json_schema,
+        "strict": handoff.strict_json_schema,
+    }
+
+
+def describe_output_schema(output_schema: AgentOutputSchema | None) -> dict[str, Any] | None:
+    """Returns the parts of an output schema that the model sees, or None for plain text."""
+    if output_schema is None or output_schema.is_plain_text():
+        return None
+    return {
+        "name": output_schema.output_type_name(),
+        "schema": output_schema.json_schema(),
+        "strict": output_schema.strict_json_schema,
+    }
+
+
+def _sort_keys(value: Any) -> Any:
+    # `json.loads` keeps the key order of the document, which `canonical_json` sorted.
+    return json.loads(canonical_json(value))
+
+
+def _canonical_tool(tool: Tool) -> Tool:
+    if isinstance(tool, FunctionTool):
+        schema = _sort_keys(tool.params_json_schema)
+        if json.dumps(schema) != json.dumps(tool.params_json_schema):
+            return dataclasses.replace(tool, params_json_schema=schema)
+    return tool
+
+
+def _canonical_handoff(handoff: Handoff) -> Handoff:
+    schema = _sort_keys(handoff.input_json_schema)
+    if json.dumps(schema) != json.dumps(handoff.input_json_schema):
+        return dataclasses.replace(handoff, input_json_schema=schema)
+    return handoff
+
+
+_CANONICAL_TOOLS_MEMO: IdentityMemo[Tool] = IdentityMemo()
+_CANONICAL_HANDOFFS_MEMO: IdentityMemo[Handoff] = IdentityMemo()
+_DESCRIBED_TOOLS_MEMO: IdentityMemo[str] = IdentityMemo()
+_HANDOFFS_SEPARATOR = object()
+
+
+@dataclass
+class RequestLayoutReport:
+    """How much of a model request matched the start of the previous request in the same run.
+    Providers can only reuse their prompt cache for a prefix that is byte-for-byte identical, so
+    a short stable prefix explains a low cached token ratio.
+    """
+
+    stable_prefix_chars: int
+    """The length of the canonical serialization of the request that is identical to the
+    previous request, in characters.
+    """
+
+    total_chars: int
+    """The length of the canonical serialization of the whole request, in characters."""
+
+    first_changed_section: RequestSection | None
+    """The first section that differs from the previous request, or None if the previous request
+    is a prefix of this one (e.g. the input only grew). Changes to the instructions invalidate the
+    cache for the whole input that follows them. The first request of a run reports "tools".
+    """
+
+    cached_input_ratio: float | None = None
+    """The fraction of input tokens the provider read from its prompt cache, if it reported it."""
+
+
+class RequestLayout:
+    """Arranges the model requests of one run so their prefix stays byte-stable across turns:
+    tools are sorted by name, handoffs by tool name, and JSON schemas have sorted keys. Tools from
+    MCP servers therefore keep their place even if a server reorders its listing.
+
+    It also compares each request with the previous one, and reports the length of the stable
+    prefix along with the cached token ratio the provider reported.
+    """
+
+    def __init__(self, tracing_disabled: bool = False) -> None:
+        self._tracing_disabled = tracing_disabled
+        self._tools_json: str | None = None
+        self._instructions: str | None = None
+        self._input: list[TResponseInputItem] = []
+        self._input_lengths: list[int] = []
+        self.reports: list[RequestLayoutReport] = []
+        """A report for each request in the run, in order."""
+
+    def arrange(
+        self, tools: list[Tool], handoffs: list[Handoff]
+    ) -> tuple[list[Tool], list[Handoff]]:
+        """Returns the tools and handoffs in a deterministic order, with canonical schemas. The
+        canonical objects are memoized, so the models' own conversion caches keep working.
+        """
+        arranged_tools = [
+            _CANONICAL_TOOLS_MEMO.get_or_create(
+                (tool,), functools.partial(_canonical_tool, tool), field_values(tool)
+            )
+            for tool in sorted(tools, key=lambda tool: tool.name)
+        ]
+        arranged_handoffs = [
+            _CANONICAL_HANDOFFS_MEMO.get_or_create(
+                (handoff,), functools.partial(_canonical_handoff, handoff), field_values(handoff)
+            )
+            for handoff in sorted(handoffs, key=lambda handoff: handoff.tool_name)
+        ]
+        return arranged_tools, arranged_handoffs
+
+    def observe(
+        self,
+        system_instructions: str | None,
+        tools: Sequence[Tool],
+        handoffs: Sequence[Handoff],
+        input: Sequence[TResponseInputItem],
+    ) -> RequestLayoutReport:
+        """Compares a request with the previous one, and records it as the previous request."""
+        tools_json = _DESCRIBED_TOOLS_MEMO.get_or_create(
+            (*tools, _HANDOFFS_SEPARATOR, *handoffs),
+            lambda: canonical_json(
+                [describe_tool(tool) for tool in tools]
+                + [describe_handoff(handoff) for handoff in handoffs]
+            ),
+            field_values(*tools, *handoffs),
+        )
+        instructions = system_instructions or ""
+
+        # Input items are shared between turns, so most of them can be matched by identity and
+        # their lengths reused.
+        input_lengths: list[int] = []
+        matched_items = 0
+        for index, item in enumerate(input):
+            if (
+                matched_items == index
+                and index < len(self._input)
+                and (self._input[index] is item or self._input[index] == item)
+            ):
+                matched_items += 1
+                input_lengths.append(self._input_lengths[index])
+            else:
+                input_lengths.append(len(canonical_json(item)))
+
+        first_changed: RequestSection | None = None
+        stable = 0
+        if self._tools_json != tools_json:
+            first_changed = "tools"
+        else:
+            stable += len(tools_json)
+            if self._instructions != instructions:
+                first_changed = "instructions"
+            else:
+                stable += len(instructions) + sum(input_lengths[:matched_items])
+                if matched_items < len(self._input):
+                    first_changed = "input"
+
+        report = RequestLayoutReport(
+            stable_prefix_chars=stable,
+            total_chars=len(tools_json) + len(instructions) + sum(input_lengths),
+            first_changed_section=first_changed,
+        )
+        self._tools_json = tools_json
+        self._instructions = instructions
+        self._input = list(input)
+        self._input_lengths = input_lengths
+        self.reports.append(report)
+        return report
+
+    def record_usage(self, report: RequestLayoutReport, usage: Usage) -> None:
+        """Adds the cached token ratio of the response to the request's report, then logs it and
+        records it in a `request_layout` trace span.
+        """
+        if usage.input_tokens:
+            report.cached_input_ratio = usage.cached_input_tokens / usage.input_tokens
+        logger.debug(
+            f"Request layout: stable prefix {report.stable_prefix_chars}/{report.total_chars} "
+            f"chars, first change in {report.first_changed_section or 'nothing'}, cached input "
+            f"ratio {report.cached_input_ratio}"
+        )
+        with custom_span(
+            "request_layout", data=dataclasses.asdict(report), disabled=self._tracing_disabled
+        ):
+            pass
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import dataclasses
+import functools
 import inspect
-from collections.abc import Awaitable
+from collections.abc import Awaitable, Iterable
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any, cast
 
@@ -28,10 +29,11 @@ from openai.types.responses.response_computer_tool_call import (
 from openai.types.responses.response_input_param import ComputerCallOutput
 from openai.types.responses.response_reasoning_item import ResponseReasoningItem
 
+from ._tool_scheduler import ToolScheduler
 from .agent import Agent, ToolsToFinalOutputResult
 from .agent_output import AgentOutputSchema
 from .computer import AsyncComputer, Computer
-from .exceptions import AgentsException, ModelBehaviorError, UserError
+from .exceptions import AgentsException, ModelBehaviorError, ToolTimeoutError, UserError
 from .guardrail import InputGuardrail, InputGuardrailResult, OutputGuardrail, OutputGuardrailResult
 from .handoffs import Handoff, HandoffInputData
 from .items import (
@@ -63,6 +65,7 @@ from .tracing import (
     trace,
 )
 from .util import _coro, _error_tracing
+from .util._frozen import freeze
 
 if TYPE_CHECKING:
     from .run import RunConfig
@@ -77,6 +80,14 @@ QUEUE_COMPLETE_SENTINEL = QueueCompleteSentinel()
 _NOT_FINAL_OUTPUT = ToolsToFinalOutputResult(is_final_output=False, final_output=None)
 
 
+async def _cancel_tasks(tasks: Iterable[asyncio.Future[Any]]) -> None:
+    """Cancels tasks and waits for them to finish."""
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
 @dataclass
 class AgentToolUseTracker:
     agent_to_tools: list[tuple[Agent, list[str]]] = field(default_factory=list)
@@ -93,6 +104,16 @@ class AgentToolUseTracker:
         existing_data = next((item for item in self.agent_to_tools if item[0] == agent), None)
         return existing_data is not None and len(existing_data[1]) > 0
 
+    @classmethod
+    def from_items(cls, items: list[RunItem]) -> AgentToolUseTracker:
+        """Rebuilds the tracker from the items generated so far in a run, e.g. when resuming it."""
+        tracker = cls()
+        for item in items:
+            if isinstance(item, (ToolCallItem, HandoffCallItem)):
+                tool_name = getattr(item.raw_item, "name", item.raw_item.type)
+                tracker.add_tool_use(item.agent, [tool_name])
+        return tracker
+
 
 @dataclass
 class ToolRunHandoff:
@@ -199,6 +220,8 @@ class RunImpl:
         hooks: RunHooks[TContext],
         context_wrapper: RunContextWrapper[TContext],
         run_config: RunConfig,
+        started_tool_calls: dict[str, asyncio.Task[Any]] | None = None,
+        tool_scheduler: ToolScheduler | None = None,
     ) -> SingleStepResult:
         # Make a copy of the generated items
         pre_step_items = list(pre_step_items)
@@ -214,6 +237,8 @@ class RunImpl:
                 hooks=hooks,
                 context_wrapper=context_wrapper,
                 config=run_config,
+                started_tool_calls=started_tool_calls,
+                tool_scheduler=tool_scheduler,
             ),
             cls.execute_computer_actions(
                 agent=agent,
@@ -428,53 +453,36 @@ class RunImpl:
         hooks: RunHooks[TContext],
         context_wrapper: RunContextWrapper[TContext],
         config: RunConfig,
+        started_tool_calls: dict[str, asyncio.Task[Any]] | None = None,
+        tool_scheduler: ToolScheduler | None = None,
     ) -> list[FunctionToolResult]:
-        async def run_single_tool(
-            func_tool: FunctionTool, tool_call: ResponseFunctionToolCall
-        ) -> Any:
-            with function_span(func_tool.name) as span_fn:
-                if config.trace_include_sensitive_data:
-                    span_fn.span_data.input = tool_call.arguments
-                try:
-                    _, _, result = await asyncio.gather(
-                        hooks.on_tool_start(context_wrapper, agent, func_tool),
-                        (
-                            agent.hooks.on_tool_start(context_wrapper, agent, func_tool)
-                            if agent.hooks
-                            else _coro.noop_coroutine()
-                        ),
-                        func_tool.on_invoke_tool(context_wrapper, tool_call.arguments),
-                    )
-
-                    await asyncio.gather(
-                        hooks.on_tool_end(context_wrapper, agent, func_tool, result),
-                        (
-                            agent.hooks.on_tool_end(context_wrapper, agent, func_tool, result)
-                            if agent.hooks
-                            else _coro.noop_coroutine()
-                        ),
-                    )
-                except Exception as e:
-                    _error_tracing.attach_error_to_current_span(
-                        SpanError(
-                            message="Error running tool",
-                            data={"tool_name": func_tool.name, "error": str(e)},
-                        )
-                    )
-                    if isinstance(e, AgentsException):
-                        raise e
-                    raise UserError(f"Error running tool {func_tool.name}: {e}") from e
-
-                if config.trace_include_sensitive_data:
-                    span_fn.span_data.output = result
-            return result
-
-        tasks = []
+        tasks: list[Awaitable[Any]] = []
         for tool_run in tool_runs:
-            function_tool = tool_run.function_tool
-            tasks.append(run_single_tool(function_tool, tool_run.tool_call))
+            # Tool calls that were already started (e.g. while the model was still streaming)
+            # are awaited rather than run again. Each one is consumed once.
+            started = (
+                started_tool_calls.pop(tool_run.tool_call.call_id, None)
+                if started_tool_calls
+                else None
+            )
+            if started is not None:
+                tasks.append(started)
+            else:
+                tasks.append(
+                    cls.run_function_tool(
+                        agent=agent,
+                        func_tool=tool_run.function_tool,
+                        tool_call=tool_run.tool_call,
+                        hooks=hooks,
+                        context_wrapper=context_wrapper,
+                        config=config,
+                        tool_scheduler=tool_scheduler,
+                    )
+                )
 
-        results = await asyncio.gather(*tasks)
+        results = await cls._run_tool_calls(
+            tool_runs, tasks, context_wrapper, config.tool_turn_timeout
+        )
 
         return [
             FunctionToolResult(
@@ -489,6 +497,178 @@ class RunImpl:
             for tool_run, result in zip(tool_runs, results)
         ]
 
+    @classmethod
+    async def _run_tool_calls(
+        cls,
+        tool_runs: list[ToolRunFunction],
+        calls: list[Awaitable[Any]],
+        context_wrapper: RunContextWrapper[TContext],
+        turn_timeout: float | None,
+    ) -> list[Any]:
+        """Runs the tool calls of a turn concurrently, as a task group: tools report recoverable
+        errors as outputs, so if a call raises, the run is going to fail, and the other calls are
+        cancelled before the error is re-raised. Calls still running after `turn_timeout` seconds
+        are cancelled and reported as timed out.
+        """
+        if not calls:
+            return []
+
+        tasks = [asyncio.ensure_future(call) for call in calls]
+        try:
+            done, pending = await asyncio.wait(
+                tasks, timeout=turn_timeout, return_when=asyncio.FIRST_EXCEPTION
+            )
+        except BaseException:
+            await _cancel_tasks(tasks)
+            raise
+
+        failed = next(
+            (
+                task
+                for task in tasks
+                if task in done and not task.cancelled() and task.exception() is not None
+            ),
+            None,
+        )
+        if pending:
+            await _cancel_tasks(pending)
+        if failed is not None:
+            raise cast(BaseException, failed.exception())
+
+        results: list[Any] = []
+        for tool_run, task in zip(tool_runs, tasks):
+            if task in pending:
+                assert turn_timeout is not None
+                logger.debug(
+                    f"Tool {tool_run.function_tool.name} was still running at the end of the turn"
+                )
+                results.append(
+                    await cls._tool_timed_out(tool_run.function_tool, context_wrapper, turn_timeout)
+                )
+            else:
+                results.append(task.result())
+        return results
+
+    @classmethod
+    async def _tool_timed_out(
+        cls,
+        func_tool: FunctionTool,
+        context_wrapper: RunContextWrapper[TContext],
+        timeout: float,
+    ) -> Any:
+        """Returns the output for a call that timed out, from the tool's `failure_error_function`,
+        or raises a `ToolTimeoutError` if it doesn't have one.
+        """
+        error = ToolTimeoutError(f"Tool {func_tool.name} timed out after {timeout} seconds")
+        if func_tool.failure_error_function is None:
+            raise error
+        result = func_tool.failure_error_function(context_wrapper, error)
+        if inspect.isawaitable(result):
+            return await result
+        return result
+
+    @classmethod
+    async def run_function_tool(
+        cls,
+        *,
+        agent: Agent[TContext],
+        func_tool: FunctionTool,
+        tool_call: ResponseFunctionToolCall,
+        hooks: RunHooks[TContext],
+        context_wrapper: RunContextWrapper[TContext],
+        config: RunConfig,
+        tool_scheduler: ToolScheduler | None = None,
+    ) -> Any:
+        invoke = functools.partial(
+            cls._invoke_function_tool,
+            agent=agent,
+            func_tool=func_tool,
+            tool_call=tool_call,
+            hooks=hooks,
+            context_wrapper=context_wrapper,
+            config=config,
+        )
+        if tool_scheduler is None:
+            return await invoke()
+        return await tool_scheduler.run(func_tool, invoke)
+
+    @classmethod
+    async def _invoke_function_tool(
+        cls,
+        *,
+        agent: Agent[TContext],
+        func_tool: FunctionTool,
+        tool_call: ResponseFunctionToolCall,
+        hooks: RunHooks[TContext],
+        context_wrapper: RunContextWrapper[TContext],
+        config: RunConfig,
+    ) -> Any:
+        with function_span(func_tool.name) as span_fn:
+            if config.trace_include_sensitive_data:
+                span_fn.span_data.input = tool_call.arguments
+            try:
+                _, _, result = await asyncio.gather(
+                    hooks.on_tool_start(context_wrapper, agent, func_tool),
+                    (
+                        agent.hooks.on_tool_start(context_wrapper, agent, func_tool)
+                        if agent.hooks
+                        else _coro.noop_coroutine()
+                    ),
+                    cls._invoke_with_timeout(
+                        func_tool,
+                        context_wrapper,
+                        tool_call.arguments,
+                        func_tool.timeout if func_tool.timeout is not None else config.tool_timeout,
+                    ),
+                )
+
+                await asyncio.gather(
+                    hooks.on_tool_end(context_wrapper, agent, func_tool, result),
+                    (
+                        agent.hooks.on_tool_end(context_wrapper, agent, func_tool, result)
+                        if agent.hooks
+                        else _coro.noop_coroutine()
+                    ),
+                )
+            except Exception as e:
+                _error_tracing.attach_error_to_current_span(
+                    SpanError(
+                        message="Error running tool",
+                        data={"tool_name": func_tool.name, "error": str(e)},
+                    )
+                )
+                if isinstance(e, AgentsException):
+                    raise e
+                raise UserError(f"Error running tool {func_tool.name}: {e}") from e
+
+            if config.trace_include_sensitive_data:
+                span_fn.span_data.output = result
+        return result
+
+    @classmethod
+    async def _invoke_with_timeout(
+        cls,
+        func_tool: FunctionTool,
+        context_wrapper: RunContextWrapper[TContext],
+        arguments: str,
+        timeout: float | None,
+    ) -> Any:
+        if timeout is None:
+            return await func_tool.on_invoke_tool(context_wrapper, arguments)
+        try:
+            return await asyncio.wait_for(
+                func_tool.on_invoke_tool(context_wrapper, arguments), timeout
+            )
+        except asyncio.TimeoutError:
+            if func_tool.failure_error_function is not None:
+                _error_tracing.attach_error_to_current_span(
+                    SpanError(
+                        message="Tool call timed out (non-fatal)",
+                        data={"tool_name": func_tool.name, "timeout": timeout},
+                    )
+                )
+            return await cls._tool_timed_out(func_tool, context_wrapper, timeout)
+
     @classmethod
     async def execute_computer_actions(
         cls,
@@ -630,7 +810,7 @@ class RunImpl:
                 original_input = (
                     filtered.input_history
                     if isinstance(filtered.input_history, str)
-                    else list(filtered.input_history)
+                    else freeze(list(filtered.input_history))
                 )
                 pre_step_items = list(filtered.pre_handoff_items)
                 new_step_items = list(filtered.new_items)
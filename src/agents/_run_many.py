@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from typing import Any
+
+from .agent import Agent
+from .tool import Tool
+
+
+class BatchToolsCache:
+    """Lists each agent's tools (including MCP tools) once per `Runner.run_many()` batch, and
+    shares the result between all the runs in the batch. Concurrent runs that need the same agent's
+    tools wait on a single listing. If listing fails, the failure is reported to the runs waiting
+    on it and the next run tries again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[Agent[Any], asyncio.Future[list[Tool]]]] = {}
+
+    async def get_all_tools(self, agent: Agent[Any]) -> list[Tool]:
+        entry = self._entries.get(id(agent))
+        if entry is None:
+            # Keep the agent alive with the entry, so its id can't be reused during the batch.
+            entry = (agent, asyncio.ensure_future(agent.get_all_tools()))
+            self._entries[id(agent)] = entry
+
+        try:
+            # Shielded, so one run being cancelled doesn't cancel the listing for the others.
+            tools = await asyncio.shield(entry[1])
+        except Exception:
+            if self._entries.get(id(agent)) is entry:
+                del self._entries[id(agent)]
+            raise
+        return list(tools)
+
+
+current_batch_tools: contextvars.ContextVar[BatchToolsCache | None] = contextvars.ContextVar(
+    "current_batch_tools", default=None
+)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from openai.types.responses import ResponseCompletedEvent
+
+from .agent_output import AgentOutputSchema
+from .exceptions import PreviousResponseNotFoundError
+from .handoffs import Handoff
+from .items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from .logger import logger
+from .model_settings import ModelSettings
+from .models.interface import Model, ModelTracing
+from .tool import Tool
+from .usage import Usage
+
+
+def _to_model_response(event: ResponseCompletedEvent) -> ModelResponse:
+    return ModelResponse(
+        output=event.response.output, usage=Usage(), referenceable_id=event.response.id
+    )
+
+
+class ServerConversation:
+    """Tracks the conversation state that the server stored for one run, so each model request
+    can continue from the previous response instead of resending the whole history.
+
+    A request only sends the input items that follow the items the server already has: the
+    previous request's input and the previous response's output. If the history no longer starts
+    with those items (e.g. a handoff input filter rewrote it), if the model doesn't support
+    `previous_response_id`, or if the server no longer has the previous response, the full history
+    is sent instead.
+    """
+
+    def __init__(self) -> None:
+        self._response_id: str | None = None
+        self._stored_items: list[TResponseInputItem] = []
+        self.items_sent = 0
+        """The number of input items sent to the model in the run."""
+
+        self.items_skipped = 0
+        """The number of input items that didn't need to be sent, because the server had them."""
+
+    def _split_input(
+        self, model: Model, model_settings: ModelSettings, input: list[TResponseInputItem]
+    ) -> tuple[list[TResponseInputItem], str | None]:
+        if (
+            self._response_id is None
+            or not model.supports_previous_response_id
+            or model_settings.store is False
+        ):
+            return input, None
+
+        stored = self._stored_items
+        if len(input) < len(stored) or any(
+            item is not stored_item and item != stored_item
+            for item, stored_item in zip(input, stored)
+        ):
+            logger.debug("The history was rewritten, so the full history is sent to the model")
+            return input, None
+        return input[len(stored) :], self._response_id
+
+    def _record(
+        self,
+        input: list[TResponseInputItem],
+        model_input: list[TResponseInputItem],
+        response: ModelResponse,
+    ) -> None:
+        self.items_sent += len(model_input)
+        self.items_skipped += len(input) - len(model_input)
+        self._response_id = response.referenceable_id
+        self._stored_items = input + response.to_input_items() if self._response_id else []
+
+    async def get_response(
+        self,
+        model: Model,
+        system_instructions: str | None,
+        input: list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> ModelResponse:
+        """Gets a response from the model, continuing from the previous response if possible."""
+        model_input, previous_response_id = self._split_input(model, model_settings, input)
+        kwargs: dict[str, Any] = {}
+        if previous_response_id is not None:
+            kwargs["previous_response_id"] = previous_response_id
+        try:
+            response = await model.get_response(
+                system_instructions,
+                model_input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+        except PreviousResponseNotFoundError:
+            logger.debug(f"Response {previous_response_id} wasn't found, sending the full history")
+            model_input = input
+            response = await model.get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing
+            )
+
+        self._record(input, model_input, response)
+        return response
+
+    async def stream_response(
+        self,
+        model: Model,
+        system_instructions: str | None,
+        input: list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        """Streams a response from the model, continuing from the previous response if possible.
+        The full history is only resent if the server rejects the previous response before any
+        event was streamed.
+        """
+        model_input, previous_response_id = self._split_input(model, model_settings, input)
+        kwargs: dict[str, Any] = {}
+        if previous_response_id is not None:
+            kwargs["previous_response_id"] = previous_response_id
+
+        streamed_any = False
+        try:
+            async for event in model.stream_response(
+                system_instructions,
+                model_input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            ):
+                streamed_any = True
+                if isinstance(event, ResponseCompletedEvent):
+                    self._record(input, model_input, _to_model_response(event))
+                yield event
+            return
+        except PreviousResponseNotFoundError:
+            if streamed_any:
+                raise
+            logger.debug(f"Response {previous_response_id} wasn't found, sending the full history")
+
+        async for event in model.stream_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing
+        ):
+            if isinstance(event, ResponseCompletedEvent):
+                self._record(input, input, _to_model_response(event))
+            yield event
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import weakref
+from collections.abc import AsyncIterator, Awaitable
+from typing import Callable, TypeVar
+
+from .exceptions import UserError
+from .tool import FunctionTool
+
+T = TypeVar("T")
+
+
+class _LoopLimits:
+    """The limits shared by every run on one event loop: a semaphore per tool with
+    `max_concurrency`, and a lock per resource key.
+    """
+
+    def __init__(self) -> None:
+        self.tool_slots: dict[int, tuple[weakref.ref[FunctionTool], asyncio.Semaphore]] = {}
+        self.resource_locks: dict[str, asyncio.Lock] = {}
+
+    def tool_semaphore(self, tool: FunctionTool, max_concurrency: int) -> asyncio.Semaphore:
+        tool_id = id(tool)
+        entry = self.tool_slots.get(tool_id)
+        if entry is not None and entry[0]() is tool:
+            return entry[1]
+
+        def _remove(_: weakref.ref[FunctionTool]) -> None:
+            current = self.tool_slots.get(tool_id)
+            if current is not None and current[0]() is None:
+                del self.tool_slots[tool_id]
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        self.tool_slots[tool_id] = (weakref.ref(tool, _remove), semaphore)
+        return semaphore
+
+    def resource_lock(self, resource_key: str) -> asyncio.Lock:
+        lock = self.resource_locks.get(resource_key)
+        if lock is None:
+            lock = self.resource_locks[resource_key] = asyncio.Lock()
+        return lock
+
+
+# asyncio primitives can't be shared between event loops (e.g. across `Runner.run_sync` calls), so
+# the shared limits are kept per loop.
+_limits_by_loop: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopLimits] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _loop_limits() -> _LoopLimits:
+    loop = asyncio.get_running_loop()
+    limits = _limits_by_loop.get(loop)
+    if limits is None:
+        limits = _limits_by_loop[loop] = _LoopLimits()
+    return limits
+
+
+class ToolScheduler:
+    """Decides when each function tool call in a run may start. A call waits until:
+    1. No other call with the same `FunctionTool.resource_key` is running, in any run.
+    2. Fewer than `FunctionTool.max_concurrency` calls to the same tool are running, in any run.
+    3. Fewer than `max_concurrent_tool_calls` function tool calls are running in this run.
+
+    Calls without limits start immediately, as before.
+    """
+
+    def __init__(self, max_concurrent_tool_calls: int | None = None) -> None:
+        if max_concurrent_tool_calls is not None and max_concurrent_tool_calls < 1:
+            raise UserError(
+                f"max_concurrent_tool_calls must be at least 1, got {max_concurrent_tool_calls}"
+            )
+        self._max_concurrent_tool_calls = max_concurrent_tool_calls
+        self._run_slots: asyncio.Semaphore | None = None
+
+    async def run(self, tool: FunctionTool, invoke: Callable[[], Awaitable[T]]) -> T:
+        """Runs `invoke()` once the limits for the given tool allow it."""
+        async with self._acquire(tool):
+            return await invoke()
+
+    @contextlib.asynccontextmanager
+    async def _acquire(self, tool: FunctionTool) -> AsyncIterator[None]:
+        if (
+            tool.resource_key is None
+            and tool.max_concurrency is None
+            and self._max_concurrent_tool_calls is None
+        ):
+            yield
+            return
+
+        async with contextlib.AsyncExitStack() as stack:
+            # Always acquired in the same order, so calls can't deadlock each other. The run-wide
+            # slot is acquired last, so calls waiting for a key or tool don't hold it.
+            if tool.resource_key is not None:
+                await stack.enter_async_context(_loop_limits().resource_lock(tool.resource_key))
+            if tool.max_concurrency is not None:
+                semaphore = _loop_limits().tool_semaphore(tool, tool.max_concurrency)
+                await stack.enter_async_context(semaphore)
+            if self._max_concurrent_tool_calls is not None:
+                if self._run_slots is None:
+                    self._run_slots = asyncio.Semaphore(self._max_concurrent_tool_calls)
+                await stack.enter_async_context(self._run_slots)
+            yield
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from .items import RunItem, TResponseInputItem
+
+
+class RunTranscript:
+    """The model input for an agent run: the original input, followed by every item generated so
+    far. Each generated item is converted to an input item exactly once, when it is first seen.
+
+    Turns normally only append to the generated items, so syncing the transcript is proportional to
+    the number of new items rather than to the size of the history. If the history is rewritten
+    (e.g. by a handoff input filter), the transcript is rebuilt from scratch.
+    """
+
+    def __init__(self, original_input: str | list[TResponseInputItem]) -> None:
+        self._original_input: str | list[TResponseInputItem] = original_input
+        self._run_items: list[RunItem] = []
+        self._input_items: list[TResponseInputItem] = self._convert_original_input(original_input)
+
+    @property
+    def original_input(self) -> str | list[TResponseInputItem]:
+        """The original input that the transcript starts with."""
+        return self._original_input
+
+    @property
+    def num_items(self) -> int:
+        """The total number of input items in the transcript."""
+        return len(self._input_items)
+
+    def sync(
+        self,
+        original_input: str | list[TResponseInputItem],
+        generated_items: Sequence[RunItem],
+    ) -> None:
+        """Bring the transcript up to date with the given run state. New generated items are
+        appended; if the original input or the already-seen items changed, the transcript is
+        rebuilt.
+        """
+        if original_input is not self._original_input or not self._is_prefix_of(generated_items):
+            self._reset(original_input)
+
+        for item in generated_items[len(self._run_items) :]:
+            self._run_items.append(item)
+            self._input_items.append(item.to_input_item())
+
+    def to_input_list(self) -> list[TResponseInputItem]:
+        """Returns the input items for the next model call. This is a new list, but the items are
+        shared with the transcript, so they must not be mutated.
+        """
+        return list(self._input_items)
+
+    def _is_prefix_of(self, generated_items: Sequence[RunItem]) -> bool:
+        if len(generated_items) < len(self._run_items):
+            return False
+        return all(seen is item for seen, item in zip(self._run_items, generated_items))
+
+    def _reset(self, original_input: str | list[TResponseInputItem]) -> None:
+        self._original_input = original_input
+        self._run_items = []
+        self._input_items = self._convert_original_input(original_input)
+
+    @staticmethod
+    def _convert_original_input(
+        original_input: str | list[TResponseInputItem],
+    ) -> list[TResponseInputItem]:
+        if isinstance(original_input, str):
+            return [{"content": original_input, "role": "user"}]
+        # The runner never mutates the input items, so a shallow copy is enough here.
+        return list(original_input)
@@ -49,7 +49,7 @@ class AgentOutputSchema:
 
         if output_type is None or output_type is str:
             self._is_wrapped = False
-            self._type_adapter = TypeAdapter(output_type)
+            self._type_adapter = _json.type_adapter(output_type)
             self._output_schema = self._type_adapter.json_schema()
             return
 
@@ -57,6 +57,8 @@ class AgentOutputSchema:
         # not be a JSON Schema object.
         self._is_wrapped = not _is_subclass_of_base_model_or_dict(output_type)
 
+        # Validators are cached per output type, so that agents with the same output type (e.g.
+        # clones) share them.
         if self._is_wrapped:
             OutputType = TypedDict(
                 "OutputType",
@@ -64,10 +66,12 @@ class AgentOutputSchema:
                     _WRAPPER_DICT_KEY: output_type,  # type: ignore
                 },
             )
-            self._type_adapter = TypeAdapter(OutputType)
+            self._type_adapter = _json.type_adapter(
+                OutputType, key=(_WRAPPER_DICT_KEY, output_type)
+            )
             self._output_schema = self._type_adapter.json_schema()
         else:
-            self._type_adapter = TypeAdapter(output_type)
+            self._type_adapter = _json.type_adapter(output_type)
             self._output_schema = self._type_adapter.json_schema()
 
         if self.strict_json_schema:
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage
+from openai.types.responses.response_reasoning_item import ResponseReasoningItem
+from pydantic import BaseModel, TypeAdapter
+
+from .agent import Agent
+from .exceptions import UserError
+from .items import (
+    HandoffCallItem,
+    HandoffOutputItem,
+    MessageOutputItem,
+    ReasoningItem,
+    RunItem,
+    ToolCallItem,
+    ToolCallItemTypes,
+    ToolCallOutputItem,
+    TResponseInputItem,
+)
+from .usage import Usage
+
+_FORMAT_VERSION = 1
+
+_tool_call_adapter: TypeAdapter[ToolCallItemTypes] = TypeAdapter(ToolCallItemTypes)
+
+
+@dataclass
+class RunCheckpoint:
+    """The state of an agent run after its last completed turn. A run that saves checkpoints (see
+    `RunConfig.checkpoint_store`) can be continued from its last checkpoint with `Runner.resume()`,
+    e.g. after the process running it died, without repeating the model calls and tool calls of the
+    completed turns.
+
+    Every field is JSON serializable. Agents are referenced by name, and are looked up again when
+    the run is resumed.
+    """
+
+    checkpoint_id: str
+    """The ID of the run the checkpoint belongs to. Each save overwrites the previous checkpoint
+    with the same ID.
+    """
+
+    agent_name: str
+    """The name of the agent that runs the next turn."""
+
+    original_input: str | list[TResponseInputItem]
+    """The original input of the run. This may differ from the input passed to `Runner.run()`, if
+    a handoff input filter rewrote the history.
+    """
+
+    generated_items: list[dict[str, Any]]
+    """The items generated so far, in serialized form."""
+
+    usage: Usage
+    """The usage of the run so far."""
+
+    current_turn: int
+    """The number of turns completed so far."""
+
+    agent_started: bool = True
+    """Whether the start hooks of the agent that runs the next turn have run. They haven't if the
+    last completed turn handed off to it, so they run when the run is resumed.
+    """
+
+    def to_json(self) -> str:
+        """Serializes the checkpoint to a JSON string."""
+        data = asdict(self)
+        data["version"] = _FORMAT_VERSION
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> RunCheckpoint:
+        """Deserializes a checkpoint from a JSON string created by `to_json()`."""
+        parsed = json.loads(data)
+        version = parsed.pop("version", None)
+        if version != _FORMAT_VERSION:
+            raise UserError(f"Unsupported checkpoint format version: {version}")
+        parsed["usage"] = Usage(**parsed["usage"])
+        return cls(**parsed)
+
+
+class CheckpointStore(abc.ABC):
+    """Persists run checkpoints. Implement this to store checkpoints somewhere other than the local
+    disk, e.g. in a database shared by several workers.
+    """
+
+    @abc.abstractmethod
+    async def save(self, checkpoint: RunCheckpoint) -> None:
+        """Saves a checkpoint, replacing any previous checkpoint with the same ID. When this
+        returns, the checkpoint must be durable.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def load(self, checkpoint_id: str) -> RunCheckpoint | None:
+        """Loads the checkpoint with the given ID, or returns None if there isn't one."""
+        pass
+
+    @abc.abstractmethod
+    async def delete(self, checkpoint_id: str) -> None:
+        """Deletes the checkpoint with the given ID, if it exists."""
+        pass
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Stores each checkpoint as a JSON file in a directory. Files are replaced atomically, so a
+    crash while saving leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, checkpoint_id: str) -> Path:
+        if not checkpoint_id or os.sep in checkpoint_id or checkpoint_id in (".", ".."):
+            raise UserError(f"Invalid checkpoint ID: {checkpoint_id!r}")
+        return self.directory / f"{checkpoint_id}.json"
+
+    def _save(self, checkpoint: RunCheckpoint) -> None:
+        path = self._path(checkpoint.checkpoint_id)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(checkpoint.to_json())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    def _load(self, checkpoint_id: str) -> RunCheckpoint | None:
+        try:
+            data = self._path(checkpoint_id).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        return RunCheckpoint.from_json(data)
+
+    def _delete(self, checkpoint_id: str) -> None:
+        self._path(checkpoint_id).unlink(missing_ok=True)
+
+    async def save(self, checkpoint: RunCheckpoint) -> None:
+        await asyncio.to_thread(self._save, checkpoint)
+
+    async def load(self, checkpoint_id: str) -> RunCheckpoint | None:
+        return await asyncio.to_thread(self._load, checkpoint_id)
+
+    async def delete(self, checkpoint_id: str) -> None:
+        await asyncio.to_thread(self._delete, checkpoint_id)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a table of a SQLite database file."""
+
+    def __init__(self, path: str | os.PathLike[str], table_name: str = "agent_checkpoints") -> None:
+        if not table_name.isidentifier():
+            raise UserError(f"Invalid table name: {table_name!r}")
+        self.path = path
+        self.table_name = table_name
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        if not self._initialized:
+            with conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table_name} ("
+                    "checkpoint_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+                )
+            self._initialized = True
+        return conn
+
+    def _save(self, checkpoint: RunCheckpoint) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table_name} VALUES (?, ?, ?)",
+                    (checkpoint.checkpoint_id, checkpoint.to_json(), time.time()),
+                )
+        finally:
+            conn.close()
+
+    def _load(self, checkpoint_id: str) -> RunCheckpoint | None:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT data FROM {self.table_name} WHERE checkpoint_id = ?", (checkpoint_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return RunCheckpoint.from_json(row[0]) if row else None
+
+    def _delete(self, checkpoint_id: str) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    f"DELETE FROM {self.table_name} WHERE checkpoint_id = ?", (checkpoint_id,)
+                )
+        finally:
+            conn.close()
+
+    async def save(self, checkpoint: RunCheckpoint) -> None:
+        await asyncio.to_thread(self._save, checkpoint)
+
+    async def load(self, checkpoint_id: str) -> RunCheckpoint | None:
+        return await asyncio.to_thread(self._load, checkpoint_id)
+
+    async def delete(self, checkpoint_id: str) -> None:
+        await asyncio.to_thread(self._delete, checkpoint_id)
+
+
+def _serialize_output(output: Any) -> Any:
+    try:
+        json.dumps(output)
+    except (TypeError, ValueError):
+        return str(output)
+    return output
+
+
+def _serialize_item(item: RunItem) -> dict[str, Any]:
+    raw_item = item.raw_item
+    data: dict[str, Any] = {
+        "type": item.type,
+        "agent": item.agent.name,
+        "raw_item": raw_item.model_dump(mode="json", exclude_unset=True)
+        if isinstance(raw_item, BaseModel)
+        else raw_item,
+    }
+    if isinstance(item, HandoffOutputItem):
+        data["source_agent"] = item.source_agent.name
+        data["target_agent"] = item.target_agent.name
+    elif isinstance(item, ToolCallOutputItem):
+        data["output"] = _serialize_output(item.output)
+    return data
+
+
+def _deserialize_item(data: dict[str, Any], agents: dict[str, Agent[Any]]) -> RunItem:
+    agent = find_agent(agents, data["agent"])
+    raw_item = data["raw_item"]
+    item_type = data["type"]
+    if item_type == "message_output_item":
+        return MessageOutputItem(
+            agent=agent, raw_item=ResponseOutputMessage.model_validate(raw_item)
+        )
+    elif item_type == "handoff_call_item":
+        return HandoffCallItem(
+            agent=agent, raw_item=ResponseFunctionToolCall.model_validate(raw_item)
+        )
+    elif item_type == "handoff_output_item":
+        return HandoffOutputItem(
+            agent=agent,
+            raw_item=raw_item,
+            source_agent=find_agent(agents, data["source_agent"]),
+            target_agent=find_agent(agents, data["target_agent"]),
+        )
+    elif item_type == "tool_call_item":
+        return ToolCallItem(agent=agent, raw_item=_tool_call_adapter.validate_python(raw_item))
+    elif item_type == "tool_call_output_item":
+        return ToolCallOutputItem(agent=agent, raw_item=raw_item, output=data["output"])
+    elif item_type == "reasoning_item":
+        return ReasoningItem(agent=agent, raw_item=ResponseReasoningItem.model_validate(raw_item))
+    raise UserError(f"Unknown item type in checkpoint: {item_type}")
+
+
+def collect_agents(
+    starting_agent: Agent[Any], extra_agents: Sequence[Agent[Any]] = ()
+) -> dict[str, Agent[Any]]:
+    """Maps names to the given agents and every agent reachable through their plain `Agent`
+    handoffs. Agents behind `Handoff` objects can't be discovered, so they must be passed
+    explicitly.
+    """
+    agents: dict[str, Agent[Any]] = {}
+    pending = [starting_agent, *extra_agents]
+    while pending:
+        agent = pending.pop()
+        if agent.name in agents:
+            continue
+        agents[agent.name] = agent
+        pending.extend(h for h in agent.handoffs if isinstance(h, Agent))
+    return agents
+
+
+def find_agent(agents: dict[str, Agent[Any]], name: str) -> Agent[Any]:
+    agent = agents.get(name)
+    if agent is None:
+        raise UserError(
+            f"Agent {name!r} from the checkpoint wasn't found. Pass it to Runner.resume() with "
+            "`agents=`."
+        )
+    return agent
+
+
+class RunCheckpointer:
+    """Saves the checkpoints of one run. Each generated item is serialized once, when it is first
+    seen, so saving a checkpoint is proportional to the number of new items.
+    """
+
+    def __init__(self, store: CheckpointStore, checkpoint_id: str) -> None:
+        self.store = store
+        self.checkpoint_id = checkpoint_id
+        self._items: list[RunItem] = []
+        self._serialized_items: list[dict[str, Any]] = []
+
+    async def save(
+        self,
+        agent: Agent[Any],
+        original_input: str | list[TResponseInputItem],
+        generated_items: Sequence[RunItem],
+        usage: Usage,
+        current_turn: int,
+        agent_started: bool = True,
+    ) -> None:
+        """Saves the state of the run after a completed turn."""
+        if len(generated_items) < len(self._items) or any(
+            seen is not item for seen, item in zip(self._items, generated_items)
+        ):
+            # The history was rewritten, e.g. by a handoff input filter
+            self._items = []
+            self._serialized_items = []
+        for item in generated_items[len(self._items) :]:
+            self._items.append(item)
+            self._serialized_items.append(_serialize_item(item))
+
+        await self.store.save(
+            RunCheckpoint(
+                checkpoint_id=self.checkpoint_id,
+                agent_name=agent.name,
+                original_input=original_input
+                if isinstance(original_input, str)
+                else list(original_input),
+                generated_items=list(self._serialized_items),
+                usage=Usage(**asdict(usage)),
+                current_turn=current_turn,
+                agent_started=agent_started,
+            )
+        )
+
+    async def complete(self) -> None:
+        """Deletes the checkpoint once the run has finished, since there's nothing to resume."""
+        await self.store.delete(self.checkpoint_id)
+
+
+def restore_generated_items(
+    checkpoint: RunCheckpoint, agents: dict[str, Agent[Any]]
+) -> list[RunItem]:
+    """Deserializes the generated items of a checkpoint."""
+    return [_deserialize_item(data, agents) for data in checkpoint.generated_items]
@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import abc
+import json
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+from .items import ItemHelpers, TResponseInputItem
+from .logger import logger
+from .model_settings import ModelSettings
+from .models.interface import Model, ModelProvider, ModelTracing
+from .models.openai_provider import OpenAIProvider
+from .run_context import RunContextWrapper
+from .token_estimation import get_default_token_estimator
+from .tracing import custom_span
+from .util._canonical import canonical_hash
+
+TokenCounter = Callable[[TResponseInputItem], int]
+"""A function that estimates the number of tokens an input item takes up in a model request."""
+
+TRIMMED_TOOL_OUTPUT = "[This tool output was removed to save space.]"
+"""The output that `PruningStrategy` puts in place of old tool outputs."""
+
+DEFAULT_SUMMARY_INSTRUCTIONS = (
+    "You compress the earlier part of a conversation between a user and an AI assistant, so the "
+    "assistant can continue the conversation without it. Write a concise summary that keeps the "
+    "user's goals and constraints, the decisions made, the facts found by tool calls and any open "
+    "questions. Don't address the user."
+)
+"""The default instructions for the model that `SummarizingStrategy` uses."""
+
+_MAX_CACHED_SUMMARIES = 32
+
+
+@dataclass
+class ContextMetrics:
+    """How much a context strategy trimmed the model input, across all the requests it ran on."""
+
+    requests: int = 0
+    """The number of model requests the strategy ran on."""
+
+    trimmed_requests: int = 0
+    """The number of model requests whose input the strategy changed."""
+
+    input_tokens_before: int = 0
+    """The estimated input tokens of all requests, before trimming."""
+
+    input_tokens_after: int = 0
+    """The estimated input tokens of all requests, after trimming."""
+
+    largest_input_tokens: int = 0
+    """The estimated input tokens of the largest request, after trimming."""
+
+    @property
+    def tokens_trimmed(self) -> int:
+        """The estimated number of input tokens the strategy removed."""
+        return self.input_tokens_before - self.input_tokens_after
+
+
+@dataclass
+class ContextTrimReport:
+    """How a context strategy trimmed the input of one model request."""
+
+    items_before: int
+    """The number of input items before trimming."""
+
+    items_after: int
+    """The number of input items after trimming."""
+
+    tokens_before: int
+    """The estimated input tokens before trimming."""
+
+    tokens_after: int
+    """The estimated input tokens after trimming."""
+
+
+class ContextStrategy(abc.ABC):
+    """Decides which input items are sent to the model on each turn, so the input of long runs can
+    be held to a token budget. The runner applies the strategy right before each model request; the
+    items in the run's result aren't changed.
+    """
+
+    def __init__(self, token_counter: TokenCounter | None = None) -> None:
+        self.token_counter: TokenCounter = token_counter or get_default_token_estimator().count_item
+        """Estimates the number of tokens of an input item."""
+
+        self.metrics = ContextMetrics()
+        """How much the strategy trimmed, across all the requests it ran on."""
+
+    def count_tokens(self, items: Sequence[TResponseInputItem]) -> int:
+        """Returns the estimated number of tokens of the given input items."""
+        return sum(self.token_counter(item) for item in items)
+
+    @abc.abstractmethod
+    async def apply(
+        self, input: list[TResponseInputItem], context_wrapper: RunContextWrapper[Any]
+    ) -> list[TResponseInputItem]:
+        """Returns the input items to send to the model.
+
+        Args:
+            input: The full input for the request. The items are shared with the run, so they must
+                not be mutated; return new items instead.
+            context_wrapper: The run context. The usage of any model calls the strategy makes
+                should be added to its `usage`.
+
+        Returns:
+            The input items to send to the model, or `input` itself if nothing was trimmed.
+        """
+        pass
+
+
+async def apply_context_strategy(
+    strategy: ContextStrategy,
+    input: list[TResponseInputItem],
+    context_wrapper: RunContextWrapper[Any],
+    tracing_disabled: bool,
+) -> list[TResponseInputItem]:
+    """Applies a context strategy to the input of a model request, and records how much it trimmed
+    in the strategy's metrics and in a `context_strategy` trace span.
+    """
+    trimmed = await strategy.apply(input, context_wrapper)
+    tokens_before = strategy.count_tokens(input)
+    report = ContextTrimReport(
+        items_before=len(input),
+        items_after=len(trimmed),
+        tokens_before=tokens_before,
+        tokens_after=tokens_before if trimmed is input else strategy.count_tokens(trimmed),
+    )
+
+    metrics = strategy.metrics
+    metrics.requests += 1
+    metrics.input_tokens_before += report.tokens_before
+    metrics.input_tokens_after += report.tokens_after
+    metrics.largest_input_tokens = max(metrics.largest_input_tokens, report.tokens_after)
+    if trimmed is not input:
+        metrics.trimmed_requests += 1
+        logger.debug(
+            f"Context strategy trimmed the input from {report.tokens_before} to "
+            f"{report.tokens_after} estimated tokens"
+        )
+
+    with custom_span("context_strategy", data=asdict(report), disabled=tracing_disabled):
+        pass
+    return trimmed
+
+
+def _summary_message(summary: str) -> TResponseInputItem:
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+
+def _is_message(item: TResponseInputItem) -> bool:
+    return item.get("type", "message") == "message"
+
+
+def _units(items: Sequence[TResponseInputItem]) -> list[list[int]]:
+    """Groups the indices of items that must be kept or dropped together, oldest first: a tool call
+    with its output, and reasoning items with the item that follows them.
+    """
+    units: list[list[int]] = []
+    unit_by_call_id: dict[str, list[int]] = {}
+    pending_reasoning: list[int] = []
+    for index, item in enumerate(items):
+        if item.get("type") == "reasoning":
+            pending_reasoning.append(index)
+            continue
+        call_id = item.get("call_id")
+        if isinstance(call_id, str) and call_id in unit_by_call_id:
+            unit_by_call_id[call_id].append(index)
+            continue
+        unit = pending_reasoning + [index]
+        pending_reasoning = []
+        units.append(unit)
+        if isinstance(call_id, str):
+            unit_by_call_id[call_id] = unit
+    if pending_reasoning:
+        units.append(pending_reasoning)
+    return units
+
+
+def _drop_oldest(
+    items: list[TResponseInputItem],
+    tokens: list[int],
+    max_tokens: int,
+    keep_first_message: bool,
+) -> list[TResponseInputItem]:
+    """Drops the oldest units of items until the rest fits in the budget. The newest unit is always
+    kept, so the result may still be over the budget.
+    """
+    total = sum(tokens)
+    units = _units(items)
+    if keep_first_message and units and _is_message(items[units[0][0]]):
+        units = units[1:]
+
+    dropped: set[int] = set()
+    for unit in units[:-1]:
+        if total <= max_tokens:
+            break
+        dropped.update(unit)
+        total -= sum(tokens[index] for index in unit)
+    if not dropped:
+        return items
+    return [item for index, item in enumerate(items) if index not in dropped]
+
+
+class SlidingWindowStrategy(ContextStrategy):
+    """Drops the oldest input items until the input fits in the token budget. Tool calls are
+    dropped together with their outputs, and reasoning items with the item that follows them.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        *,
+        keep_first_message: bool = True,
+        token_counter: TokenCounter | None = None,
+    ) -> None:
+        """
+        Args:
+            max_tokens: The token budget for the input of each request.
+            keep_first_message: Whether to always keep the first input item if it's a message,
+                which is usually the task the run was started with.
+            token_counter: Estimates the tokens of an input item. Defaults to the
+                estimator returned by `get_default_token_estimator()`.
+        """
+        super().__init__(token_counter)
+        self.max_tokens = max_tokens
+        self.keep_first_message = keep_first_message
+
+    async def apply(
+        self, input: list[TResponseInputItem], context_wrapper: RunContextWrapper[Any]
+    ) -> list[TResponseInputItem]:
+        tokens = [self.token_counter(item) for item in input]
+        if sum(tokens) <= self.max_tokens:
+            return input
+        return _drop_oldest(input, tokens, self.max_tokens, self.keep_first_message)
+
+
+class PruningStrategy(ContextStrategy):
+    """Trims the input to the token budget in order of how little the model needs each item: first
+    old reasoning items are dropped, then the outputs of old function calls are replaced with a
+    short placeholder, and finally the oldest items are dropped as in `SlidingWindowStrategy`.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        *,
+        keep_recent_items: int = 10,
+        keep_first_message: bool = True,
+        token_counter: TokenCounter | None = None,
+    ) -> None:
+        """
+        Args:
+            max_tokens: The token budget for the input of each request.
+            keep_recent_items: The number of most recent items whose reasoning and tool outputs are
+                never pruned.
+            keep_first_message: Whether to always keep the first input item if it's a message.
+            token_counter: Estimates the tokens of an input item. Defaults to the
+                estimator returned by `get_default_token_estimator()`.
+        """
+        super().__init__(token_counter)
+        self.max_tokens = max_tokens
+        self.keep_recent_items = keep_recent_items
+        self.keep_first_message = keep_first_message
+
+    async def apply(
+        self, input: list[TResponseInputItem], context_wrapper: RunContextWrapper[Any]
+    ) -> list[TResponseInputItem]:
+        tokens = [self.token_counter(item) for item in input]
+        total = sum(tokens)
+        if total <= self.max_tokens:
+            return input
+
+        prunable = range(max(0, len(input) - self.keep_recent_items))
+        items: list[TResponseInputItem | None] = list(input)
+        for index in prunable:
+            if total <= self.max_tokens:
+                break
+            if input[index].get("type") == "reasoning":
+                items[index] = None
+                total -= tokens[index]
+                tokens[index] = 0
+
+        for index in prunable:
+            if total <= self.max_tokens:
+                break
+            item = input[index]
+            if item.get("type") == "function_call_output" and item.get("output") != (
+                TRIMMED_TOOL_OUTPUT
+            ):
+                pruned: TResponseInputItem = {**item, "output": TRIMMED_TOOL_OUTPUT}  # type: ignore
+                items[index] = pruned
+                pruned_tokens = self.token_counter(pruned)
+                total -= tokens[index] - pruned_tokens
+                tokens[index] = pruned_tokens
+
+        kept = [item for item in items if item is not None]
+        kept_tokens = [count for item, count in zip(items, tokens) if item is not None]
+        return _drop_oldest(kept, kept_tokens, self.max_tokens, self.keep_first_message)
+
+
+class SummarizingStrategy(ContextStrategy):
+    """Replaces the oldest input items with a summary written by a (usually cheaper) model, once
+    the input goes over the token budget. The most recent items are kept as they are.
+
+    Summaries are reused on later turns, and extended rather than rewritten when the input goes
+    over the budget again, so the summary message stays the same for several turns and only the
+    new items are summarized each time.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        model: str | Model,
+        *,
+        keep_recent_tokens: int | None = None,
+        model_provider: ModelProvider | None = None,
+        model_settings: ModelSettings | None = None,
+        instructions: str = DEFAULT_SUMMARY_INSTRUCTIONS,
+        token_counter: TokenCounter | None = None,
+    ) -> None:
+        """
+        Args:
+            max_tokens: The token budget for the input of each request.
+            model: The model that writes the summaries.
+            keep_recent_tokens: The token budget for the most recent items, which are kept as they
+                are when the older items are summarized. Defaults to half of `max_tokens`.
+            model_provider: The provider used to look up `model` if it's a name. Defaults to the
+                OpenAI provider.
+            model_settings: The model settings for the summary requests.
+            instructions: The system instructions for the summary requests.
+            token_counter: Estimates the tokens of an input item. Defaults to the
+                estimator returned by `get_default_token_estimator()`.
+        """
+        super().__init__(token_counter)
+        self.max_tokens = max_tokens
+        self.keep_recent_tokens = (
+            keep_recent_tokens if keep_recent_tokens is not None else max_tokens // 2
+        )
+        self.model = model
+        self.model_provider = model_provider or OpenAIProvider()
+        self.model_settings = model_settings or ModelSettings()
+        self.instructions = instructions
+        # The number of summarized items and their hash, mapped to the summary.
+        self._summaries: OrderedDict[tuple[int, str], str] = OrderedDict()
+        # The items of the last summary that was used, and its key. Later turns of the same run
+        # start with the same item objects, so they're matched by identity without hashing.
+        self._last_items: list[TResponseInputItem] = []
+        self._last_key: tuple[int, str] | None = None
+
+    def _get_model(self) -> Model:
+        if isinstance(self.model, Model):
+            return self.model
+        return self.model_provider.get_model(self.model)
+
+    def _remember(self, input: list[TResponseInputItem], key: tuple[int, str]) -> None:
+        self._last_items = input[: key[0]]
+        self._last_key = key
+
+    def _find_summary(self, input: list[TResponseInputItem]) -> tuple[int, str | None]:
+        if self._last_key is not None and self._last_key in self._summaries:
+            summarized = self._last_key[0]
+            if summarized <= len(input) and all(
+                last is item for last, item in zip(self._last_items, input)
+            ):
+                self._summaries.move_to_end(self._last_key)
+                return summarized, self._summaries[self._last_key]
+
+        for summarized, key in sorted(self._summaries, reverse=True):
+            if summarized <= len(input) and canonical_hash(input[:summarized]) == key:
+                self._summaries.move_to_end((summarized, key))
+                self._remember(input, (summarized, key))
+                return summarized, self._summaries[(summarized, key)]
+        return 0, None
+
+    def _split_point(self, input: list[TResponseInputItem], start: int, tokens: list[int]) -> int:
+        """Returns the first index after `start` from which the items fit in the recent budget and
+        no tool call is separated from its output, or `start` if there is none.
+        """
+        # Indices that would separate items of the same unit
+        straddled: set[int] = set()
+        for unit in _units(input):
+            straddled.update(range(min(unit) + 1, max(unit) + 1))
+        split_points = [index for index in range(start + 1, len(input)) if index not in straddled]
+        if not split_points:
+            return start
+
+        recent_tokens = sum(tokens[split_points[-1] :])
+        best = split_points[-1]
+        for index in reversed(split_points[:-1]):
+            recent_tokens += sum(tokens[index:best])
+            if recent_tokens > self.keep_recent_tokens:
+                break
+            best = index
+        return best
+
+    async def _summarize(
+        self,
+        previous_summary: str | None,
+        items: list[TResponseInputItem],
+        context_wrapper: RunContextWrapper[Any],
+    ) -> str:
+        parts = []
+        if previous_summary is not None:
+            parts.append(f"Summary of the conversation so far:\n{previous_summary}")
+        parts.append(
+            "Conversation items:\n" + "\n".join(json.dumps(item, default=str) for item in items)
+        )
+        response = await self._get_model().get_response(
+            system_instructions=self.instructions,
+            input="\n\n".join(parts),
+            model_settings=self.model_settings,
+            tools=[],
+            output_schema=None,
+            handoffs=[],
+            tracing=ModelTracing.DISABLED,
+        )
+        context_wrapper.usage.add(response.usage)
+        return "".join(ItemHelpers.extract_last_text(item) or "" for item in response.output)
+
+    async def apply(
+        self, input: list[TResponseInputItem], context_wrapper: RunContextWrapper[Any]
+    ) -> list[TResponseInputItem]:
+        tokens = [self.token_counter(item) for item in input]
+        if sum(tokens) <= self.max_tokens:
+            return input
+
+        summarized, summary = self._find_summary(input)
+        if summary is not None:
+            candidate = [_summary_message(summary), *input[summarized:]]
+            if self.count_tokens(candidate) <= self.max_tokens:
+                return candidate
+
+        split = self._split_point(input, summarized, tokens)
+        if split == summarized:
+            logger.debug("Context strategy can't summarize the input without splitting a tool call")
+            return input if summary is None else [_summary_message(summary), *input[summarized:]]
+
+        summary = await self._summarize(summary, input[summarized:split], context_wrapper)
+        key = (split, canonical_hash(input[:split]))
+        self._summaries[key] = summary
+        self._remember(input, key)
+        while len(self._summaries) > _MAX_CACHED_SUMMARIES:
+            self._summaries.popitem(last=False)
+        return [_summary_message(summary), *input[split:]]
@@ -28,6 +28,42 @@ class ModelBehaviorError(AgentsException):
         self.message = message
 
 
+class PreviousResponseNotFoundError(AgentsException):
+    """Exception raised by a model when the server no longer has the response that a request
+    continued from (see `Model.supports_previous_response_id`). The runner then resends the full
+    conversation.
+    """
+
+    message: str
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+class CircuitOpenError(AgentsException):
+    """Exception raised when a model call fails fast because the model's circuit breaker is open
+    after repeated failures, and there is no fallback model (see `RetryPolicy`).
+    """
+
+    message: str
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+class ToolTimeoutError(AgentsException):
+    """Exception raised when a function tool call runs longer than its timeout (see
+    `FunctionTool.timeout` and `RunConfig.tool_timeout`), or is still running when the turn's
+    `RunConfig.tool_turn_timeout` expires. It's passed to the tool's `failure_error_function`, if it
+    has one, and raised otherwise.
+    """
+
+    message: str
+
+    def __init__(self, message: str):
+        self.message = message
+
+
 class UserError(AgentsException):
     """Exception raised when the user makes an error using the SDK."""
 
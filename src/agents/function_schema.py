@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import contextlib
+import dataclasses
 import inspect
 import logging
 import re
@@ -8,11 +9,12 @@ from dataclasses import dataclass
 from typing import Any, Callable, Literal, get_args, get_origin, get_type_hints
 
 from griffe import Docstring, DocstringSectionKind
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel, ConfigDict, Field, create_model
 
 from .exceptions import UserError
 from .run_context import RunContextWrapper
 from .strict_schema import ensure_strict_json_schema
+from .util._schema_cache import get_schema_cache, schema_cache_key
 
 
 @dataclass
@@ -214,19 +216,36 @@ def function_schema(
         and other metadata.
     """
 
-    # 1. Grab docstring info
-    if use_docstring_info:
+    # 1. Inspect function signature and get type hints
+    sig = inspect.signature(func)
+    type_hints = get_type_hints(func)
+
+    # 2. Grab docstring info, unless it's cached along with the JSON schema
+    cache = get_schema_cache()
+    cache_key = schema_cache_key(
+        func,
+        sig,
+        type_hints,
+        {
+            "docstring_style": docstring_style,
+            "name_override": name_override,
+            "description_override": description_override,
+            "use_docstring_info": use_docstring_info,
+            "strict_json_schema": strict_json_schema,
+        },
+    )
+    cached = cache.get(cache_key) if cache_key is not None else None
+    doc_info: FuncDocumentation | None
+    if cached is not None:
+        doc_info = FuncDocumentation(**cached["doc"]) if cached["doc"] is not None else None
+    elif use_docstring_info:
         doc_info = generate_func_documentation(func, docstring_style)
-        param_descs = doc_info.param_descriptions or {}
     else:
         doc_info = None
-        param_descs = {}
+    param_descs = (doc_info.param_descriptions or {}) if doc_info else {}
 
     func_name = name_override or doc_info.name if doc_info else func.__name__
 
-    # 2. Inspect function signature and get type hints
-    sig = inspect.signature(func)
-    type_hints = get_type_hints(func)
     params = list(sig.parameters.items())
     takes_context = False
     filtered_params = []
@@ -324,13 +343,29 @@ def function_schema(
                     Field(default=default, description=field_description),
                 )
 
-    # 3. Dynamically build a Pydantic model
-    dynamic_model = create_model(f"{func_name}_args", __base__=BaseModel, **fields)
+    # 3. Dynamically build a Pydantic model. If the schema is cached, the model was built before,
+    # so building its validator is deferred until it's used: many tools are never called.
+    dynamic_model = create_model(
+        f"{func_name}_args",
+        __config__=ConfigDict(defer_build=True) if cached is not None else None,
+        **fields,
+    )
 
     # 4. Build JSON schema from that model
-    json_schema = dynamic_model.model_json_schema()
-    if strict_json_schema:
-        json_schema = ensure_strict_json_schema(json_schema)
+    if cached is not None:
+        json_schema = cached["params_json_schema"]
+    else:
+        json_schema = dynamic_model.model_json_schema()
+        if strict_json_schema:
+            json_schema = ensure_strict_json_schema(json_schema)
+        if cache_key is not None:
+            cache.put(
+                cache_key,
+                {
+                    "doc": dataclasses.asdict(doc_info) if doc_info else None,
+                    "params_json_schema": json_schema,
+                },
+            )
 
     # 5. Return as a FuncSchema dataclass
     return FuncSchema(
@@ -10,6 +10,7 @@ from ..logger import logger
 from ..run_context import RunContextWrapper
 from ..tool import FunctionTool, Tool
 from ..tracing import FunctionSpanData, get_current_span, mcp_tools_span
+from ..util import _json
 
 if TYPE_CHECKING:
     from mcp.types import Tool as MCPTool
@@ -85,7 +86,7 @@ class MCPUtil:
     ) -> str:
         """Invoke an MCP tool and return the result as a string."""
         try:
-            json_data: dict[str, Any] = json.loads(input_json) if input_json else {}
+            json_data: dict[str, Any] = _json.loads(input_json) if input_json else {}
         except Exception as e:
             if _debug.DONT_LOG_TOOL_DATA:
                 logger.debug(f"Invalid JSON input for tool {tool.name}")
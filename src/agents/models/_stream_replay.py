@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseContentPartAddedEvent,
+    ResponseContentPartDoneEvent,
+    ResponseCreatedEvent,
+    ResponseFunctionCallArgumentsDeltaEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemAddedEvent,
+    ResponseOutputItemDoneEvent,
+    ResponseOutputMessage,
+    ResponseOutputRefusal,
+    ResponseOutputText,
+    ResponseRefusalDeltaEvent,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+from ..items import ModelResponse, TResponseStreamEvent
+from .fake_id import FAKE_RESPONSES_ID
+
+
+def _to_response_usage(response: ModelResponse) -> ResponseUsage | None:
+    usage = response.usage
+    if not usage.requests and not usage.total_tokens:
+        return None
+    return ResponseUsage(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        total_tokens=usage.total_tokens,
+        input_tokens_details=InputTokensDetails(cached_tokens=usage.cached_input_tokens),
+        output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+    )
+
+
+def stream_events_from_response(
+    response: ModelResponse, model_name: str
+) -> Iterator[TResponseStreamEvent]:
+    """Builds the stream events a model would have sent while generating the given response. Each
+    text or refusal part is sent as a single delta, and each function call's arguments as a single
+    delta.
+    """
+    base_response = Response(
+        id=response.referenceable_id or FAKE_RESPONSES_ID,
+        created_at=time.time(),
+        model=model_name,
+        object="response",
+        output=[],
+        tool_choice="auto",
+        top_p=None,
+        temperature=None,
+        tools=[],
+        parallel_tool_calls=False,
+    )
+    yield ResponseCreatedEvent(response=base_response, type="response.created")
+
+    for output_index, item in enumerate(response.output):
+        if isinstance(item, ResponseOutputMessage):
+            item_id = item.id
+            yield ResponseOutputItemAddedEvent(
+                item=item.model_copy(update={"content": [], "status": "in_progress"}),
+                output_index=output_index,
+                type="response.output_item.added",
+            )
+            for content_index, part in enumerate(item.content):
+                empty_part = (
+                    ResponseOutputText(text="", type="output_text", annotations=[])
+                    if isinstance(part, ResponseOutputText)
+                    else ResponseOutputRefusal(refusal="", type="refusal")
+                )
+                yield ResponseContentPartAddedEvent(
+                    content_index=content_index,
+                    item_id=item_id,
+                    output_index=output_index,
+                    part=empty_part,
+                    type="response.content_part.added",
+                )
+                if isinstance(part, ResponseOutputText):
+                    yield ResponseTextDeltaEvent(
+                        content_index=content_index,
+                        delta=part.text,
+                        item_id=item_id,
+                        output_index=output_index,
+                        type="response.output_text.delta",
+                    )
+                else:
+                    yield ResponseRefusalDeltaEvent(
+                        content_index=content_index,
+                        delta=part.refusal,
+                        item_id=item_id,
+                        output_index=output_index,
+                        type="response.refusal.delta",
+                    )
+                yield ResponseContentPartDoneEvent(
+                    content_index=content_index,
+                    item_id=item_id,
+                    output_index=output_index,
+                    part=part,
+                    type="response.content_part.done",
+                )
+        else:
+            yield ResponseOutputItemAddedEvent(
+                item=item,
+                output_index=output_index,
+                type="response.output_item.added",
+            )
+            if isinstance(item, ResponseFunctionToolCall):
+                yield ResponseFunctionCallArgumentsDeltaEvent(
+                    delta=item.arguments,
+                    item_id=item.id or FAKE_RESPONSES_ID,
+                    output_index=output_index,
+                    type="response.function_call_arguments.delta",
+                )
+
+        yield ResponseOutputItemDoneEvent(
+            item=item,
+            output_index=output_index,
+            type="response.output_item.done",
+        )
+
+    final_response = base_response.model_copy()
+    final_response.output = list(response.output)
+    final_response.usage = _to_response_usage(response)
+    yield ResponseCompletedEvent(response=final_response, type="response.completed")
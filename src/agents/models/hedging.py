@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseCreatedEvent,
+    ResponseInProgressEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+from ..agent_output import AgentOutputSchema
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..logger import logger
+from ..model_settings import ModelSettings
+from ..token_estimation import get_default_token_estimator
+from ..tool import Tool
+from ..usage import Usage
+from .interface import Model, ModelTracing
+
+
+class LatencyTracker:
+    """Keeps the most recent latencies of a kind of request, to compute percentiles."""
+
+    def __init__(self, window: int = 100) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """Records the latency of a request, in seconds."""
+        self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> float | None:
+        """Returns the latency at the given percentile (between 0 and 1), or None if no latencies
+        were recorded.
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(percentile * len(ordered)) - 1))
+        return ordered[index]
+
+
+class _StreamAttempt:
+    """A stream of events from one model. The stream is read by a task of its own for its whole
+    life, so that the spans and context variables it sets are entered and exited in the same task,
+    and its events are queued for whoever reads the attempt. `first_token` completes when the first
+    token arrives (events before it, like `response.created`, don't count), when the stream ends, or
+    with the stream's error if it fails before that.
+    """
+
+    def __init__(self, stream: AsyncIterator[TResponseStreamEvent]) -> None:
+        self.started_at = time.monotonic()
+        self.first_token: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self.error: Exception | None = None
+        self._events: asyncio.Queue[TResponseStreamEvent | None] = asyncio.Queue()
+        self.task = asyncio.ensure_future(self._pump(stream))
+
+    async def _pump(self, stream: AsyncIterator[TResponseStreamEvent]) -> None:
+        try:
+            async for event in stream:
+                self._events.put_nowait(event)
+                if not self.first_token.done() and not isinstance(
+                    event, (ResponseCreatedEvent, ResponseInProgressEvent)
+                ):
+                    self.first_token.set_result(None)
+        except Exception as e:
+            self.error = e
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            if not self.first_token.done():
+                if self.error is not None:
+                    self.first_token.set_exception(self.error)
+                else:
+                    self.first_token.set_result(None)
+            # Marks the end of the stream
+            self._events.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[TResponseStreamEvent]:
+        while True:
+            event = await self._events.get()
+            if event is None:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield event
+
+
+async def _cancel(task: asyncio.Task[Any]) -> None:
+    if task.done():
+        return
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
+
+
+def _with_extra_usage(event: ResponseCompletedEvent, extra: Usage) -> ResponseCompletedEvent:
+    usage = event.response.usage
+    input_tokens = (usage.input_tokens if usage else 0) + extra.input_tokens
+    output_tokens = (usage.output_tokens if usage else 0) + extra.output_tokens
+    cached_tokens = (
+        usage.input_tokens_details.cached_tokens if usage and usage.input_tokens_details else 0
+    ) + extra.cached_input_tokens
+    reasoning_tokens = (
+        usage.output_tokens_details.reasoning_tokens if usage and usage.output_tokens_details else 0
+    )
+    response = event.response.model_copy(
+        update={
+            "usage": ResponseUsage(
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+                input_tokens_details=InputTokensDetails(cached_tokens=cached_tokens),
+                output_tokens_details=OutputTokensDetails(reasoning_tokens=reasoning_tokens),
+            )
+        }
+    )
+    return event.model_copy(update={"response": response})
+
+
+class HedgedModel(Model):
+    """A model that cuts tail latency by hedging: it sends each request to the primary model, and
+    if no response (or, when streaming, no first token) arrives within a latency percentile of
+    recent requests, it sends the same request to the hedge model too. Whichever answers first is
+    used, and the other request is cancelled.
+
+    The usage of both requests is included in the response's usage. A request that was cancelled
+    before it finished never reports its usage, so it's counted as one request with the estimated
+    input tokens of the request.
+    """
+
+    def __init__(
+        self,
+        primary: Model,
+        hedge: Model | None = None,
+        *,
+        percentile: float = 0.95,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.0,
+        window: int = 100,
+        min_samples: int = 10,
+    ) -> None:
+        """
+        Args:
+            primary: The model that each request is sent to first.
+            hedge: The model that hedge requests are sent to. Defaults to the primary model.
+            percentile: The latency percentile (between 0 and 1) of recent requests after which a
+                hedge request is sent.
+            initial_delay: The delay before a hedge request is sent, in seconds, until `min_samples`
+                latencies have been recorded.
+            min_delay: The minimum delay before a hedge request is sent, in seconds.
+            window: The number of recent latencies that the percentile is computed from.
+            min_samples: The number of latencies that must be recorded before the percentile is
+                used instead of `initial_delay`.
+        """
+        self.primary = primary
+        self.hedge = hedge if hedge is not None else primary
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.response_latencies = LatencyTracker(window)
+        """Latencies until the full response, for `get_response()`."""
+
+        self.first_token_latencies = LatencyTracker(window)
+        """Latencies until the first token, for `stream_response()`."""
+
+        self.hedges_sent = 0
+        """The number of hedge requests that were sent."""
+
+        self.hedges_won = 0
+        """The number of hedge requests that answered before the primary request."""
+
+    def hedge_delay(self, latencies: LatencyTracker) -> float:
+        """Returns how long to wait for the primary request before sending a hedge request."""
+        delay = (
+            latencies.percentile(self.percentile) if len(latencies) >= self.min_samples else None
+        )
+        return max(self.min_delay, delay if delay is not None else self.initial_delay)
+
+    @staticmethod
+    def _cancelled_usage(
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+    ) -> Usage:
+        input_tokens = get_default_token_estimator().count_request(
+            system_instructions, input, tools, handoffs, output_schema
+        )
+        return Usage(requests=1, input_tokens=input_tokens, total_tokens=input_tokens)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> ModelResponse:
+        def request(model: Model) -> asyncio.Task[ModelResponse]:
+            return asyncio.create_task(
+                model.get_response(
+                    system_instructions,
+                    input,
+                    model_settings,
+                    tools,
+                    output_schema,
+                    handoffs,
+                    tracing,
+                )
+            )
+
+        started_at = time.monotonic()
+        primary = request(self.primary)
+        hedge: asyncio.Task[ModelResponse] | None = None
+        try:
+            done, _ = await asyncio.wait(
+                {primary}, timeout=self.hedge_delay(self.response_latencies)
+            )
+            if done:
+                response = primary.result()
+                self.response_latencies.record(time.monotonic() - started_at)
+                return response
+
+            logger.debug("The primary model is slow to respond, sending a hedge request")
+            self.hedges_sent += 1
+            hedge_started_at = time.monotonic()
+            hedge = request(self.hedge)
+            pending: set[asyncio.Task[ModelResponse]] = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Use the first successful response, and only fail if both requests failed
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    winner = hedge if hedge in succeeded else primary
+                    break
+                if not pending:
+                    return primary.result()
+        finally:
+            await _cancel(primary)
+            if hedge is not None:
+                await _cancel(hedge)
+
+        loser = primary if winner is hedge else hedge
+        if winner is hedge:
+            self.hedges_won += 1
+        self.response_latencies.record(
+            time.monotonic() - (hedge_started_at if winner is hedge else started_at)
+        )
+
+        response = winner.result()
+        usage = Usage()
+        usage.add(response.usage)
+        if not loser.cancelled() and loser.exception() is None:
+            usage.add(loser.result().usage)
+        elif loser.cancelled():
+            usage.add(
+                self._cancelled_usage(system_instructions, input, tools, output_schema, handoffs)
+            )
+        return ModelResponse(
+            output=response.output,
+            usage=usage,
+            referenceable_id=response.referenceable_id,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        def start(model: Model) -> _StreamAttempt:
+            return _StreamAttempt(
+                model.stream_response(
+                    system_instructions,
+                    input,
+                    model_settings,
+                    tools,
+                    output_schema,
+                    handoffs,
+                    tracing,
+                )
+            )
+
+        primary = start(self.primary)
+        attempts = [primary]
+        winner = primary
+        extra_usage: Usage | None = None
+        try:
+            done, _ = await asyncio.wait(
+                {primary.first_token}, timeout=self.hedge_delay(self.first_token_latencies)
+            )
+            if done:
+                primary.first_token.result()
+            else:
+                logger.debug("The primary model is slow to stream, sending a hedge request")
+                self.hedges_sent += 1
+                hedge = start(self.hedge)
+                attempts.append(hedge)
+                pending: set[asyncio.Future[None]] = {primary.first_token, hedge.first_token}
+                while True:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    succeeded = [future for future in done if future.exception() is None]
+                    if succeeded:
+                        winner = hedge if hedge.first_token in succeeded else primary
+                        break
+                    if not pending:
+                        primary.first_token.result()
+
+                if winner is hedge:
+                    self.hedges_won += 1
+                # The losing stream is cancelled before it finishes, so it never reports its usage
+                extra_usage = self._cancelled_usage(
+                    system_instructions, input, tools, output_schema, handoffs
+                )
+        except BaseException:
+            for attempt in attempts:
+                await _cancel(attempt.task)
+            raise
+        for attempt in attempts:
+            if attempt is not winner:
+                await _cancel(attempt.task)
+
+        self.first_token_latencies.record(time.monotonic() - winner.started_at)
+
+        try:
+            async for event in winner.events():
+                if extra_usage is not None and isinstance(event, ResponseCompletedEvent):
+                    event = _with_extra_usage(event, extra_usage)
+                yield event
+        finally:
+            await _cancel(winner.task)
@@ -34,6 +34,14 @@ class ModelTracing(enum.Enum):
 class Model(abc.ABC):
     """The base interface for calling an LLM."""
 
+    supports_previous_response_id: bool = False
+    """Whether the model can continue from a response that the server stored. If True,
+    `get_response()` and `stream_response()` must also accept a `previous_response_id` keyword
+    argument. When the runner passes it, the input only contains the items added since that
+    response, and the model should raise `PreviousResponseNotFoundError` if the server no longer
+    has it.
+    """
+
     @abc.abstractmethod
     async def get_response(
         self,
@@ -49,7 +57,8 @@ class Model(abc.ABC):
 
         Args:
             system_instructions: The system instructions to use.
-            input: The input items to the model, in OpenAI Responses format.
+            input: The input items to the model, in OpenAI Responses format. The items are shared
+                with the run's transcript, so implementations must not mutate them.
             model_settings: The model settings to use.
             tools: The tools available to the model.
             output_schema: The output schema to use.
@@ -76,7 +85,8 @@ class Model(abc.ABC):
 
         Args:
             system_instructions: The system instructions to use.
-            input: The input items to the model, in OpenAI Responses format.
+            input: The input items to the model, in OpenAI Responses format. The items are shared
+                with the run's transcript, so implementations must not mutate them.
             model_settings: The model settings to use.
             tools: The tools available to the model.
             output_schema: The output schema to use.
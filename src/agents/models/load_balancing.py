@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import time
+from collections.abc import AsyncIterator, Sequence
+from typing import Literal
+
+import httpx
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, DefaultAsyncHttpxClient
+
+from ..agent_output import AgentOutputSchema
+from ..exceptions import UserError
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..logger import logger
+from ..model_settings import ModelSettings
+from ..tool import Tool
+from . import _openai_shared
+from .interface import Model, ModelProvider, ModelTracing
+from .openai_chatcompletions import OpenAIChatCompletionsModel
+from .openai_provider import DEFAULT_MODEL
+from .openai_responses import OpenAIResponsesModel
+
+BalancingStrategy = Literal["least_outstanding", "ewma"]
+"""How a `LoadBalancedProvider` chooses the endpoint of each request:
+
+- `least_outstanding`: the endpoint with the fewest requests in flight.
+- `ewma`: the endpoint with the lowest exponentially weighted moving average of its latency,
+  weighted by its requests in flight.
+"""
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """Returns whether an error means that the endpoint failed (a connection error, a rate limit or
+    a server error), as opposed to a request the endpoint rejected.
+    """
+    if isinstance(error, APIConnectionError):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+class Endpoint:
+    """A deployment that serves the models, e.g. a base URL and API key. Each endpoint has its own
+    client, and therefore its own connection pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        openai_client: AsyncOpenAI | None = None,
+        name: str | None = None,
+        max_connections: int = 100,
+        max_retries: int = 0,
+    ) -> None:
+        """
+        Args:
+            base_url: The base URL of the endpoint. Defaults to the OpenAI API.
+            api_key: The API key of the endpoint. Defaults to the default API key.
+            openai_client: A client to use instead of creating one from `base_url` and `api_key`.
+            name: The name of the endpoint in logs. Defaults to its base URL.
+            max_connections: The size of the endpoint's connection pool.
+            max_retries: The retries of the endpoint's client. Defaults to none, since failed
+                requests are retried on another endpoint instead.
+        """
+        if openai_client is not None and (base_url is not None or api_key is not None):
+            raise UserError("Don't provide base_url or api_key if you provide openai_client")
+        self._client = openai_client
+        self._base_url = base_url
+        self._api_key = api_key
+        self._max_connections = max_connections
+        self._max_retries = max_retries
+        self.name = name or base_url or (str(openai_client.base_url) if openai_client else "openai")
+
+        self.outstanding = 0
+        """The number of requests currently in flight."""
+
+        self.requests = 0
+        """The number of requests sent to the endpoint."""
+
+        self.failures = 0
+        """The number of requests that failed because of the endpoint."""
+
+        self.consecutive_failures = 0
+        """The number of failures since the last successful request."""
+
+        self.latency_ewma: float | None = None
+        """The moving average of the endpoint's latency in seconds, or None before its first
+        successful request. For streamed requests, this is the latency of the first event."""
+
+        self.ejected_until = 0.0
+        """Until when the endpoint is ejected, as a `time.monotonic()` timestamp."""
+
+    @property
+    def ejected(self) -> bool:
+        return time.monotonic() < self.ejected_until
+
+    # The client is created lazily, so that endpoints can be defined without an API key set
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self._api_key or _openai_shared.get_default_openai_key(),
+                base_url=self._base_url,
+                max_retries=self._max_retries,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=self._max_connections,
+                        max_keepalive_connections=self._max_connections,
+                    )
+                ),
+            )
+        return self._client
+
+
+class LoadBalancedProvider(ModelProvider):
+    """A model provider that spreads requests across several endpoints serving the same models,
+    e.g. deployments in different regions or projects with separate rate limits.
+
+    The endpoint is chosen for each request. An endpoint is ejected for `ejection_time` seconds
+    after `failure_threshold` consecutive failures, and a request that fails because of its
+    endpoint is sent to another one, as long as it was a streamed request that hadn't streamed any
+    event yet.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Endpoint],
+        *,
+        strategy: BalancingStrategy = "least_outstanding",
+        use_responses: bool | None = None,
+        failure_threshold: int = 3,
+        ejection_time: float = 30.0,
+        ewma_weight: float = 0.3,
+        max_attempts: int | None = None,
+    ) -> None:
+        """
+        Args:
+            endpoints: The endpoints to spread requests across.
+            strategy: How the endpoint of each request is chosen.
+            use_responses: Whether to use the Responses API. Defaults to the SDK-wide default.
+            failure_threshold: The consecutive failures after which an endpoint is ejected.
+            ejection_time: How long an ejected endpoint gets no requests, in seconds.
+            ewma_weight: The weight of the latest latency in each endpoint's moving average.
+            max_attempts: The most endpoints that a request is tried on. Defaults to all of them.
+        """
+        if not endpoints:
+            raise UserError("LoadBalancedProvider needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.strategy = strategy
+        self.use_responses = (
+            use_responses
+            if use_responses is not None
+            else _openai_shared.get_use_responses_by_default()
+        )
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.ewma_weight = ewma_weight
+        self.max_attempts = max_attempts or len(self.endpoints)
+        self._models: dict[tuple[int, str], Model] = {}
+
+    def get_model(self, model_name: str | None) -> Model:
+        return LoadBalancedModel(self, model_name or DEFAULT_MODEL)
+
+    def choose_endpoint(self, exclude: Sequence[Endpoint] = ()) -> Endpoint | None:
+        """Returns the endpoint for the next request, skipping the excluded ones, or None if all
+        endpoints are excluded. Ejected endpoints are only chosen if all the others are ejected.
+        """
+        candidates = [endpoint for endpoint in self.endpoints if endpoint not in exclude]
+        if not candidates:
+            return None
+        healthy = [endpoint for endpoint in candidates if not endpoint.ejected]
+        if not healthy:
+            return min(candidates, key=lambda endpoint: endpoint.ejected_until)
+
+        if self.strategy == "ewma":
+            # Endpoints without a latency yet are tried first
+            return min(
+                healthy,
+                key=lambda endpoint: (
+                    (endpoint.latency_ewma or 0.0) * (endpoint.outstanding + 1),
+                    endpoint.outstanding,
+                    endpoint.requests,
+                ),
+            )
+        # Break ties by the total requests, so that endpoints take turns
+        return min(healthy, key=lambda endpoint: (endpoint.outstanding, endpoint.requests))
+
+    def model_for(self, endpoint: Endpoint, model_name: str) -> Model:
+        """Returns the model that sends requests for `model_name` to an endpoint."""
+        key = (id(endpoint), model_name)
+        model = self._models.get(key)
+        if model is None:
+            model = (
+                OpenAIResponsesModel(model=model_name, openai_client=endpoint.client)
+                if self.use_responses
+                else OpenAIChatCompletionsModel(model=model_name, openai_client=endpoint.client)
+            )
+            self._models[key] = model
+        return model
+
+    def _record_success(self, endpoint: Endpoint, latency: float) -> None:
+        endpoint.consecutive_failures = 0
+        endpoint.ejected_until = 0.0
+        endpoint.latency_ewma = (
+            latency
+            if endpoint.latency_ewma is None
+            else self.ewma_weight * latency + (1 - self.ewma_weight) * endpoint.latency_ewma
+        )
+
+    def _record_failure(self, endpoint: Endpoint, error: Exception) -> None:
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold:
+            if not endpoint.ejected:
+                logger.warning(
+                    f"Ejecting endpoint {endpoint.name} for {self.ejection_time}s after "
+                    f"{endpoint.consecutive_failures} failures"
+                )
+            endpoint.ejected_until = time.monotonic() + self.ejection_time
+        else:
+            logger.debug(f"Endpoint {endpoint.name} failed with {type(error).__name__}")
+
+
+class LoadBalancedModel(Model):
+    """A model whose requests are spread across the endpoints of a `LoadBalancedProvider`."""
+
+    def __init__(self, provider: LoadBalancedProvider, model_name: str) -> None:
+        self.provider = provider
+        self.model = model_name
+
+    def _next_endpoint(self, tried: list[Endpoint], error: Exception | None) -> Endpoint:
+        endpoint = (
+            self.provider.choose_endpoint(tried)
+            if len(tried) < self.provider.max_attempts
+            else None
+        )
+        if endpoint is None:
+            assert error is not None
+            raise error
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        tried.append(endpoint)
+        return endpoint
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> ModelResponse:
+        tried: list[Endpoint] = []
+        error: Exception | None = None
+        while True:
+            endpoint = self._next_endpoint(tried, error)
+            started_at = time.monotonic()
+            try:
+                response = await self.provider.model_for(endpoint, self.model).get_response(
+                    system_instructions,
+                    input,
+                    model_settings,
+                    tools,
+                    output_schema,
+                    handoffs,
+                    tracing,
+                )
+            except Exception as e:
+                if not is_endpoint_failure(e):
+                    raise
+                self.provider._record_failure(endpoint, e)
+                error = e
+            else:
+                self.provider._record_success(endpoint, time.monotonic() - started_at)
+                return response
+            finally:
+                endpoint.outstanding -= 1
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        tried: list[Endpoint] = []
+        error: Exception | None = None
+        while True:
+            endpoint = self._next_endpoint(tried, error)
+            started_at = time.monotonic()
+            streamed = False
+            try:
+                async for event in self.provider.model_for(endpoint, self.model).stream_response(
+                    system_instructions,
+                    input,
+                    model_settings,
+                    tools,
+                    output_schema,
+                    handoffs,
+                    tracing,
+                ):
+                    if not streamed:
+                        streamed = True
+                        self.provider._record_success(endpoint, time.monotonic() - started_at)
+                    yield event
+                return
+            except Exception as e:
+                if not is_endpoint_failure(e):
+                    raise
+                self.provider._record_failure(endpoint, e)
+                if streamed:
+                    raise
+                error = e
+            finally:
+                endpoint.outstanding -= 1
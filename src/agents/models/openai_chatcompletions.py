@@ -67,6 +67,7 @@ from ..tracing import generation_span
 from ..tracing.span_data import GenerationSpanData
 from ..tracing.spans import Span
 from ..usage import Usage
+from ..util._identity_memo import IdentityMemo, field_values
 from ..version import __version__
 from .fake_id import FAKE_RESPONSES_ID
 from .interface import Model, ModelTracing
@@ -78,6 +79,13 @@ if TYPE_CHECKING:
 _USER_AGENT = f"Agents/Python {__version__}"
 _HEADERS = {"User-Agent": _USER_AGENT}
 
+# Tools, handoffs and output schemas are long-lived, so their conversions are reused across turns
+# and runs instead of being rebuilt for every request. Tools and handoffs are converted again if
+# one of their fields is reassigned.
+_CONVERTED_TOOLS_MEMO: IdentityMemo[list[ChatCompletionToolParam]] = IdentityMemo()
+_RESPONSE_FORMAT_MEMO: IdentityMemo[ResponseFormat | NotGiven] = IdentityMemo()
+_HANDOFFS_SEPARATOR = object()
+
 
 @dataclass
 class _StreamingState:
@@ -140,6 +148,9 @@ class OpenAIChatCompletionsModel(Model):
                     input_tokens=response.usage.prompt_tokens,
                     output_tokens=response.usage.completion_tokens,
                     total_tokens=response.usage.total_tokens,
+                    cached_input_tokens=response.usage.prompt_tokens_details.cached_tokens or 0
+                    if response.usage.prompt_tokens_details
+                    else 0,
                 )
                 if response.usage
                 else Usage()
@@ -500,12 +511,15 @@ class OpenAIChatCompletionsModel(Model):
             True if model_settings.parallel_tool_calls and tools and len(tools) > 0 else NOT_GIVEN
         )
         tool_choice = _Converter.convert_tool_choice(model_settings.tool_choice)
-        response_format = _Converter.convert_response_format(output_schema)
-
-        converted_tools = [ToolConverter.to_openai(tool) for tool in tools] if tools else []
+        response_format = _RESPONSE_FORMAT_MEMO.get_or_create(
+            (output_schema,), lambda: _Converter.convert_response_format(output_schema)
+        )
 
-        for handoff in handoffs:
-            converted_tools.append(ToolConverter.convert_handoff_tool(handoff))
+        converted_tools = _CONVERTED_TOOLS_MEMO.get_or_create(
+            (*tools, _HANDOFFS_SEPARATOR, *handoffs),
+            lambda: ToolConverter.convert_tools(tools, handoffs),
+            fingerprint=field_values(*tools, *handoffs),
+        )
 
         if _debug.DONT_LOG_MODEL_DATA:
             logger.debug("Calling LLM")
@@ -1002,6 +1016,15 @@ class ToolConverter:
             f"{type(tool)}, tool: {tool}"
         )
 
+    @classmethod
+    def convert_tools(
+        cls, tools: list[Tool], handoffs: list[Handoff[Any]]
+    ) -> list[ChatCompletionToolParam]:
+        converted_tools = [cls.to_openai(tool) for tool in tools]
+        for handoff in handoffs:
+            converted_tools.append(cls.convert_handoff_tool(handoff))
+        return converted_tools
+
     @classmethod
     def convert_handoff_tool(cls, handoff: Handoff[Any]) -> ChatCompletionToolParam:
         return {
@@ -19,13 +19,15 @@ from openai.types.responses import (
 
 from .. import _debug
 from ..agent_output import AgentOutputSchema
-from ..exceptions import UserError
+from ..exceptions import PreviousResponseNotFoundError, UserError
 from ..handoffs import Handoff
 from ..items import ItemHelpers, ModelResponse, TResponseInputItem
 from ..logger import logger
 from ..tool import ComputerTool, FileSearchTool, FunctionTool, Tool, WebSearchTool
 from ..tracing import SpanError, response_span
 from ..usage import Usage
+from ..util._identity_memo import IdentityMemo, field_values
+from ..util._usage import cached_input_tokens
 from ..version import __version__
 from .interface import Model, ModelTracing
 
@@ -43,12 +45,22 @@ IncludeLiteral = Literal[
     "computer_call_output.output.image_url",
 ]
 
+_HANDOFFS_SEPARATOR = object()
+
+
+def _is_previous_response_not_found(error: Exception) -> bool:
+    return isinstance(error, APIStatusError) and (
+        error.code == "previous_response_not_found" or error.param == "previous_response_id"
+    )
+
 
 class OpenAIResponsesModel(Model):
     """
     Implementation of `Model` that uses the OpenAI Responses API.
     """
 
+    supports_previous_response_id = True
+
     def __init__(
         self,
         model: str | ChatModel,
@@ -69,6 +81,8 @@ class OpenAIResponsesModel(Model):
         output_schema: AgentOutputSchema | None,
         handoffs: list[Handoff],
         tracing: ModelTracing,
+        *,
+        previous_response_id: str | None = None,
     ) -> ModelResponse:
         with response_span(disabled=tracing.is_disabled()) as span_response:
             try:
@@ -80,6 +94,7 @@ class OpenAIResponsesModel(Model):
                     output_schema,
                     handoffs,
                     stream=False,
+                    previous_response_id=previous_response_id,
                 )
 
                 if _debug.DONT_LOG_MODEL_DATA:
@@ -96,6 +111,7 @@ class OpenAIResponsesModel(Model):
                         input_tokens=response.usage.input_tokens,
                         output_tokens=response.usage.output_tokens,
                         total_tokens=response.usage.total_tokens,
+                        cached_input_tokens=cached_input_tokens(response.usage),
                     )
                     if response.usage
                     else Usage()
@@ -115,6 +131,8 @@ class OpenAIResponsesModel(Model):
                 )
                 request_id = e.request_id if isinstance(e, APIStatusError) else None
                 logger.error(f"Error getting response: {e}. (request_id: {request_id})")
+                if previous_response_id is not None and _is_previous_response_not_found(e):
+                    raise PreviousResponseNotFoundError(str(e)) from e
                 raise
 
         return ModelResponse(
@@ -132,6 +150,8 @@ class OpenAIResponsesModel(Model):
         output_schema: AgentOutputSchema | None,
         handoffs: list[Handoff],
         tracing: ModelTracing,
+        *,
+        previous_response_id: str | None = None,
     ) -> AsyncIterator[ResponseStreamEvent]:
         """
         Yields a partial message as it is generated, as well as the usage information.
@@ -146,6 +166,7 @@ class OpenAIResponsesModel(Model):
                     output_schema,
                     handoffs,
                     stream=True,
+                    previous_response_id=previous_response_id,
                 )
 
                 final_response: Response | None = None
@@ -169,6 +190,8 @@ class OpenAIResponsesModel(Model):
                     )
                 )
                 logger.error(f"Error streaming response: {e}")
+                if previous_response_id is not None and _is_previous_response_not_found(e):
+                    raise PreviousResponseNotFoundError(str(e)) from e
                 raise
 
     @overload
@@ -181,6 +204,7 @@ class OpenAIResponsesModel(Model):
         output_schema: AgentOutputSchema | None,
         handoffs: list[Handoff],
         stream: Literal[True],
+        previous_response_id: str | None = None,
     ) -> AsyncStream[ResponseStreamEvent]: ...
 
     @overload
@@ -193,6 +217,7 @@ class OpenAIResponsesModel(Model):
         output_schema: AgentOutputSchema | None,
         handoffs: list[Handoff],
         stream: Literal[False],
+        previous_response_id: str | None = None,
     ) -> Response: ...
 
     async def _fetch_response(
@@ -204,8 +229,11 @@ class OpenAIResponsesModel(Model):
         output_schema: AgentOutputSchema | None,
         handoffs: list[Handoff],
         stream: Literal[True] | Literal[False] = False,
+        previous_response_id: str | None = None,
     ) -> Response | AsyncStream[ResponseStreamEvent]:
-        list_input = ItemHelpers.input_to_new_input_list(input)
+        # The input items are only read while building the request, so lists are passed through
+        # as-is rather than copied on every call.
+        list_input = ItemHelpers.input_to_new_input_list(input) if isinstance(input, str) else input
 
         parallel_tool_calls = (
             True
@@ -216,8 +244,17 @@ class OpenAIResponsesModel(Model):
         )
 
         tool_choice = Converter.convert_tool_choice(model_settings.tool_choice)
-        converted_tools = Converter.convert_tools(tools, handoffs)
-        response_format = Converter.get_response_format(output_schema)
+        # Tools, handoffs and output schemas are long-lived, so their conversions are reused
+        # across turns and runs instead of being rebuilt for every request. Tools and handoffs
+        # are converted again if one of their fields is reassigned.
+        converted_tools = _CONVERTED_TOOLS_MEMO.get_or_create(
+            (*tools, _HANDOFFS_SEPARATOR, *handoffs),
+            lambda: Converter.convert_tools(tools, handoffs),
+            fingerprint=field_values(*tools, *handoffs),
+        )
+        response_format = _RESPONSE_FORMAT_MEMO.get_or_create(
+            (output_schema,), lambda: Converter.get_response_format(output_schema)
+        )
 
         if _debug.DONT_LOG_MODEL_DATA:
             logger.debug("Calling LLM")
@@ -227,6 +264,7 @@ class OpenAIResponsesModel(Model):
                 f"{json.dumps(list_input, indent=2)}\n"
                 f"Tools:\n{json.dumps(converted_tools.tools, indent=2)}\n"
                 f"Stream: {stream}\n"
+                f"Previous response: {previous_response_id}\n"
                 f"Tool choice: {tool_choice}\n"
                 f"Response format: {response_format}\n"
             )
@@ -235,6 +273,7 @@ class OpenAIResponsesModel(Model):
             instructions=self._non_null_or_not_given(system_instructions),
             model=self.model,
             input=list_input,
+            previous_response_id=self._non_null_or_not_given(previous_response_id),
             include=converted_tools.includes,
             tools=converted_tools.tools,
             temperature=self._non_null_or_not_given(model_settings.temperature),
@@ -263,6 +302,10 @@ class ConvertedTools:
     includes: list[IncludeLiteral]
 
 
+_CONVERTED_TOOLS_MEMO: IdentityMemo[ConvertedTools] = IdentityMemo()
+_RESPONSE_FORMAT_MEMO: IdentityMemo[ResponseTextConfigParam | NotGiven] = IdentityMemo()
+
+
 class Converter:
     @classmethod
     def convert_tool_choice(
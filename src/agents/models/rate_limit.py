@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from openai import APIStatusError
+from openai.types.responses import ResponseCompletedEvent
+
+from ..agent_output import AgentOutputSchema
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..logger import logger
+from ..model_settings import ModelSettings
+from ..token_estimation import TokenEstimator, get_default_token_estimator
+from ..tool import Tool
+from .interface import Model, ModelProvider, ModelTracing
+from .retry import retry_after_seconds
+
+
+class TokenBucket:
+    """A token bucket that refills continuously at a rate per minute, up to its capacity.
+
+    Consuming more than is available puts the bucket in debt, which later consumers wait out. This
+    lets a cost that's only known afterwards (e.g. the tokens a response actually used) be settled
+    after the fact.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None) -> None:
+        """
+        Args:
+            per_minute: The amount that the bucket refills per minute.
+            capacity: The most that the bucket holds, i.e. the largest burst. Defaults to ten
+                seconds' worth of refill.
+        """
+        self.rate = per_minute / 60
+        self.capacity = capacity if capacity is not None else per_minute / 6
+        self._level = self.capacity
+        self._updated_at = time.monotonic()
+
+    @property
+    def level(self) -> float:
+        """The amount currently available. Negative while the bucket is in debt."""
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        return self._level
+
+    def time_until(self, amount: float) -> float:
+        """Returns how long until `amount` is available, in seconds. Amounts larger than the
+        capacity only wait for a full bucket.
+        """
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate) if self.rate > 0 else math.inf
+
+    def consume(self, amount: float) -> None:
+        """Takes `amount` from the bucket, or puts it back if `amount` is negative."""
+        self._level = min(self.capacity, self.level - amount)
+
+    def drain(self) -> None:
+        """Empties the bucket, e.g. when the server says the budget is used up."""
+        self._level = min(self.level, 0.0)
+
+
+class _Waiter:
+    def __init__(self) -> None:
+        self._future: asyncio.Future[None] | None = None
+
+    async def wait(self, timeout: float | None) -> None:
+        self._future = asyncio.get_running_loop().create_future()
+        await asyncio.wait({self._future}, timeout=timeout)
+
+    def wake(self) -> None:
+        if self._future is not None and not self._future.done():
+            self._future.set_result(None)
+
+
+class RateLimiter:
+    """A client-side rate limiter for model requests, to be shared by every run in a process that
+    uses the same API key. It limits requests per minute and tokens per minute with token buckets,
+    and the number of concurrent requests with AIMD: the limit grows by about one for each limit's
+    worth of successful requests, and is multiplied by `decrease_factor` on each rate limit error.
+
+    Requests wait in a first-come, first-served queue until they fit in all the limits. A request's
+    token cost is its estimated input tokens plus `ModelSettings.max_tokens`, and is reconciled
+    with the usage the response reports once it's done.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        *,
+        max_concurrency: int = 64,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        token_estimator: TokenEstimator | None = None,
+    ) -> None:
+        """
+        Args:
+            requests_per_minute: The most requests to send per minute. If None, unlimited.
+            tokens_per_minute: The most tokens to use per minute. If None, unlimited.
+            max_concurrency: The most concurrent requests, which is also the initial limit.
+            min_concurrency: The least that the concurrency limit is lowered to.
+            decrease_factor: The factor that the concurrency limit is multiplied by on a rate limit
+                error.
+            token_estimator: Estimates the input tokens of requests. Defaults to the SDK's default
+                token estimator.
+        """
+        self.request_bucket = (
+            TokenBucket(requests_per_minute) if requests_per_minute is not None else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute) if tokens_per_minute is not None else None
+        )
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease_factor = decrease_factor
+        self.token_estimator = token_estimator or get_default_token_estimator()
+
+        self.concurrency_limit: float = max_concurrency
+        """The current limit on concurrent requests, adjusted with AIMD."""
+
+        self.in_flight = 0
+        """The number of requests currently being sent."""
+
+        self.requests = 0
+        """The number of requests that were let through."""
+
+        self.throttled = 0
+        """The number of requests that the server rejected with a rate limit error."""
+
+        self.wait_time = 0.0
+        """The total time that requests waited in the queue, in seconds."""
+
+        self.estimated_tokens = 0
+        """The total tokens that requests were estimated to cost before they were sent."""
+
+        self.actual_tokens = 0
+        """The total tokens that responses reported using."""
+
+        self._queue: deque[_Waiter] = deque()
+        self._paused_until = 0.0
+
+    def estimate_cost(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+    ) -> int:
+        """Returns the tokens that a request is expected to cost: its estimated input tokens plus
+        the most output tokens it may generate, if limited.
+        """
+        input_tokens = self.token_estimator.count_request(
+            system_instructions, input, tools, handoffs, output_schema
+        )
+        return input_tokens + (model_settings.max_tokens or 0)
+
+    def _time_until_ready(self, tokens: int) -> float:
+        if self.in_flight >= max(1, int(self.concurrency_limit)):
+            return math.inf
+        wait = max(0.0, self._paused_until - time.monotonic())
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.time_until(1))
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.time_until(tokens))
+        return wait
+
+    async def acquire(self, tokens: int) -> None:
+        """Waits until a request that's estimated to cost `tokens` may be sent, and reserves it.
+        Each call must be followed by a call to `release()`.
+        """
+        waiter = _Waiter()
+        self._queue.append(waiter)
+        started_at = time.monotonic()
+        try:
+            while True:
+                if self._queue[0] is waiter:
+                    wait = self._time_until_ready(tokens)
+                    if wait <= 0:
+                        break
+                    await waiter.wait(None if math.isinf(wait) else wait)
+                else:
+                    await waiter.wait(None)
+        finally:
+            self._queue.remove(waiter)
+            if self._queue:
+                self._queue[0].wake()
+
+        self.in_flight += 1
+        self.requests += 1
+        self.estimated_tokens += tokens
+        self.wait_time += time.monotonic() - started_at
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None:
+            self.token_bucket.consume(tokens)
+
+    def release(
+        self, reserved_tokens: int, used_tokens: int | None, error: BaseException | None = None
+    ) -> None:
+        """Releases a request reserved by `acquire()`.
+
+        Args:
+            reserved_tokens: The tokens that were reserved for the request.
+            used_tokens: The tokens the response reported using, or None if unknown. The
+                difference with the reserved tokens is settled with the token bucket.
+            error: The error the request failed with, if any. A request that was cancelled (e.g.
+                by a timeout, or because a hedged request won) or whose stream was closed early
+                ends with a `BaseException` that isn't an `Exception`; it says nothing about the
+                server, so the concurrency limit is left as is.
+        """
+        self.in_flight -= 1
+        if used_tokens is not None:
+            self.actual_tokens += used_tokens
+        if self.token_bucket is not None:
+            # Failed requests aren't charged, so their reservation is given back
+            self.token_bucket.consume((used_tokens or 0) - reserved_tokens)
+
+        if isinstance(error, APIStatusError) and error.status_code == 429:
+            self._on_rate_limited(error)
+        elif error is None:
+            self.concurrency_limit = min(
+                self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit
+            )
+
+        if self._queue:
+            self._queue[0].wake()
+
+    def _on_rate_limited(self, error: APIStatusError) -> None:
+        self.throttled += 1
+        self.concurrency_limit = max(
+            self.min_concurrency, self.concurrency_limit * self.decrease_factor
+        )
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+        headers = error.response.headers
+        if self.request_bucket is not None and headers.get("x-ratelimit-remaining-requests") == "0":
+            self.request_bucket.drain()
+        if self.token_bucket is not None and headers.get("x-ratelimit-remaining-tokens") == "0":
+            self.token_bucket.drain()
+        logger.debug(
+            f"Rate limited by the server, lowering the concurrency limit to "
+            f"{self.concurrency_limit:.1f}"
+        )
+
+
+class RateLimitedModel(Model):
+    """A model whose requests go through a `RateLimiter`, so that they wait client-side instead
+    of being rejected by the server.
+    """
+
+    def __init__(self, model: Model, limiter: RateLimiter) -> None:
+        self.model = model
+        self.limiter = limiter
+        self.supports_previous_response_id = model.supports_previous_response_id
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        tokens = self.limiter.estimate_cost(
+            system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        await self.limiter.acquire(tokens)
+        try:
+            response = await self.model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+        except BaseException as e:
+            self.limiter.release(tokens, None, e)
+            raise
+
+        used_tokens = response.usage.total_tokens if response.usage.requests else None
+        self.limiter.release(tokens, used_tokens)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        tokens = self.limiter.estimate_cost(
+            system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        await self.limiter.acquire(tokens)
+        used_tokens: int | None = None
+        error: BaseException | None = None
+        try:
+            async for event in self.model.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            ):
+                if isinstance(event, ResponseCompletedEvent) and event.response.usage:
+                    used_tokens = event.response.usage.total_tokens
+                yield event
+        except BaseException as e:
+            # Including GeneratorExit, if the consumer stops before the stream ends
+            error = e
+            raise
+        finally:
+            self.limiter.release(tokens, used_tokens, error)
+
+
+class RateLimitedModelProvider(ModelProvider):
+    """A model provider that sends the requests of every model of another provider (e.g.
+    `OpenAIProvider`) through one shared `RateLimiter`. Note that this only applies to models
+    looked up by name: agents whose `model` is a `Model` instance should wrap it in a
+    `RateLimitedModel` directly.
+    """
+
+    def __init__(self, provider: ModelProvider, limiter: RateLimiter) -> None:
+        self.provider = provider
+        self.limiter = limiter
+
+    def get_model(self, model_name: str | None) -> Model:
+        return RateLimitedModel(self.provider.get_model(model_name), self.limiter)
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, Any, cast
+
+from pydantic import TypeAdapter
+
+from ..agent_output import AgentOutputSchema
+from ..exceptions import UserError
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..model_settings import ModelSettings
+from ..tool import Tool
+from ..usage import Usage
+from ..util._usage import cached_input_tokens
+from ._stream_replay import stream_events_from_response
+from .interface import Model, ModelProvider, ModelTracing
+from .response_cache import _output_item_adapter, model_request_key
+
+_stream_event_adapter: TypeAdapter[TResponseStreamEvent] = TypeAdapter(TResponseStreamEvent)
+
+
+@dataclass
+class RecordedCall:
+    """A model call that was recorded: either a response, or the events of a stream along with the
+    time that passed before each of them.
+    """
+
+    key: str
+    """The key of the request (see `model_request_key`)."""
+
+    model: str
+    """The name of the model that was called."""
+
+    latency: float
+    """How long the call took, in seconds."""
+
+    response: ModelResponse | None = None
+    """The response, for a `get_response()` call."""
+
+    events: list[tuple[float, TResponseStreamEvent]] = field(default_factory=list)
+    """The events of a `stream_response()` call, each with the seconds since the previous event
+    (or since the call started, for the first event)."""
+
+    def to_json(self) -> str:
+        data: dict[str, Any] = {"key": self.key, "model": self.model, "latency": self.latency}
+        if self.response is not None:
+            data["response"] = {
+                "output": [
+                    item.model_dump(mode="json", exclude_unset=True)
+                    for item in self.response.output
+                ],
+                "usage": asdict(self.response.usage),
+                "referenceable_id": self.response.referenceable_id,
+            }
+        else:
+            data["events"] = [
+                [round(delay, 6), event.model_dump(mode="json", exclude_unset=True)]
+                for delay, event in self.events
+            ]
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> RecordedCall:
+        data = json.loads(line)
+        response = data.get("response")
+        return cls(
+            key=data["key"],
+            model=data["model"],
+            latency=data["latency"],
+            response=ModelResponse(
+                output=[_output_item_adapter.validate_python(item) for item in response["output"]],
+                usage=Usage(**response["usage"]),
+                referenceable_id=response["referenceable_id"],
+            )
+            if response is not None
+            else None,
+            events=[
+                (delay, _stream_event_adapter.validate_python(event))
+                for delay, event in data.get("events", [])
+            ],
+        )
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+class ModelRecording:
+    """A file of recorded model calls, one JSON object per line. Paths that end with `.gz` are
+    gzip-compressed.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def append(self, call: RecordedCall) -> None:
+        """Appends a call to the file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _open(self.path, "a") as f:
+            f.write(call.to_json() + "\n")
+
+    def load(self) -> list[RecordedCall]:
+        """Returns the calls in the file, in the order they were recorded."""
+        with _open(self.path, "r") as f:
+            return [RecordedCall.from_json(line) for line in f if line.strip()]
+
+
+class RecordingModel(Model):
+    """A model that records the calls it makes to the wrapped model, with their timing, so they can
+    be replayed with a `ReplayModel`. Failed calls and interrupted streams aren't recorded.
+    """
+
+    def __init__(
+        self, model: Model, recording: ModelRecording, model_name: str | None = None
+    ) -> None:
+        """
+        Args:
+            model: The model to wrap.
+            recording: The file that calls are recorded to.
+            model_name: The name of the model in the recording. Defaults to the wrapped model's
+                `model` attribute, if it has one.
+        """
+        self.model = model
+        self.recording = recording
+        self.model_name = model_name if model_name is not None else str(getattr(model, "model", ""))
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> ModelResponse:
+        started_at = time.monotonic()
+        response = await self.model.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+        )
+        key = model_request_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+        self.recording.append(
+            RecordedCall(
+                key=key,
+                model=self.model_name,
+                latency=time.monotonic() - started_at,
+                response=response,
+            )
+        )
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        key = model_request_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+        started_at = last_event_at = time.monotonic()
+        events: list[tuple[float, TResponseStreamEvent]] = []
+        async for event in self.model.stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+        ):
+            now = time.monotonic()
+            events.append((now - last_event_at, event))
+            last_event_at = now
+            yield event
+
+        self.recording.append(
+            RecordedCall(
+                key=key,
+                model=self.model_name,
+                latency=time.monotonic() - started_at,
+                events=events,
+            )
+        )
+
+
+class RecordingModelProvider(ModelProvider):
+    """A model provider that records the calls of every model of another provider to one file.
+    Note that this only applies to models looked up by name: agents whose `model` is a `Model`
+    instance should wrap it in a `RecordingModel` directly.
+    """
+
+    def __init__(self, provider: ModelProvider, path: str | Path) -> None:
+        self.provider = provider
+        self.recording = ModelRecording(path)
+
+    def get_model(self, model_name: str | None) -> Model:
+        return RecordingModel(self.provider.get_model(model_name), self.recording, model_name or "")
+
+
+class _Replay:
+    """The recorded calls of a file, served by request key."""
+
+    def __init__(self, calls: list[RecordedCall]) -> None:
+        self.calls = calls
+        self._by_key: dict[str, deque[RecordedCall]] = defaultdict(deque)
+        for call in calls:
+            self._by_key[call.key].append(call)
+        self._next = 0
+
+    def next_call(self, key: str, strict: bool) -> RecordedCall:
+        matching = self._by_key.get(key)
+        if matching:
+            # Recordings of the same request are served in turn, and then again from the start
+            call = matching.popleft()
+            matching.append(call)
+            return call
+        if strict or not self.calls:
+            raise UserError(
+                f"No recorded model call matches the request {key}. Record the run again, or "
+                "replay with strict=False to serve recorded calls in order."
+            )
+        call = self.calls[self._next % len(self.calls)]
+        self._next += 1
+        return call
+
+
+class ReplayModel(Model):
+    """A model that replays recorded calls, with their recorded timing scaled by `time_scale`. No
+    request is sent over the network. Each request is matched with a recorded call of the same
+    request.
+    """
+
+    def __init__(
+        self,
+        replay: _Replay,
+        model_name: str,
+        *,
+        time_scale: float = 1.0,
+        strict: bool = True,
+    ) -> None:
+        self.replay = replay
+        self.model_name = model_name
+        self.time_scale = time_scale
+        self.strict = strict
+
+    def _next_call(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+    ) -> RecordedCall:
+        key = model_request_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+        return self.replay.next_call(key, self.strict)
+
+    async def _sleep(self, seconds: float) -> None:
+        if self.time_scale > 0 and seconds > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> ModelResponse:
+        call = self._next_call(
+            system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        await self._sleep(call.latency)
+        if call.response is not None:
+            return ModelResponse(
+                output=list(call.response.output),
+                usage=call.response.usage,
+                referenceable_id=call.response.referenceable_id,
+            )
+
+        # The call was recorded as a stream, so the response is rebuilt from its last event
+        for _, event in reversed(call.events):
+            if event.type == "response.completed":
+                response = event.response
+                usage = response.usage
+                return ModelResponse(
+                    output=list(response.output),
+                    usage=Usage(
+                        requests=1,
+                        input_tokens=usage.input_tokens,
+                        output_tokens=usage.output_tokens,
+                        total_tokens=usage.total_tokens,
+                        cached_input_tokens=cached_input_tokens(usage),
+                    )
+                    if usage
+                    else Usage(),
+                    referenceable_id=response.id,
+                )
+        raise UserError(f"The recorded stream of request {call.key} has no completed response")
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        call = self._next_call(
+            system_instructions, input, model_settings, tools, output_schema, handoffs
+        )
+        if call.response is not None:
+            # The call was recorded as a response, so it's replayed as a stream of its events
+            await self._sleep(call.latency)
+            for event in stream_events_from_response(call.response, self.model_name):
+                yield event
+            return
+
+        for delay, event in call.events:
+            await self._sleep(delay)
+            yield event
+
+
+class ReplayModelProvider(ModelProvider):
+    """A model provider that serves the calls recorded by a `RecordingModelProvider` (or
+    `RecordingModel`), for deterministic load tests and benchmarks without network access.
+    """
+
+    def __init__(self, path: str | Path, *, time_scale: float = 1.0, strict: bool = True) -> None:
+        """
+        Args:
+            path: The recording to replay.
+            time_scale: The factor that recorded latencies and inter-event delays are multiplied
+                by. 0 replays without any delay.
+            strict: Whether a request must match a recorded call of the same request. If False,
+                requests that don't match are served the recorded calls in recorded order.
+        """
+        self.replay = _Replay(ModelRecording(path).load())
+        self.time_scale = time_scale
+        self.strict = strict
+
+    def get_model(self, model_name: str | None) -> Model:
+        return ReplayModel(
+            self.replay, model_name or "", time_scale=self.time_scale, strict=self.strict
+        )
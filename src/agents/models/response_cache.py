@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from openai.types.responses import ResponseCompletedEvent, ResponseOutputItem
+from pydantic import TypeAdapter
+
+from .._request_layout import describe_handoff, describe_output_schema, describe_tool
+from ..agent_output import AgentOutputSchema
+from ..exceptions import UserError
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..model_settings import ModelSettings
+from ..tool import Tool
+from ..usage import Usage
+from ..util._canonical import canonical_hash
+from ..util._usage import cached_input_tokens
+from ._stream_replay import stream_events_from_response
+from .interface import Model, ModelProvider, ModelTracing
+
+_output_item_adapter: TypeAdapter[ResponseOutputItem] = TypeAdapter(ResponseOutputItem)
+
+
+def model_request_key(
+    model_name: str,
+    system_instructions: str | None,
+    input: str | list[TResponseInputItem],
+    model_settings: ModelSettings,
+    tools: list[Tool],
+    output_schema: AgentOutputSchema | None,
+    handoffs: list[Handoff],
+    previous_response_id: str | None = None,
+) -> str:
+    """Returns a content hash of a model request. Requests that would send the same data to the
+    same model have the same key, regardless of dict key order or object identity. Requests that
+    continue different server-side conversations (`previous_response_id`) have different keys.
+    """
+    request: dict[str, Any] = {
+        "model": model_name,
+        "instructions": system_instructions,
+        "input": input,
+        "settings": model_settings,
+        "tools": [describe_tool(tool) for tool in tools],
+        "output_schema": describe_output_schema(output_schema),
+        "handoffs": [describe_handoff(handoff) for handoff in handoffs],
+    }
+    if previous_response_id is not None:
+        # Only added when set, so the keys of other requests don't change
+        request["previous_response_id"] = previous_response_id
+    return canonical_hash(request)
+
+
+def _dump_response(response: ModelResponse, stored_at: float) -> str:
+    return json.dumps(
+        {
+            "stored_at": stored_at,
+            "output": [
+                item.model_dump(mode="json", exclude_unset=True) for item in response.output
+            ],
+            "usage": asdict(response.usage),
+            "referenceable_id": response.referenceable_id,
+        }
+    )
+
+
+def _load_response(data: str) -> tuple[float, ModelResponse]:
+    parsed = json.loads(data)
+    response = ModelResponse(
+        output=[_output_item_adapter.validate_python(item) for item in parsed["output"]],
+        usage=Usage(**parsed["usage"]),
+        referenceable_id=parsed["referenceable_id"],
+    )
+    return parsed["stored_at"], response
+
+
+class ResponseCache:
+    """Stores model responses by request key, in an in-memory LRU and, optionally, in a directory
+    on disk that survives restarts. Entries expire after `ttl` seconds, if set. Memory entries
+    beyond `max_entries` are evicted least recently used first, and disk entries beyond
+    `max_disk_bytes` are evicted oldest first.
+
+    A cache can be shared by several `CachingModel`s; the model name is part of the request key.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float | None = None,
+        disk_path: str | os.PathLike[str] | None = None,
+        max_disk_bytes: int | None = None,
+    ) -> None:
+        if max_entries < 1:
+            raise UserError(f"max_entries must be at least 1, got {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = Path(disk_path) if disk_path is not None else None
+        self.max_disk_bytes = max_disk_bytes
+
+        self.hits = 0
+        """The number of lookups that found a response."""
+
+        self.misses = 0
+        """The number of lookups that didn't find a response."""
+
+        self.evictions = 0
+        """The number of entries evicted because of the size limits or the TTL."""
+
+        self._entries: OrderedDict[str, tuple[float, ModelResponse]] = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that found a response."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    async def get(self, key: str) -> ModelResponse | None:
+        """Returns the response stored for the key, or None if there isn't a live one."""
+        entry = self._entries.get(key)
+        if entry is not None and self._is_expired(entry[0]):
+            del self._entries[key]
+            self.evictions += 1
+            entry = None
+
+        if entry is None and self.disk_path is not None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._store_in_memory(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, response: ModelResponse) -> None:
+        """Stores a response for the key."""
+        entry = (time.time(), response)
+        self._store_in_memory(key, entry)
+        if self.disk_path is not None:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    def clear(self) -> None:
+        """Drops every entry from memory and disk, and resets the counters."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+        if self.disk_path is not None and self.disk_path.exists():
+            for path in self.disk_path.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _store_in_memory(self, key: str, entry: tuple[float, ModelResponse]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> tuple[float, ModelResponse] | None:
+        assert self.disk_path is not None
+        path = self.disk_path / f"{key}.json"
+        try:
+            entry = _load_response(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        if self._is_expired(entry[0]):
+            path.unlink(missing_ok=True)
+            self.evictions += 1
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: tuple[float, ModelResponse]) -> None:
+        assert self.disk_path is not None
+        self.disk_path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(_dump_response(entry[1], entry[0]))
+            os.replace(tmp_path, self.disk_path / f"{key}.json")
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+        if self.max_disk_bytes is not None:
+            self._evict_disk(self.max_disk_bytes)
+
+    def _evict_disk(self, max_bytes: int) -> None:
+        assert self.disk_path is not None
+        files = []
+        for entry in os.scandir(self.disk_path):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            total -= size
+            self.evictions += 1
+
+
+class CachingModel(Model):
+    """A model that returns stored responses for requests it has already seen, and only calls the
+    wrapped model on a cache miss. Streamed requests are served from the same cache: cached
+    responses are replayed as a stream of events.
+
+    Responses served from the cache report zero usage, since no request was made. Failed requests
+    and interrupted streams aren't cached.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        cache: ResponseCache | None = None,
+        *,
+        model_name: str | None = None,
+    ) -> None:
+        """
+        Args:
+            model: The model to wrap.
+            cache: The cache to use. If not provided, a new in-memory cache is created.
+            model_name: The name that identifies the model in cache keys. Defaults to the wrapped
+                model's class and `model` attribute, if it has one.
+        """
+        self.model = model
+        self.cache = cache if cache is not None else ResponseCache()
+        self.model_name = model_name or (
+            f"{type(model).__module__}.{type(model).__qualname__}:{getattr(model, 'model', '')}"
+        )
+        self.supports_previous_response_id = model.supports_previous_response_id
+
+    def _key(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        previous_response_id: str | None,
+    ) -> str:
+        return model_request_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            previous_response_id,
+        )
+
+    @staticmethod
+    def _as_hit(response: ModelResponse) -> ModelResponse:
+        return ModelResponse(
+            output=list(response.output),
+            usage=Usage(),
+            referenceable_id=response.referenceable_id,
+        )
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        key = self._key(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            kwargs.get("previous_response_id"),
+        )
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return self._as_hit(cached)
+
+        response = await self.model.get_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+        await self.cache.set(key, response)
+        return response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        key = self._key(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            kwargs.get("previous_response_id"),
+        )
+        cached = await self.cache.get(key)
+        if cached is not None:
+            for event in stream_events_from_response(self._as_hit(cached), self.model_name):
+                yield event
+            return
+
+        completed: ModelResponse | None = None
+        async for event in self.model.stream_response(
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        ):
+            if isinstance(event, ResponseCompletedEvent):
+                response_usage = event.response.usage
+                completed = ModelResponse(
+                    output=event.response.output,
+                    usage=Usage(
+                        requests=1,
+                        input_tokens=response_usage.input_tokens,
+                        output_tokens=response_usage.output_tokens,
+                        total_tokens=response_usage.total_tokens,
+                        cached_input_tokens=cached_input_tokens(response_usage),
+                    )
+                    if response_usage
+                    else Usage(),
+                    referenceable_id=event.response.id,
+                )
+            yield event
+
+        if completed is not None:
+            await self.cache.set(key, completed)
+
+
+class CachingModelProvider(ModelProvider):
+    """A model provider that wraps every model of another provider in a `CachingModel`, sharing
+    one cache. Note that this only applies to models looked up by name: agents whose `model` is a
+    `Model` instance should wrap it in a `CachingModel` directly.
+    """
+
+    def __init__(self, provider: ModelProvider, cache: ResponseCache | None = None) -> None:
+        self.provider = provider
+        self.cache = cache if cache is not None else ResponseCache()
+
+    def get_model(self, model_name: str | None) -> Model:
+        return CachingModel(
+            self.provider.get_model(model_name),
+            self.cache,
+            model_name=model_name,
+        )
@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal
+
+import httpx
+from openai import APIConnectionError, APIStatusError
+
+from ..agent_output import AgentOutputSchema
+from ..exceptions import CircuitOpenError
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..logger import logger
+from ..model_settings import ModelSettings
+from ..tool import Tool
+from ..tracing import custom_span
+from .interface import Model, ModelTracing
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Returns how long the server asked to wait before retrying, from the `retry-after-ms` or
+    `retry-after` header of an error response, or None if it didn't say.
+    """
+    response = getattr(error, "response", None)
+    if not isinstance(response, httpx.Response):
+        return None
+
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    retry_after = response.headers.get("retry-after")
+    if retry_after is None:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+@dataclass
+class RetryPolicy:
+    """How model calls that fail with transient errors are retried, and when a model's circuit
+    breaker opens. Set it as `RunConfig.retry_policy`, or use it with a `RetryingModel`.
+
+    Circuit breakers are kept per model in the policy, so reuse the same policy across runs for
+    failures in one run to protect the next ones.
+    """
+
+    max_retries: int = 3
+    """The maximum number of retries of a model call, after the first attempt."""
+
+    initial_backoff: float = 0.5
+    """The backoff before the first retry, in seconds."""
+
+    max_backoff: float = 30.0
+    """The maximum backoff between two attempts, in seconds."""
+
+    backoff_multiplier: float = 2.0
+    """The factor by which the backoff grows after each retry."""
+
+    jitter: float = 1.0
+    """The fraction of the backoff that is randomized, between 0 and 1. With 1 (full jitter), each
+    backoff is a random duration between 0 and the exponential backoff, so that clients that failed
+    together don't retry together."""
+
+    retry_on_status_codes: frozenset[int] = frozenset({408, 409, 429, 500, 502, 503, 504})
+    """The HTTP status codes of the errors that are retried. Connection errors and timeouts are
+    always retried."""
+
+    honor_retry_after: bool = True
+    """Whether to wait as long as the `retry-after` header of an error response asks, instead of
+    the backoff."""
+
+    max_retry_after: float = 60.0
+    """The longest `retry-after` that is waited for, in seconds. If the server asks to wait longer,
+    the call isn't retried."""
+
+    retry_on: Callable[[Exception], bool] | None = None
+    """Decides whether an error is transient, instead of `retry_on_status_codes`."""
+
+    failure_threshold: int | None = 5
+    """The number of consecutive failed attempts after which a model's circuit breaker opens, and
+    calls to the model fail fast (or go to the fallback model) without being sent. If None, there
+    are no circuit breakers."""
+
+    reset_timeout: float = 30.0
+    """How long a circuit breaker stays open before a trial call is let through, in seconds."""
+
+    fallback_model: str | Model | None = None
+    """The model that calls go to when the model's circuit breaker is open, or when its retries are
+    exhausted. A model name is looked up with the run's model provider."""
+
+    _circuit_breakers: dict[Any, CircuitBreaker] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Returns whether a failed model call should be retried."""
+        if self.retry_on is not None:
+            return self.retry_on(error)
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIStatusError):
+            return error.status_code in self.retry_on_status_codes
+        return False
+
+    def backoff(self, retry: int, error: Exception | None = None) -> float | None:
+        """Returns how long to wait before a retry, or None if the call shouldn't be retried
+        because the server asked to wait longer than `max_retry_after`.
+
+        Args:
+            retry: The number of the retry, starting at 1.
+            error: The error of the failed attempt.
+        """
+        if self.honor_retry_after and error is not None:
+            retry_after = retry_after_seconds(error)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_retry_after else None
+
+        backoff = min(
+            self.max_backoff, self.initial_backoff * self.backoff_multiplier ** (retry - 1)
+        )
+        return backoff * (1 - self.jitter * random.random())
+
+    def circuit_breaker(self, key: Any) -> CircuitBreaker | None:
+        """Returns the circuit breaker of a model, identified by its name or by the model itself.
+        Returns None if circuit breakers are disabled.
+        """
+        if self.failure_threshold is None:
+            return None
+        breaker = self._circuit_breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._circuit_breakers[key] = breaker
+        return breaker
+
+
+class CircuitBreaker:
+    """Tracks the failures of a model. After `failure_threshold` consecutive failures, the circuit
+    opens and calls fail fast. After `reset_timeout` seconds, one trial call is let through: if it
+    succeeds the circuit closes again, otherwise it stays open for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow_request(self) -> bool:
+        """Returns whether a call may be sent. While half open, only one trial call is allowed."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def release_trial(self) -> None:
+        """Ends a trial call without an outcome, e.g. because it was cancelled. The next call is
+        let through as a new trial.
+        """
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self._trial_in_flight or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"Opening the circuit breaker after {self.consecutive_failures} failures"
+                )
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class RetryingModel(Model):
+    """A model that retries calls failing with transient errors (e.g. 429 and 5xx responses, or
+    connection errors) with jittered exponential backoff, honoring `retry-after`. With a circuit
+    breaker, calls to a model that keeps failing fail fast with `CircuitOpenError`, or go to the
+    fallback model.
+
+    Streamed calls are only retried if they fail before their first event. Each retry is recorded in
+    a `model_retry` span, whose duration is the backoff.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        retry_policy: RetryPolicy | None = None,
+        *,
+        circuit_breaker: CircuitBreaker | None = None,
+        fallback: Model | None = None,
+        model_name: str | None = None,
+    ) -> None:
+        """
+        Args:
+            model: The model to wrap.
+            retry_policy: How to retry. Defaults to `RetryPolicy()`.
+            circuit_breaker: The circuit breaker of the model. If not provided, the policy's
+                circuit breaker for the model is used.
+            fallback: The model that calls go to when the circuit breaker is open or the retries
+                are exhausted.
+            model_name: The name of the model in retry spans and logs.
+        """
+        self.model = model
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.circuit_breaker = (
+            circuit_breaker
+            if circuit_breaker is not None
+            else self.retry_policy.circuit_breaker(model)
+        )
+        self.fallback = fallback
+        self.model_name = model_name or str(getattr(model, "model", type(model).__name__))
+        self.supports_previous_response_id = model.supports_previous_response_id and (
+            fallback is None or fallback.supports_previous_response_id
+        )
+
+        self.retries = 0
+        """The number of retried calls."""
+
+        self.fallbacks = 0
+        """The number of calls that went to the fallback model."""
+
+        self.rejected = 0
+        """The number of calls that failed fast because the circuit breaker was open."""
+
+    def _allow_request(self) -> bool:
+        if self.circuit_breaker is None or self.circuit_breaker.allow_request():
+            return True
+        if self.fallback is None:
+            self.rejected += 1
+            raise CircuitOpenError(
+                f"The circuit breaker of model {self.model_name} is open after repeated failures"
+            )
+        logger.debug(f"The circuit breaker of model {self.model_name} is open, using the fallback")
+        return False
+
+    def _is_trial(self) -> bool:
+        # Called right after `_allow_request()`, which let the trial through if it's half open
+        return self.circuit_breaker is not None and self.circuit_breaker.state == "half_open"
+
+    def _release_trial(self, is_trial: bool) -> None:
+        # A cancelled call says nothing about the model, so it's neither a success nor a failure
+        if is_trial and self.circuit_breaker is not None:
+            self.circuit_breaker.release_trial()
+
+    def _record_success(self) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success()
+
+    def _backoff(self, attempt: int, error: Exception) -> float | None:
+        """Records a failed attempt, and returns how long to wait before retrying it, or None if
+        it shouldn't be retried.
+        """
+        retryable = self.retry_policy.is_retryable(error)
+        if self.circuit_breaker is not None:
+            if retryable:
+                self.circuit_breaker.record_failure()
+            else:
+                # The model answered, so it's up: an invalid request isn't a failure of the model
+                self.circuit_breaker.record_success()
+        if not retryable or attempt > self.retry_policy.max_retries:
+            return None
+        if self.circuit_breaker is not None and self.circuit_breaker.state != "closed":
+            return None
+        return self.retry_policy.backoff(attempt, error)
+
+    async def _wait(
+        self, attempt: int, delay: float, error: Exception, tracing: ModelTracing
+    ) -> None:
+        self.retries += 1
+        logger.debug(
+            f"Model {self.model_name} failed with {type(error).__name__}, retrying in {delay:.2f}s"
+        )
+        data: dict[str, Any] = {
+            "model": self.model_name,
+            "attempt": attempt,
+            "backoff": delay,
+            "error": type(error).__name__,
+        }
+        if isinstance(error, APIStatusError):
+            data["status_code"] = error.status_code
+        with custom_span("model_retry", data=data, disabled=tracing.is_disabled()):
+            await asyncio.sleep(delay)
+
+    def _should_fall_back(self, error: Exception) -> bool:
+        return self.fallback is not None and self.retry_policy.is_retryable(error)
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        def call(model: Model) -> Any:
+            return model.get_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+
+        if self._allow_request():
+            is_trial = self._is_trial()
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    response: ModelResponse = await call(self.model)
+                except Exception as e:
+                    delay = self._backoff(attempt, e)
+                    if delay is None:
+                        if not self._should_fall_back(e):
+                            raise
+                        break
+                    await self._wait(attempt, delay, e, tracing)
+                except BaseException:
+                    self._release_trial(is_trial)
+                    raise
+                else:
+                    self._record_success()
+                    return response
+
+        assert self.fallback is not None
+        self.fallbacks += 1
+        fallback_response: ModelResponse = await call(self.fallback)
+        return fallback_response
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        def call(model: Model) -> AsyncIterator[TResponseStreamEvent]:
+            return model.stream_response(
+                system_instructions,
+                input,
+                model_settings,
+                tools,
+                output_schema,
+                handoffs,
+                tracing,
+                **kwargs,
+            )
+
+        if self._allow_request():
+            is_trial = self._is_trial()
+            attempt = 0
+            while True:
+                attempt += 1
+                streamed = False
+                try:
+                    async for event in call(self.model):
+                        if not streamed:
+                            streamed = True
+                            self._record_success()
+                        yield event
+                except Exception as e:
+                    if streamed:
+                        raise
+                    delay = self._backoff(attempt, e)
+                    if delay is None:
+                        if not self._should_fall_back(e):
+                            raise
+                        break
+                    await self._wait(attempt, delay, e, tracing)
+                except BaseException:
+                    # e.g. cancelled, or closed by the consumer (GeneratorExit)
+                    self._release_trial(is_trial)
+                    raise
+                else:
+                    if not streamed:
+                        self._record_success()
+                    return
+
+        assert self.fallback is not None
+        self.fallbacks += 1
+        async for event in call(self.fallback):
+            yield event
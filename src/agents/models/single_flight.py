@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable
+from typing import Any, Callable
+
+from openai.types.responses import ResponseCompletedEvent
+
+from ..agent_output import AgentOutputSchema
+from ..handoffs import Handoff
+from ..items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from ..logger import logger
+from ..model_settings import ModelSettings
+from ..tool import Tool
+from ..tracing import custom_span
+from ..usage import Usage
+from .interface import Model, ModelProvider, ModelTracing
+from .response_cache import model_request_key
+
+
+class _Call:
+    """A model call shared by every request with the same key. The call is cancelled once all the
+    requests waiting for it are.
+    """
+
+    def __init__(self, coro: Awaitable[ModelResponse]) -> None:
+        self.task: asyncio.Task[ModelResponse] = asyncio.ensure_future(coro)
+        self.waiters = 0
+
+    async def wait(self) -> ModelResponse:
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        finally:
+            self.waiters -= 1
+            if self.waiters == 0 and not self.task.done():
+                self.task.cancel()
+
+
+class _Broadcast:
+    """A model stream that's read once and fanned out to every subscriber. Subscribers that join
+    late replay the events they missed. The stream is closed once all subscribers stop reading.
+    """
+
+    def __init__(self, stream: AsyncIterator[TResponseStreamEvent]) -> None:
+        self.events: list[TResponseStreamEvent] = []
+        self.done = False
+        self.error: Exception | None = None
+        self.subscribers = 0
+        self._waiters: list[asyncio.Future[None]] = []
+        self.task = asyncio.ensure_future(self._pump(stream))
+
+    async def _pump(self, stream: AsyncIterator[TResponseStreamEvent]) -> None:
+        try:
+            async for event in stream:
+                self.events.append(event)
+                self._notify()
+        except Exception as e:
+            # Raised to every subscriber instead
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def subscribe(self) -> AsyncGenerator[TResponseStreamEvent, None]:
+        self.subscribers += 1
+        try:
+            index = 0
+            while True:
+                if index < len(self.events):
+                    index += 1
+                    yield self.events[index - 1]
+                elif self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    waiter = asyncio.get_running_loop().create_future()
+                    self._waiters.append(waiter)
+                    await waiter
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.task.done():
+                self.task.cancel()
+
+
+class SingleFlightGroup:
+    """The model requests in flight, shared by `SingleFlightModel`s. Concurrent requests with the
+    same key share a single call to the model.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call] = {}
+        self._streams: dict[str, _Broadcast] = {}
+
+        self.requests = 0
+        """The number of requests made through the group."""
+
+        self.coalesced = 0
+        """The number of requests that shared a call already in flight, instead of calling the
+        model."""
+
+    @property
+    def coalesced_ratio(self) -> float:
+        """The fraction of requests that shared a call already in flight."""
+        return self.coalesced / self.requests if self.requests else 0.0
+
+    @property
+    def in_flight(self) -> int:
+        """The number of distinct calls currently in flight."""
+        return len(self._calls) + len(self._streams)
+
+    def _forget(self, registry: dict[str, Any], key: str, entry: Any, _: Any) -> None:
+        if registry.get(key) is entry:
+            del registry[key]
+
+    def join_call(
+        self, key: str, call: Callable[[], Awaitable[ModelResponse]]
+    ) -> tuple[_Call, bool]:
+        """Returns the call in flight for the key, or starts one, and whether it was already in
+        flight.
+        """
+        self.requests += 1
+        existing = self._calls.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            return existing, True
+        started = _Call(call())
+        self._calls[key] = started
+        started.task.add_done_callback(functools.partial(self._forget, self._calls, key, started))
+        return started, False
+
+    def join_stream(
+        self, key: str, stream: Callable[[], AsyncIterator[TResponseStreamEvent]]
+    ) -> tuple[_Broadcast, bool]:
+        """Returns the stream in flight for the key, or starts one, and whether it was already in
+        flight.
+        """
+        self.requests += 1
+        existing = self._streams.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            return existing, True
+        started = _Broadcast(stream())
+        self._streams[key] = started
+        started.task.add_done_callback(functools.partial(self._forget, self._streams, key, started))
+        return started, False
+
+
+def _without_usage(event: TResponseStreamEvent) -> TResponseStreamEvent:
+    if isinstance(event, ResponseCompletedEvent) and event.response.usage is not None:
+        response = event.response.model_copy(update={"usage": None})
+        return event.model_copy(update={"response": response})
+    return event
+
+
+class SingleFlightModel(Model):
+    """A model that deduplicates identical concurrent requests: requests whose canonical payload
+    (see `model_request_key`) matches a call already in flight wait for that call instead of making
+    their own, and every waiter gets its response. Streamed requests are fanned out the same way,
+    and requests that join a stream late first replay the events they missed.
+
+    Only the request that made the call reports its usage. Requests that shared it report zero
+    usage, since no extra request was made. Errors are shared too.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        group: SingleFlightGroup | None = None,
+        *,
+        model_name: str | None = None,
+    ) -> None:
+        """
+        Args:
+            model: The model to wrap.
+            group: The group of in-flight requests to share. If not provided, a new one is created.
+            model_name: The name that identifies the model in request keys. Requests are only shared
+                between models with the same name, so only give the same name to models that send
+                requests to the same place with the same credentials. Defaults to the wrapped
+                model's class and `model` attribute, and the identity of the wrapped model: models
+                with the same name but different clients (e.g. other endpoints or API keys) don't
+                share requests.
+        """
+        self.model = model
+        self.group = group if group is not None else SingleFlightGroup()
+        # The model is kept alive by the calls in flight, so its id can't be reused while they are
+        self.model_name = model_name or (
+            f"{type(model).__module__}.{type(model).__qualname__}:{getattr(model, 'model', '')}"
+            f"@{id(model)}"
+        )
+        self.supports_previous_response_id = model.supports_previous_response_id
+
+    def _key(
+        self,
+        kind: str,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        kwargs: dict[str, Any],
+    ) -> str:
+        key = model_request_key(
+            self.model_name,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+        )
+        previous_response_id = kwargs.get("previous_response_id")
+        if previous_response_id is not None:
+            key = f"{key}:{previous_response_id}"
+        return f"{kind}:{key}"
+
+    @staticmethod
+    def _record_coalesced(key: str, tracing: ModelTracing) -> None:
+        logger.debug(f"Sharing the model call in flight for {key}")
+        with custom_span(
+            "single_flight", data={"request_key": key}, disabled=tracing.is_disabled()
+        ):
+            pass
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> ModelResponse:
+        key = self._key(
+            "response",
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            kwargs,
+        )
+        call = functools.partial(
+            self.model.get_response,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+        shared, joined = self.group.join_call(key, call)
+        if not joined:
+            return await shared.wait()
+
+        self._record_coalesced(key, tracing)
+        response = await shared.wait()
+        return ModelResponse(
+            output=list(response.output),
+            usage=Usage(),
+            referenceable_id=response.referenceable_id,
+        )
+
+    async def stream_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+        **kwargs: Any,
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        key = self._key(
+            "stream",
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            kwargs,
+        )
+        stream = functools.partial(
+            self.model.stream_response,
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            tracing,
+            **kwargs,
+        )
+        broadcast, joined = self.group.join_stream(key, stream)
+        if joined:
+            self._record_coalesced(key, tracing)
+
+        subscription = broadcast.subscribe()
+        try:
+            async for event in subscription:
+                yield _without_usage(event) if joined else event
+        finally:
+            await subscription.aclose()
+
+
+class SingleFlightModelProvider(ModelProvider):
+    """A model provider that wraps every model of another provider in a `SingleFlightModel`,
+    sharing one group of in-flight requests. Note that this only applies to models looked up by
+    name: agents whose `model` is a `Model` instance should wrap it in a `SingleFlightModel`
+    directly.
+    """
+
+    def __init__(self, provider: ModelProvider, group: SingleFlightGroup | None = None) -> None:
+        self.provider = provider
+        self.group = group if group is not None else SingleFlightGroup()
+
+    def get_model(self, model_name: str | None) -> Model:
+        # Models looked up by the same name share requests, unless they come from other providers
+        # (e.g. with other clients) that share the group.
+        return SingleFlightModel(
+            self.provider.get_model(model_name),
+            self.group,
+            model_name=f"{model_name}@{id(self.provider)}",
+        )
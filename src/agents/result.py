@@ -2,21 +2,22 @@ from __future__ import annotations
 
 import abc
 import asyncio
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterable, AsyncIterator, Coroutine, Iterable
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Any, Callable, Union, cast
 
 from typing_extensions import TypeVar
 
 from ._run_impl import QueueCompleteSentinel
 from .agent import Agent
 from .agent_output import AgentOutputSchema
-from .exceptions import InputGuardrailTripwireTriggered, MaxTurnsExceeded
+from .exceptions import InputGuardrailTripwireTriggered, MaxTurnsExceeded, UserError
 from .guardrail import InputGuardrailResult, OutputGuardrailResult
 from .items import ItemHelpers, ModelResponse, RunItem, TResponseInputItem
 from .logger import logger
 from .stream_events import StreamEvent
 from .tracing import Trace
+from .usage import Usage
 from .util._pretty_print import pretty_print_result, pretty_print_run_result_streaming
 
 if TYPE_CHECKING:
@@ -223,3 +224,125 @@ class RunResultStreaming(RunResultBase):
 
     def __str__(self) -> str:
         return pretty_print_run_result_streaming(self)
+
+
+RunManyInput = Union[str, list[TResponseInputItem]]
+
+
+@dataclass
+class RunManyItem:
+    """The outcome of running a single input in a `Runner.run_many()` batch."""
+
+    index: int
+    """The position of the input in the batch."""
+
+    input: str | list[TResponseInputItem]
+    """The input that was run."""
+
+    result: RunResult | None
+    """The result of the run, or None if it failed."""
+
+    error: Exception | None
+    """The exception raised by the run, or None if it succeeded."""
+
+    @property
+    def ok(self) -> bool:
+        """Whether the run succeeded."""
+        return self.error is None
+
+
+@dataclass
+class RunManyResult:
+    """The result of a batch of agent runs. Use the `stream_results` method to run the batch and
+    receive each item's outcome as it completes.
+
+    A failing input doesn't stop the batch: its exception is reported on the corresponding
+    `RunManyItem`, and the remaining inputs keep running.
+    """
+
+    max_concurrency: int
+    """The maximum number of runs in flight at once."""
+
+    _inputs: Iterable[RunManyInput] | AsyncIterable[RunManyInput] = field(repr=False)
+
+    _run_one: Callable[[RunManyInput], Coroutine[Any, Any, RunResult]] = field(repr=False)
+
+    usage: Usage = field(default_factory=Usage)
+    """The usage of all the successful runs so far, aggregated."""
+
+    num_succeeded: int = 0
+    """The number of runs that succeeded so far."""
+
+    num_failed: int = 0
+    """The number of runs that failed so far."""
+
+    is_complete: bool = False
+    """Whether every input has been run."""
+
+    _is_started: bool = field(default=False, repr=False)
+
+    async def stream_results(self) -> AsyncIterator[RunManyItem]:
+        """Run the batch, yielding each input's outcome as soon as it completes. Items are yielded
+        in completion order; use `RunManyItem.index` to match them with their inputs.
+
+        Inputs are pulled from the input iterable lazily, so at most `max_concurrency` of them are
+        held in memory at once. If you stop iterating early, the runs in flight are cancelled.
+        """
+        if self._is_started:
+            raise UserError("stream_results() can only be called once per batch")
+        self._is_started = True
+
+        inputs = self._iterate_inputs()
+        pending: dict[asyncio.Task[RunResult], tuple[int, RunManyInput]] = {}
+        next_index = 0
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_concurrency:
+                    try:
+                        run_input = await inputs.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.create_task(self._run_one(run_input))
+                    pending[task] = (next_index, run_input)
+                    next_index += 1
+
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, run_input = pending.pop(task)
+                    yield self._record(index, run_input, task)
+
+            self.is_complete = True
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _iterate_inputs(self) -> AsyncIterator[RunManyInput]:
+        if isinstance(self._inputs, AsyncIterable):
+            async for run_input in self._inputs:
+                yield run_input
+        else:
+            for run_input in self._inputs:
+                yield run_input
+
+    def _record(
+        self, index: int, run_input: RunManyInput, task: asyncio.Task[RunResult]
+    ) -> RunManyItem:
+        error = task.exception()
+        if error is not None:
+            if not isinstance(error, Exception):
+                raise error
+            self.num_failed += 1
+            return RunManyItem(index=index, input=run_input, result=None, error=error)
+
+        result = task.result()
+        for response in result.raw_responses:
+            self.usage.add(response.usage)
+        self.num_succeeded += 1
+        return RunManyItem(index=index, input=run_input, result=result, error=None)
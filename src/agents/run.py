@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import asyncio
-import copy
+import uuid
+from collections.abc import AsyncIterable, Iterable, Sequence
 from dataclasses import dataclass, field
 from typing import Any, cast
 
-from openai.types.responses import ResponseCompletedEvent
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemDoneEvent,
+)
 
+from ._agent_plan import AGENT_PLAN_CACHE
+from ._request_layout import RequestLayout, RequestLayoutReport
 from ._run_impl import (
     AgentToolUseTracker,
     NextStepFinalOutput,
@@ -18,33 +25,51 @@ from ._run_impl import (
     TraceCtxManager,
     get_model_tracing_impl,
 )
+from ._run_many import BatchToolsCache, current_batch_tools
+from ._server_conversation import ServerConversation
+from ._tool_scheduler import ToolScheduler
+from ._transcript import RunTranscript
 from .agent import Agent
 from .agent_output import AgentOutputSchema
+from .checkpoint import (
+    CheckpointStore,
+    RunCheckpoint,
+    RunCheckpointer,
+    collect_agents,
+    find_agent,
+    restore_generated_items,
+)
+from .context_strategy import ContextStrategy, apply_context_strategy
 from .exceptions import (
     AgentsException,
     InputGuardrailTripwireTriggered,
     MaxTurnsExceeded,
     ModelBehaviorError,
     OutputGuardrailTripwireTriggered,
+    UserError,
 )
 from .guardrail import InputGuardrail, InputGuardrailResult, OutputGuardrail, OutputGuardrailResult
-from .handoffs import Handoff, HandoffInputFilter, handoff
+from .handoffs import Handoff, HandoffInputFilter
 from .items import ItemHelpers, ModelResponse, RunItem, TResponseInputItem
 from .lifecycle import RunHooks
 from .logger import logger
 from .model_settings import ModelSettings
 from .models.interface import Model, ModelProvider
 from .models.openai_provider import OpenAIProvider
-from .result import RunResult, RunResultStreaming
+from .models.retry import RetryingModel, RetryPolicy
+from .result import RunManyResult, RunResult, RunResultStreaming
 from .run_context import RunContextWrapper, TContext
 from .stream_events import AgentUpdatedStreamEvent, RawResponsesStreamEvent
-from .tool import Tool
+from .tool import FunctionTool, Tool
 from .tracing import Span, SpanError, agent_span, get_current_trace, trace
 from .tracing.span_data import AgentSpanData
 from .usage import Usage
 from .util import _coro, _error_tracing
+from .util._frozen import freeze
+from .util._usage import cached_input_tokens
 
 DEFAULT_MAX_TURNS = 10
+DEFAULT_MAX_CONCURRENCY = 8
 
 
 @dataclass
@@ -76,6 +101,73 @@ class RunConfig:
     output_guardrails: list[OutputGuardrail[Any]] | None = None
     """A list of output guardrails to run on the final output of the run."""
 
+    max_concurrent_tool_calls: int | None = None
+    """The maximum number of function tool calls that may run at once in the run. Further calls
+    wait for a running one to finish. This applies on top of each tool's own `max_concurrency` and
+    `resource_key`. If None, calls aren't limited.
+    """
+
+    tool_timeout: float | None = None
+    """The default maximum number of seconds a function tool call may run, for tools without their
+    own `FunctionTool.timeout`. A call that takes longer is cancelled, and reported to the model
+    with the tool's `failure_error_function`.
+    """
+
+    tool_turn_timeout: float | None = None
+    """The maximum number of seconds the function tool calls of one turn may take together. Calls
+    still running when it expires are cancelled, and reported to the model with their tools'
+    `failure_error_function`.
+    """
+
+    checkpoint_store: CheckpointStore | None = None
+    """If set, the state of the run is saved to this store after every completed turn, so the run
+    can be continued with `Runner.resume()` if it's interrupted. The checkpoint is deleted when the
+    run completes.
+    """
+
+    checkpoint_id: str | None = None
+    """The ID under which the run's checkpoints are saved. Set this to be able to find the
+    checkpoint of an interrupted run. If None, a random ID is generated for each run.
+    """
+
+    context_strategy: ContextStrategy | None = None
+    """Decides which input items are sent to the model on each turn, e.g. to hold the input of long
+    runs to a token budget. It's applied right before each model request, and doesn't change the
+    items in the run's result. See `SlidingWindowStrategy`, `PruningStrategy` and
+    `SummarizingStrategy`.
+    """
+
+    stable_request_layout: bool = False
+    """If True, model requests are laid out so that their prefix stays byte-stable across turns,
+    which lets the provider reuse its prompt cache: tools are sorted by name, handoffs by tool name,
+    and tool and handoff JSON schemas have sorted keys. Each request is also compared with the
+    previous one, and the length of the stable prefix and the cached token ratio are logged and
+    recorded in a `request_layout` trace span.
+    """
+
+    use_previous_response_id: bool = False
+    """If True, each model request after the first continues from the previous response that the
+    server stored, via `previous_response_id`, and only sends the items added since then instead of
+    the whole history. This only applies to models that support it (e.g. the Responses API
+    models) and requires `ModelSettings.store` not to be False. The full history is still sent
+    after a handoff input filter rewrites it, or if the server no longer has the previous response.
+    """
+
+    retry_policy: RetryPolicy | None = None
+    """If set, model calls that fail with transient errors (e.g. 429 and 5xx responses) are retried
+    with backoff instead of failing the run, and each model gets a circuit breaker that fails fast,
+    or switches to the policy's fallback model, after repeated failures. See `RetryPolicy`.
+    """
+
+    speculative_tool_execution: bool = False
+    """Only applies to streamed runs. If True, each function tool call is started as soon as the
+    model finishes streaming it, instead of after the whole response has been streamed, so tool
+    latency overlaps with the rest of the generation. Tool results are still added to the run in
+    the order the model produced the calls. Tool hooks may then fire before the response is
+    complete, and if the turn fails (e.g. the model calls an unknown tool), tool calls that already
+    started are cancelled.
+    """
+
     tracing_disabled: bool = False
     """Whether tracing is disabled for the agent run. If disabled, we will not trace the agent run.
     """
@@ -105,6 +197,12 @@ class RunConfig:
     An optional dictionary of additional metadata to include with the trace.
     """
 
+    def __post_init__(self) -> None:
+        for setting in ("tool_timeout", "tool_turn_timeout"):
+            value = getattr(self, setting)
+            if value is not None and value <= 0:
+                raise UserError(f"RunConfig.{setting} must be positive, got {value}")
+
 
 class Runner:
     @classmethod
@@ -151,7 +249,96 @@ class Runner:
         if run_config is None:
             run_config = RunConfig()
 
-        tool_use_tracker = AgentToolUseTracker()
+        return await cls._run(
+            starting_agent,
+            freeze(input),
+            context=context,
+            max_turns=max_turns,
+            hooks=hooks,
+            run_config=run_config,
+        )
+
+    @classmethod
+    async def resume(
+        cls,
+        starting_agent: Agent[TContext],
+        checkpoint: RunCheckpoint | str,
+        *,
+        agents: Sequence[Agent[Any]] = (),
+        context: TContext | None = None,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        hooks: RunHooks[TContext] | None = None,
+        run_config: RunConfig | None = None,
+    ) -> RunResult:
+        """Continue a run from its last checkpoint, e.g. after the process running it died. The
+        completed turns aren't run again: the run continues with the agent, items, usage and turn
+        count saved in the checkpoint. Input guardrails aren't run again either.
+
+        If `run_config.checkpoint_store` is set, the resumed run keeps saving checkpoints under the
+        same ID.
+
+        Args:
+            starting_agent: The agent the run was started with. The agents in the checkpoint are
+                looked up by name among this agent and the agents reachable through its `Agent`
+                handoffs.
+            checkpoint: The checkpoint to resume from, or its ID, to load it from
+                `run_config.checkpoint_store`.
+            agents: Any other agents that may appear in the checkpoint, e.g. agents behind custom
+                `Handoff` objects.
+            context: The context to run the agent with. The context isn't saved in checkpoints, so
+                it must be provided again.
+            max_turns: The maximum number of turns for the whole run, including the turns
+                completed before the checkpoint.
+            hooks: An object that receives callbacks on various lifecycle events.
+            run_config: Global settings for the entire agent run.
+
+        Returns:
+            A run result, as returned by `Runner.run()`. It contains all the items generated in the
+            run, but only the raw responses of the turns run after resuming.
+        """
+        if hooks is None:
+            hooks = RunHooks[Any]()
+        if run_config is None:
+            run_config = RunConfig()
+
+        if isinstance(checkpoint, str):
+            if run_config.checkpoint_store is None:
+                raise UserError("Resuming from a checkpoint ID requires a checkpoint_store")
+            loaded = await run_config.checkpoint_store.load(checkpoint)
+            if loaded is None:
+                raise UserError(f"No checkpoint found with ID {checkpoint!r}")
+            checkpoint = loaded
+
+        agents_by_name = collect_agents(starting_agent, agents)
+        return await cls._run(
+            find_agent(agents_by_name, checkpoint.agent_name),
+            freeze(checkpoint.original_input),
+            context=context,
+            max_turns=max_turns,
+            hooks=hooks,
+            run_config=run_config,
+            checkpoint=checkpoint,
+            resumed_items=restore_generated_items(checkpoint, agents_by_name),
+        )
+
+    @classmethod
+    async def _run(
+        cls,
+        starting_agent: Agent[TContext],
+        input: str | list[TResponseInputItem],
+        *,
+        context: TContext | None,
+        max_turns: int,
+        hooks: RunHooks[TContext],
+        run_config: RunConfig,
+        checkpoint: RunCheckpoint | None = None,
+        resumed_items: list[RunItem] | None = None,
+    ) -> RunResult:
+        generated_items: list[RunItem] = resumed_items or []
+        tool_use_tracker = AgentToolUseTracker.from_items(generated_items)
+        tool_scheduler = ToolScheduler(run_config.max_concurrent_tool_calls)
+        request_layout = cls._get_request_layout(run_config)
+        server_conversation = cls._get_server_conversation(run_config)
 
         with TraceCtxManager(
             workflow_name=run_config.workflow_name,
@@ -160,20 +347,25 @@ class Runner:
             metadata=run_config.trace_metadata,
             disabled=run_config.tracing_disabled,
         ):
-            current_turn = 0
-            original_input: str | list[TResponseInputItem] = copy.deepcopy(input)
-            generated_items: list[RunItem] = []
+            current_turn = checkpoint.current_turn if checkpoint else 0
+            # The input is frozen rather than deep-copied, so it can be shared with guardrails,
+            # handoff filters and the model without being copied again.
+            original_input: str | list[TResponseInputItem] = input
+            transcript = RunTranscript(original_input)
             model_responses: list[ModelResponse] = []
 
             context_wrapper: RunContextWrapper[TContext] = RunContextWrapper(
                 context=context,  # type: ignore
             )
+            if checkpoint:
+                context_wrapper.usage.add(checkpoint.usage)
+            checkpointer = cls._get_checkpointer(run_config, checkpoint)
 
             input_guardrail_results: list[InputGuardrailResult] = []
 
             current_span: Span[AgentSpanData] | None = None
             current_agent = starting_agent
-            should_run_agent_start_hooks = True
+            should_run_agent_start_hooks = checkpoint is None or not checkpoint.agent_started
 
             try:
                 while True:
@@ -217,7 +409,7 @@ class Runner:
                                 starting_agent,
                                 starting_agent.input_guardrails
                                 + (run_config.input_guardrails or []),
-                                copy.deepcopy(input),
+                                original_input,
                                 context_wrapper,
                             ),
                             cls._run_single_turn(
@@ -225,11 +417,15 @@ class Runner:
                                 all_tools=all_tools,
                                 original_input=original_input,
                                 generated_items=generated_items,
+                                transcript=transcript,
                                 hooks=hooks,
                                 context_wrapper=context_wrapper,
                                 run_config=run_config,
                                 should_run_agent_start_hooks=should_run_agent_start_hooks,
                                 tool_use_tracker=tool_use_tracker,
+                                tool_scheduler=tool_scheduler,
+                                request_layout=request_layout,
+                                server_conversation=server_conversation,
                             ),
                         )
                     else:
@@ -238,11 +434,15 @@ class Runner:
                             all_tools=all_tools,
                             original_input=original_input,
                             generated_items=generated_items,
+                            transcript=transcript,
                             hooks=hooks,
                             context_wrapper=context_wrapper,
                             run_config=run_config,
                             should_run_agent_start_hooks=should_run_agent_start_hooks,
                             tool_use_tracker=tool_use_tracker,
+                            tool_scheduler=tool_scheduler,
+                            request_layout=request_layout,
+                            server_conversation=server_conversation,
                         )
                     should_run_agent_start_hooks = False
 
@@ -257,6 +457,8 @@ class Runner:
                             turn_result.next_step.output,
                             context_wrapper,
                         )
+                        if checkpointer:
+                            await checkpointer.complete()
                         return RunResult(
                             input=original_input,
                             new_items=generated_items,
@@ -277,6 +479,16 @@ class Runner:
                         raise AgentsException(
                             f"Unknown next step type: {type(turn_result.next_step)}"
                         )
+
+                    if checkpointer:
+                        await checkpointer.save(
+                            current_agent,
+                            original_input,
+                            generated_items,
+                            context_wrapper.usage,
+                            current_turn,
+                            agent_started=not should_run_agent_start_hooks,
+                        )
             finally:
                 if current_span:
                     current_span.finish(reset_current=True)
@@ -404,7 +616,7 @@ class Runner:
         )
 
         streamed_result = RunResultStreaming(
-            input=copy.deepcopy(input),
+            input=freeze(input),
             new_items=[],
             current_agent=starting_agent,
             raw_responses=[],
@@ -421,7 +633,7 @@ class Runner:
         # Kick off the actual agent loop in the background and return the streamed result object.
         streamed_result._run_impl_task = asyncio.create_task(
             cls._run_streamed_impl(
-                starting_input=input,
+                starting_input=streamed_result.input,
                 streamed_result=streamed_result,
                 starting_agent=starting_agent,
                 max_turns=max_turns,
@@ -432,6 +644,64 @@ class Runner:
         )
         return streamed_result
 
+    @classmethod
+    def run_many(
+        cls,
+        starting_agent: Agent[TContext],
+        inputs: Iterable[str | list[TResponseInputItem]]
+        | AsyncIterable[str | list[TResponseInputItem]],
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        context: TContext | None = None,
+        max_turns: int = DEFAULT_MAX_TURNS,
+        hooks: RunHooks[TContext] | None = None,
+        run_config: RunConfig | None = None,
+    ) -> RunManyResult:
+        """Run a workflow starting at the given agent for each of the given inputs, with at most
+        `max_concurrency` runs in flight at once. The returned result object contains a method you
+        can use to run the batch and receive each run's outcome as it completes.
+
+        Each input is run as if by `Runner.run()`. Work that only depends on the agents, such as
+        listing MCP tools, is done once and shared between all the runs in the batch. A run that
+        raises doesn't affect the others: its exception is reported on its `RunManyItem`.
+
+        Args:
+            starting_agent: The starting agent to run.
+            inputs: An iterable or async iterable of inputs. Each input is a single string for a
+                user message, or a list of input items. Inputs are consumed lazily.
+            max_concurrency: The maximum number of runs in flight at once.
+            context: The context to run the agents with. It is shared between all the runs.
+            max_turns: The maximum number of turns for each run.
+            hooks: An object that receives callbacks on various lifecycle events, for every run.
+            run_config: Global settings for every run in the batch.
+
+        Returns:
+            A result object that aggregates usage across the batch, as well as a method to stream
+            the result of each run.
+        """
+        if max_concurrency < 1:
+            raise UserError(f"max_concurrency must be at least 1, got {max_concurrency}")
+
+        batch_tools = BatchToolsCache()
+
+        async def run_one(input: str | list[TResponseInputItem]) -> RunResult:
+            # Each run is its own task, so this only applies to the runs in this batch.
+            current_batch_tools.set(batch_tools)
+            return await cls.run(
+                starting_agent,
+                input,
+                context=context,
+                max_turns=max_turns,
+                hooks=hooks,
+                run_config=run_config,
+            )
+
+        return RunManyResult(
+            max_concurrency=max_concurrency,
+            _inputs=inputs,
+            _run_one=run_one,
+        )
+
     @classmethod
     async def _run_input_guardrails_with_queue(
         cls,
@@ -491,6 +761,11 @@ class Runner:
         current_turn = 0
         should_run_agent_start_hooks = True
         tool_use_tracker = AgentToolUseTracker()
+        tool_scheduler = ToolScheduler(run_config.max_concurrent_tool_calls)
+        transcript = RunTranscript(streamed_result.input)
+        request_layout = cls._get_request_layout(run_config)
+        server_conversation = cls._get_server_conversation(run_config)
+        checkpointer = cls._get_checkpointer(run_config)
 
         streamed_result._event_queue.put_nowait(AgentUpdatedStreamEvent(new_agent=current_agent))
 
@@ -538,7 +813,9 @@ class Runner:
                         cls._run_input_guardrails_with_queue(
                             starting_agent,
                             starting_agent.input_guardrails + (run_config.input_guardrails or []),
-                            copy.deepcopy(ItemHelpers.input_to_new_input_list(starting_input)),
+                            freeze(ItemHelpers.input_to_new_input_list(starting_input))
+                            if isinstance(starting_input, str)
+                            else starting_input,
                             context_wrapper,
                             streamed_result,
                             current_span,
@@ -554,12 +831,14 @@ class Runner:
                         should_run_agent_start_hooks,
                         tool_use_tracker,
                         all_tools,
+                        transcript,
+                        tool_scheduler,
+                        request_layout,
+                        server_conversation,
                     )
                     should_run_agent_start_hooks = False
 
-                    streamed_result.raw_responses = streamed_result.raw_responses + [
-                        turn_result.model_response
-                    ]
+                    streamed_result.raw_responses.append(turn_result.model_response)
                     streamed_result.input = turn_result.original_input
                     streamed_result.new_items = turn_result.generated_items
 
@@ -588,12 +867,25 @@ class Runner:
                             # Exceptions will be checked in the stream_events loop
                             output_guardrail_results = []
 
+                        if checkpointer:
+                            await checkpointer.complete()
+
                         streamed_result.output_guardrail_results = output_guardrail_results
                         streamed_result.final_output = turn_result.next_step.output
                         streamed_result.is_complete = True
                         streamed_result._event_queue.put_nowait(QueueCompleteSentinel())
                     elif isinstance(turn_result.next_step, NextStepRunAgain):
                         pass
+
+                    if checkpointer and not streamed_result.is_complete:
+                        await checkpointer.save(
+                            current_agent,
+                            streamed_result.input,
+                            streamed_result.new_items,
+                            context_wrapper.usage,
+                            current_turn,
+                            agent_started=not should_run_agent_start_hooks,
+                        )
                 except Exception as e:
                     if current_span:
                         _error_tracing.attach_error_to_span(
@@ -623,6 +915,10 @@ class Runner:
         should_run_agent_start_hooks: bool,
         tool_use_tracker: AgentToolUseTracker,
         all_tools: list[Tool],
+        transcript: RunTranscript,
+        tool_scheduler: ToolScheduler,
+        request_layout: RequestLayout | None,
+        server_conversation: ServerConversation | None,
     ) -> SingleStepResult:
         if should_run_agent_start_hooks:
             await asyncio.gather(
@@ -648,58 +944,120 @@ class Runner:
 
         final_response: ModelResponse | None = None
 
-        input = ItemHelpers.input_to_new_input_list(streamed_result.input)
-        input.extend([item.to_input_item() for item in streamed_result.new_items])
+        transcript.sync(streamed_result.input, streamed_result.new_items)
+        input = transcript.to_input_list()
+        if run_config.context_strategy is not None:
+            input = await apply_context_strategy(
+                run_config.context_strategy, input, context_wrapper, run_config.tracing_disabled
+            )
 
-        # 1. Stream the output events
-        async for event in model.stream_response(
-            system_prompt,
-            input,
-            model_settings,
-            all_tools,
-            output_schema,
-            handoffs,
-            get_model_tracing_impl(
+        model_tools, model_handoffs = all_tools, handoffs
+        layout_report: RequestLayoutReport | None = None
+        if request_layout is not None:
+            model_tools, model_handoffs = request_layout.arrange(all_tools, handoffs)
+            layout_report = request_layout.observe(
+                system_prompt, model_tools, model_handoffs, input
+            )
+
+        # Function tool calls started while the response is still streaming, keyed by call ID
+        started_tool_calls: dict[str, asyncio.Task[Any]] = {}
+        function_tools = (
+            {tool.name: tool for tool in all_tools if isinstance(tool, FunctionTool)}
+            if run_config.speculative_tool_execution
+            else {}
+        )
+
+        try:
+            # 1. Stream the output events
+            tracing = get_model_tracing_impl(
                 run_config.tracing_disabled, run_config.trace_include_sensitive_data
-            ),
-        ):
-            if isinstance(event, ResponseCompletedEvent):
-                usage = (
-                    Usage(
-                        requests=1,
-                        input_tokens=event.response.usage.input_tokens,
-                        output_tokens=event.response.usage.output_tokens,
-                        total_tokens=event.response.usage.total_tokens,
-                    )
-                    if event.response.usage
-                    else Usage()
+            )
+            events = (
+                server_conversation.stream_response(
+                    model,
+                    system_prompt,
+                    input,
+                    model_settings,
+                    model_tools,
+                    output_schema,
+                    model_handoffs,
+                    tracing,
                 )
-                final_response = ModelResponse(
-                    output=event.response.output,
-                    usage=usage,
-                    referenceable_id=event.response.id,
+                if server_conversation is not None
+                else model.stream_response(
+                    system_prompt,
+                    input,
+                    model_settings,
+                    model_tools,
+                    output_schema,
+                    model_handoffs,
+                    tracing,
                 )
+            )
+            async for event in events:
+                if isinstance(event, ResponseCompletedEvent):
+                    usage = (
+                        Usage(
+                            requests=1,
+                            input_tokens=event.response.usage.input_tokens,
+                            output_tokens=event.response.usage.output_tokens,
+                            total_tokens=event.response.usage.total_tokens,
+                            cached_input_tokens=cached_input_tokens(event.response.usage),
+                        )
+                        if event.response.usage
+                        else Usage()
+                    )
+                    final_response = ModelResponse(
+                        output=event.response.output,
+                        usage=usage,
+                        referenceable_id=event.response.id,
+                    )
+                elif (
+                    function_tools
+                    and isinstance(event, ResponseOutputItemDoneEvent)
+                    and isinstance(event.item, ResponseFunctionToolCall)
+                    and event.item.name in function_tools
+                    and event.item.call_id not in started_tool_calls
+                ):
+                    started_tool_calls[event.item.call_id] = asyncio.create_task(
+                        RunImpl.run_function_tool(
+                            agent=agent,
+                            func_tool=function_tools[event.item.name],
+                            tool_call=event.item,
+                            hooks=hooks,
+                            context_wrapper=context_wrapper,
+                            config=run_config,
+                            tool_scheduler=tool_scheduler,
+                        )
+                    )
 
-            streamed_result._event_queue.put_nowait(RawResponsesStreamEvent(data=event))
-
-        # 2. At this point, the streaming is complete for this turn of the agent loop.
-        if not final_response:
-            raise ModelBehaviorError("Model did not produce a final response!")
-
-        # 3. Now, we can process the turn as we do in the non-streaming case
-        single_step_result = await cls._get_single_step_result_from_response(
-            agent=agent,
-            original_input=streamed_result.input,
-            pre_step_items=streamed_result.new_items,
-            new_response=final_response,
-            output_schema=output_schema,
-            all_tools=all_tools,
-            handoffs=handoffs,
-            hooks=hooks,
-            context_wrapper=context_wrapper,
-            run_config=run_config,
-            tool_use_tracker=tool_use_tracker,
-        )
+                streamed_result._event_queue.put_nowait(RawResponsesStreamEvent(data=event))
+
+            # 2. At this point, the streaming is complete for this turn of the agent loop.
+            if not final_response:
+                raise ModelBehaviorError("Model did not produce a final response!")
+            if request_layout is not None and layout_report is not None:
+                request_layout.record_usage(layout_report, final_response.usage)
+
+            # 3. Now, we can process the turn as we do in the non-streaming case
+            single_step_result = await cls._get_single_step_result_from_response(
+                agent=agent,
+                original_input=streamed_result.input,
+                pre_step_items=streamed_result.new_items,
+                new_response=final_response,
+                output_schema=output_schema,
+                all_tools=all_tools,
+                handoffs=handoffs,
+                hooks=hooks,
+                context_wrapper=context_wrapper,
+                run_config=run_config,
+                tool_use_tracker=tool_use_tracker,
+                tool_scheduler=tool_scheduler,
+                started_tool_calls=started_tool_calls,
+            )
+        finally:
+            # Cancel any started tool calls that the step didn't consume (e.g. because it failed)
+            await cls._cancel_tool_calls(started_tool_calls.values())
 
         RunImpl.stream_step_result_to_queue(single_step_result, streamed_result._event_queue)
         return single_step_result
@@ -712,11 +1070,15 @@ class Runner:
         all_tools: list[Tool],
         original_input: str | list[TResponseInputItem],
         generated_items: list[RunItem],
+        transcript: RunTranscript,
         hooks: RunHooks[TContext],
         context_wrapper: RunContextWrapper[TContext],
         run_config: RunConfig,
         should_run_agent_start_hooks: bool,
         tool_use_tracker: AgentToolUseTracker,
+        tool_scheduler: ToolScheduler,
+        request_layout: RequestLayout | None,
+        server_conversation: ServerConversation | None,
     ) -> SingleStepResult:
         # Ensure we run the hooks before anything else
         if should_run_agent_start_hooks:
@@ -733,8 +1095,8 @@ class Runner:
 
         output_schema = cls._get_output_schema(agent)
         handoffs = cls._get_handoffs(agent)
-        input = ItemHelpers.input_to_new_input_list(original_input)
-        input.extend([generated_item.to_input_item() for generated_item in generated_items])
+        transcript.sync(original_input, generated_items)
+        input = transcript.to_input_list()
 
         new_response = await cls._get_new_response(
             agent,
@@ -746,6 +1108,8 @@ class Runner:
             context_wrapper,
             run_config,
             tool_use_tracker,
+            request_layout,
+            server_conversation,
         )
 
         return await cls._get_single_step_result_from_response(
@@ -760,8 +1124,18 @@ class Runner:
             context_wrapper=context_wrapper,
             run_config=run_config,
             tool_use_tracker=tool_use_tracker,
+            tool_scheduler=tool_scheduler,
         )
 
+    @classmethod
+    async def _cancel_tool_calls(cls, tasks: Iterable[asyncio.Task[Any]]) -> None:
+        tasks = list(tasks)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Wait for the cancelled calls, and retrieve errors so they aren't reported as unhandled
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     @classmethod
     async def _get_single_step_result_from_response(
         cls,
@@ -777,6 +1151,8 @@ class Runner:
         context_wrapper: RunContextWrapper[TContext],
         run_config: RunConfig,
         tool_use_tracker: AgentToolUseTracker,
+        tool_scheduler: ToolScheduler,
+        started_tool_calls: dict[str, asyncio.Task[Any]] | None = None,
     ) -> SingleStepResult:
         processed_response = RunImpl.process_model_response(
             agent=agent,
@@ -798,6 +1174,8 @@ class Runner:
             hooks=hooks,
             context_wrapper=context_wrapper,
             run_config=run_config,
+            started_tool_calls=started_tool_calls,
+            tool_scheduler=tool_scheduler,
         )
 
     @classmethod
@@ -888,55 +1266,119 @@ class Runner:
         context_wrapper: RunContextWrapper[TContext],
         run_config: RunConfig,
         tool_use_tracker: AgentToolUseTracker,
+        request_layout: RequestLayout | None,
+        server_conversation: ServerConversation | None,
     ) -> ModelResponse:
         model = cls._get_model(agent, run_config)
         model_settings = agent.model_settings.resolve(run_config.model_settings)
         model_settings = RunImpl.maybe_reset_tool_choice(agent, tool_use_tracker, model_settings)
 
-        new_response = await model.get_response(
-            system_instructions=system_prompt,
-            input=input,
-            model_settings=model_settings,
-            tools=all_tools,
-            output_schema=output_schema,
-            handoffs=handoffs,
-            tracing=get_model_tracing_impl(
-                run_config.tracing_disabled, run_config.trace_include_sensitive_data
-            ),
+        if run_config.context_strategy is not None:
+            input = await apply_context_strategy(
+                run_config.context_strategy, input, context_wrapper, run_config.tracing_disabled
+            )
+
+        layout_report: RequestLayoutReport | None = None
+        if request_layout is not None:
+            all_tools, handoffs = request_layout.arrange(all_tools, handoffs)
+            layout_report = request_layout.observe(system_prompt, all_tools, handoffs, input)
+
+        tracing = get_model_tracing_impl(
+            run_config.tracing_disabled, run_config.trace_include_sensitive_data
         )
+        if server_conversation is not None:
+            new_response = await server_conversation.get_response(
+                model,
+                system_prompt,
+                input,
+                model_settings,
+                all_tools,
+                output_schema,
+                handoffs,
+                tracing,
+            )
+        else:
+            new_response = await model.get_response(
+                system_instructions=system_prompt,
+                input=input,
+                model_settings=model_settings,
+                tools=all_tools,
+                output_schema=output_schema,
+                handoffs=handoffs,
+                tracing=tracing,
+            )
 
         context_wrapper.usage.add(new_response.usage)
+        if request_layout is not None and layout_report is not None:
+            request_layout.record_usage(layout_report, new_response.usage)
 
         return new_response
 
     @classmethod
     def _get_output_schema(cls, agent: Agent[Any]) -> AgentOutputSchema | None:
-        if agent.output_type is None or agent.output_type is str:
-            return None
-
-        return AgentOutputSchema(agent.output_type)
+        return AGENT_PLAN_CACHE.get(agent).output_schema
 
     @classmethod
     def _get_handoffs(cls, agent: Agent[Any]) -> list[Handoff]:
-        handoffs = []
-        for handoff_item in agent.handoffs:
-            if isinstance(handoff_item, Handoff):
-                handoffs.append(handoff_item)
-            elif isinstance(handoff_item, Agent):
-                handoffs.append(handoff(handoff_item))
-        return handoffs
+        return list(AGENT_PLAN_CACHE.get(agent).handoffs)
 
     @classmethod
     async def _get_all_tools(cls, agent: Agent[Any]) -> list[Tool]:
+        batch_tools = current_batch_tools.get()
+        if batch_tools is not None:
+            return await batch_tools.get_all_tools(agent)
         return await agent.get_all_tools()
 
+    @classmethod
+    def _get_request_layout(cls, run_config: RunConfig) -> RequestLayout | None:
+        if not run_config.stable_request_layout:
+            return None
+        return RequestLayout(tracing_disabled=run_config.tracing_disabled)
+
+    @classmethod
+    def _get_server_conversation(cls, run_config: RunConfig) -> ServerConversation | None:
+        if not run_config.use_previous_response_id:
+            return None
+        return ServerConversation()
+
+    @classmethod
+    def _get_checkpointer(
+        cls, run_config: RunConfig, checkpoint: RunCheckpoint | None = None
+    ) -> RunCheckpointer | None:
+        if run_config.checkpoint_store is None:
+            return None
+        if checkpoint is not None:
+            checkpoint_id = checkpoint.checkpoint_id
+        else:
+            checkpoint_id = run_config.checkpoint_id or uuid.uuid4().hex
+        return RunCheckpointer(run_config.checkpoint_store, checkpoint_id)
+
     @classmethod
     def _get_model(cls, agent: Agent[Any], run_config: RunConfig) -> Model:
+        model: Model
         if isinstance(run_config.model, Model):
-            return run_config.model
+            model = run_config.model
         elif isinstance(run_config.model, str):
-            return run_config.model_provider.get_model(run_config.model)
+            model = run_config.model_provider.get_model(run_config.model)
         elif isinstance(agent.model, Model):
-            return agent.model
-
-        return run_config.model_provider.get_model(agent.model)
+            model = agent.model
+        else:
+            model = run_config.model_provider.get_model(agent.model)
+
+        retry_policy = run_config.retry_policy
+        if retry_policy is None:
+            return model
+
+        # Models looked up by name are new instances, so their circuit breakers are kept by name
+        model_name = run_config.model if run_config.model is not None else agent.model
+        breaker_key = model_name if isinstance(model_name, str) or model_name is None else model
+        fallback = retry_policy.fallback_model
+        if isinstance(fallback, str):
+            fallback = run_config.model_provider.get_model(fallback)
+        return RetryingModel(
+            model,
+            retry_policy,
+            circuit_breaker=retry_policy.circuit_breaker(breaker_key),
+            fallback=fallback,
+            model_name=model_name if isinstance(model_name, str) else None,
+        )
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import functools
+import json
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Callable, Union
+
+from ._request_layout import describe_handoff, describe_output_schema, describe_tool
+from .agent_output import AgentOutputSchema
+from .handoffs import Handoff
+from .items import RunItem, TResponseInputItem
+from .tool import Tool
+from .util._identity_memo import IdentityMemo, field_values
+
+Tokenizer = Callable[[str], int]
+"""A function that returns the number of tokens in a string."""
+
+EstimatedItem = Union[TResponseInputItem, RunItem]
+"""An item whose tokens can be estimated: a model input item, or a run item."""
+
+MESSAGE_OVERHEAD_TOKENS = 4
+"""The tokens that each input item adds on top of its content, for its role and delimiters."""
+
+IMAGE_TOKENS = 765
+"""The estimated tokens of an input image. The real cost depends on the image's size and detail."""
+
+
+def heuristic_tokenizer(text: str) -> int:
+    """Estimates the tokens in a string without a tokenizer: about four characters per token for
+    ASCII text, and one token per character otherwise (e.g. for CJK text).
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def tiktoken_tokenizer(encoding: str = "o200k_base") -> Tokenizer:
+    """Returns a tokenizer that counts tokens exactly with `tiktoken`, which must be installed.
+
+    Args:
+        encoding: The name of the tiktoken encoding. `o200k_base` is used by the GPT-4o and o-series
+            models.
+    """
+    try:
+        import tiktoken
+    except ImportError as e:
+        raise ImportError(
+            "tiktoken is required for exact token counts. Install it with `pip install tiktoken`."
+        ) from e
+
+    tiktoken_encoding = tiktoken.get_encoding(encoding)
+
+    def count(text: str) -> int:
+        return len(tiktoken_encoding.encode(text, disallowed_special=()))
+
+    return count
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _freeze(value: Any) -> Any:
+    # A hashable copy of an input item, which references the same strings as the item.
+    if isinstance(value, dict):
+        return (dict, tuple((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_freeze(item) for item in value))
+    try:
+        hash(value)
+    except TypeError:
+        return _compact_json(value)
+    return value
+
+
+class TokenEstimator:
+    """Estimates the tokens of model requests locally, before they're sent: input items, tools,
+    handoffs and output schemas. Nothing is sent over the network.
+
+    Token counts are cached per item (by identity), so counting a history that grows by a few items
+    each turn only counts the new items. Items must therefore not be mutated after they're counted,
+    which is already the case for the items of a run. The cache doesn't keep any item alive: run
+    items and model objects are referenced weakly, and input item dicts (which can't be) are keyed
+    by a hash of their content. Strings cache their own hash, so hashing the items of a history
+    again on the next turn doesn't read large strings (e.g. base64 images) again.
+    """
+
+    def __init__(self, tokenizer: Tokenizer | None = None, max_cached_items: int = 1024) -> None:
+        """
+        Args:
+            tokenizer: Counts the tokens in a string. Defaults to `heuristic_tokenizer`; use
+                `tiktoken_tokenizer()` for exact counts.
+            max_cached_items: The maximum number of input item dicts whose token counts are cached.
+        """
+        self.tokenizer: Tokenizer = tokenizer or heuristic_tokenizer
+        self.max_cached_items = max_cached_items
+        self._item_counts: OrderedDict[int, int] = OrderedDict()
+        self._weak_item_counts: dict[int, tuple[weakref.ref[Any], int]] = {}
+        self._lock = threading.Lock()
+        self._definition_counts: IdentityMemo[int] = IdentityMemo()
+
+    def count_text(self, text: str) -> int:
+        """Returns the tokens in a string."""
+        return self.tokenizer(text)
+
+    def count_item(self, item: EstimatedItem) -> int:
+        """Returns the estimated tokens of an input item or run item."""
+        if isinstance(item, dict):
+            return self._count_dict_item(item)
+
+        item_id = id(item)
+        entry = self._weak_item_counts.get(item_id)
+        if entry is not None and entry[0]() is item:
+            return entry[1]
+
+        count = self._count_item(item)
+
+        def _remove(_: weakref.ref[Any]) -> None:
+            with self._lock:
+                current = self._weak_item_counts.get(item_id)
+                if current is not None and current[0]() is None:
+                    del self._weak_item_counts[item_id]
+
+        with self._lock:
+            self._weak_item_counts[item_id] = (weakref.ref(item, _remove), count)
+        return count
+
+    def _count_dict_item(self, item: Any) -> int:
+        key = hash(_freeze(item))
+        with self._lock:
+            count = self._item_counts.get(key)
+            if count is not None:
+                self._item_counts.move_to_end(key)
+                return count
+
+        count = self._count_item(item)
+        with self._lock:
+            self._item_counts[key] = count
+            while len(self._item_counts) > self.max_cached_items:
+                self._item_counts.popitem(last=False)
+        return count
+
+    def count_items(self, items: str | Sequence[EstimatedItem]) -> int:
+        """Returns the estimated tokens of a model input, i.e. a string or a list of items."""
+        if isinstance(items, str):
+            return MESSAGE_OVERHEAD_TOKENS + self.count_text(items)
+        return sum(self.count_item(item) for item in items)
+
+    def count_tools(self, tools: Sequence[Tool] = (), handoffs: Sequence[Handoff] = ()) -> int:
+        """Returns the estimated tokens of the definitions of the given tools and handoffs."""
+        total = 0
+        for tool in tools:
+            total += self._definition_counts.get_or_create(
+                (tool,),
+                functools.partial(self._count_definition, describe_tool, tool),
+                field_values(tool),
+            )
+        for handoff in handoffs:
+            total += self._definition_counts.get_or_create(
+                (handoff,),
+                functools.partial(self._count_definition, describe_handoff, handoff),
+                field_values(handoff),
+            )
+        return total
+
+    def count_output_schema(self, output_schema: AgentOutputSchema | None) -> int:
+        """Returns the estimated tokens of the response format for an output schema."""
+        if output_schema is None or output_schema.is_plain_text():
+            return 0
+        return self._definition_counts.get_or_create(
+            (output_schema,),
+            functools.partial(self._count_definition, describe_output_schema, output_schema),
+        )
+
+    def count_request(
+        self,
+        system_instructions: str | None,
+        input: str | Sequence[EstimatedItem],
+        tools: Sequence[Tool] = (),
+        handoffs: Sequence[Handoff] = (),
+        output_schema: AgentOutputSchema | None = None,
+    ) -> int:
+        """Returns the estimated input tokens of a whole model request."""
+        instructions_tokens = (
+            MESSAGE_OVERHEAD_TOKENS + self.count_text(system_instructions)
+            if system_instructions
+            else 0
+        )
+        return (
+            instructions_tokens
+            + self.count_items(input)
+            + self.count_tools(tools, handoffs)
+            + self.count_output_schema(output_schema)
+        )
+
+    def clear(self) -> None:
+        """Clears the cached token counts."""
+        with self._lock:
+            self._item_counts.clear()
+            self._weak_item_counts.clear()
+        self._definition_counts.clear()
+
+    def _count_json(self, value: Any) -> int:
+        return self.count_text(_compact_json(value))
+
+    def _count_definition(self, describe: Callable[[Any], Any], definition: Any) -> int:
+        return self._count_json(describe(definition))
+
+    def _count_item(self, item: EstimatedItem) -> int:
+        input_item: Any = item if isinstance(item, dict) else item.to_input_item()
+        content = input_item.get("content")
+        if input_item.get("type", "message") != "message" or content is None:
+            return MESSAGE_OVERHEAD_TOKENS + self._count_json(input_item)
+        if isinstance(content, str):
+            return MESSAGE_OVERHEAD_TOKENS + self.count_text(content)
+
+        total = MESSAGE_OVERHEAD_TOKENS
+        for part in content:
+            part_type = part.get("type")
+            if part_type in ("input_text", "output_text"):
+                total += self.count_text(part.get("text", ""))
+            elif part_type == "refusal":
+                total += self.count_text(part.get("refusal", ""))
+            elif part_type == "input_image":
+                total += IMAGE_TOKENS
+            else:
+                total += self._count_json(part)
+        return total
+
+
+_DEFAULT_ESTIMATOR = TokenEstimator()
+
+
+def get_default_token_estimator() -> TokenEstimator:
+    """Returns the token estimator that the SDK uses when none is given, e.g. in context
+    strategies. Its cache is shared, so counting the same items again is cheap.
+    """
+    return _DEFAULT_ESTIMATOR
+
+
+def set_default_tokenizer(tokenizer: Tokenizer | None) -> None:
+    """Sets the tokenizer of the default token estimator, e.g. `tiktoken_tokenizer()`. If None, the
+    heuristic tokenizer is used.
+    """
+    _DEFAULT_ESTIMATOR.tokenizer = tokenizer or heuristic_tokenizer
+    _DEFAULT_ESTIMATOR.clear()
+
+
+def estimate_tokens(
+    input: str | Sequence[EstimatedItem],
+    *,
+    system_instructions: str | None = None,
+    tools: Sequence[Tool] = (),
+    handoffs: Sequence[Handoff] = (),
+    output_schema: AgentOutputSchema | None = None,
+) -> int:
+    """Estimates the input tokens of a model request with the default token estimator. This works
+    with the items available in hooks and handoff input filters as well as with model inputs.
+
+    Args:
+        input: The input items or run items, or a string.
+        system_instructions: The system instructions of the request.
+        tools: The tools of the request.
+        handoffs: The handoffs of the request.
+        output_schema: The output schema of the request.
+
+    Returns:
+        The estimated number of input tokens.
+    """
+    return _DEFAULT_ESTIMATOR.count_request(
+        system_instructions, input, tools, handoffs, output_schema
+    )
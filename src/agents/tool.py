@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
-import json
 from collections.abc import Awaitable
 from dataclasses import dataclass
-from typing import Any, Callable, Literal, Union, overload
+from typing import Any, Callable, Literal, Union, cast, overload
 
 from openai.types.responses.file_search_tool_param import Filters, RankingOptions
 from openai.types.responses.web_search_tool_param import UserLocation
@@ -13,13 +13,16 @@ from typing_extensions import Concatenate, ParamSpec
 
 from . import _debug
 from .computer import AsyncComputer, Computer
-from .exceptions import ModelBehaviorError
-from .function_schema import DocstringStyle, function_schema
+from .exceptions import ModelBehaviorError, UserError
+from .function_schema import DocstringStyle, FuncSchema, function_schema
 from .items import RunItem
 from .logger import logger
 from .run_context import RunContextWrapper
-from .tracing import SpanError
-from .util import _error_tracing
+from .tool_cache import ToolCache, tool_cache_key
+from .tracing import FunctionSpanData, SpanError, get_current_span
+from .util import _error_tracing, _json
+from .util._lazy import Lazy, LazyField
+from .util._tool_execution import register_process_function, run_in_process
 from .util._types import MaybeAwaitable
 
 ToolParams = ParamSpec("ToolParams")
@@ -29,6 +32,14 @@ ToolFunctionWithContext = Callable[Concatenate[RunContextWrapper[Any], ToolParam
 
 ToolFunction = Union[ToolFunctionWithoutContext[ToolParams], ToolFunctionWithContext[ToolParams]]
 
+ToolExecution = Literal["inline", "thread", "process"]
+"""How a synchronous tool function is run:
+- "inline": called directly on the event loop. Only suitable for functions that return quickly.
+- "thread": called in a worker thread, so it doesn't block the event loop.
+- "process": called in a process pool, for CPU-bound work. See `function_tool` for the
+  requirements.
+"""
+
 
 @dataclass
 class FunctionToolResult:
@@ -52,10 +63,14 @@ class FunctionTool:
     """The name of the tool, as shown to the LLM. Generally the name of the function."""
 
     description: str
-    """A description of the tool, as shown to the LLM."""
+    """A description of the tool, as shown to the LLM. Tools created with `function_tool` parse it
+    from the docstring the first time it's read."""
 
     params_json_schema: dict[str, Any]
-    """The JSON schema for the tool's parameters."""
+    """The JSON schema for the tool's parameters. Tools created with `function_tool` generate it
+    the first time it's read, e.g. when the tool is first sent to a model. Models reuse the request
+    format they convert it to, so to change the schema, assign a new dict rather than editing this
+    one in place."""
 
     on_invoke_tool: Callable[[RunContextWrapper[Any], str], Awaitable[Any]]
     """A function that invokes the tool with the given context and parameters. The params passed
@@ -72,6 +87,47 @@ class FunctionTool:
     """Whether the JSON schema is in strict mode. We **strongly** recommend setting this to True,
     as it increases the likelihood of correct JSON input."""
 
+    max_concurrency: int | None = None
+    """The maximum number of calls to this tool that may run at once, across all runs. Further calls
+    wait for a running one to finish. If None, calls aren't limited.
+    """
+
+    resource_key: str | None = None
+    """If set, calls to tools with the same resource key run one at a time, across all runs, while
+    calls to other tools still run in parallel. Useful for tools that share something that can't be
+    used concurrently, like a file or a database connection.
+    """
+
+    timeout: float | None = None
+    """The maximum number of seconds a call to this tool may run, not counting the time it waits
+    for `max_concurrency` or `resource_key`. A call that takes longer is cancelled and fails with a
+    `ToolTimeoutError`. If None, `RunConfig.tool_timeout` applies.
+
+    Note that cancelling a sync function that runs in a thread or process doesn't stop it; its
+    result is just ignored.
+    """
+
+    failure_error_function: ToolErrorFunction | None = None
+    """Generates the output sent to the model when the runner fails a call to this tool, e.g.
+    because it timed out. If None, such errors are raised and fail the run. `function_tool` sets it
+    to its own `failure_error_function`.
+    """
+
+    def __post_init__(self) -> None:
+        if self.max_concurrency is not None and self.max_concurrency < 1:
+            raise UserError(
+                f"max_concurrency for tool {self.name} must be at least 1, got "
+                f"{self.max_concurrency}"
+            )
+        if self.timeout is not None and self.timeout <= 0:
+            raise UserError(
+                f"Tool {self.name} has a timeout of {self.timeout}; it must be positive"
+            )
+
+
+# `function_tool` sets these fields to `Lazy` values
+LazyField.install(FunctionTool, "description", "params_json_schema")
+
 
 @dataclass
 class FileSearchTool:
@@ -142,6 +198,12 @@ def default_tool_error_function(ctx: RunContextWrapper[Any], error: Exception) -
 ToolErrorFunction = Callable[[RunContextWrapper[Any], Exception], MaybeAwaitable[str]]
 
 
+def _record_cache_hit(hit: bool) -> None:
+    span = get_current_span()
+    if span is not None and isinstance(span.span_data, FunctionSpanData):
+        span.span_data.cache_hit = hit
+
+
 @overload
 def function_tool(
     func: ToolFunction[...],
@@ -152,6 +214,11 @@ def function_tool(
     use_docstring_info: bool = True,
     failure_error_function: ToolErrorFunction | None = None,
     strict_mode: bool = True,
+    max_concurrency: int | None = None,
+    resource_key: str | None = None,
+    execution: ToolExecution | None = None,
+    cache: ToolCache | None = None,
+    timeout: float | None = None,
 ) -> FunctionTool:
     """Overload for usage as @function_tool (no parentheses)."""
     ...
@@ -166,6 +233,11 @@ def function_tool(
     use_docstring_info: bool = True,
     failure_error_function: ToolErrorFunction | None = None,
     strict_mode: bool = True,
+    max_concurrency: int | None = None,
+    resource_key: str | None = None,
+    execution: ToolExecution | None = None,
+    cache: ToolCache | None = None,
+    timeout: float | None = None,
 ) -> Callable[[ToolFunction[...]], FunctionTool]:
     """Overload for usage as @function_tool(...)."""
     ...
@@ -180,6 +252,11 @@ def function_tool(
     use_docstring_info: bool = True,
     failure_error_function: ToolErrorFunction | None = default_tool_error_function,
     strict_mode: bool = True,
+    max_concurrency: int | None = None,
+    resource_key: str | None = None,
+    execution: ToolExecution | None = None,
+    cache: ToolCache | None = None,
+    timeout: float | None = None,
 ) -> FunctionTool | Callable[[ToolFunction[...]], FunctionTool]:
     """
     Decorator to create a FunctionTool from a function. By default, we will:
@@ -208,22 +285,73 @@ def function_tool(
             If False, it allows non-strict JSON schemas. For example, if a parameter has a default
             value, it will be optional, additional properties are allowed, etc. See here for more:
             https://platform.openai.com/docs/guides/structured-outputs?api-mode=responses#supported-schemas
+        max_concurrency: If provided, the maximum number of calls to this tool that may run at
+            once, across all runs. Useful for tools backed by a limited pool of connections.
+        resource_key: If provided, calls to tools with the same resource key run one at a time,
+            across all runs, while calls to other tools still run in parallel.
+        execution: How to run a synchronous function. Defaults to "thread", which runs it in a
+            worker thread so it doesn't block the event loop. Use "inline" for functions that
+            return quickly, or "process" for CPU-bound work. With "process", the function must be
+            defined at module level, and its arguments, return value and context (if it takes one)
+            must be picklable; it receives a copy of the context, so changes to it are not seen by
+            the run. Async functions always run on the event loop.
+        cache: If provided, results are memoized by the tool name and the validated arguments, so
+            a call with the same arguments as an earlier one returns the stored result without
+            running the function. Only use it for tools whose result depends on nothing but their
+            arguments. See `ToolCache` for the options.
+        timeout: If provided, the maximum number of seconds a call may run. A call that takes
+            longer is cancelled, and the `ToolTimeoutError` is passed to `failure_error_function`.
     """
 
     def _create_function_tool(the_func: ToolFunction[...]) -> FunctionTool:
-        schema = function_schema(
-            func=the_func,
-            name_override=name_override,
-            description_override=description_override,
-            docstring_style=docstring_style,
-            use_docstring_info=use_docstring_info,
-            strict_json_schema=strict_mode,
+        is_async = inspect.iscoroutinefunction(the_func)
+        if is_async and execution not in (None, "inline"):
+            raise UserError(
+                f"Tool {the_func.__name__} is async, so it always runs on the event loop. The "
+                f"{execution!r} execution policy only applies to sync functions."
+            )
+        policy: ToolExecution = execution or "thread"
+        process_key: tuple[str, str] | None = None
+        if not is_async and policy == "process":
+            if "<locals>" in the_func.__qualname__:
+                raise UserError(
+                    f"Tool {the_func.__name__} uses the 'process' execution policy, so it must be "
+                    "defined at module level."
+                )
+            process_key = register_process_function(the_func)
+
+        # The schema is only created when it's first needed: when the tool is sent to a model or
+        # called. Importing a large library of tools then costs next to nothing.
+        lazy_schema = Lazy(
+            lambda: function_schema(
+                func=the_func,
+                name_override=name_override,
+                description_override=description_override,
+                docstring_style=docstring_style,
+                use_docstring_info=use_docstring_info,
+                strict_json_schema=strict_mode,
+            )
+        )
+        # The same name as function_schema() gives the tool
+        tool_name = (
+            (name_override or the_func.__name__) if use_docstring_info else the_func.__name__
         )
 
-        async def _on_invoke_tool_impl(ctx: RunContextWrapper[Any], input: str) -> Any:
+        async def _on_invoke_tool_impl(
+            ctx: RunContextWrapper[Any], input: str, schema: FuncSchema
+        ) -> Any:
+            if _debug.DONT_LOG_TOOL_DATA:
+                logger.debug(f"Invoking tool {schema.name}")
+            else:
+                logger.debug(f"Invoking tool {schema.name} with input {input}")
+
             try:
-                json_data: dict[str, Any] = json.loads(input) if input else {}
-            except Exception as e:
+                parsed = _json.validate_model_json(schema.params_pydantic_model, input)
+            except ValidationError as e:
+                if not _json.is_invalid_json(e):
+                    raise ModelBehaviorError(
+                        f"Invalid JSON input for tool {schema.name}: {e}"
+                    ) from e
                 if _debug.DONT_LOG_TOOL_DATA:
                     logger.debug(f"Invalid JSON input for tool {schema.name}")
                 else:
@@ -232,46 +360,45 @@ def function_tool(
                     f"Invalid JSON input for tool {schema.name}: {input}"
                 ) from e
 
-            if _debug.DONT_LOG_TOOL_DATA:
-                logger.debug(f"Invoking tool {schema.name}")
-            else:
-                logger.debug(f"Invoking tool {schema.name} with input {input}")
-
-            try:
-                parsed = (
-                    schema.params_pydantic_model(**json_data)
-                    if json_data
-                    else schema.params_pydantic_model()
-                )
-            except ValidationError as e:
-                raise ModelBehaviorError(f"Invalid JSON input for tool {schema.name}: {e}") from e
-
             args, kwargs_dict = schema.to_call_args(parsed)
 
             if not _debug.DONT_LOG_TOOL_DATA:
                 logger.debug(f"Tool call args: {args}, kwargs: {kwargs_dict}")
 
-            if inspect.iscoroutinefunction(the_func):
-                if schema.takes_context:
-                    result = await the_func(ctx, *args, **kwargs_dict)
-                else:
-                    result = await the_func(*args, **kwargs_dict)
+            cache_key: str | None = None
+            if cache is not None:
+                cache_key = tool_cache_key(schema.name, parsed)
+                cached = await cache.get(ctx, cache_key)
+                _record_cache_hit(cached is not None)
+                if cached is not None:
+                    logger.debug(f"Tool {schema.name} result served from cache")
+                    return cached
+
+            call_args = (ctx, *args) if schema.takes_context else tuple(args)
+            if is_async:
+                result = await the_func(*call_args, **kwargs_dict)
+            elif process_key is not None:
+                result = await run_in_process(process_key, *call_args, **kwargs_dict)
+            elif policy == "thread":
+                result = await asyncio.to_thread(the_func, *call_args, **kwargs_dict)
             else:
-                if schema.takes_context:
-                    result = the_func(ctx, *args, **kwargs_dict)
-                else:
-                    result = the_func(*args, **kwargs_dict)
+                result = the_func(*call_args, **kwargs_dict)
 
             if _debug.DONT_LOG_TOOL_DATA:
                 logger.debug(f"Tool {schema.name} completed.")
             else:
                 logger.debug(f"Tool {schema.name} returned {result}")
 
+            if cache is not None and cache_key is not None:
+                await cache.set(ctx, cache_key, result)
             return result
 
         async def _on_invoke_tool(ctx: RunContextWrapper[Any], input: str) -> Any:
+            # An invalid function signature is a bug in the tool, not something the model can fix,
+            # so it's raised rather than passed to failure_error_function
+            schema = lazy_schema.get()
             try:
-                return await _on_invoke_tool_impl(ctx, input)
+                return await _on_invoke_tool_impl(ctx, input, schema)
             except Exception as e:
                 if failure_error_function is None:
                     raise
@@ -292,11 +419,17 @@ def function_tool(
                 return result
 
         return FunctionTool(
-            name=schema.name,
-            description=schema.description or "",
-            params_json_schema=schema.params_json_schema,
+            name=tool_name,
+            description=cast(str, Lazy(lambda: lazy_schema.get().description or "")),
+            params_json_schema=cast(
+                dict[str, Any], Lazy(lambda: lazy_schema.get().params_json_schema)
+            ),
             on_invoke_tool=_on_invoke_tool,
             strict_json_schema=strict_mode,
+            max_concurrency=max_concurrency,
+            resource_key=resource_key,
+            timeout=timeout,
+            failure_error_function=failure_error_function,
         )
 
     # If func is actually a callable, we were used as @function_tool with no parentheses
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from .exceptions import UserError
+from .logger import logger
+from .run_context import RunContextWrapper
+from .util._canonical import canonical_hash
+
+ToolCacheScope = Literal["process", "run"]
+"""How long cached tool results are shared:
+- "process": by every run in the process (or every process that shares the backend), until they
+  expire or are evicted.
+- "run": only within one run. Each run starts with an empty in-memory cache, which is dropped when
+  the run ends.
+"""
+
+
+def tool_cache_key(tool_name: str, arguments: BaseModel) -> str:
+    """Returns the cache key of a tool call: a hash of the tool name and the validated arguments,
+    including defaults. Calls whose JSON arguments differ only in key order, whitespace or values
+    that validate to the same thing (e.g. an omitted default) have the same key.
+    """
+    return canonical_hash({"tool": tool_name, "arguments": arguments.model_dump(mode="json")})
+
+
+class ToolCacheBackend(abc.ABC):
+    """Stores the results of tool calls by key. Implement this to keep results in a shared store,
+    e.g. Redis.
+    """
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Any | None:
+        """Returns the result stored for the key, or None if there isn't a live one."""
+        pass
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: Any, ttl: float | None) -> None:
+        """Stores a result for the key. If `ttl` is set, the result expires after that many
+        seconds.
+        """
+        pass
+
+
+class InMemoryToolCache(ToolCacheBackend):
+    """Keeps tool results in memory. Entries beyond `max_entries` are evicted least recently used
+    first. Results are returned as-is, not copied.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        if max_entries < 1:
+            raise UserError(f"max_entries must be at least 1, got {max_entries}")
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any, ttl: float | None) -> None:
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteToolCache(ToolCacheBackend):
+    """Keeps tool results in a local SQLite database, so they survive restarts and can be shared by
+    the processes of a service on the same machine. Results are stored as JSON, so only results
+    that are JSON-serializable (strings, numbers, lists, dicts, ...) are cached; others are
+    skipped. Database calls run in a worker thread.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], table: str = "tool_results") -> None:
+        if not table.isidentifier():
+            raise UserError(f"Invalid table name {table!r}")
+        self.path = Path(path)
+        self.table = table
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _get(self, key: str) -> Any | None:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and time.time() >= expires_at:
+                connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+        return json.loads(value)
+
+    def _set(self, key: str, value: str, expires_at: float | None) -> None:
+        with self._lock:
+            self._connect().execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+
+    async def get(self, key: str) -> Any | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float | None) -> None:
+        try:
+            data = json.dumps(value)
+        except (TypeError, ValueError):
+            logger.debug(f"Not caching a tool result of type {type(value).__name__}")
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        await asyncio.to_thread(self._set, key, data, expires_at)
+
+    def clear(self) -> None:
+        """Deletes every stored result."""
+        with self._lock:
+            self._connect().execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class ToolCache:
+    """Memoizes the results of a function tool, so that calls with the same arguments return the
+    stored result instead of running the tool again. Pass it to `function_tool(cache=...)`.
+
+    Only use it for tools whose result depends on nothing but their arguments, like lookups of
+    exchange rates or catalog metadata: the context isn't part of the key. Failed calls and `None`
+    results aren't cached.
+
+    One `ToolCache` can be shared by several tools; the tool name is part of the key.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float | None = None,
+        max_entries: int = 1024,
+        scope: ToolCacheScope = "process",
+        backend: ToolCacheBackend | None = None,
+    ) -> None:
+        """
+        Args:
+            ttl: If set, results expire after this many seconds.
+            max_entries: The maximum number of results kept in memory, when no backend is given.
+            scope: Whether results are shared by every run in the process, or only within a run.
+            backend: Where to store results, e.g. a `SQLiteToolCache`. Defaults to an in-memory
+                LRU. Only supported with the "process" scope.
+        """
+        if scope == "run" and backend is not None:
+            raise UserError("Run-scoped tool caches are kept in memory and can't use a backend")
+        if ttl is not None and ttl <= 0:
+            raise UserError(f"ttl must be positive, got {ttl}")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.scope = scope
+        self.backend = backend if backend is not None else InMemoryToolCache(max_entries)
+
+        self.hits = 0
+        """The number of calls that were served from the cache."""
+
+        self.misses = 0
+        """The number of calls that ran the tool."""
+
+        self._run_backends: dict[
+            int, tuple[weakref.ref[RunContextWrapper[Any]], InMemoryToolCache]
+        ] = {}
+
+    def _backend_for(self, context: RunContextWrapper[Any]) -> ToolCacheBackend:
+        if self.scope == "process":
+            return self.backend
+
+        # Each run has its own context wrapper, so run-scoped results are kept per wrapper, and
+        # dropped when it's garbage collected.
+        run_id = id(context)
+        entry = self._run_backends.get(run_id)
+        if entry is not None and entry[0]() is context:
+            return entry[1]
+
+        def _remove(_: weakref.ref[RunContextWrapper[Any]]) -> None:
+            current = self._run_backends.get(run_id)
+            if current is not None and current[0]() is None:
+                del self._run_backends[run_id]
+
+        backend = InMemoryToolCache(self.max_entries)
+        self._run_backends[run_id] = (weakref.ref(context, _remove), backend)
+        return backend
+
+    async def get(self, context: RunContextWrapper[Any], key: str) -> Any | None:
+        """Returns the result stored for the key, or None. Errors from the backend are logged and
+        treated as misses, so a broken cache never fails a tool call.
+        """
+        try:
+            value = await self._backend_for(context).get(key)
+        except Exception as e:
+            logger.warning(f"Error reading from the tool cache: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, context: RunContextWrapper[Any], key: str, value: Any) -> None:
+        """Stores a result for the key. Errors from the backend are logged and ignored."""
+        if value is None:
+            return
+        try:
+            await self._backend_for(context).set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Error writing to the tool cache: {e}")
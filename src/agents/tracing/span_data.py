@@ -62,10 +62,11 @@ class AgentSpanData(SpanData):
 class FunctionSpanData(SpanData):
     """
     Represents a Function Span in the trace.
-    Includes input, output and MCP data (if applicable).
+    Includes input, output, MCP data (if applicable) and, for tools with a result cache, whether
+    the result came from the cache.
     """
 
-    __slots__ = ("name", "input", "output", "mcp_data")
+    __slots__ = ("name", "input", "output", "mcp_data", "cache_hit")
 
     def __init__(
         self,
@@ -73,24 +74,30 @@ class FunctionSpanData(SpanData):
         input: str | None,
         output: Any | None,
         mcp_data: dict[str, Any] | None = None,
+        cache_hit: bool | None = None,
     ):
         self.name = name
         self.input = input
         self.output = output
         self.mcp_data = mcp_data
+        self.cache_hit = cache_hit
 
     @property
     def type(self) -> str:
         return "function"
 
     def export(self) -> dict[str, Any]:
-        return {
+        data: dict[str, Any] = {
             "type": self.type,
             "name": self.name,
             "input": self.input,
             "output": str(self.output) if self.output else None,
             "mcp_data": self.mcp_data,
         }
+        # Only tools with a result cache report it
+        if self.cache_hit is not None:
+            data["cache_hit"] = self.cache_hit
+        return data
 
 
 class GenerationSpanData(SpanData):
@@ -15,8 +15,19 @@ class Usage:
     total_tokens: int = 0
     """Total tokens sent and received, across all requests."""
 
+    cached_input_tokens: int = 0
+    """Input tokens that the provider read from its prompt cache, across all requests. Not all
+    providers report this.
+    """
+
+    @property
+    def cached_input_ratio(self) -> float:
+        """The fraction of input tokens that the provider read from its prompt cache."""
+        return self.cached_input_tokens / self.input_tokens if self.input_tokens else 0.0
+
     def add(self, other: "Usage") -> None:
         self.requests += other.requests if other.requests else 0
         self.input_tokens += other.input_tokens if other.input_tokens else 0
         self.output_tokens += other.output_tokens if other.output_tokens else 0
         self.total_tokens += other.total_tokens if other.total_tokens else 0
+        self.cached_input_tokens += other.cached_input_tokens if other.cached_input_tokens else 0
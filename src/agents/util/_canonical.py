@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+from typing import Any
+
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_unset=True)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {
+            field.name: getattr(value, field.name)
+            for field in dataclasses.fields(value)
+            if not callable(getattr(value, field.name))
+        }
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return repr(value)
+
+
+def canonical_json(value: Any) -> str:
+    """Serializes a value to JSON deterministically: keys are sorted and there's no whitespace, so
+    equal values always produce the same string. Pydantic models and dataclasses are serialized by
+    their fields; other values that JSON doesn't support are serialized by `repr()`.
+    """
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=_default
+    )
+
+
+def canonical_hash(value: Any) -> str:
+    """Returns the SHA-256 hex digest of the canonical JSON of a value."""
+    return hashlib.sha256(canonical_json(value).encode("utf-8")).hexdigest()
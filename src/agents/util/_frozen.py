@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from typing import Any, NoReturn, TypeVar
+
+T = TypeVar("T")
+
+
+def _raise_frozen(obj: Any) -> NoReturn:
+    raise TypeError(
+        f"{type(obj).__name__} is read-only. Run input is shared between the runner, guardrails "
+        "and handoff filters without copying; copy it first (e.g. with `copy.deepcopy`) if you "
+        "need a mutable version."
+    )
+
+
+class FrozenDict(dict[str, Any]):
+    """A read-only dict. It is a real `dict`, so it can be serialized and passed to the OpenAI
+    client as-is. `copy.copy` and `copy.deepcopy` return plain, mutable copies.
+    """
+
+    __slots__ = ()
+
+    def __setitem__(self, key: Any, value: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def __delitem__(self, key: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def __ior__(self, other: Any) -> NoReturn:  # type: ignore[misc]
+        _raise_frozen(self)
+
+    def clear(self) -> NoReturn:
+        _raise_frozen(self)
+
+    def pop(self, *args: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def popitem(self) -> NoReturn:
+        _raise_frozen(self)
+
+    def setdefault(self, *args: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def update(self, *args: Any, **kwargs: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (dict, (dict(self),))
+
+
+class FrozenList(list[Any]):
+    """A read-only list. It is a real `list`, so it can be serialized and passed to the OpenAI
+    client as-is. `copy.copy` and `copy.deepcopy` return plain, mutable copies.
+    """
+
+    __slots__ = ()
+
+    def __setitem__(self, index: Any, value: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def __delitem__(self, index: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def __iadd__(self, other: Any) -> NoReturn:  # type: ignore[misc]
+        _raise_frozen(self)
+
+    def __imul__(self, other: Any) -> NoReturn:  # type: ignore[misc]
+        _raise_frozen(self)
+
+    def append(self, value: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def extend(self, values: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def insert(self, index: Any, value: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def pop(self, *args: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def remove(self, value: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def clear(self) -> NoReturn:
+        _raise_frozen(self)
+
+    def sort(self, *args: Any, **kwargs: Any) -> NoReturn:
+        _raise_frozen(self)
+
+    def reverse(self) -> NoReturn:
+        _raise_frozen(self)
+
+    def __copy__(self) -> list[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list[Any]:
+        return thaw(self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (list, (list(self),))
+
+
+def freeze(value: T) -> T:
+    """Returns a read-only version of a JSON-like value. Dicts and lists are rebuilt as
+    `FrozenDict`/`FrozenList`; everything else (including strings and bytes, which are immutable)
+    is shared with the original. Values that are already frozen are returned as-is, so freezing is
+    cheap to repeat.
+    """
+    if type(value) is FrozenDict or type(value) is FrozenList:
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())  # type: ignore
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)  # type: ignore
+    return value
+
+
+def thaw(value: T) -> T:
+    """Returns a mutable copy of a frozen value. Dicts and lists are copied recursively; other
+    values are shared.
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}  # type: ignore
+    if isinstance(value, list):
+        return [thaw(item) for item in value]  # type: ignore
+    return value
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import dataclasses
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Callable, Generic
+
+from typing_extensions import TypeVar
+
+T = TypeVar("T")
+
+
+class IdentityMemo(Generic[T]):
+    """A small LRU memo keyed by the identity of a sequence of objects, for values derived from
+    objects that are expensive to hash or not hashable at all (tools, handoffs, output schemas).
+
+    Each entry keeps its key objects alive, so their ids can't be reused while the entry exists.
+    Key objects that can be changed in place (like tools) should also pass a `fingerprint`: the
+    values the derived value is computed from, e.g. `field_values(*key_objects)`. An entry is only
+    reused while each of those is the very same object, so assigning a new value to a field
+    refreshes it. Changes made inside a field's value, e.g. to a nested dict, aren't detected.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple[int, ...], tuple[tuple[Any, ...], tuple[Any, ...], T]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get_or_create(
+        self,
+        key_objects: Sequence[Any],
+        factory: Callable[[], T],
+        fingerprint: Sequence[Any] = (),
+    ) -> T:
+        key = tuple(id(obj) for obj in key_objects)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and _same_objects(entry[1], fingerprint):
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        value = factory()
+        with self._lock:
+            # The entry keeps the fingerprint alive too, so its ids can't be reused either.
+            self._entries[key] = (tuple(key_objects), tuple(fingerprint), value)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def field_values(*objects: Any) -> tuple[Any, ...]:
+    """Returns the current values of the fields of the given dataclass instances, to use as the
+    fingerprint of a value derived from them.
+    """
+    return tuple(getattr(obj, field.name) for obj in objects for field in dataclasses.fields(obj))
+
+
+def _same_objects(stored: tuple[Any, ...], current: Sequence[Any]) -> bool:
+    return len(stored) == len(current) and all(a is b for a, b in zip(stored, current))
@@ -1,15 +1,83 @@
 from __future__ import annotations
 
-from typing import Literal
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Literal
 
-from pydantic import TypeAdapter, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from typing_extensions import TypeVar
 
 from ..exceptions import ModelBehaviorError
 from ..tracing import SpanError
 from ._error_tracing import attach_error_to_current_span
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, and only makes `loads()` faster
+    orjson = None  # type: ignore[assignment]
+
 T = TypeVar("T")
+TModel = TypeVar("TModel", bound=BaseModel)
+
+_MAX_TYPE_ADAPTERS = 256
+_type_adapters: OrderedDict[Hashable, TypeAdapter[Any]] = OrderedDict()
+_type_adapters_lock = threading.Lock()
+_NO_KEY = object()
+
+
+def loads(data: str | bytes) -> Any:
+    """Parses a JSON document into Python objects, like `json.loads()`. Uses orjson if it's
+    installed, which is several times faster for large documents.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects a few documents that the standard library accepts, e.g. NaN and
+            # integers over 64 bits. Let `json` parse those, or raise its usual error.
+            pass
+    return json.loads(data)
+
+
+def type_adapter(tp: Any, key: Any = _NO_KEY) -> TypeAdapter[Any]:
+    """Returns a `TypeAdapter` for a type, cached so that its validator is only built once per
+    type. Types that are created on each use (e.g. wrapper `TypedDict`s) can be cached by a `key`
+    instead. Unhashable types and keys get a new adapter each time.
+    """
+    cache_key = tp if key is _NO_KEY else key
+    try:
+        with _type_adapters_lock:
+            adapter = _type_adapters.get(cache_key)
+            if adapter is not None:
+                _type_adapters.move_to_end(cache_key)
+                return adapter
+    except TypeError:
+        return TypeAdapter(tp)
+
+    adapter = TypeAdapter(tp)
+    with _type_adapters_lock:
+        _type_adapters[cache_key] = adapter
+        while len(_type_adapters) > _MAX_TYPE_ADAPTERS:
+            _type_adapters.popitem(last=False)
+    return adapter
+
+
+def validate_model_json(model: type[TModel], json_str: str) -> TModel:
+    """Validates a JSON object against a Pydantic model in a single pass: Pydantic parses the string
+    straight into the model, without building an intermediate dict. An empty string is validated
+    as an empty object.
+
+    Raises a `ValidationError` if the JSON is invalid or doesn't match the model; use
+    `is_invalid_json()` to tell these apart.
+    """
+    return model.model_validate_json(json_str if json_str.strip() else "{}")
+
+
+def is_invalid_json(error: ValidationError) -> bool:
+    """Whether a validation error was raised because the input wasn't valid JSON at all."""
+    return any(detail["type"] == "json_invalid" for detail in error.errors(include_url=False))
 
 
 def validate_json(json_str: str, type_adapter: TypeAdapter[T], partial: bool) -> T:
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Callable, Generic
+
+from typing_extensions import TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """A value that is computed the first time it's needed. Concurrent first calls to `get()` from
+    several threads compute it once.
+    """
+
+    def __init__(self, compute: Callable[[], T]) -> None:
+        self._compute: Callable[[], T] | None = compute
+        self._value: T | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def computed(self) -> bool:
+        return self._compute is None
+
+    def get(self) -> T:
+        if self._compute is not None:
+            with self._lock:
+                if self._compute is not None:
+                    self._value = self._compute()
+                    self._compute = None
+        return self._value  # type: ignore[return-value]
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> T:
+        # A deep copy must not share the computed value with the original, so it's computed and
+        # copied. Holders of a `Lazy` (i.e. `LazyField`s) accept the plain value.
+        return copy.deepcopy(self.get(), memo)
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class LazyField:
+    """A descriptor for a dataclass field that can be set to a `Lazy` value, which is computed the
+    first time the field is read. Install it on a dataclass with `LazyField.install()`, after the
+    class is created, so that the fields keep their types and stay required.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    @classmethod
+    def install(cls, dataclass: type, *names: str) -> None:
+        for name in names:
+            setattr(dataclass, name, cls(name))
+
+    def __get__(self, obj: object | None, objtype: type | None = None) -> Any:
+        if obj is None:
+            return self
+        value = obj.__dict__[self._name]
+        if isinstance(value, Lazy):
+            value = value.get()
+            obj.__dict__[self._name] = value
+        return value
+
+    def __set__(self, obj: object, value: Any) -> None:
+        obj.__dict__[self._name] = value
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import dataclasses
+import enum
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, cast, get_args
+
+import pydantic
+from pydantic import BaseModel
+from typing_extensions import is_typeddict
+
+from ..logger import logger
+from ..version import __version__
+
+# Set to a directory to keep the cache on disk, e.g. one that is baked into a container image or
+# shared by the workers of a service
+CACHE_DIR_ENV_VAR = "OPENAI_AGENTS_SCHEMA_CACHE_DIR"
+
+
+# Object addresses in reprs differ between processes
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def _update_with_code(digest: Any, code: types.CodeType) -> None:
+    """Hashes a code object: its bytecode, constants and names. This is much cheaper than reading
+    and tokenizing the source, and changes whenever the compiled source does.
+    """
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_with_code(digest, const)
+        else:
+            digest.update(repr(const).encode("utf-8", "surrogatepass"))
+    digest.update(repr((code.co_names, code.co_varnames, code.co_freevars)).encode("utf-8"))
+
+
+def _referenced_classes(annotation: Any, seen: set[type]) -> None:
+    """Collects the classes used by a type annotation, including the types of the fields of
+    models, dataclasses and typed dicts, whose definitions change the JSON schema.
+    """
+    for arg in get_args(annotation):
+        _referenced_classes(arg, seen)
+    if not isinstance(annotation, type) or annotation in seen:
+        return
+    seen.add(annotation)
+    field_types: list[Any] = []
+    if issubclass(annotation, BaseModel):
+        field_types = [field.annotation for field in annotation.model_fields.values()]
+    elif dataclasses.is_dataclass(annotation):
+        field_types = [field.type for field in dataclasses.fields(annotation)]
+    elif is_typeddict(annotation):
+        field_types = list(getattr(annotation, "__annotations__", {}).values())
+    for field_type in field_types:
+        _referenced_classes(field_type, seen)
+
+
+def _class_fingerprint(cls: type) -> str:
+    """Describes the parts of a class that its JSON schema is generated from."""
+    parts: list[Any] = [cls.__module__, cls.__qualname__, cls.__doc__]
+    if issubclass(cls, BaseModel):
+        parts += [cls.model_fields, cls.model_config]
+    elif dataclasses.is_dataclass(cls):
+        parts += [(field.name, field.type, field.default) for field in dataclasses.fields(cls)]
+    elif issubclass(cls, enum.Enum):
+        parts += [(member.name, member.value) for member in cls]
+    elif is_typeddict(cls):
+        parts += [getattr(cls, "__annotations__", {}), getattr(cls, "__required_keys__", ())]
+    return _ADDRESS.sub("", repr(parts))
+
+
+def schema_cache_key(
+    func: Callable[..., Any],
+    signature: inspect.Signature,
+    type_hints: dict[str, Any],
+    options: dict[str, Any],
+) -> str | None:
+    """Returns the cache key of a function's schema, or None if it can't be cached because the
+    function has no code object (e.g. builtins and other callables).
+
+    The key is built from the function's module and qualified name, a hash of its compiled source,
+    docstring and signature (so closures with other defaults get their own entries), the
+    definitions of the classes its parameters use, the options the schema is created with, and the
+    versions of the SDK, Pydantic and Python.
+    """
+    code = getattr(inspect.unwrap(func), "__code__", None)
+    if not isinstance(code, types.CodeType):
+        return None
+
+    classes: set[type] = set()
+    for annotation in type_hints.values():
+        _referenced_classes(annotation, classes)
+
+    source_hash = hashlib.sha256()
+    _update_with_code(source_hash, code)
+    for part in (
+        inspect.getdoc(func) or "",
+        _ADDRESS.sub("", str(signature)),
+        *sorted(_class_fingerprint(cls) for cls in classes),
+    ):
+        source_hash.update(b"\0")
+        source_hash.update(part.encode("utf-8", "surrogatepass"))
+
+    key = {
+        "module": getattr(func, "__module__", None),
+        "qualname": getattr(func, "__qualname__", None),
+        "source": source_hash.hexdigest(),
+        "options": options,
+        "versions": [__version__, pydantic.VERSION, sys.version_info[:2]],
+    }
+    data = json.dumps(key, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+class FunctionSchemaCache:
+    """A cache of the parts of function schemas that are expensive to create: the documentation
+    parsed from docstrings and the JSON schema of the parameters. Entries are kept in memory, and
+    also on disk if a directory is set, so that new processes start with them.
+
+    Entries are JSON-serializable dicts, stored serialized, so each `get()` returns a new copy that
+    callers can modify.
+    """
+
+    def __init__(self, directory: str | Path | None = None, maxsize: int = 4096) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self.maxsize = maxsize
+        self.hits = 0
+        """The number of lookups that found an entry, in memory or on disk."""
+        self.misses = 0
+        """The number of lookups that didn't find an entry."""
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path | None:
+        return self.directory / f"{key}.json" if self.directory is not None else None
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cast(dict[str, Any], json.loads(data))
+
+        path = self._path(key)
+        if path is not None:
+            try:
+                data = path.read_text(encoding="utf-8")
+                entry = json.loads(data)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.debug(f"Ignoring unreadable function schema cache entry {path}: {e}")
+            else:
+                self._remember(key, data)
+                with self._lock:
+                    self.hits += 1
+                return cast(dict[str, Any], entry)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        try:
+            data = json.dumps(entry, separators=(",", ":"))
+        except (TypeError, ValueError):
+            # e.g. a schema with a default value that isn't JSON-serializable
+            return
+        self._remember(key, data)
+
+        path = self._path(key)
+        if path is None:
+            return
+        # Write to a temporary file first, so that concurrent processes never read partial entries
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.debug(f"Couldn't write function schema cache entry {path}: {e}")
+
+    def _remember(self, key: str, data: str) -> None:
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes the entries kept in memory. Entries on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = FunctionSchemaCache(os.environ.get(CACHE_DIR_ENV_VAR) or None)
+
+
+def get_schema_cache() -> FunctionSchemaCache:
+    return _cache
+
+
+def set_schema_cache_dir(directory: str | Path | None) -> None:
+    """Sets the directory where function schemas are cached on disk, or None to only cache them in
+    memory.
+    """
+    global _cache
+    _cache = FunctionSchemaCache(directory, _cache.maxsize)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import importlib
+import threading
+from typing import Any, Callable
+
+# Functions of tools that run in a process pool, by module and qualified name. `function_tool`
+# replaces the module attribute with a `FunctionTool`, so the function can't be pickled by
+# reference. Instead, worker processes import the module, which registers the function again.
+_process_functions: dict[tuple[str, str], Callable[..., Any]] = {}
+
+_process_pool: concurrent.futures.ProcessPoolExecutor | None = None
+_process_pool_lock = threading.Lock()
+
+
+def register_process_function(func: Callable[..., Any]) -> tuple[str, str]:
+    """Registers a function to be called in the process pool, and returns its key."""
+    key = (func.__module__, func.__qualname__)
+    _process_functions[key] = func
+    return key
+
+
+def set_process_pool(executor: concurrent.futures.ProcessPoolExecutor | None) -> None:
+    """Sets the process pool used by tools with the "process" execution policy. If None, a default
+    pool is created when it is first needed.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        _process_pool = executor
+
+
+def _get_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = concurrent.futures.ProcessPoolExecutor()
+        return _process_pool
+
+
+def _call_registered_function(key: tuple[str, str], args: Any, kwargs: Any) -> Any:
+    func = _process_functions.get(key)
+    if func is None:
+        importlib.import_module(key[0])
+        func = _process_functions[key]
+    return func(*args, **kwargs)
+
+
+async def run_in_process(key: tuple[str, str], *args: Any, **kwargs: Any) -> Any:
+    """Runs a registered function in the process pool. The arguments and the return value must be
+    picklable.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(_call_registered_function, key, args, kwargs)
+    return await loop.run_in_executor(_get_process_pool(), call)
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from openai.types.responses import ResponseUsage
+
+
+def cached_input_tokens(usage: ResponseUsage) -> int:
+    """Returns the cached input tokens of a Responses API usage object. Not every provider fills
+    in the token details, so missing details count as zero.
+    """
+    details = getattr(usage, "input_tokens_details", None)
+    return getattr(details, "cached_tokens", None) or 0
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import copy
+import gc
+import weakref
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from agents import (
+    Agent,
+    Handoff,
+    ModelSettings,
+    ModelTracing,
+    OpenAIChatCompletionsModel,
+    OpenAIResponsesModel,
+    Runner,
+    generation_span,
+    handoff,
+)
+from agents._agent_plan import AgentPlanCache
+from agents.agent_output import AgentOutputSchema
+from agents.models.openai_chatcompletions import ToolConverter
+from agents.models.openai_responses import Converter
+from agents.tool import Tool
+from agents.util._identity_memo import IdentityMemo, field_values
+
+from .fake_model import FakeModel
+from .test_responses import get_function_tool, get_text_message
+
+
+class Foo(BaseModel):
+    bar: str
+
+
+def test_plan_is_reused_for_same_agent():
+    cache = AgentPlanCache()
+    other = Agent(name="other")
+    agent = Agent(name="test", output_type=Foo, handoffs=[other])
+
+    plan = cache.get(agent)
+    assert isinstance(plan.output_schema, AgentOutputSchema)
+    assert len(plan.handoffs) == 1
+    assert isinstance(plan.handoffs[0], Handoff)
+    assert plan.handoffs[0].agent_name == "other"
+
+    assert cache.get(agent) is plan
+
+
+def test_plan_is_recompiled_when_agent_changes():
+    cache = AgentPlanCache()
+    agent = Agent(name="test")
+    plan = cache.get(agent)
+    assert plan.output_schema is None
+    assert plan.handoffs == []
+
+    agent.output_type = Foo
+    agent.handoffs.append(Agent(name="other"))
+    new_plan = cache.get(agent)
+    assert new_plan is not plan
+    assert new_plan.output_schema is not None
+    assert len(new_plan.handoffs) == 1
+
+    # Renaming a handoff target changes the generated handoff tool
+    target = agent.handoffs[0]
+    assert isinstance(target, Agent)
+    target.name = "renamed"
+    assert cache.get(agent).handoffs[0].agent_name == "renamed"
+
+
+def test_plan_invalidate():
+    cache = AgentPlanCache()
+    agent_1 = Agent(name="one")
+    agent_2 = Agent(name="two")
+    plan_1 = cache.get(agent_1)
+    plan_2 = cache.get(agent_2)
+
+    cache.invalidate(agent_1)
+    assert cache.get(agent_1) is not plan_1
+    assert cache.get(agent_2) is plan_2
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_plan_is_dropped_with_agent():
+    cache = AgentPlanCache()
+    agent = Agent(name="test")
+    cache.get(agent)
+    assert len(cache) == 1
+
+    del agent
+    gc.collect()
+    assert len(cache) == 0
+
+
+def test_agents_that_hand_off_to_each_other_are_collected():
+    cache = AgentPlanCache()
+    first = Agent(name="first")
+    second = Agent(name="second", handoffs=[first])
+    first.handoffs.append(second)
+    cache.get(first)
+    cache.get(second)
+    assert len(cache) == 2
+
+    first_ref = weakref.ref(first)
+    del first, second
+    gc.collect()
+    assert first_ref() is None
+    assert len(cache) == 0
+
+
+def test_copies_of_an_agent_get_their_own_plan():
+    cache = AgentPlanCache()
+    agent = Agent(name="test", output_type=Foo)
+    plan = cache.get(agent)
+    copied = copy.copy(agent)
+    assert cache.get(copied) is not plan
+    assert len(cache) == 2
+
+    cache.invalidate()
+    assert cache.get(agent) is not plan
+
+
+def test_explicit_handoffs_are_kept_as_is():
+    cache = AgentPlanCache()
+    explicit = handoff(Agent(name="other"))
+    agent = Agent(name="test", handoffs=[explicit])
+    assert cache.get(agent).handoffs[0] is explicit
+
+
+def test_identity_memo_reuses_values_and_evicts():
+    memo: IdentityMemo[list[int]] = IdentityMemo(maxsize=2)
+    a, b, c = object(), object(), object()
+    calls = 0
+
+    def factory() -> list[int]:
+        nonlocal calls
+        calls += 1
+        return [calls]
+
+    first = memo.get_or_create((a,), factory)
+    assert memo.get_or_create((a,), factory) is first
+    memo.get_or_create((b,), factory)
+    memo.get_or_create((c,), factory)
+    assert len(memo) == 2
+    assert calls == 3
+
+    # `a` was evicted, so it is recomputed
+    assert memo.get_or_create((a,), factory) is not first
+
+
+def test_identity_memo_recomputes_when_fingerprint_changes():
+    memo: IdentityMemo[str] = IdentityMemo()
+    tool = get_function_tool("foo", "result")
+
+    def describe() -> str:
+        return tool.description
+
+    assert memo.get_or_create((tool,), describe, field_values(tool)) == ""
+    tool.description = "Looks things up"
+    assert memo.get_or_create((tool,), describe, field_values(tool)) == "Looks things up"
+    # Without a fingerprint, only the identity of the key objects counts
+    assert memo.get_or_create((tool,), describe) == "Looks things up"
+
+
+@pytest.mark.asyncio
+async def test_runner_reuses_plan_across_turns_and_runs(monkeypatch):
+    compiled = 0
+    original_init = AgentOutputSchema.__init__
+
+    def counting_init(self, *args, **kwargs):
+        nonlocal compiled
+        compiled += 1
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(AgentOutputSchema, "__init__", counting_init)
+
+    model = FakeModel()
+    agent = Agent(name="test", model=model, output_type=Foo)
+    for _ in range(3):
+        model.set_next_output([get_text_message(Foo(bar="baz").model_dump_json())])
+        result = await Runner.run(agent, input="hi")
+        assert result.final_output == Foo(bar="baz")
+
+    assert compiled == 1
+
+
+def test_tool_conversion_includes_handoffs():
+    tools: list[Tool] = [get_function_tool("foo", "result")]
+    handoffs = [handoff(Agent(name="other"))]
+
+    converted = Converter.convert_tools(tools, handoffs)
+    assert [tool["name"] for tool in converted.tools] == ["foo", "transfer_to_other"]  # type: ignore
+    chat_tools = ToolConverter.convert_tools(tools, handoffs)
+    assert [tool["function"]["name"] for tool in chat_tools] == ["foo", "transfer_to_other"]
+
+
+class Captured(Exception):
+    pass
+
+
+class CapturingClient:
+    """Records the arguments of the last request to either API, then fails it."""
+
+    def __init__(self) -> None:
+        self.kwargs: dict[str, Any] = {}
+        self.responses = self
+        self.chat = self
+        self.completions = self
+        self.base_url = "http://fake"
+
+    async def create(self, **kwargs: Any) -> Any:
+        self.kwargs = kwargs
+        raise Captured()
+
+
+@pytest.mark.asyncio
+async def test_models_convert_tools_again_when_they_are_changed():
+    client = CapturingClient()
+    tool = get_function_tool("foo", "result")
+    tools: list[Tool] = [tool]
+    handoffs: list[Handoff] = [handoff(Agent(name="other"))]
+    responses_model = OpenAIResponsesModel(model="gpt-4o", openai_client=client)  # type: ignore
+    chat_model = OpenAIChatCompletionsModel(model="gpt-4o", openai_client=client)  # type: ignore
+
+    async def sent_descriptions() -> list[list[str]]:
+        with pytest.raises(Captured):
+            await responses_model._fetch_response(
+                None, "hi", ModelSettings(), tools, None, handoffs, stream=False
+            )
+        responses_tools = [tool["description"] for tool in client.kwargs["tools"]]
+        with pytest.raises(Captured), generation_span(disabled=True) as span:
+            await chat_model._fetch_response(
+                None,
+                "hi",
+                ModelSettings(),
+                tools,
+                None,
+                handoffs,
+                span,
+                ModelTracing.DISABLED,
+                False,
+            )
+        chat_tools = [tool["function"]["description"] for tool in client.kwargs["tools"]]
+        return [responses_tools, chat_tools]
+
+    tool.description = "Old"
+    assert await sent_descriptions() == [["Old", handoffs[0].tool_description]] * 2
+    tool.description = "New"
+    handoffs[0].tool_description = "Hand off now"
+    assert await sent_descriptions() == [["New", "Hand off now"]] * 2
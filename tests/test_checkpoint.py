@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from agents import (
+    Agent,
+    FileCheckpointStore,
+    FunctionTool,
+    MaxTurnsExceeded,
+    RunCheckpoint,
+    RunConfig,
+    RunContextWrapper,
+    RunHooks,
+    Runner,
+    SQLiteCheckpointStore,
+    UserError,
+    function_tool,
+    handoff,
+)
+from agents.run_context import TContext
+from agents.usage import Usage
+
+from .fake_model import FakeModel
+from .test_responses import (
+    get_function_tool_call,
+    get_handoff_tool_call,
+    get_text_input_item,
+    get_text_message,
+)
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path: Path):
+    if request.param == "file":
+        return FileCheckpointStore(tmp_path / "checkpoints")
+    return SQLiteCheckpointStore(tmp_path / "checkpoints.db")
+
+
+def _tool_counter() -> tuple[list[str], FunctionTool]:
+    calls: list[str] = []
+
+    @function_tool
+    def lookup(key: str) -> str:
+        calls.append(key)
+        return f"value of {key}"
+
+    return calls, lookup
+
+
+@pytest.mark.asyncio
+async def test_resume_continues_after_last_completed_turn(store):
+    calls, lookup = _tool_counter()
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[lookup])
+    run_config = RunConfig(checkpoint_store=store, checkpoint_id="run-1")
+
+    model.add_multiple_turn_outputs(
+        [
+            [get_text_message("a"), get_function_tool_call("lookup", json.dumps({"key": "x"}))],
+            [get_function_tool_call("lookup", json.dumps({"key": "y"}))],
+            Crash(),
+        ]
+    )
+    with pytest.raises(Crash):
+        await Runner.run(agent, input="hello", run_config=run_config)
+
+    checkpoint = await store.load("run-1")
+    assert checkpoint is not None
+    assert checkpoint.agent_name == "test"
+    assert checkpoint.current_turn == 2
+    assert checkpoint.original_input == "hello"
+    assert len(checkpoint.generated_items) == 5
+    assert calls == ["x", "y"]
+
+    model.set_next_output([get_text_message("done")])
+    result = await Runner.resume(agent, "run-1", run_config=run_config)
+
+    assert result.final_output == "done"
+    # The completed turns weren't run again
+    assert calls == ["x", "y"]
+    assert len(result.new_items) == 6
+    assert result.new_items[2].type == "tool_call_output_item"
+    assert result.new_items[2].output == "value of x"
+    assert len(result.raw_responses) == 1
+    # The model sees the full history
+    assert len(model.last_turn_args["input"]) == 6
+
+    # The checkpoint is deleted once the run completes
+    assert await store.load("run-1") is None
+
+
+@pytest.mark.asyncio
+async def test_resume_restores_agents_after_handoff(store):
+    model = FakeModel()
+    custom = Agent(name="custom", model=model)
+    billing = Agent(name="billing", model=model)
+    triage = Agent(name="triage", model=model, handoffs=[billing, handoff(custom)])
+
+    model.add_multiple_turn_outputs([[get_handoff_tool_call(billing)], Crash()])
+    with pytest.raises(Crash):
+        await Runner.run(
+            triage,
+            input=[get_text_input_item("hi")],
+            run_config=RunConfig(checkpoint_store=store, checkpoint_id="run-2"),
+        )
+
+    checkpoint = await store.load("run-2")
+    assert checkpoint is not None
+    assert checkpoint.agent_name == "billing"
+
+    model.set_next_output([get_text_message("done")])
+    result = await Runner.resume(triage, checkpoint)
+
+    assert result.last_agent is billing
+    assert result.new_items[1].type == "handoff_output_item"
+    assert result.new_items[1].source_agent is triage
+    assert result.new_items[1].target_agent is billing
+    assert result.input == [get_text_input_item("hi")]
+
+    # Agents behind `Handoff` objects must be passed explicitly
+    checkpoint.agent_name = "custom"
+    with pytest.raises(UserError):
+        await Runner.resume(triage, checkpoint)
+    model.set_next_output([get_text_message("done")])
+    result = await Runner.resume(triage, checkpoint, agents=[custom])
+    assert result.last_agent is custom
+
+
+class StartedAgents(RunHooks):
+    def __init__(self) -> None:
+        self.started: list[str] = []
+
+    async def on_agent_start(
+        self, context: RunContextWrapper[TContext], agent: Agent[TContext]
+    ) -> None:
+        self.started.append(agent.name)
+
+
+@pytest.mark.asyncio
+async def test_agents_handed_off_to_after_resume_are_started(store):
+    _, lookup = _tool_counter()
+    model = FakeModel()
+    billing = Agent(name="billing", model=model)
+    triage = Agent(name="triage", model=model, tools=[lookup], handoffs=[billing])
+
+    model.add_multiple_turn_outputs(
+        [[get_function_tool_call("lookup", json.dumps({"key": "x"}))], Crash()]
+    )
+    with pytest.raises(Crash):
+        await Runner.run(
+            triage,
+            input="hi",
+            run_config=RunConfig(checkpoint_store=store, checkpoint_id="run-7"),
+        )
+
+    checkpoint = await store.load("run-7")
+    assert checkpoint is not None
+    hooks = StartedAgents()
+    model.add_multiple_turn_outputs([[get_handoff_tool_call(billing)], [get_text_message("done")]])
+    result = await Runner.resume(triage, checkpoint, hooks=hooks)
+
+    assert result.last_agent is billing
+    # The resumed agent was already started before the checkpoint, the one handed off to wasn't
+    assert hooks.started == ["billing"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("streamed", [False, True])
+async def test_agents_handed_off_to_before_the_checkpoint_are_started(store, streamed: bool):
+    model = FakeModel()
+    billing = Agent(name="billing", model=model)
+    triage = Agent(name="triage", model=model, handoffs=[billing])
+    run_config = RunConfig(checkpoint_store=store, checkpoint_id="run-8")
+
+    hooks = StartedAgents()
+    model.add_multiple_turn_outputs([[get_handoff_tool_call(billing)], Crash()])
+    with pytest.raises(Crash):
+        if streamed:
+            result = Runner.run_streamed(triage, input="hi", hooks=hooks, run_config=run_config)
+            async for _ in result.stream_events():
+                pass
+        else:
+            await Runner.run(triage, input="hi", hooks=hooks, run_config=run_config)
+
+    checkpoint = await store.load("run-8")
+    assert checkpoint is not None
+    assert checkpoint.agent_name == "billing"
+    assert not checkpoint.agent_started
+    assert not RunCheckpoint.from_json(checkpoint.to_json()).agent_started
+
+    # The turn that crashed is run again, including the start hooks of the agent handed off to
+    resumed_hooks = StartedAgents()
+    model.set_next_output([get_text_message("done")])
+    await Runner.resume(triage, checkpoint, hooks=resumed_hooks)
+    assert resumed_hooks.started == ["billing"]
+
+
+@pytest.mark.asyncio
+async def test_completed_turns_count_towards_max_turns():
+    model = FakeModel()
+    agent = Agent(name="test", model=model)
+    checkpoint = RunCheckpoint(
+        checkpoint_id="run-3",
+        agent_name="test",
+        original_input="hi",
+        generated_items=[],
+        usage=Usage(requests=2, input_tokens=10, output_tokens=5, total_tokens=15),
+        current_turn=2,
+    )
+
+    model.set_next_output([get_text_message("done")])
+    result = await Runner.resume(agent, checkpoint, max_turns=3)
+    assert result.final_output == "done"
+
+    with pytest.raises(MaxTurnsExceeded):
+        await Runner.resume(agent, checkpoint, max_turns=2)
+
+
+@pytest.mark.asyncio
+async def test_streamed_runs_save_checkpoints(store):
+    calls, lookup = _tool_counter()
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[lookup])
+    model.add_multiple_turn_outputs(
+        [[get_function_tool_call("lookup", json.dumps({"key": "x"}))], Crash()]
+    )
+    result = Runner.run_streamed(
+        agent, input="hi", run_config=RunConfig(checkpoint_store=store, checkpoint_id="run-4")
+    )
+    with pytest.raises(Crash):
+        async for _ in result.stream_events():
+            pass
+
+    checkpoint = await store.load("run-4")
+    assert checkpoint is not None
+    assert checkpoint.current_turn == 1
+
+    model.set_next_output([get_text_message("done")])
+    resumed = await Runner.resume(agent, checkpoint)
+    assert resumed.final_output == "done"
+    assert calls == ["x"]
+
+
+def test_checkpoint_json_round_trip():
+    checkpoint = RunCheckpoint(
+        checkpoint_id="run-5",
+        agent_name="test",
+        original_input=[get_text_input_item("hi")],
+        generated_items=[{"type": "message_output_item"}],
+        usage=Usage(requests=1),
+        current_turn=1,
+    )
+    assert RunCheckpoint.from_json(checkpoint.to_json()) == checkpoint
+
+    with pytest.raises(UserError):
+        RunCheckpoint.from_json(json.dumps({"version": 999}))
+
+
+@pytest.mark.asyncio
+async def test_resume_by_id_requires_a_saved_checkpoint(store):
+    agent = Agent(name="test", model=FakeModel())
+    with pytest.raises(UserError):
+        await Runner.resume(agent, "run-6")
+    with pytest.raises(UserError):
+        await Runner.resume(agent, "run-6", run_config=RunConfig(checkpoint_store=store))
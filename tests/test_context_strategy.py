@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from openai.types.responses import ResponseFunctionToolCall
+
+from agents import (
+    Agent,
+    PruningStrategy,
+    RunConfig,
+    RunContextWrapper,
+    Runner,
+    SlidingWindowStrategy,
+    SummarizingStrategy,
+    function_tool,
+)
+from agents.context_strategy import TRIMMED_TOOL_OUTPUT
+from agents.items import TResponseInputItem
+from agents.util._canonical import canonical_hash
+
+from .fake_model import FakeModel
+from .test_responses import get_text_message
+
+
+def _ten_tokens(item: TResponseInputItem) -> int:
+    return 10
+
+
+def _message(text: str, role: str = "user") -> TResponseInputItem:
+    return {"role": role, "content": text}  # type: ignore[return-value, misc]
+
+
+def _call(call_id: str) -> TResponseInputItem:
+    return {"type": "function_call", "call_id": call_id, "name": "f", "arguments": "{}"}
+
+
+def _output(call_id: str, output: str = "result") -> TResponseInputItem:
+    return {"type": "function_call_output", "call_id": call_id, "output": output}
+
+
+def _reasoning(id: str) -> TResponseInputItem:
+    return {"type": "reasoning", "id": id, "summary": []}
+
+
+def _context() -> RunContextWrapper[Any]:
+    return RunContextWrapper(context=None)
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_keeps_tool_calls_with_their_outputs():
+    task = _message("task")
+    items = [task, _call("a"), _call("b"), _output("a"), _output("b"), _message("more")]
+
+    # The task is kept, and calls are dropped together with their outputs
+    strategy = SlidingWindowStrategy(max_tokens=40, token_counter=_ten_tokens)
+    assert await strategy.apply(items, _context()) == [task, _call("b"), _output("b"), items[-1]]
+
+    strategy = SlidingWindowStrategy(max_tokens=30, token_counter=_ten_tokens)
+    trimmed = await strategy.apply(items, _context())
+    assert trimmed == [task, _message("more")]
+
+    # Inputs within the budget are returned as they are
+    assert await strategy.apply(trimmed, _context()) is trimmed
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_can_drop_the_first_message():
+    strategy = SlidingWindowStrategy(
+        max_tokens=20, keep_first_message=False, token_counter=_ten_tokens
+    )
+    items = [_message("a"), _message("b"), _message("c"), _message("d")]
+    assert await strategy.apply(items, _context()) == [_message("c"), _message("d")]
+
+
+@pytest.mark.asyncio
+async def test_pruning_drops_reasoning_then_tool_outputs_then_old_items():
+    def count(item: TResponseInputItem) -> int:
+        return 1 if item.get("output") == TRIMMED_TOOL_OUTPUT else 10
+
+    task = _message("task")
+    items = [
+        task,
+        _reasoning("r1"),
+        _call("a"),
+        _output("a"),
+        _reasoning("r2"),
+        _call("b"),
+        _output("b"),
+    ]
+
+    # Dropping the old reasoning item is enough
+    strategy = PruningStrategy(max_tokens=60, keep_recent_items=3, token_counter=count)
+    assert await strategy.apply(items, _context()) == [task, *items[2:]]
+
+    # Then old tool outputs are replaced
+    strategy = PruningStrategy(max_tokens=51, keep_recent_items=3, token_counter=count)
+    assert await strategy.apply(items, _context()) == [
+        task,
+        _call("a"),
+        _output("a", TRIMMED_TOOL_OUTPUT),
+        *items[4:],
+    ]
+    # The original items aren't changed
+    assert items[3] == _output("a")
+
+    # And finally the oldest items are dropped
+    strategy = PruningStrategy(max_tokens=40, keep_recent_items=3, token_counter=count)
+    assert await strategy.apply(items, _context()) == [task, *items[4:]]
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_reused_and_extended():
+    summarizer = FakeModel()
+    summarizer.add_multiple_turn_outputs(
+        [[get_text_message("first summary")], [get_text_message("second summary")]]
+    )
+    strategy = SummarizingStrategy(
+        max_tokens=50, model=summarizer, keep_recent_tokens=20, token_counter=_ten_tokens
+    )
+    context = _context()
+    items = [_message(str(i)) for i in range(6)]
+
+    trimmed = await strategy.apply(items, context)
+    assert trimmed[1:] == items[4:]
+    assert "first summary" in trimmed[0]["content"]  # type: ignore[typeddict-item]
+    assert "0" in summarizer.last_turn_args["input"]
+    assert len(summarizer.turn_outputs) == 1
+
+    # The next turn fits in the budget with the same summary, so the model isn't called again
+    items.append(_message("6"))
+    assert await strategy.apply(items, context) == [trimmed[0], *items[4:]]
+    assert len(summarizer.turn_outputs) == 1
+
+    # Once over the budget again, the previous summary is extended with the newer items
+    items.extend([_message("7"), _message("8")])
+    trimmed = await strategy.apply(items, context)
+    assert "second summary" in trimmed[0]["content"]  # type: ignore[typeddict-item]
+    assert trimmed[1:] == items[7:]
+    assert "first summary" in summarizer.last_turn_args["input"]
+    assert '"content": "0"' not in summarizer.last_turn_args["input"]
+
+
+@pytest.mark.asyncio
+async def test_summaries_of_the_same_history_are_found_without_hashing(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    hashed: list[int] = []
+
+    def counting_hash(value: Any) -> str:
+        hashed.append(len(value))
+        return canonical_hash(value)
+
+    monkeypatch.setattr("agents.context_strategy.canonical_hash", counting_hash)
+    summarizer = FakeModel()
+    summarizer.set_next_output([get_text_message("summary")])
+    strategy = SummarizingStrategy(
+        max_tokens=50, model=summarizer, keep_recent_tokens=20, token_counter=_ten_tokens
+    )
+    items = [_message(str(i)) for i in range(6)]
+    await strategy.apply(items, _context())
+    assert len(hashed) == 1
+
+    for i in range(6, 8):
+        items.append(_message(str(i)))
+        trimmed = await strategy.apply(items, _context())
+        assert "summary" in trimmed[0]["content"]  # type: ignore[typeddict-item]
+    assert len(hashed) == 1
+
+    # Equal items that are other objects, e.g. in another run, are matched by hash
+    copied: list[Any] = [dict(item) for item in items]
+    assert await strategy.apply(copied, _context()) == [trimmed[0], *copied[4:]]
+    assert len(hashed) == 2
+
+
+@pytest.mark.asyncio
+async def test_runner_applies_the_strategy_before_each_request():
+    model = FakeModel()
+
+    @function_tool
+    def search() -> str:
+        return "a long search result " * 50
+
+    agent = Agent(name="test", model=model, tools=[search])
+    model.add_multiple_turn_outputs(
+        [
+            [
+                ResponseFunctionToolCall(
+                    id=f"fc_{i}",
+                    call_id=f"call_{i}",
+                    type="function_call",
+                    name="search",
+                    arguments="{}",
+                )
+            ]
+            for i in range(8)
+        ]
+    )
+    model.set_next_output([get_text_message("done")])
+    strategy = SlidingWindowStrategy(max_tokens=1000)
+
+    result = await Runner.run(
+        agent, input="research", run_config=RunConfig(context_strategy=strategy)
+    )
+
+    assert result.final_output == "done"
+    # The run's items aren't trimmed, only the model input
+    assert len(result.to_input_list()) == 18
+    model_input = model.last_turn_args["input"]
+    assert model_input[0] == {"content": "research", "role": "user"}
+    assert strategy.count_tokens(model_input) <= 1000
+    assert strategy.metrics.requests == 9
+    assert strategy.metrics.trimmed_requests > 0
+    assert strategy.metrics.tokens_trimmed > 0
+    assert strategy.metrics.largest_input_tokens <= 1000
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import copy
+import json
+import pickle
+from typing import Any
+
+import pytest
+
+from agents import (
+    Agent,
+    GuardrailFunctionOutput,
+    HandoffInputData,
+    InputGuardrail,
+    RunContextWrapper,
+    Runner,
+    TResponseInputItem,
+    handoff,
+)
+from agents.util._frozen import FrozenDict, FrozenList, freeze, thaw
+
+from .fake_model import FakeModel
+from .test_responses import get_handoff_tool_call, get_text_input_item, get_text_message
+
+
+def test_freeze_shares_leaves_and_blocks_mutation():
+    image = "data:image/png;base64," + "A" * 1000
+    value = [{"role": "user", "content": [{"type": "input_image", "image_url": image}]}]
+    frozen = freeze(value)
+
+    assert frozen == value
+    assert isinstance(frozen, FrozenList)
+    assert isinstance(frozen[0], FrozenDict)
+    assert frozen[0]["content"][0]["image_url"] is image
+    assert freeze(frozen) is frozen
+
+    with pytest.raises(TypeError):
+        frozen.append({})
+    with pytest.raises(TypeError):
+        frozen[0]["role"] = "assistant"
+    with pytest.raises(TypeError):
+        frozen[0]["content"].pop()
+    with pytest.raises(TypeError):
+        frozen[0].update(role="assistant")
+
+    # The original is untouched, and still mutable
+    value[0]["role"] = "assistant"
+    assert frozen[0]["role"] == "user"
+
+
+def test_frozen_values_copy_to_plain_containers():
+    frozen = freeze([{"role": "user", "content": [{"type": "input_text", "text": "hi"}]}])
+
+    for copied in (copy.deepcopy(frozen), thaw(frozen), pickle.loads(pickle.dumps(frozen))):
+        assert copied == frozen
+        assert type(copied) is list
+        assert type(copied[0]) is dict
+        assert type(copied[0]["content"]) is list
+        copied[0]["role"] = "assistant"
+
+    assert type(copy.copy(frozen)) is list
+    assert json.loads(json.dumps(frozen)) == frozen
+
+
+@pytest.mark.asyncio
+async def test_guardrails_see_frozen_input_and_caller_input_is_isolated():
+    seen: list[Any] = []
+
+    def guardrail(
+        context: RunContextWrapper[Any], agent: Agent[Any], input: str | list[TResponseInputItem]
+    ) -> GuardrailFunctionOutput:
+        seen.append(input)
+        with pytest.raises(TypeError):
+            input.append(get_text_input_item("injected"))  # type: ignore[union-attr]
+        return GuardrailFunctionOutput(output_info=None, tripwire_triggered=False)
+
+    model = FakeModel()
+    model.set_next_output([get_text_message("done")])
+    agent = Agent(
+        name="test", model=model, input_guardrails=[InputGuardrail(guardrail_function=guardrail)]
+    )
+    caller_input: list[TResponseInputItem] = [get_text_input_item("hello")]
+
+    result = await Runner.run(agent, input=caller_input)
+
+    assert len(seen) == 1
+    assert seen[0] == [get_text_input_item("hello")]
+    assert model.last_turn_args["input"] == [get_text_input_item("hello")]
+
+    # The caller's list is neither frozen nor shared with the result
+    caller_input.append(get_text_input_item("later"))
+    assert result.input == [get_text_input_item("hello")]
+
+    # `to_input_list()` returns a list the caller can mutate freely
+    input_list = result.to_input_list()
+    input_list.append(get_text_input_item("next"))
+    input_list[0]["content"] = "changed"  # type: ignore
+    assert result.input == [get_text_input_item("hello")]
+
+
+@pytest.mark.asyncio
+async def test_streamed_run_is_isolated_from_caller_mutation():
+    model = FakeModel()
+    model.set_next_output([get_text_message("done")])
+    agent = Agent(name="test", model=model)
+    caller_input: list[TResponseInputItem] = [get_text_input_item("hello")]
+
+    result = Runner.run_streamed(agent, input=caller_input)
+    caller_input.append(get_text_input_item("later"))
+    async for _ in result.stream_events():
+        pass
+
+    assert result.input == [get_text_input_item("hello")]
+    assert len(result.to_input_list()) == 2
+
+
+@pytest.mark.asyncio
+async def test_handoff_filter_receives_frozen_history():
+    def mutating_filter(data: HandoffInputData) -> HandoffInputData:
+        with pytest.raises(TypeError):
+            data.input_history[0]["content"] = "changed"  # type: ignore
+        history = data.input_history
+        assert isinstance(history, tuple)
+        # Filters return new containers, which the runner freezes again
+        return HandoffInputData(
+            input_history=history + ({"content": "extra", "role": "user"},),
+            pre_handoff_items=data.pre_handoff_items,
+            new_items=(),
+        )
+
+    model = FakeModel()
+    agent_1 = Agent(name="agent_1", model=model)
+    agent_2 = Agent(
+        name="agent_2",
+        model=model,
+        handoffs=[handoff(agent=agent_1, input_filter=mutating_filter)],
+    )
+    model.add_multiple_turn_outputs([[get_handoff_tool_call(agent_1)], [get_text_message("last")]])
+
+    result = await Runner.run(agent_2, input=[get_text_input_item("hello")])
+
+    assert result.final_output == "last"
+    assert isinstance(result.input, FrozenList)
+    assert result.input == [get_text_input_item("hello"), {"content": "extra", "role": "user"}]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import inspect
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from agents import RunContextWrapper, function_tool
+from agents.function_schema import function_schema
+from agents.util import _schema_cache
+from agents.util._schema_cache import FunctionSchemaCache, schema_cache_key
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> Iterator[FunctionSchemaCache]:
+    cache = FunctionSchemaCache()
+    monkeypatch.setattr(_schema_cache, "_cache", cache)
+    yield cache
+
+
+def forecast(city: str, days: int = 3) -> str:
+    """Get the weather forecast.
+
+    Args:
+        city: The city to get the forecast for.
+        days: The number of days.
+    """
+    return f"{city}: {days}"
+
+
+def _fail(*args: Any, **kwargs: Any) -> Any:
+    raise AssertionError("the docstring was parsed again")
+
+
+def test_schemas_are_cached_in_memory(cache: FunctionSchemaCache, monkeypatch: pytest.MonkeyPatch):
+    first = function_schema(forecast)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    monkeypatch.setattr("agents.function_schema.generate_func_documentation", _fail)
+    second = function_schema(forecast)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second.params_json_schema == first.params_json_schema
+    assert (second.name, second.description) == ("forecast", "Get the weather forecast.")
+    assert second.params_pydantic_model.model_fields["city"].description == (
+        "The city to get the forecast for."
+    )
+    # Each schema gets its own copy
+    second.params_json_schema["properties"].clear()
+    assert function_schema(forecast).params_json_schema == first.params_json_schema
+
+    # The model of a cached schema still validates
+    args = second.params_pydantic_model.model_validate_json('{"city": "Paris"}')
+    assert second.to_call_args(args) == (["Paris", 3], {})
+    with pytest.raises(ValidationError):
+        second.params_pydantic_model.model_validate_json('{"days": "many"}')
+
+
+def test_options_are_part_of_the_key(cache: FunctionSchemaCache):
+    function_schema(forecast)
+    overridden = function_schema(forecast, description_override="Forecast.")
+    not_strict = function_schema(forecast, strict_json_schema=False)
+
+    assert cache.misses == 3
+    assert overridden.description == "Forecast."
+    assert not_strict.params_json_schema.get("additionalProperties") is None
+
+
+def test_closures_with_other_defaults_get_their_own_entries(cache: FunctionSchemaCache):
+    def make_tool(default_days: int) -> Any:
+        def tool(city: str, days: int = default_days) -> str:
+            return city
+
+        return tool
+
+    schemas = [function_schema(make_tool(days)) for days in (1, 2, 1)]
+
+    assert (cache.hits, cache.misses) == (1, 2)
+    defaults = [schema.params_json_schema["properties"]["days"]["default"] for schema in schemas]
+    assert defaults == [1, 2, 1]
+
+
+def test_the_key_changes_with_the_classes_of_parameters():
+    class Location(BaseModel):
+        city: str
+
+    def lookup(location: Location) -> str:
+        return location.city
+
+    key = schema_cache_key(lookup, inspect.signature(lookup), {"location": Location}, {})
+
+    class Location(BaseModel):  # type: ignore[no-redef]
+        city: str
+        country: str
+
+    assert key is not None
+    assert key != schema_cache_key(lookup, inspect.signature(lookup), {"location": Location}, {})
+    assert schema_cache_key(print, inspect.Signature(), {}, {}) is None
+
+
+def test_schemas_are_cached_on_disk(
+    tmp_path: Path, cache: FunctionSchemaCache, monkeypatch: pytest.MonkeyPatch
+):
+    disk_cache = FunctionSchemaCache(tmp_path)
+    monkeypatch.setattr(_schema_cache, "_cache", disk_cache)
+    first = function_schema(forecast)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # A new process starts with an empty memory cache, and reads the entry from disk
+    monkeypatch.setattr(_schema_cache, "_cache", FunctionSchemaCache(tmp_path))
+    monkeypatch.setattr("agents.function_schema.generate_func_documentation", _fail)
+    second = function_schema(forecast)
+
+    assert _schema_cache.get_schema_cache().hits == 1
+    assert second.params_json_schema == first.params_json_schema
+    assert second.description == first.description
+
+
+def test_unreadable_entries_are_ignored(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(_schema_cache, "_cache", FunctionSchemaCache(tmp_path))
+    expected = function_schema(forecast).params_json_schema
+    (entry,) = tmp_path.glob("*.json")
+    entry.write_text("{not json")
+
+    monkeypatch.setattr(_schema_cache, "_cache", FunctionSchemaCache(tmp_path))
+    assert function_schema(forecast).params_json_schema == expected
+    assert json.loads(entry.read_text())["params_json_schema"] == expected
+
+
+@pytest.mark.asyncio
+async def test_tools_with_cached_schemas_can_be_called(cache: FunctionSchemaCache):
+    def make_tool() -> Any:
+        @function_tool
+        def greet(context: RunContextWrapper[str], name: str) -> str:
+            """Greet someone."""
+            return f"{context.context}, {name}"
+
+        return greet
+
+    assert make_tool().params_json_schema
+    tool = make_tool()
+    assert tool.params_json_schema
+
+    assert cache.hits == 1
+    assert tool.description == "Greet someone."
+    assert await tool.on_invoke_tool(RunContextWrapper("Hello"), '{"name": "Ada"}') == "Hello, Ada"
@@ -1,11 +1,22 @@
+import copy
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import pytest
 from pydantic import BaseModel
 from typing_extensions import TypedDict
 
-from agents import FunctionTool, ModelBehaviorError, RunContextWrapper, function_tool
+from agents import (
+    Agent,
+    FunctionTool,
+    ModelBehaviorError,
+    RunContextWrapper,
+    UserError,
+    function_tool,
+)
+from agents.function_schema import function_schema
 from agents.tool import default_tool_error_function
 
 
@@ -255,3 +266,79 @@ async def test_async_custom_error_function_works():
 
     result = await tool.on_invoke_tool(ctx, '{"a": 1, "b": 2}')
     assert result == "error_ValueError"
+
+
+def documented_function(city: str) -> str:
+    """Get the weather.
+
+    Args:
+        city: The city.
+    """
+    return city
+
+
+def test_schema_is_created_when_first_read(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    def counting_function_schema(*args: Any, **kwargs: Any) -> Any:
+        calls.append(kwargs["func"])
+        return function_schema(*args, **kwargs)
+
+    monkeypatch.setattr("agents.tool.function_schema", counting_function_schema)
+    tool = function_tool(documented_function, name_override="weather")
+    assert tool.name == "weather"
+    assert calls == []
+
+    assert tool.description == "Get the weather."
+    assert tool.params_json_schema["properties"]["city"]["description"] == "The city."
+    assert calls == [documented_function]
+
+    # The fields can still be replaced
+    tool.params_json_schema = {"type": "object"}
+    assert tool.params_json_schema == {"type": "object"}
+    assert len(calls) == 1
+
+
+def test_concurrent_first_reads_create_the_schema_once(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    def slow_function_schema(*args: Any, **kwargs: Any) -> Any:
+        calls.append(kwargs["func"])
+        time.sleep(0.05)
+        return function_schema(*args, **kwargs)
+
+    monkeypatch.setattr("agents.tool.function_schema", slow_function_schema)
+    tool = function_tool(documented_function)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        schemas = list(executor.map(lambda _: tool.params_json_schema, range(8)))
+
+    assert len(calls) == 1
+    assert all(schema is schemas[0] for schema in schemas)
+
+
+def context_in_the_wrong_place(city: str, ctx: RunContextWrapper[Any]) -> str:
+    return city
+
+
+@pytest.mark.asyncio
+async def test_invalid_signatures_are_raised_when_the_tool_is_used():
+    tool = function_tool(context_in_the_wrong_place)
+
+    with pytest.raises(UserError):
+        tool.params_json_schema  # noqa: B018
+    # Even with a failure error function, since the model can't fix the tool
+    with pytest.raises(UserError):
+        await tool.on_invoke_tool(RunContextWrapper(None), '{"city": "Paris"}')
+
+
+def test_tools_can_be_deep_copied_before_their_schema_is_created():
+    tool = function_tool(documented_function)
+    copied_agent = copy.deepcopy(Agent(name="test", tools=[tool]))
+    copied = copy.deepcopy(tool)
+
+    assert copied.description == "Get the weather."
+    assert copied.params_json_schema == tool.params_json_schema
+    assert copied.params_json_schema is not tool.params_json_schema
+    copied_tool = copied_agent.tools[0]
+    assert isinstance(copied_tool, FunctionTool)
+    assert copied_tool.params_json_schema == tool.params_json_schema
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator
+from typing import Any, Callable
+
+import pytest
+from openai.types.responses import ResponseCompletedEvent, ResponseTextDeltaEvent
+
+from agents import Agent, HedgedModel, ModelSettings, ModelTracing, Runner, trace
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.hedging import LatencyTracker
+from agents.models.interface import Model
+from agents.usage import Usage
+
+from .fake_model import FakeModel, get_response_obj
+from .test_responses import get_text_message
+from .testing_processor import fetch_ordered_spans
+
+
+class LatencyModel(Model):
+    """A fake model whose requests take a latency drawn from an injectable distribution."""
+
+    def __init__(self, name: str, latency: Callable[[], float]) -> None:
+        self.name = name
+        self.latency = latency
+        self.requests = 0
+        self.cancelled = 0
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.requests += 1
+        try:
+            await asyncio.sleep(self.latency())
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return ModelResponse(
+            output=[get_text_message(self.name)],
+            usage=Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15),
+            referenceable_id=None,
+        )
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        self.requests += 1
+        try:
+            await asyncio.sleep(self.latency())
+            yield ResponseTextDeltaEvent(
+                content_index=0,
+                delta=self.name,
+                item_id="1",
+                output_index=0,
+                type="response.output_text.delta",
+            )
+            yield ResponseCompletedEvent(
+                type="response.completed", response=get_response_obj([get_text_message(self.name)])
+            )
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled += 1
+            raise
+
+
+async def _get(model: Model) -> ModelResponse:
+    return await model.get_response(
+        "instructions", "hello", ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+
+
+async def _stream(model: Model) -> list[TResponseStreamEvent]:
+    return [
+        event
+        async for event in model.stream_response(
+            "instructions", "hello", ModelSettings(), [], None, [], ModelTracing.DISABLED
+        )
+    ]
+
+
+def test_latency_percentiles():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95) is None
+    for latency in range(1, 101):
+        tracker.record(latency / 100)
+    assert tracker.percentile(0.5) == 0.5
+    assert tracker.percentile(0.95) == 0.95
+    assert tracker.percentile(1.0) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    primary = LatencyModel("primary", lambda: 0.0)
+    hedge = LatencyModel("hedge", lambda: 0.0)
+    model = HedgedModel(primary, hedge, initial_delay=0.5)
+
+    response = await _get(model)
+
+    assert response.output[0].content[0].text == "primary"  # type: ignore[union-attr]
+    assert (hedge.requests, model.hedges_sent) == (0, 0)
+    assert response.usage.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    primary = LatencyModel("primary", lambda: 5.0)
+    hedge = LatencyModel("hedge", lambda: 0.01)
+    model = HedgedModel(primary, hedge, initial_delay=0.05)
+
+    started = time.monotonic()
+    response = await _get(model)
+
+    assert time.monotonic() - started < 1
+    assert response.output[0].content[0].text == "hedge"  # type: ignore[union-attr]
+    assert primary.cancelled == 1
+    assert (model.hedges_sent, model.hedges_won) == (1, 1)
+    # The hedge's usage, plus the cancelled primary request with its estimated input tokens
+    assert response.usage.requests == 2
+    assert response.usage.input_tokens > 10
+    assert response.usage.output_tokens == 5
+
+
+@pytest.mark.asyncio
+async def test_hedge_answers_when_the_primary_fails():
+    # The primary fails after the hedge was sent, so the slower hedge answers
+    class FailingModel(LatencyModel):
+        async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+            await super().get_response(*args, **kwargs)
+            raise RuntimeError("primary failed")
+
+    primary = FailingModel("primary", lambda: 0.1)
+    hedge = LatencyModel("hedge", lambda: 0.2)
+    model = HedgedModel(primary, hedge, initial_delay=0.05)
+
+    response = await _get(model)
+    assert response.output[0].content[0].text == "hedge"  # type: ignore[union-attr]
+    assert response.usage.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_the_latency_percentile():
+    # Most requests are fast, but one in ten is very slow
+    latencies = itertools.cycle([0.01] * 9 + [5.0])
+    primary = LatencyModel("primary", lambda: next(latencies))
+    model = HedgedModel(primary, initial_delay=0.05, percentile=0.8, min_samples=5)
+
+    started = time.monotonic()
+    for _ in range(20):
+        await _get(model)
+
+    assert time.monotonic() - started < 3
+    assert model.hedge_delay(model.response_latencies) < 0.05
+    assert model.hedges_sent >= 1
+    assert model.hedges_won == model.hedges_sent
+
+
+@pytest.mark.asyncio
+async def test_streams_are_hedged_until_the_first_token():
+    primary = LatencyModel("primary", lambda: 5.0)
+    hedge = LatencyModel("hedge", lambda: 0.01)
+    model = HedgedModel(primary, hedge, initial_delay=0.05)
+
+    events = await _stream(model)
+
+    deltas = [event.delta for event in events if isinstance(event, ResponseTextDeltaEvent)]
+    assert deltas == ["hedge"]
+    assert primary.cancelled == 1
+    completed = events[-1]
+    assert isinstance(completed, ResponseCompletedEvent)
+    # The cancelled primary request's estimated input tokens are added to the usage
+    assert completed.response.usage is not None
+    assert completed.response.usage.input_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_hedged_model_in_a_run():
+    primary = LatencyModel("primary", lambda: 5.0)
+    hedge = LatencyModel("hedge", lambda: 0.01)
+    agent = Agent(name="test", model=HedgedModel(primary, hedge, initial_delay=0.05))
+
+    result = await Runner.run(agent, input="hi")
+    assert result.final_output == "hedge"
+    assert result.raw_responses[0].usage.requests == 2
+
+    streamed = Runner.run_streamed(agent, input="hi")
+    async for _ in streamed.stream_events():
+        pass
+    assert streamed.final_output == "hedge"
+
+
+@pytest.mark.asyncio
+async def test_hedged_streams_of_models_with_spans():
+    model = FakeModel(tracing_enabled=True)
+    model.set_next_output([get_text_message("first")])
+    agent = Agent(name="test", model=HedgedModel(model, initial_delay=5))
+
+    with trace("test"):
+        streamed = Runner.run_streamed(agent, input="hi")
+        async for _ in streamed.stream_events():
+            pass
+
+    assert streamed.final_output == "first"
+    generation_spans = [
+        span for span in fetch_ordered_spans() if span.span_data.type == "generation"
+    ]
+    assert len(generation_spans) == 1
+    assert generation_spans[0].ended_at is not None
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Annotated, Any
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from agents import AgentOutputSchema, ModelBehaviorError, RunContextWrapper, function_tool
+from agents.util import _json
+
+
+class Point(BaseModel):
+    x: int
+    y: int = 0
+
+
+def test_loads_matches_the_standard_library():
+    for document in ['{"a": [1, 2.5, "b", null, true]}', "[]", '"text"', str(2**70)]:
+        assert _json.loads(document) == json.loads(document)
+    assert math.isnan(_json.loads("NaN"))
+    with pytest.raises(ValueError):
+        _json.loads("{not json")
+
+
+def test_loads_uses_orjson_when_installed(monkeypatch: pytest.MonkeyPatch):
+    orjson = pytest.importorskip("orjson")
+    monkeypatch.setattr(json, "loads", None)
+    assert _json.loads('{"a": 1}') == orjson.loads('{"a": 1}')
+
+
+def test_validate_model_json_tells_invalid_json_from_invalid_values():
+    assert _json.validate_model_json(Point, '{"x": 1}') == Point(x=1)
+
+    with pytest.raises(ValidationError) as invalid_json:
+        _json.validate_model_json(Point, '{"x": 1')
+    assert _json.is_invalid_json(invalid_json.value)
+
+    with pytest.raises(ValidationError) as invalid_value:
+        _json.validate_model_json(Point, '{"x": "one"}')
+    assert not _json.is_invalid_json(invalid_value.value)
+
+
+def test_type_adapters_are_cached():
+    assert _json.type_adapter(list[Point]) is _json.type_adapter(list[Point])
+    assert _json.type_adapter(int, key="a") is not _json.type_adapter(int, key="b")
+
+    unhashable = Annotated[int, {"unhashable": True}]
+    assert _json.type_adapter(unhashable) is not _json.type_adapter(unhashable)
+    assert _json.type_adapter(unhashable).validate_json("3") == 3
+
+    schemas = [AgentOutputSchema(list[Point]) for _ in range(2)]
+    assert schemas[0]._type_adapter is schemas[1]._type_adapter
+    assert schemas[1].validate_json('{"response": [{"x": 1}]}') == [Point(x=1)]
+
+
+@pytest.mark.asyncio
+async def test_tool_arguments_are_validated_from_the_json_string():
+    @function_tool(failure_error_function=None)
+    def move(point: Point, steps: int = 1) -> str:
+        return f"{point.x},{point.y} x{steps}"
+
+    ctx = RunContextWrapper[Any](None)
+    assert await move.on_invoke_tool(ctx, '{"point": {"x": 2}}') == "2,0 x1"
+
+    with pytest.raises(ModelBehaviorError, match=r"Invalid JSON input for tool move: \{bad"):
+        await move.on_invoke_tool(ctx, "{bad")
+    with pytest.raises(ModelBehaviorError, match="validation error"):
+        await move.on_invoke_tool(ctx, '{"point": {"x": "two"}}')
+
+
+@pytest.mark.asyncio
+async def test_tools_without_arguments_accept_empty_input():
+    @function_tool
+    def ping() -> str:
+        return "pong"
+
+    ctx = RunContextWrapper[Any](None)
+    assert await ping.on_invoke_tool(ctx, "") == "pong"
+    assert await ping.on_invoke_tool(ctx, "{}") == "pong"
+
+
+def test_invalid_structured_output_raises_model_behavior_error():
+    with pytest.raises(ModelBehaviorError):
+        AgentOutputSchema(Point).validate_json('{"x": "one"}')
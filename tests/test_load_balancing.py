@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+
+from agents import Agent, Endpoint, LoadBalancedProvider, RunConfig, Runner
+
+
+class StubServer:
+    """A local OpenAI-compatible server for the Responses API that answers with the name of the
+    server, after a delay. It can be made to fail with a status code.
+    """
+
+    def __init__(self, name: str, delay: float = 0.0) -> None:
+        self.name = name
+        self.delay = delay
+        self.status = 200
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                server.requests += 1
+                time.sleep(server.delay)
+                if server.status != 200:
+                    self._send(server.status, "application/json", b'{"error": {"message": "x"}}')
+                    return
+                response = server.response(body["model"])
+                if body.get("stream"):
+                    event = {"type": "response.completed", "response": response}
+                    data = f"event: response.completed\ndata: {json.dumps(event)}\n\n"
+                    self._send(200, "text/event-stream", data.encode())
+                else:
+                    self._send(200, "application/json", json.dumps(response).encode())
+
+            def _send(self, status: int, content_type: str, data: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.http_server.server_address[1]}/v1"
+        threading.Thread(
+            target=self.http_server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+
+    def response(self, model: str) -> dict[str, Any]:
+        return {
+            "id": f"resp_{self.requests}",
+            "object": "response",
+            "created_at": 0,
+            "model": model,
+            "output": [
+                {
+                    "type": "message",
+                    "id": "msg_1",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": self.name, "annotations": []}],
+                }
+            ],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+
+    def close(self) -> None:
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+
+@pytest.fixture
+def servers() -> Iterator[list[StubServer]]:
+    started = [StubServer(f"server-{i}", delay=0.02) for i in range(3)]
+    try:
+        yield started
+    finally:
+        for server in started:
+            server.close()
+
+
+def _provider(servers: list[StubServer], **kwargs: Any) -> LoadBalancedProvider:
+    endpoints = [Endpoint(base_url=server.base_url, api_key="fake") for server in servers]
+    return LoadBalancedProvider(endpoints, use_responses=True, **kwargs)
+
+
+async def _run_many(provider: LoadBalancedProvider, count: int) -> list[str]:
+    agent = Agent(name="test", model="test-model")
+    run_config = RunConfig(model_provider=provider, tracing_disabled=True)
+    results = await asyncio.gather(
+        *(Runner.run(agent, input="hi", run_config=run_config) for _ in range(count))
+    )
+    return [result.final_output for result in results]
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_load_is_spread_evenly(servers: list[StubServer]):
+    provider = _provider(servers)
+
+    outputs = await _run_many(provider, 30)
+
+    assert [server.requests for server in servers] == [10, 10, 10]
+    assert sorted(set(outputs)) == ["server-0", "server-1", "server-2"]
+    assert all(endpoint.outstanding == 0 for endpoint in provider.endpoints)
+
+    # Sequential requests take turns too
+    await _run_many(provider, 1)
+    await _run_many(provider, 1)
+    await _run_many(provider, 1)
+    assert [server.requests for server in servers] == [11, 11, 11]
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_failed_requests_fail_over_and_endpoints_are_ejected(servers: list[StubServer]):
+    servers[0].status = 503
+    provider = _provider(servers, failure_threshold=2, ejection_time=60)
+
+    outputs = await _run_many(provider, 12)
+
+    assert "server-0" not in outputs
+    assert len(outputs) == 12
+    assert provider.endpoints[0].ejected
+    failed_requests = servers[0].requests
+
+    # Once ejected, the failing endpoint gets no more requests
+    outputs = await _run_many(provider, 12)
+    assert "server-0" not in outputs
+    assert servers[0].requests == failed_requests
+    assert servers[1].requests + servers[2].requests == 24
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_unreachable_endpoints_fail_over(servers: list[StubServer]):
+    servers[1].close()
+    provider = _provider(servers, failure_threshold=1)
+
+    outputs = await _run_many(provider, 6)
+
+    assert set(outputs) == {"server-0", "server-2"}
+    assert provider.endpoints[1].ejected
+    failures = provider.endpoints[1].failures
+    await _run_many(provider, 6)
+    assert provider.endpoints[1].failures == failures
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_ewma_prefers_faster_endpoints(servers: list[StubServer]):
+    servers[0].delay = 0.2
+    provider = _provider(servers, strategy="ewma")
+
+    for _ in range(10):
+        await _run_many(provider, 1)
+
+    # The slow endpoint gets its first request, and no more once it's measured
+    assert servers[0].requests == 1
+    latency = provider.endpoints[0].latency_ewma
+    assert latency is not None and latency >= 0.2
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_streamed_requests_fail_over_before_their_first_event(servers: list[StubServer]):
+    servers[0].status = 500
+    provider = _provider(servers)
+    agent = Agent(name="test", model="test-model")
+
+    result = Runner.run_streamed(
+        agent, input="hi", run_config=RunConfig(model_provider=provider, tracing_disabled=True)
+    )
+    async for _ in result.stream_events():
+        pass
+
+    assert result.final_output in ("server-1", "server-2")
+    assert servers[0].requests == 1
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import time
+
+import httpx
+import openai
+import pytest
+
+from agents import (
+    Agent,
+    CircuitBreaker,
+    CircuitOpenError,
+    ModelSettings,
+    ModelTracing,
+    RetryingModel,
+    RetryPolicy,
+    RunConfig,
+    Runner,
+)
+from agents.models.interface import Model, ModelProvider
+from agents.models.retry import retry_after_seconds
+from agents.tracing.span_data import CustomSpanData
+
+from .fake_model import FakeModel
+from .test_responses import get_text_message
+from .testing_processor import fetch_ordered_spans
+
+
+def _status_error(status_code: int, headers: dict[str, str] | None = None) -> openai.APIStatusError:
+    response = httpx.Response(
+        status_code,
+        headers=headers,
+        request=httpx.Request("POST", "https://api.example.com/v1/responses"),
+    )
+    return openai.APIStatusError("error", response=response, body=None)
+
+
+def _policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(**{"initial_backoff": 0.01, "jitter": 0.0, **kwargs})
+
+
+async def _get(model: Model) -> str:
+    response = await model.get_response(
+        None, "hello", ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+    return response.output[0].content[0].text  # type: ignore[union-attr]
+
+
+class StaticProvider(ModelProvider):
+    def __init__(self, models: dict[str, Model]) -> None:
+        self.models = models
+
+    def get_model(self, model_name: str | None) -> Model:
+        assert model_name is not None
+        return self.models[model_name]
+
+
+def test_backoff_is_exponential_capped_and_jittered():
+    policy = RetryPolicy(initial_backoff=1, max_backoff=5, jitter=0)
+    assert [policy.backoff(retry) for retry in range(1, 5)] == [1, 2, 4, 5]
+
+    jittered = RetryPolicy(initial_backoff=1, jitter=1)
+    backoffs = {jittered.backoff(3) for _ in range(20)}
+    assert all(0 <= backoff <= 4 for backoff in backoffs if backoff is not None)
+    assert len(backoffs) > 1
+
+
+def test_retry_after_headers_are_honored():
+    assert retry_after_seconds(_status_error(429, {"retry-after": "3"})) == 3
+    assert retry_after_seconds(_status_error(429, {"retry-after-ms": "250"})) == 0.25
+    retry_at = email.utils.formatdate(time.time() + 10, usegmt=True)
+    retry_after = retry_after_seconds(_status_error(503, {"retry-after": retry_at}))
+    assert retry_after is not None and 8 < retry_after <= 10
+    assert retry_after_seconds(_status_error(429)) is None
+
+    policy = _policy(max_retry_after=5)
+    assert policy.backoff(1, _status_error(429, {"retry-after": "2"})) == 2
+    # The server asked to wait too long, so the call isn't retried
+    assert policy.backoff(1, _status_error(429, {"retry-after": "20"})) is None
+
+
+def test_only_transient_errors_are_retried():
+    policy = RetryPolicy()
+    assert policy.is_retryable(_status_error(429))
+    assert policy.is_retryable(_status_error(503))
+    assert not policy.is_retryable(_status_error(400))
+    assert not policy.is_retryable(ValueError())
+    request = httpx.Request("POST", "https://api.example.com")
+    assert policy.is_retryable(openai.APIConnectionError(request=request))
+    assert RetryPolicy(retry_on=lambda e: isinstance(e, ValueError)).is_retryable(ValueError())
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    model = FakeModel()
+    model.add_multiple_turn_outputs(
+        [_status_error(500), _status_error(429), [get_text_message("done")]]
+    )
+    retrying = RetryingModel(model, _policy())
+
+    assert await _get(retrying) == "done"
+    assert retrying.retries == 2
+    assert retrying.circuit_breaker is not None
+    assert retrying.circuit_breaker.consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_when_not_retryable_or_retries_are_exhausted():
+    model = FakeModel()
+    model.set_next_output(_status_error(400))
+    retrying = RetryingModel(model, _policy())
+    with pytest.raises(openai.APIStatusError):
+        await _get(retrying)
+    assert retrying.retries == 0
+
+    model.add_multiple_turn_outputs([_status_error(503)] * 3)
+    retrying = RetryingModel(model, _policy(max_retries=2))
+    with pytest.raises(openai.APIStatusError):
+        await _get(retrying)
+    assert retrying.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast_and_recovers():
+    model = FakeModel()
+    model.add_multiple_turn_outputs([_status_error(503)] * 3)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    retrying = RetryingModel(model, _policy(), circuit_breaker=breaker)
+
+    with pytest.raises(openai.APIStatusError):
+        await _get(retrying)
+    assert breaker.opened_at is not None
+    # The breaker opened before the retries were exhausted
+    assert retrying.retries == 2
+
+    model.set_next_output([get_text_message("not sent")])
+    with pytest.raises(CircuitOpenError):
+        await _get(retrying)
+    assert retrying.rejected == 1
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert await _get(retrying) == "not sent"
+    assert breaker.opened_at is None
+
+
+class HangingModel(FakeModel):
+    async def get_response(self, *args, **kwargs):
+        await asyncio.sleep(10)
+        raise AssertionError("not reached")
+
+    async def stream_response(self, *args, **kwargs):
+        await asyncio.sleep(10)
+        yield  # pragma: no cover
+
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_calls_release_the_half_open_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    retrying = RetryingModel(HangingModel(), _policy(), circuit_breaker=breaker)
+
+    async def stream() -> None:
+        async for _ in retrying.stream_response(
+            None, "hello", ModelSettings(), [], None, [], ModelTracing.DISABLED
+        ):
+            pass
+
+    for call in (lambda: _get(retrying), stream):
+        breaker.opened_at = time.monotonic() - 1
+        assert breaker.state == "half_open"
+        trial = asyncio.create_task(call())
+        await asyncio.sleep(0.01)
+        # Only one trial call is let through while it's in flight
+        with pytest.raises(CircuitOpenError):
+            await _get(retrying)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # Cancelling the trial is neither a success nor a failure
+        assert breaker.state == "half_open"
+        assert breaker.allow_request()
+        breaker.release_trial()
+
+
+@pytest.mark.asyncio
+async def test_fallback_model_is_used_when_the_circuit_is_open():
+    model = FakeModel()
+    model.add_multiple_turn_outputs([_status_error(503)] * 2)
+    fallback = FakeModel()
+    fallback.add_multiple_turn_outputs([[get_text_message("fallback")]] * 2)
+    breaker = CircuitBreaker(failure_threshold=2)
+    retrying = RetryingModel(model, _policy(), circuit_breaker=breaker, fallback=fallback)
+
+    assert await _get(retrying) == "fallback"
+    assert await _get(retrying) == "fallback"
+    assert retrying.fallbacks == 2
+    assert model.turn_outputs == []
+
+
+@pytest.mark.asyncio
+async def test_streams_are_retried_before_their_first_event():
+    model = FakeModel()
+    model.add_multiple_turn_outputs([_status_error(502), [get_text_message("streamed")]])
+    agent = Agent(name="test", model=model)
+
+    result = Runner.run_streamed(agent, input="hi", run_config=RunConfig(retry_policy=_policy()))
+    async for _ in result.stream_events():
+        pass
+    assert result.final_output == "streamed"
+
+
+@pytest.mark.asyncio
+async def test_run_config_retries_and_traces_the_backoff():
+    model = FakeModel()
+    model.add_multiple_turn_outputs([_status_error(429), [get_text_message("done")]])
+    agent = Agent(name="test", model=model)
+
+    result = await Runner.run(agent, input="hi", run_config=RunConfig(retry_policy=_policy()))
+
+    assert result.final_output == "done"
+    retry_spans = [
+        span
+        for span in fetch_ordered_spans()
+        if isinstance(span.span_data, CustomSpanData) and span.span_data.name == "model_retry"
+    ]
+    assert len(retry_spans) == 1
+    data = retry_spans[0].span_data.data
+    assert data["attempt"] == 1
+    assert data["status_code"] == 429
+    assert data["backoff"] == pytest.approx(0.01)
+
+
+@pytest.mark.asyncio
+async def test_circuit_breakers_are_kept_per_model_across_runs():
+    primary = FakeModel()
+    backup = FakeModel()
+    provider = StaticProvider({"primary": primary, "backup": backup})
+    policy = _policy(max_retries=0, failure_threshold=2, fallback_model="backup")
+    run_config = RunConfig(model="primary", model_provider=provider, retry_policy=policy)
+    agent = Agent(name="test")
+
+    primary.add_multiple_turn_outputs([_status_error(500), _status_error(500)])
+    backup.add_multiple_turn_outputs([[get_text_message("backup")]] * 3)
+    for _ in range(3):
+        result = await Runner.run(agent, input="hi", run_config=run_config)
+        assert result.final_output == "backup"
+
+    breaker = policy.circuit_breaker("primary")
+    assert breaker is not None and breaker.state == "open"
+    assert backup.turn_outputs == []
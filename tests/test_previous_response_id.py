@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+from openai import AsyncOpenAI
+
+from agents import (
+    Agent,
+    OpenAIResponsesModel,
+    RunConfig,
+    Runner,
+    function_tool,
+    handoff,
+)
+from agents.extensions.handoff_filters import remove_all_tools
+
+
+class ResponsesServer:
+    """A local stand-in for the Responses API. It stores every response, rebuilds the full
+    conversation of requests that continue from a previous response, and returns scripted outputs.
+    """
+
+    def __init__(self) -> None:
+        self.outputs: list[list[dict[str, Any]]] = []
+        self.requests: list[dict[str, Any]] = []
+        self.request_bytes: list[int] = []
+        self.conversations: list[list[dict[str, Any]]] = []
+        self.stored: dict[str, list[dict[str, Any]]] = {}
+
+    def handle(self, body: bytes) -> tuple[int, dict[str, Any]]:
+        request = json.loads(body)
+        previous_id = request.get("previous_response_id")
+        if previous_id is not None and previous_id not in self.stored:
+            error = {
+                "message": f"Previous response with id '{previous_id}' not found.",
+                "type": "invalid_request_error",
+                "param": "previous_response_id",
+                "code": "previous_response_not_found",
+            }
+            return 400, {"error": error}
+
+        self.requests.append(request)
+        self.request_bytes.append(len(body))
+        conversation = (self.stored[previous_id] if previous_id else []) + request["input"]
+        self.conversations.append(conversation)
+
+        output = self.outputs.pop(0)
+        response_id = f"resp_{len(self.requests)}"
+        self.stored[response_id] = conversation + output
+        return 200, {
+            "id": response_id,
+            "object": "response",
+            "created_at": 0,
+            "model": request["model"],
+            "output": output,
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+        }
+
+
+def _function_call(name: str, call_id: str) -> dict[str, Any]:
+    return {
+        "type": "function_call",
+        "id": f"fc_{call_id}",
+        "call_id": call_id,
+        "name": name,
+        "arguments": "{}",
+        "status": "completed",
+    }
+
+
+def _message(text: str) -> dict[str, Any]:
+    return {
+        "type": "message",
+        "id": "msg_1",
+        "role": "assistant",
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+
+
+@pytest.fixture
+def server() -> Iterator[tuple[ResponsesServer, str]]:
+    state = ResponsesServer()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            status, payload = state.handle(body)
+            if payload.get("object") == "response" and json.loads(body).get("stream"):
+                data = (
+                    f"event: response.completed\ndata: "
+                    f"{json.dumps({'type': 'response.completed', 'response': payload})}\n\n"
+                ).encode()
+                content_type = "text/event-stream"
+            else:
+                data = json.dumps(payload).encode()
+                content_type = "application/json"
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield state, f"http://127.0.0.1:{http_server.server_address[1]}/v1"
+    finally:
+        http_server.shutdown()
+        http_server.server_close()
+
+
+def _model(base_url: str) -> OpenAIResponsesModel:
+    client = AsyncOpenAI(base_url=base_url, api_key="fake", max_retries=0)
+    return OpenAIResponsesModel(model="test-model", openai_client=client)
+
+
+def _tool_agent(base_url: str) -> Agent:
+    @function_tool
+    def lookup() -> str:
+        return "a fairly long tool result " * 20
+
+    return Agent(name="test", instructions="Be helpful.", model=_model(base_url), tools=[lookup])
+
+
+def _script_tool_turns(state: ResponsesServer, turns: int) -> None:
+    state.outputs = [[_function_call("lookup", f"call_{i}")] for i in range(turns)]
+    state.outputs.append([_message("done")])
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_only_new_items_are_sent(server: tuple[ResponsesServer, str]):
+    state, base_url = server
+    agent = _tool_agent(base_url)
+
+    _script_tool_turns(state, 8)
+    await Runner.run(agent, input="start")
+    full_bytes = sum(state.request_bytes)
+    full_conversations = state.conversations
+
+    state.requests, state.request_bytes, state.conversations = [], [], []
+    _script_tool_turns(state, 8)
+    result = await Runner.run(
+        agent, input="start", run_config=RunConfig(use_previous_response_id=True)
+    )
+
+    assert result.final_output == "done"
+    previous_ids = [r.get("previous_response_id") for r in state.requests]
+    assert previous_ids == [None] + [f"resp_{i}" for i in range(1, 9)]
+    # Every request after the first only sends the tool output of the previous turn
+    assert all(len(r["input"]) == 1 for r in state.requests[1:])
+    # The server sees the same conversation as when the full history is sent
+    assert state.conversations == full_conversations
+    assert sum(state.request_bytes) < full_bytes * 0.6
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_full_history_is_sent_if_the_previous_response_is_missing(
+    server: tuple[ResponsesServer, str],
+):
+    state, base_url = server
+    agent = _tool_agent(base_url)
+    _script_tool_turns(state, 2)
+
+    original_handle = state.handle
+
+    def forgetful_handle(body: bytes) -> tuple[int, dict[str, Any]]:
+        # The server loses the first response, e.g. because it expired
+        state.stored.pop("resp_1", None)
+        return original_handle(body)
+
+    state.handle = forgetful_handle  # type: ignore[method-assign]
+    result = await Runner.run(
+        agent, input="start", run_config=RunConfig(use_previous_response_id=True)
+    )
+
+    assert result.final_output == "done"
+    second, third = state.requests[1], state.requests[2]
+    assert "previous_response_id" not in second
+    assert len(second["input"]) == 3
+    # Later turns continue from the response created by the retry
+    assert third["previous_response_id"] == "resp_2"
+    assert len(third["input"]) == 1
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_full_history_is_sent_after_a_handoff_input_filter(
+    server: tuple[ResponsesServer, str],
+):
+    state, base_url = server
+    model = _model(base_url)
+    specialist = Agent(name="specialist", model=model)
+    triage = Agent(
+        name="triage",
+        model=model,
+        handoffs=[handoff(specialist, input_filter=remove_all_tools)],
+    )
+    state.outputs = [
+        [_message("let me transfer you"), _function_call("transfer_to_specialist", "call_1")],
+        [_message("done")],
+    ]
+
+    result = await Runner.run(
+        triage, input="start", run_config=RunConfig(use_previous_response_id=True)
+    )
+
+    assert result.final_output == "done"
+    assert "previous_response_id" not in state.requests[1]
+    assert [item.get("type", "message") for item in state.requests[1]["input"]] == [
+        "message",
+        "message",
+    ]
+
+
+@pytest.mark.allow_call_model_methods
+@pytest.mark.asyncio
+async def test_streamed_runs_send_only_new_items(server: tuple[ResponsesServer, str]):
+    state, base_url = server
+    agent = _tool_agent(base_url)
+    _script_tool_turns(state, 2)
+
+    result = Runner.run_streamed(
+        agent, input="start", run_config=RunConfig(use_previous_response_id=True)
+    )
+    async for _ in result.stream_events():
+        pass
+
+    assert result.final_output == "done"
+    assert [r.get("previous_response_id") for r in state.requests] == [None, "resp_1", "resp_2"]
+    assert [len(r["input"]) for r in state.requests] == [1, 1, 1]
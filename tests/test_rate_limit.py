@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import httpx
+import openai
+import pytest
+
+from agents import (
+    Agent,
+    ModelSettings,
+    ModelTracing,
+    RateLimitedModel,
+    RateLimitedModelProvider,
+    RateLimiter,
+    RunConfig,
+    Runner,
+)
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.models.rate_limit import TokenBucket
+from agents.usage import Usage
+
+from .fake_model import FakeModel
+from .test_responses import get_text_message
+
+
+def _rate_limit_error(headers: dict[str, str] | None = None) -> openai.APIStatusError:
+    response = httpx.Response(
+        429, headers=headers, request=httpx.Request("POST", "https://api.example.com")
+    )
+    return openai.APIStatusError("rate limited", response=response, body=None)
+
+
+class ConcurrencyModel(Model):
+    """Records how many requests are in flight at once, and reports fixed usage."""
+
+    def __init__(self, latency: float = 0.01, total_tokens: int = 100) -> None:
+        self.latency = latency
+        self.total_tokens = total_tokens
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors: list[Exception] = []
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.errors:
+                raise self.errors.pop(0)
+        finally:
+            self.in_flight -= 1
+        return ModelResponse(
+            output=[get_text_message("done")],
+            usage=Usage(requests=1, total_tokens=self.total_tokens),
+            referenceable_id=None,
+        )
+
+    async def stream_response(self, *args: Any, **kwargs: Any):
+        raise NotImplementedError
+        yield
+
+
+async def _get(model: Model, settings: ModelSettings | None = None) -> ModelResponse:
+    return await model.get_response(
+        None, "hello", settings or ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+
+
+class SingleModelProvider(ModelProvider):
+    def __init__(self, model: Model) -> None:
+        self.model = model
+
+    def get_model(self, model_name: str | None) -> Model:
+        return self.model
+
+
+def test_token_bucket_refills_and_carries_debt():
+    bucket = TokenBucket(per_minute=600, capacity=10)
+    assert bucket.time_until(5) == 0
+    bucket.consume(15)
+    # In debt by 5, refilling at 10 per second
+    assert bucket.time_until(5) == pytest.approx(1.0, abs=0.05)
+    # Amounts above the capacity only wait for a full bucket
+    assert bucket.time_until(1000) == pytest.approx(1.5, abs=0.05)
+    bucket.consume(-100)
+    assert bucket.level == 10
+
+
+@pytest.mark.asyncio
+async def test_requests_per_minute_are_limited():
+    limiter = RateLimiter(requests_per_minute=1200)
+    limiter.request_bucket = TokenBucket(per_minute=1200, capacity=1)
+
+    started = time.monotonic()
+    for _ in range(5):
+        await limiter.acquire(0)
+        limiter.release(0, None)
+
+    # One request right away, then one every 50ms
+    assert time.monotonic() - started >= 0.18
+    assert limiter.requests == 5
+    assert limiter.wait_time > 0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_let_through_in_arrival_order():
+    limiter = RateLimiter(max_concurrency=1)
+    order: list[int] = []
+
+    async def request(i: int) -> None:
+        await limiter.acquire(0)
+        order.append(i)
+        await asyncio.sleep(0.001)
+        limiter.release(0, None)
+
+    await asyncio.gather(*(request(i) for i in range(10)))
+    assert order == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_token_costs_are_reconciled_with_usage():
+    limiter = RateLimiter(tokens_per_minute=60_000)
+    assert limiter.token_bucket is not None
+    model = RateLimitedModel(ConcurrencyModel(total_tokens=3000), limiter)
+    settings = ModelSettings(max_tokens=500)
+
+    estimate = limiter.estimate_cost(None, "hello", settings, [], None, [])
+    assert estimate > 500
+    level = limiter.token_bucket.level
+    await _get(model, settings)
+
+    # The bucket was charged what the response reported, not the estimate
+    assert limiter.token_bucket.level == pytest.approx(level - 3000, abs=20)
+    assert (limiter.estimated_tokens, limiter.actual_tokens) == (estimate, 3000)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_adapts_to_rate_limit_errors():
+    limiter = RateLimiter(max_concurrency=8, min_concurrency=2)
+    model = ConcurrencyModel()
+    model.errors = [_rate_limit_error({"retry-after-ms": "50"})] * 2
+    rate_limited = RateLimitedModel(model, limiter)
+
+    for _ in range(2):
+        with pytest.raises(openai.APIStatusError):
+            await _get(rate_limited)
+    assert limiter.concurrency_limit == 2
+    assert limiter.throttled == 2
+
+    # The next request waits out the retry-after
+    started = time.monotonic()
+    await _get(rate_limited)
+    assert time.monotonic() - started >= 0.04
+    # Successes raise the limit additively
+    assert limiter.concurrency_limit == pytest.approx(2.5)
+
+
+@pytest.mark.asyncio
+async def test_runs_sharing_a_provider_are_coordinated():
+    model = ConcurrencyModel(latency=0.02)
+    limiter = RateLimiter(max_concurrency=3)
+    run_config = RunConfig(
+        model_provider=RateLimitedModelProvider(SingleModelProvider(model), limiter)
+    )
+    agent = Agent(name="test")
+
+    results = await asyncio.gather(
+        *(Runner.run(agent, input="hi", run_config=run_config) for _ in range(12))
+    )
+
+    assert all(result.final_output == "done" for result in results)
+    assert model.max_in_flight == 3
+    assert limiter.requests == 12
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_streamed_requests_hold_their_slot_until_done():
+    model = FakeModel()
+    model.set_next_output([get_text_message("streamed")])
+    limiter = RateLimiter(max_concurrency=1)
+    agent = Agent(name="test", model=RateLimitedModel(model, limiter))
+
+    result = Runner.run_streamed(agent, input="hi")
+    async for _ in result.stream_events():
+        pass
+
+    assert result.final_output == "streamed"
+    assert (limiter.requests, limiter.in_flight) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_free_their_slot_without_raising_the_limit():
+    limiter = RateLimiter(max_concurrency=8)
+    limiter.concurrency_limit = 2
+    rate_limited = RateLimitedModel(ConcurrencyModel(latency=10), limiter)
+
+    request = asyncio.create_task(_get(rate_limited))
+    await asyncio.sleep(0.01)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    assert (limiter.in_flight, limiter.concurrency_limit) == (0, 2)
+
+    # A stream closed by its consumer before it ends
+    model = FakeModel()
+    model.set_next_output([get_text_message("streamed")])
+    stream = RateLimitedModel(model, limiter).stream_response(
+        None, "hello", ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+    await stream.__anext__()
+    await stream.aclose()  # type: ignore[attr-defined]
+    assert (limiter.in_flight, limiter.concurrency_limit) == (0, 2)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from openai.types.responses import ResponseFunctionToolCall
+
+from agents import (
+    Agent,
+    ModelSettings,
+    ModelTracing,
+    RecordingModel,
+    RecordingModelProvider,
+    ReplayModelProvider,
+    RunConfig,
+    Runner,
+    UserError,
+    function_tool,
+)
+from agents.items import TResponseStreamEvent
+from agents.models._stream_replay import stream_events_from_response
+from agents.models.interface import Model, ModelProvider
+from agents.models.record_replay import ModelRecording
+
+from .fake_model import FakeModel
+from .test_responses import get_text_message
+
+
+class TimedModel(FakeModel):
+    """A fake model whose streams wait `delay` seconds before each event."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+
+    async def get_response(self, *args: Any, **kwargs: Any):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return await super().get_response(*args, **kwargs)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        self.calls += 1
+        response = await super().get_response(*args, **kwargs)
+        for event in stream_events_from_response(response, "test-model"):
+            await asyncio.sleep(self.delay)
+            yield event
+
+
+class SingleModelProvider(ModelProvider):
+    def __init__(self, model: Model) -> None:
+        self.model = model
+
+    def get_model(self, model_name: str | None) -> Model:
+        return self.model
+
+
+def _tool_call(call_id: str) -> ResponseFunctionToolCall:
+    return ResponseFunctionToolCall(
+        id=f"fc_{call_id}", call_id=call_id, type="function_call", name="lookup", arguments="{}"
+    )
+
+
+def _agent() -> Agent:
+    @function_tool
+    def lookup() -> str:
+        return "the answer is 42"
+
+    return Agent(name="test", instructions="Look it up.", model="test-model", tools=[lookup])
+
+
+def _script(model: FakeModel) -> None:
+    model.add_multiple_turn_outputs([[_tool_call("1")], [get_text_message("42")]])
+
+
+@pytest.mark.parametrize("file_name", ["calls.jsonl", "calls.jsonl.gz"])
+@pytest.mark.asyncio
+async def test_recorded_runs_replay_without_the_model(tmp_path: Path, file_name: str):
+    path = tmp_path / file_name
+    model = TimedModel()
+    _script(model)
+    recorded = await Runner.run(
+        _agent(),
+        input="what is the answer?",
+        run_config=RunConfig(
+            model_provider=RecordingModelProvider(SingleModelProvider(model), path)
+        ),
+    )
+    assert len(ModelRecording(path).load()) == 2
+
+    replayed = await Runner.run(
+        _agent(),
+        input="what is the answer?",
+        run_config=RunConfig(model_provider=ReplayModelProvider(path, time_scale=0)),
+    )
+
+    assert model.calls == 2
+    assert replayed.final_output == recorded.final_output == "42"
+    assert replayed.to_input_list() == recorded.to_input_list()
+
+
+@pytest.mark.asyncio
+async def test_streams_replay_with_scaled_timing(tmp_path: Path):
+    path = tmp_path / "stream.jsonl"
+    model = TimedModel(delay=0.02)
+    model.set_next_output([get_text_message("hello")])
+    recording_model = RecordingModel(model, ModelRecording(path), model_name="test-model")
+    recorded_events = [
+        event
+        async for event in recording_model.stream_response(
+            None, "hi", ModelSettings(), [], None, [], ModelTracing.DISABLED
+        )
+    ]
+
+    (call,) = ModelRecording(path).load()
+    assert len(call.events) == len(recorded_events)
+    assert all(delay >= 0.015 for delay, _ in call.events)
+
+    async def replay(time_scale: float) -> tuple[float, list[TResponseStreamEvent]]:
+        replay_model = ReplayModelProvider(path, time_scale=time_scale).get_model("test-model")
+        started_at = time.monotonic()
+        events = [
+            event
+            async for event in replay_model.stream_response(
+                None, "hi", ModelSettings(), [], None, [], ModelTracing.DISABLED
+            )
+        ]
+        return time.monotonic() - started_at, events
+
+    full_time, events = await replay(1.0)
+    assert events == recorded_events
+    assert full_time >= 0.9 * call.latency
+    fast_time, _ = await replay(0.1)
+    assert fast_time < full_time / 3
+
+
+@pytest.mark.asyncio
+async def test_streamed_recordings_serve_non_streamed_requests(tmp_path: Path):
+    path = tmp_path / "calls.jsonl"
+    model = TimedModel()
+    _script(model)
+    recording = RecordingModelProvider(SingleModelProvider(model), path)
+    streamed = Runner.run_streamed(
+        _agent(), input="question", run_config=RunConfig(model_provider=recording)
+    )
+    async for _ in streamed.stream_events():
+        pass
+
+    replayed = await Runner.run(
+        _agent(),
+        input="question",
+        run_config=RunConfig(model_provider=ReplayModelProvider(path, time_scale=0)),
+    )
+    assert replayed.final_output == streamed.final_output == "42"
+
+
+@pytest.mark.asyncio
+async def test_unmatched_requests(tmp_path: Path):
+    path = tmp_path / "calls.jsonl"
+    model = TimedModel()
+    _script(model)
+    await Runner.run(
+        _agent(),
+        input="question",
+        run_config=RunConfig(
+            model_provider=RecordingModelProvider(SingleModelProvider(model), path)
+        ),
+    )
+
+    with pytest.raises(UserError, match="No recorded model call"):
+        await Runner.run(
+            _agent(),
+            input="a different question",
+            run_config=RunConfig(model_provider=ReplayModelProvider(path, time_scale=0)),
+        )
+
+    # Without strict matching, recorded calls are served in order
+    result = await Runner.run(
+        _agent(),
+        input="a different question",
+        run_config=RunConfig(model_provider=ReplayModelProvider(path, time_scale=0, strict=False)),
+    )
+    assert result.final_output == "42"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_replays_of_the_same_recording(tmp_path: Path):
+    path = tmp_path / "calls.jsonl"
+    model = TimedModel()
+    _script(model)
+    await Runner.run(
+        _agent(),
+        input="question",
+        run_config=RunConfig(
+            model_provider=RecordingModelProvider(SingleModelProvider(model), path)
+        ),
+    )
+
+    run_config = RunConfig(model_provider=ReplayModelProvider(path, time_scale=0))
+    results = await asyncio.gather(
+        *(Runner.run(_agent(), input="question", run_config=run_config) for _ in range(20))
+    )
+    assert {result.final_output for result in results} == {"42"}
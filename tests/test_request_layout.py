@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from agents import (
+    Agent,
+    FunctionTool,
+    ModelResponse,
+    RunConfig,
+    RunContextWrapper,
+    Runner,
+    Usage,
+    function_tool,
+    handoff,
+)
+from agents._request_layout import RequestLayout
+from agents.items import TResponseInputItem
+
+from .fake_model import FakeModel
+from .test_responses import get_function_tool_call, get_text_message
+
+
+class RecordingModel(FakeModel):
+    def __init__(self) -> None:
+        super().__init__()
+        self.tool_names: list[list[str]] = []
+        self.schemas: list[dict[str, Any]] = []
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        tools = kwargs["tools"]
+        handoffs = kwargs["handoffs"]
+        self.tool_names.append([t.name for t in tools] + [h.tool_name for h in handoffs])
+        self.schemas.extend(t.params_json_schema for t in tools if isinstance(t, FunctionTool))
+        response = await super().get_response(*args, **kwargs)
+        response.usage = Usage(requests=1, input_tokens=100, cached_input_tokens=75)
+        return response
+
+
+def _tool(name: str, schema: dict[str, Any] | None = None) -> FunctionTool:
+    async def invoke(ctx: RunContextWrapper[Any], args: str) -> str:
+        return name
+
+    return FunctionTool(
+        name=name,
+        description=name,
+        params_json_schema=schema or {"type": "object", "properties": {}},
+        on_invoke_tool=invoke,
+    )
+
+
+def test_arrange_sorts_tools_and_canonicalizes_schemas():
+    layout = RequestLayout()
+    schema = {"type": "object", "properties": {"b": {"type": "string"}, "a": {"type": "string"}}}
+    zeta = _tool("zeta", schema)
+    alpha = _tool("alpha", {"properties": {}, "type": "object"})
+    to_b = handoff(Agent(name="b"))
+    to_a = handoff(Agent(name="a"))
+
+    tools, handoffs = layout.arrange([zeta, alpha], [to_b, to_a])
+
+    assert [t.name for t in tools] == ["alpha", "zeta"]
+    assert [h.tool_name for h in handoffs] == ["transfer_to_a", "transfer_to_b"]
+    canonical_zeta = tools[1]
+    assert isinstance(canonical_zeta, FunctionTool)
+    assert list(canonical_zeta.params_json_schema) == ["properties", "type"]
+    assert list(canonical_zeta.params_json_schema["properties"]) == ["a", "b"]
+    # The original tool isn't modified, and tools that are already canonical are reused
+    assert list(zeta.params_json_schema) == ["type", "properties"]
+    assert tools[0] is alpha
+
+    # Canonical tools are memoized, so they keep their identity across turns
+    again, _ = layout.arrange([alpha, zeta], [])
+    assert again[1] is canonical_zeta
+
+
+def test_changed_tools_are_canonicalized_and_described_again():
+    layout = RequestLayout()
+    zeta = _tool("zeta")
+    first, _ = layout.arrange([zeta], [])
+    layout.observe(None, first, [], [])
+
+    zeta.params_json_schema = {"type": "object", "properties": {"b": {}, "a": {}}}
+    second, _ = layout.arrange([zeta], [])
+    canonical = second[0]
+    assert isinstance(canonical, FunctionTool)
+    assert list(canonical.params_json_schema["properties"]) == ["a", "b"]
+    assert layout.observe(None, second, [], []).first_changed_section == "tools"
+
+    canonical.description = "changed"
+    assert layout.observe(None, second, [], []).first_changed_section == "tools"
+
+
+def test_observe_reports_the_stable_prefix():
+    layout = RequestLayout()
+    tools = [_tool("a")]
+    first_item: TResponseInputItem = {"role": "user", "content": "hi"}
+    second_item: TResponseInputItem = {"role": "assistant", "content": "hello"}
+
+    first = layout.observe("instructions", tools, [], [first_item])
+    assert first.stable_prefix_chars == 0
+    assert first.first_changed_section == "tools"
+
+    # Appending to the input keeps the whole previous request as the prefix
+    second = layout.observe("instructions", tools, [], [first_item, second_item])
+    assert second.first_changed_section is None
+    assert second.stable_prefix_chars == first.total_chars
+    assert second.total_chars > first.total_chars
+
+    # Dynamic instructions invalidate everything after the tools
+    third = layout.observe("other instructions", tools, [], [first_item, second_item])
+    assert third.first_changed_section == "instructions"
+    assert third.stable_prefix_chars < second.stable_prefix_chars
+
+    # Rewriting the history is reported as an input change
+    fourth = layout.observe("other instructions", tools, [], [second_item])
+    assert fourth.first_changed_section == "input"
+
+
+@pytest.mark.asyncio
+async def test_stable_layout_keeps_tool_order_when_tools_are_reordered():
+    model = RecordingModel()
+    agent = Agent(name="test", model=model)
+
+    @function_tool
+    def reorder_tools() -> str:
+        agent.tools.reverse()
+        return "reordered"
+
+    agent.tools = [_tool("zeta"), reorder_tools, _tool("alpha")]
+    model.add_multiple_turn_outputs(
+        [
+            [get_function_tool_call("reorder_tools", json.dumps({}))],
+            [get_function_tool_call("reorder_tools", json.dumps({}))],
+        ]
+    )
+    model.set_next_output([get_text_message("done")])
+
+    await Runner.run(agent, input="go", run_config=RunConfig(stable_request_layout=True))
+
+    assert model.tool_names == [["alpha", "reorder_tools", "zeta"]] * 3
+
+
+@pytest.mark.asyncio
+async def test_default_layout_is_unchanged():
+    model = RecordingModel()
+    agent = Agent(name="test", model=model, tools=[_tool("zeta"), _tool("alpha")])
+    model.set_next_output([get_text_message("done")])
+
+    await Runner.run(agent, input="go")
+
+    assert model.tool_names == [["zeta", "alpha"]]
+
+
+@pytest.mark.asyncio
+async def test_cached_input_ratio_is_reported(caplog):
+    model = RecordingModel()
+    agent = Agent(name="test", model=model)
+    model.set_next_output([get_text_message("done")])
+
+    with caplog.at_level("DEBUG", logger="openai.agents"):
+        await Runner.run(agent, input="go", run_config=RunConfig(stable_request_layout=True))
+
+    assert "cached input ratio 0.75" in caplog.text
+    assert Usage(input_tokens=100, cached_input_tokens=75).cached_input_ratio == 0.75
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from openai.types.responses import ResponseTextDeltaEvent
+
+from agents import (
+    Agent,
+    CachingModel,
+    CachingModelProvider,
+    ModelSettings,
+    ModelTracing,
+    ResponseCache,
+    RunConfig,
+    Runner,
+    function_tool,
+)
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.models.response_cache import model_request_key
+
+from .fake_model import FakeModel
+from .test_responses import get_function_tool_call, get_text_message
+
+
+async def _get(model: Model, input: str, settings: ModelSettings | None = None) -> ModelResponse:
+    return await model.get_response(
+        "instructions", input, settings or ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_are_served_from_the_cache():
+    fake = FakeModel()
+    fake.set_next_output([get_text_message("first")])
+    cache = ResponseCache()
+    model = CachingModel(fake, cache)
+
+    first = await _get(model, "hello")
+    second = await _get(model, "hello")
+
+    assert second.output == first.output
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate == 0.5
+    # A hit didn't make a request
+    assert second.usage.requests == 0
+
+    # A different request misses
+    fake.set_next_output([get_text_message("second")])
+    third = await _get(model, "hello", ModelSettings(temperature=0.5))
+    assert third.output[0].content[0].text == "second"  # type: ignore[union-attr]
+    assert cache.misses == 2
+
+
+def test_request_key_is_canonical():
+    def key(input, settings: ModelSettings, tool_description: str = "desc"):
+        @function_tool(description_override=tool_description)
+        def lookup(key: str) -> str:
+            return key
+
+        return model_request_key("m", "sys", input, settings, [lookup], None, [])
+
+    a = [{"role": "user", "content": "hi"}]
+    b = [{"content": "hi", "role": "user"}]
+    assert key(a, ModelSettings()) == key(b, ModelSettings())
+    assert key(a, ModelSettings()) != key(a, ModelSettings(top_p=0.5))
+    assert key(a, ModelSettings()) != key(a, ModelSettings(), tool_description="other")
+    # Keys of requests without a previous response ID don't change when it's added to the key
+    plain_key = model_request_key("m", None, "hi", ModelSettings(), [], None, [])
+    assert plain_key == model_request_key("m", None, "hi", ModelSettings(), [], None, [], None)
+    assert plain_key != model_request_key("m", None, "hi", ModelSettings(), [], None, [], "resp_1")
+
+
+class ContinuingModel(FakeModel):
+    supports_previous_response_id = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.previous_response_ids: list[str | None] = []
+
+    async def get_response(self, *args: Any, previous_response_id: str | None = None, **kwargs):
+        self.previous_response_ids.append(previous_response_id)
+        return await super().get_response(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_previous_response_ids_are_forwarded_and_part_of_the_key():
+    fake = ContinuingModel()
+    fake.add_multiple_turn_outputs([[get_text_message("a")], [get_text_message("b")]])
+    cache = ResponseCache()
+    model = CachingModel(fake, cache)
+    assert model.supports_previous_response_id
+
+    async def get(previous_response_id: str) -> ModelResponse:
+        return await model.get_response(
+            None,
+            "continue",
+            ModelSettings(),
+            [],
+            None,
+            [],
+            ModelTracing.DISABLED,
+            previous_response_id=previous_response_id,
+        )
+
+    await get("resp_1")
+    # The same input continuing another conversation isn't served from the cache
+    await get("resp_2")
+    await get("resp_1")
+    assert fake.previous_response_ids == ["resp_1", "resp_2"]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_streamed_runs_replay_cached_responses():
+    fake = FakeModel()
+    cache = ResponseCache()
+    model = CachingModel(fake, cache)
+    agent = Agent(name="test", model=model)
+
+    fake.set_next_output([get_text_message("hello there")])
+    first = Runner.run_streamed(agent, input="hi")
+    async for _ in first.stream_events():
+        pass
+    assert first.final_output == "hello there"
+
+    second = Runner.run_streamed(agent, input="hi")
+    deltas = [
+        event.data.delta
+        async for event in second.stream_events()
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent)
+    ]
+    assert second.final_output == "hello there"
+    assert deltas == ["hello there"]
+    assert cache.hits == 1
+
+    # A non-streamed request is served from the same entry
+    result = await Runner.run(agent, input="hi")
+    assert result.final_output == "hello there"
+    assert cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_tool_calls_are_replayed():
+    fake = FakeModel()
+    model = CachingModel(fake)
+    calls: list[str] = []
+
+    @function_tool
+    def lookup(key: str) -> str:
+        calls.append(key)
+        return key
+
+    agent = Agent(name="test", model=model, tools=[lookup])
+    for _ in range(2):
+        fake.add_multiple_turn_outputs(
+            [[get_function_tool_call("lookup", json.dumps({"key": "a"}))]]
+        )
+        fake.set_next_output([get_text_message("done")])
+        result = Runner.run_streamed(agent, input="go")
+        async for _ in result.stream_events():
+            pass
+        assert result.final_output == "done"
+
+    # The tools still run on a cache hit; only the model calls are cached
+    assert calls == ["a", "a"]
+    assert model.cache.hits == 2
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_a_new_cache(tmp_path: Path):
+    fake = FakeModel()
+    fake.set_next_output([get_text_message("stored")])
+    await _get(CachingModel(fake, ResponseCache(disk_path=tmp_path), model_name="m"), "hi")
+
+    cache = ResponseCache(disk_path=tmp_path)
+    response = await _get(CachingModel(FakeModel(), cache, model_name="m"), "hi")
+    assert response.output[0].content[0].text == "stored"  # type: ignore[union-attr]
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_and_size_eviction(tmp_path: Path):
+    fake = FakeModel()
+    cache = ResponseCache(max_entries=1, ttl=0.05)
+    model = CachingModel(fake, cache)
+
+    fake.add_multiple_turn_outputs([[get_text_message("a")], [get_text_message("b")]])
+    await _get(model, "a")
+    await _get(model, "b")
+    assert len(cache) == 1
+    assert cache.evictions == 1
+
+    await asyncio.sleep(0.1)
+    fake.set_next_output([get_text_message("b2")])
+    response = await _get(model, "b")
+    assert response.output[0].content[0].text == "b2"  # type: ignore[union-attr]
+    assert cache.evictions == 2
+
+    disk_cache = ResponseCache(disk_path=tmp_path, max_disk_bytes=1)
+    disk_model = CachingModel(fake, disk_cache)
+    fake.set_next_output([get_text_message("c")])
+    await _get(disk_model, "c")
+    assert list(tmp_path.glob("*.json")) == []
+
+
+@pytest.mark.asyncio
+async def test_provider_wraps_models_with_a_shared_cache():
+    fake = FakeModel()
+
+    class Provider(ModelProvider):
+        def get_model(self, model_name: str | None) -> Model:
+            return fake
+
+    provider = CachingModelProvider(Provider())
+    agent = Agent(name="test", model="some-model")
+    config = RunConfig(model_provider=provider)
+
+    fake.set_next_output([get_text_message("hi")])
+    await Runner.run(agent, input="hello", run_config=config)
+    result = await Runner.run(agent, input="hello", run_config=config)
+    assert result.final_output == "hi"
+    assert provider.cache.hits == 1
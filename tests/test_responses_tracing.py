@@ -44,7 +44,14 @@ async def test_get_response_creates_trace(monkeypatch):
 
         # Mock _fetch_response to return a dummy response with a known id
         async def dummy_fetch_response(
-            system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            stream,
+            previous_response_id=None,
         ):
             return DummyResponse()
 
@@ -74,7 +81,14 @@ async def test_non_data_tracing_doesnt_set_response_id(monkeypatch):
 
         # Mock _fetch_response to return a dummy response with a known id
         async def dummy_fetch_response(
-            system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            stream,
+            previous_response_id=None,
         ):
             return DummyResponse()
 
@@ -102,7 +116,14 @@ async def test_disable_tracing_does_not_create_span(monkeypatch):
 
         # Mock _fetch_response to return a dummy response with a known id
         async def dummy_fetch_response(
-            system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            stream,
+            previous_response_id=None,
         ):
             return DummyResponse()
 
@@ -127,7 +148,14 @@ async def test_stream_response_creates_trace(monkeypatch):
 
         # Define a dummy fetch function that returns an async stream with a dummy response
         async def dummy_fetch_response(
-            system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            stream,
+            previous_response_id=None,
         ):
             class DummyStream:
                 async def __aiter__(self):
@@ -165,7 +193,14 @@ async def test_stream_non_data_tracing_doesnt_set_response_id(monkeypatch):
 
         # Define a dummy fetch function that returns an async stream with a dummy response
         async def dummy_fetch_response(
-            system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            stream,
+            previous_response_id=None,
         ):
             class DummyStream:
                 async def __aiter__(self):
@@ -202,7 +237,14 @@ async def test_stream_disabled_tracing_doesnt_create_span(monkeypatch):
 
         # Define a dummy fetch function that returns an async stream with a dummy response
         async def dummy_fetch_response(
-            system_instructions, input, model_settings, tools, output_schema, handoffs, stream
+            system_instructions,
+            input,
+            model_settings,
+            tools,
+            output_schema,
+            handoffs,
+            stream,
+            previous_response_id=None,
         ):
             class DummyStream:
                 async def __aiter__(self):
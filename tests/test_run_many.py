@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from agents import Agent, RunManyItem, Runner, UserError
+from agents.agent_output import AgentOutputSchema
+from agents.handoffs import Handoff
+from agents.items import ModelResponse, TResponseInputItem, TResponseStreamEvent
+from agents.model_settings import ModelSettings
+from agents.models.interface import Model, ModelTracing
+from agents.tool import Tool
+from agents.usage import Usage
+
+from .mcp.helpers import FakeMCPServer
+from .test_responses import get_text_message
+
+
+class EchoModel(Model):
+    """Replies with the user's message after a delay. Fails for messages starting with "fail"."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[TResponseInputItem],
+        model_settings: ModelSettings,
+        tools: list[Tool],
+        output_schema: AgentOutputSchema | None,
+        handoffs: list[Handoff],
+        tracing: ModelTracing,
+    ) -> ModelResponse:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            text = input if isinstance(input, str) else str(input[-1]["content"])  # type: ignore
+            await asyncio.sleep(self.delay)
+            if text.startswith("fail"):
+                raise ValueError(f"bad input: {text}")
+            return ModelResponse(
+                output=[get_text_message(f"echo: {text}")],
+                usage=Usage(requests=1, input_tokens=3, output_tokens=2, total_tokens=5),
+                referenceable_id=None,
+            )
+        finally:
+            self.in_flight -= 1
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[TResponseStreamEvent]:
+        raise NotImplementedError()
+
+
+async def _collect(items: AsyncIterator[RunManyItem]) -> list[RunManyItem]:
+    return [item async for item in items]
+
+
+@pytest.mark.asyncio
+async def test_run_many_runs_every_input_and_aggregates_usage():
+    model = EchoModel()
+    agent = Agent(name="test", model=model)
+
+    batch = Runner.run_many(agent, [f"input {i}" for i in range(10)], max_concurrency=3)
+    items = await _collect(batch.stream_results())
+
+    assert sorted(item.index for item in items) == list(range(10))
+    for item in items:
+        assert item.ok
+        assert item.result is not None
+        assert item.result.final_output == f"echo: {item.input}"
+
+    assert batch.is_complete
+    assert batch.num_succeeded == 10
+    assert batch.num_failed == 0
+    assert batch.usage == Usage(requests=10, input_tokens=30, output_tokens=20, total_tokens=50)
+
+
+@pytest.mark.asyncio
+async def test_run_many_bounds_concurrency():
+    model = EchoModel(delay=0.01)
+    agent = Agent(name="test", model=model)
+
+    batch = Runner.run_many(agent, (f"input {i}" for i in range(12)), max_concurrency=4)
+    items = await _collect(batch.stream_results())
+
+    assert len(items) == 12
+    assert model.max_in_flight == 4
+
+
+@pytest.mark.asyncio
+async def test_run_many_isolates_failures():
+    agent = Agent(name="test", model=EchoModel())
+
+    batch = Runner.run_many(agent, ["ok 1", "fail 1", "ok 2", "fail 2", "ok 3"])
+    items = sorted(await _collect(batch.stream_results()), key=lambda item: item.index)
+
+    assert [item.ok for item in items] == [True, False, True, False, True]
+    assert isinstance(items[1].error, ValueError)
+    assert items[1].result is None
+    assert batch.num_succeeded == 3
+    assert batch.num_failed == 2
+    assert batch.usage.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_run_many_accepts_async_iterables():
+    async def inputs():
+        for i in range(5):
+            await asyncio.sleep(0)
+            yield [{"content": f"input {i}", "role": "user"}]
+
+    agent = Agent(name="test", model=EchoModel())
+    batch = Runner.run_many(agent, inputs(), max_concurrency=2)
+    items = await _collect(batch.stream_results())
+
+    assert len(items) == 5
+    assert all(item.ok for item in items)
+
+
+@pytest.mark.asyncio
+async def test_run_many_lists_mcp_tools_once_per_batch():
+    class CountingMCPServer(FakeMCPServer):
+        def __init__(self) -> None:
+            super().__init__()
+            self.list_calls = 0
+
+        async def list_tools(self):
+            self.list_calls += 1
+            await asyncio.sleep(0.01)
+            return await super().list_tools()
+
+    server = CountingMCPServer()
+    server.add_tool("lookup", {})
+    agent = Agent(name="test", model=EchoModel(), mcp_servers=[server])
+
+    batch = Runner.run_many(agent, [f"input {i}" for i in range(20)], max_concurrency=5)
+    items = await _collect(batch.stream_results())
+    assert all(item.ok for item in items)
+    assert server.list_calls == 1
+
+    # A new batch lists the tools again, and so does a plain run
+    await _collect(Runner.run_many(agent, ["input"]).stream_results())
+    await Runner.run(agent, "input")
+    assert server.list_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_run_many_cancels_in_flight_runs_when_stopped_early():
+    model = EchoModel(delay=0.05)
+    agent = Agent(name="test", model=model)
+    batch = Runner.run_many(agent, [f"input {i}" for i in range(10)], max_concurrency=3)
+
+    results = batch.stream_results()
+    first = await results.__anext__()
+    assert first.ok
+    await results.aclose()  # type: ignore[attr-defined]
+
+    assert model.in_flight == 0
+    assert not batch.is_complete
+    assert batch.num_succeeded == 1
+
+
+@pytest.mark.asyncio
+async def test_run_many_validates_arguments():
+    agent = Agent(name="test", model=EchoModel())
+    with pytest.raises(UserError):
+        Runner.run_many(agent, ["input"], max_concurrency=0)
+
+    batch = Runner.run_many(agent, ["input"])
+    await _collect(batch.stream_results())
+    with pytest.raises(UserError):
+        await _collect(batch.stream_results())
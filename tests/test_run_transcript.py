@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+
+import pytest
+
+from agents import Agent, Runner
+from agents._transcript import RunTranscript
+from agents.items import MessageOutputItem, RunItemBase
+
+from .fake_model import FakeModel
+from .test_responses import (
+    get_function_tool,
+    get_function_tool_call,
+    get_text_input_item,
+    get_text_message,
+)
+
+
+def _message_item(agent: Agent, text: str) -> MessageOutputItem:
+    return MessageOutputItem(agent=agent, raw_item=get_text_message(text))  # type: ignore
+
+
+def test_transcript_appends_new_items_only():
+    agent = Agent(name="test")
+    original_input = [get_text_input_item("hi")]
+    transcript = RunTranscript(original_input)
+    assert transcript.to_input_list() == original_input
+
+    first = _message_item(agent, "first")
+    transcript.sync(original_input, [first])
+    second = _message_item(agent, "second")
+    transcript.sync(original_input, [first, second])
+
+    items = transcript.to_input_list()
+    assert len(items) == 3
+    assert items[0] == original_input[0]
+    assert items[1] == first.to_input_item()
+    assert items[2] == second.to_input_item()
+
+
+def test_transcript_returns_new_list_each_time():
+    transcript = RunTranscript("hello")
+    first = transcript.to_input_list()
+    first.append(get_text_input_item("extra"))
+    assert transcript.to_input_list() == [get_text_input_item("hello")]
+
+
+def test_transcript_rebuilds_when_history_rewritten():
+    agent = Agent(name="test")
+    original_input = [get_text_input_item("hi")]
+    transcript = RunTranscript(original_input)
+    first = _message_item(agent, "first")
+    second = _message_item(agent, "second")
+    transcript.sync(original_input, [first, second])
+
+    # Dropping an item (e.g. by a handoff input filter) rebuilds the transcript
+    transcript.sync(original_input, [second])
+    assert transcript.to_input_list() == [original_input[0], second.to_input_item()]
+
+    # So does replacing the original input
+    new_input = [get_text_input_item("filtered")]
+    transcript.sync(new_input, [second])
+    assert transcript.to_input_list() == [new_input[0], second.to_input_item()]
+
+
+@pytest.mark.asyncio
+async def test_run_converts_each_item_once(monkeypatch):
+    conversions: Counter[int] = Counter()
+    original_to_input_item = RunItemBase.to_input_item
+
+    def counting_to_input_item(self):
+        conversions[id(self)] += 1
+        return original_to_input_item(self)
+
+    monkeypatch.setattr(RunItemBase, "to_input_item", counting_to_input_item)
+
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[get_function_tool("foo", "result")])
+    model.add_multiple_turn_outputs(
+        [[get_function_tool_call("foo", json.dumps({"a": "b"}))] for _ in range(5)]
+    )
+    model.set_next_output([get_text_message("done")])
+
+    result = await Runner.run(agent, input="start")
+
+    assert result.final_output == "done"
+    assert len(result.new_items) == 11
+    assert set(conversions.values()) == {1}, "each item should be converted exactly once"
+    assert len(model.last_turn_args["input"]) == 11
+
+
+@pytest.mark.asyncio
+async def test_streamed_run_converts_each_item_once(monkeypatch):
+    conversions: Counter[int] = Counter()
+    original_to_input_item = RunItemBase.to_input_item
+
+    def counting_to_input_item(self):
+        conversions[id(self)] += 1
+        return original_to_input_item(self)
+
+    monkeypatch.setattr(RunItemBase, "to_input_item", counting_to_input_item)
+
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[get_function_tool("foo", "result")])
+    model.add_multiple_turn_outputs(
+        [[get_function_tool_call("foo", json.dumps({"a": "b"}))] for _ in range(5)]
+    )
+    model.set_next_output([get_text_message("done")])
+
+    result = Runner.run_streamed(agent, input="start")
+    async for _ in result.stream_events():
+        pass
+
+    assert result.final_output == "done"
+    assert len(result.raw_responses) == 6
+    assert set(conversions.values()) == {1}, "each item should be converted exactly once"
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from openai.types.responses import ResponseCompletedEvent, ResponseTextDeltaEvent, ResponseUsage
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+from agents import (
+    Agent,
+    ModelSettings,
+    ModelTracing,
+    RunConfig,
+    Runner,
+    SingleFlightGroup,
+    SingleFlightModel,
+    SingleFlightModelProvider,
+)
+from agents.items import ModelResponse, TResponseStreamEvent
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+
+from .fake_model import get_response_obj
+from .test_responses import get_text_message
+
+
+class SlowModel(Model):
+    """Answers with its input after a delay, and counts the calls it gets."""
+
+    def __init__(self, latency: float = 0.05, error: Exception | None = None) -> None:
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_response(self, system_instructions, input, *args: Any, **kwargs: Any):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return ModelResponse(
+            output=[get_text_message(str(input))],
+            usage=Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15),
+            referenceable_id=None,
+        )
+
+    async def stream_response(
+        self, system_instructions, input, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        self.calls += 1
+        for word in str(input).split():
+            await asyncio.sleep(self.latency / 5)
+            yield ResponseTextDeltaEvent(
+                content_index=0,
+                delta=word,
+                item_id="1",
+                output_index=0,
+                type="response.output_text.delta",
+            )
+        response = get_response_obj([get_text_message(str(input))])
+        response.usage = _response_usage()
+        yield ResponseCompletedEvent(type="response.completed", response=response)
+
+
+def _response_usage() -> ResponseUsage:
+    return ResponseUsage(
+        input_tokens=10,
+        output_tokens=5,
+        total_tokens=15,
+        input_tokens_details=InputTokensDetails(cached_tokens=0),
+        output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+    )
+
+
+class SingleModelProvider(ModelProvider):
+    def __init__(self, model: Model) -> None:
+        self.model = model
+
+    def get_model(self, model_name: str | None) -> Model:
+        return self.model
+
+
+async def _get(model: Model, input: str = "hello") -> ModelResponse:
+    return await model.get_response(
+        None, input, ModelSettings(), [], None, [], ModelTracing.DISABLED
+    )
+
+
+async def _stream(model: Model, input: str = "a b c") -> list[TResponseStreamEvent]:
+    return [
+        event
+        async for event in model.stream_response(
+            None, input, ModelSettings(), [], None, [], ModelTracing.DISABLED
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_call():
+    model = SlowModel()
+    single_flight = SingleFlightModel(model)
+
+    responses = await asyncio.gather(*(_get(single_flight) for _ in range(10)))
+
+    assert model.calls == 1
+    assert all(response.output == responses[0].output for response in responses)
+    # Only the request that made the call reports its usage
+    assert sum(response.usage.requests for response in responses) == 1
+    assert (single_flight.group.requests, single_flight.group.coalesced) == (10, 9)
+    assert single_flight.group.coalesced_ratio == 0.9
+    assert single_flight.group.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_different_or_sequential_requests_are_not_shared():
+    model = SlowModel(latency=0.01)
+    single_flight = SingleFlightModel(model)
+
+    await asyncio.gather(_get(single_flight, "one"), _get(single_flight, "two"))
+    assert model.calls == 2
+
+    # Single-flight isn't a cache: a request after the call finished makes a new call
+    await _get(single_flight, "one")
+    assert model.calls == 3
+    assert single_flight.group.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_requests_to_different_models_are_not_shared():
+    # The same class and name, but e.g. other endpoints or API keys
+    first, second = SlowModel(), SlowModel()
+    group = SingleFlightGroup()
+
+    await asyncio.gather(
+        _get(SingleFlightModel(first, group)), _get(SingleFlightModel(second, group))
+    )
+    assert (first.calls, second.calls) == (1, 1)
+
+    first_provider = SingleFlightModelProvider(SingleModelProvider(first), group)
+    second_provider = SingleFlightModelProvider(SingleModelProvider(second), group)
+    await asyncio.gather(
+        _get(first_provider.get_model("gpt")), _get(second_provider.get_model("gpt"))
+    )
+    assert (first.calls, second.calls) == (2, 2)
+    assert group.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared():
+    model = SlowModel(error=ValueError("boom"))
+    single_flight = SingleFlightModel(model)
+
+    results = await asyncio.gather(*(_get(single_flight) for _ in range(3)), return_exceptions=True)
+
+    assert model.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_the_call_is_cancelled_only_once_every_waiter_is():
+    model = SlowModel(latency=0.1)
+    single_flight = SingleFlightModel(model)
+
+    first = asyncio.create_task(_get(single_flight))
+    second = asyncio.create_task(_get(single_flight))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert (await second).output[0].content[0].text == "hello"  # type: ignore[union-attr]
+    assert model.cancelled == 0
+
+    third = asyncio.create_task(_get(single_flight))
+    await asyncio.sleep(0.01)
+    third.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await third
+    await asyncio.sleep(0)
+    assert model.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_streams_are_fanned_out():
+    model = SlowModel()
+    single_flight = SingleFlightModel(model)
+
+    first = asyncio.create_task(_stream(single_flight))
+    await asyncio.sleep(0.025)
+    # This stream joins late, and replays the events it missed
+    late = asyncio.create_task(_stream(single_flight))
+    streams = await asyncio.gather(first, late, _stream(single_flight))
+
+    assert model.calls == 1
+    deltas = [
+        [event.delta for event in events if isinstance(event, ResponseTextDeltaEvent)]
+        for events in streams
+    ]
+    assert deltas == [["a", "b", "c"]] * 3
+    completed = [events[-1] for events in streams]
+    assert all(isinstance(event, ResponseCompletedEvent) for event in completed)
+    usages = [event.response.usage for event in completed]  # type: ignore[union-attr]
+    assert usages[0] is not None and usages[1] is None and usages[2] is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_share_their_first_request():
+    model = SlowModel()
+    group = SingleFlightGroup()
+    run_config = RunConfig(
+        model_provider=SingleFlightModelProvider(SingleModelProvider(model), group)
+    )
+    agent = Agent(name="triage", instructions="Route the request.")
+
+    results = await asyncio.gather(
+        *(Runner.run(agent, input="reset my password", run_config=run_config) for _ in range(20))
+    )
+
+    assert model.calls == 1
+    assert group.coalesced == 19
+    assert len({result.final_output for result in results}) == 1
+    usage = [result.raw_responses[0].usage.requests for result in results]
+    assert sorted(usage) == [0] * 19 + [1]
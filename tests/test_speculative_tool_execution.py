@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from openai.types.responses import (
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputItemDoneEvent,
+)
+
+from agents import (
+    Agent,
+    FunctionTool,
+    ModelBehaviorError,
+    RunConfig,
+    Runner,
+    ToolCallOutputItem,
+    function_tool,
+)
+from agents.items import TResponseOutputItem, TResponseStreamEvent
+
+from .fake_model import FakeModel, get_response_obj
+from .test_responses import get_text_message
+
+
+class SlowStreamingModel(FakeModel):
+    """Streams each output item, then the completed response, with a delay before each item."""
+
+    def __init__(self, item_delay: float) -> None:
+        super().__init__()
+        self.item_delay = item_delay
+        self.completion_times: list[float] = []
+
+    async def stream_response(
+        self, *args: Any, **kwargs: Any
+    ) -> AsyncIterator[TResponseStreamEvent]:
+        output = self.get_next_output()
+        assert isinstance(output, list)
+        for index, item in enumerate(output):
+            await asyncio.sleep(self.item_delay)
+            yield ResponseOutputItemDoneEvent(
+                item=item, output_index=index, type="response.output_item.done"
+            )
+
+        self.completion_times.append(time.monotonic())
+        yield ResponseCompletedEvent(type="response.completed", response=get_response_obj(output))
+
+
+def _call(name: str, call_id: str, **arguments: Any) -> TResponseOutputItem:
+    return ResponseFunctionToolCall(
+        id=call_id,
+        call_id=call_id,
+        type="function_call",
+        name=name,
+        arguments=json.dumps(arguments),
+    )
+
+
+def _make_tool(started: dict[str, float]) -> FunctionTool:
+    @function_tool
+    async def slow(label: str, delay: float) -> str:
+        started[label] = time.monotonic()
+        await asyncio.sleep(delay)
+        return f"done {label}"
+
+    return slow
+
+
+async def _run(model: SlowStreamingModel, tools: list[Any], speculative: bool) -> Any:
+    agent = Agent(name="test", model=model, tools=tools)
+    result = Runner.run_streamed(
+        agent,
+        input="go",
+        run_config=RunConfig(speculative_tool_execution=speculative),
+    )
+    async for _ in result.stream_events():
+        pass
+    return result
+
+
+@pytest.mark.asyncio
+async def test_speculative_tools_start_before_stream_completes_and_keep_order():
+    started: dict[str, float] = {}
+    model = SlowStreamingModel(item_delay=0.05)
+    model.add_multiple_turn_outputs(
+        [
+            [
+                # The first call is slower, so it finishes last
+                _call("slow", "call_a", label="a", delay=0.1),
+                _call("slow", "call_b", label="b", delay=0.01),
+                get_text_message("working"),
+            ],
+            [get_text_message("done")],
+        ]
+    )
+
+    result = await _run(model, [_make_tool(started)], speculative=True)
+
+    assert result.final_output == "done"
+    first_turn_completed = model.completion_times[0]
+    assert started["a"] < first_turn_completed
+    assert started["b"] < first_turn_completed
+    outputs = [item.output for item in result.new_items if isinstance(item, ToolCallOutputItem)]
+    assert outputs == ["done a", "done b"]
+
+
+@pytest.mark.asyncio
+async def test_tools_wait_for_stream_by_default():
+    started: dict[str, float] = {}
+    model = SlowStreamingModel(item_delay=0.01)
+    model.add_multiple_turn_outputs(
+        [[_call("slow", "call_a", label="a", delay=0.0)], [get_text_message("done")]]
+    )
+
+    result = await _run(model, [_make_tool(started)], speculative=False)
+
+    assert result.final_output == "done"
+    assert started["a"] >= model.completion_times[0]
+
+
+@pytest.mark.asyncio
+async def test_speculative_tools_run_once_each():
+    calls: list[str] = []
+
+    @function_tool
+    def record(label: str) -> str:
+        calls.append(label)
+        return label
+
+    model = SlowStreamingModel(item_delay=0.0)
+    model.add_multiple_turn_outputs(
+        [
+            [_call("record", "call_a", label="a"), _call("record", "call_b", label="b")],
+            [get_text_message("done")],
+        ]
+    )
+
+    result = await _run(model, [record], speculative=True)
+
+    assert result.final_output == "done"
+    assert sorted(calls) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_speculative_tools_are_cancelled_when_turn_fails():
+    started: dict[str, float] = {}
+    cancelled = asyncio.Event()
+
+    @function_tool
+    async def hang(label: str) -> str:
+        started[label] = time.monotonic()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return label
+
+    model = SlowStreamingModel(item_delay=0.01)
+    model.add_multiple_turn_outputs(
+        [[_call("hang", "call_a", label="a"), _call("missing_tool", "call_b")]]
+    )
+
+    with pytest.raises(ModelBehaviorError):
+        await _run(model, [hang], speculative=True)
+
+    assert "a" in started
+    assert cancelled.is_set()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import gc
+import importlib.util
+import json
+import sys
+import weakref
+from typing import Any
+
+import pytest
+from pydantic import BaseModel
+
+from agents import (
+    Agent,
+    AgentOutputSchema,
+    HandoffInputData,
+    Runner,
+    TokenEstimator,
+    estimate_tokens,
+    function_tool,
+    handoff,
+    tiktoken_tokenizer,
+)
+from agents.items import MessageOutputItem, TResponseInputItem
+from agents.token_estimation import MESSAGE_OVERHEAD_TOKENS, heuristic_tokenizer
+
+from .fake_model import FakeModel
+from .test_responses import get_handoff_tool_call, get_text_input_item, get_text_message
+
+
+class CountingTokenizer:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, text: str) -> int:
+        self.calls += 1
+        return len(text.split())
+
+
+def test_heuristic_tokenizer():
+    assert heuristic_tokenizer("") == 0
+    assert heuristic_tokenizer("abcd" * 10) == 10
+    # Non-ASCII characters (e.g. CJK) count as a token each
+    assert heuristic_tokenizer("你好") == 2
+
+
+def test_counts_are_cached_per_item():
+    tokenizer = CountingTokenizer()
+    estimator = TokenEstimator(tokenizer)
+    history: list[TResponseInputItem] = [get_text_input_item("one two three")]
+
+    assert estimator.count_items(history) == MESSAGE_OVERHEAD_TOKENS + 3
+    history.append(get_text_input_item("four five"))
+    assert estimator.count_items(history) == 2 * MESSAGE_OVERHEAD_TOKENS + 5
+    # Counting the grown history only counted the new item
+    assert tokenizer.calls == 2
+
+    estimator.clear()
+    estimator.count_items(history)
+    assert tokenizer.calls == 4
+
+
+def test_run_items_count_like_their_input_items():
+    estimator = TokenEstimator()
+    agent = Agent(name="test")
+    message = get_text_message("a reply from the model")
+    run_item = MessageOutputItem(agent=agent, raw_item=message)  # type: ignore[arg-type]
+
+    assert estimator.count_item(run_item) == estimator.count_item(run_item.to_input_item())
+    assert estimator.count_items("a reply") == estimator.count_item(get_text_input_item("a reply"))
+
+
+def test_counted_run_items_are_not_kept_alive():
+    estimator = TokenEstimator()
+    run_item = MessageOutputItem(agent=Agent(name="test"), raw_item=get_text_message("hi"))  # type: ignore[arg-type]
+    count = estimator.count_item(run_item)
+    assert estimator.count_item(run_item) == count
+
+    ref = weakref.ref(run_item)
+    del run_item
+    gc.collect()
+    assert ref() is None
+    assert estimator._weak_item_counts == {}
+
+
+def test_counted_input_items_are_not_kept_alive():
+    tokenizer = CountingTokenizer()
+    estimator = TokenEstimator(tokenizer)
+    item: dict[str, Any] = {
+        "role": "user",
+        "content": [
+            {"type": "input_text", "text": "what is this"},
+            {"type": "input_image", "image_url": "data:image/png;base64," + "A" * 100_000},
+        ],
+    }
+    refcount = sys.getrefcount(item)
+    count = estimator.count_item(item)  # type: ignore[arg-type]
+    assert sys.getrefcount(item) == refcount
+
+    # Items are cached by content, so an equal copy isn't counted again, but a changed one is
+    assert estimator.count_item(json.loads(json.dumps(item))) == count
+    assert tokenizer.calls == 1
+    estimator.count_item(get_text_input_item("what is this, again"))
+    assert tokenizer.calls == 2
+
+
+def test_changed_tools_are_counted_again():
+    @function_tool
+    def lookup(query: str) -> str:
+        return query
+
+    estimator = TokenEstimator()
+    before = estimator.count_tools([lookup])
+    lookup.description = "Looks up a query in the knowledge base, which is very large."
+    assert estimator.count_tools([lookup]) > before
+
+
+def test_tools_and_output_schemas_are_counted():
+    class Answer(BaseModel):
+        value: str
+        confidence: float
+
+    @function_tool
+    def lookup(query: str) -> str:
+        """Looks up a query in the knowledge base."""
+        return query
+
+    estimator = TokenEstimator()
+    tool_tokens = estimator.count_tools([lookup], [handoff(Agent(name="other"))])
+    assert tool_tokens > 0
+    assert estimator.count_output_schema(AgentOutputSchema(Answer)) > 0
+    assert estimator.count_output_schema(AgentOutputSchema(str)) == 0
+
+    request_tokens = estimator.count_request(
+        "Be helpful.", "hello", [lookup], [], AgentOutputSchema(Answer)
+    )
+    assert request_tokens > tool_tokens + estimator.count_items("hello")
+
+
+@pytest.mark.asyncio
+async def test_estimates_in_a_handoff_input_filter():
+    model = FakeModel()
+    estimates: list[int] = []
+
+    def measure(data: HandoffInputData) -> HandoffInputData:
+        estimates.append(estimate_tokens([*data.input_history, *data.pre_handoff_items]))
+        return data
+
+    specialist = Agent(name="specialist", model=model)
+    triage = Agent(name="triage", model=model, handoffs=[handoff(specialist, input_filter=measure)])
+    model.add_multiple_turn_outputs(
+        [
+            [get_text_message("transferring"), get_handoff_tool_call(specialist)],
+            [get_text_message("done")],
+        ]
+    )
+
+    await Runner.run(triage, input=[get_text_input_item("x " * 400)])
+
+    assert len(estimates) == 1
+    assert estimates[0] > 200
+
+
+@pytest.mark.skipif(importlib.util.find_spec("tiktoken") is not None, reason="tiktoken installed")
+def test_tiktoken_tokenizer_requires_tiktoken():
+    with pytest.raises(ImportError, match="tiktoken"):
+        tiktoken_tokenizer()
+
+
+def test_json_items_are_counted_as_json():
+    estimator = TokenEstimator(lambda text: len(text))
+    call: TResponseInputItem = {
+        "type": "function_call",
+        "call_id": "1",
+        "name": "f",
+        "arguments": json.dumps({"a": 1}),
+    }
+    assert estimator.count_item(call) > MESSAGE_OVERHEAD_TOKENS + len("function_call")
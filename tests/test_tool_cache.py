@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from agents import (
+    Agent,
+    FunctionSpanData,
+    InMemoryToolCache,
+    RunContextWrapper,
+    Runner,
+    SQLiteToolCache,
+    ToolCache,
+    ToolCacheBackend,
+    UserError,
+    function_tool,
+)
+
+from .fake_model import FakeModel
+from .test_responses import get_function_tool_call, get_text_message
+from .testing_processor import fetch_ordered_spans
+
+
+def make_rate_tool(cache: ToolCache, calls: list[str]) -> Any:
+    @function_tool(cache=cache)
+    def exchange_rate(currency: str, base: str = "USD") -> str:
+        calls.append(currency)
+        return f"{base}/{currency}: {len(calls)}"
+
+    return exchange_rate
+
+
+@pytest.mark.asyncio
+async def test_calls_with_the_same_validated_arguments_share_a_result():
+    calls: list[str] = []
+    cache = ToolCache()
+    tool = make_rate_tool(cache, calls)
+    ctx = RunContextWrapper(None)
+
+    first = await tool.on_invoke_tool(ctx, '{"currency": "EUR"}')
+    # Other key order, whitespace and an explicit default validate to the same arguments
+    assert await tool.on_invoke_tool(ctx, '{"base": "USD",  "currency": "EUR"}') == first
+    assert await tool.on_invoke_tool(RunContextWrapper(None), '{"currency": "EUR"}') == first
+    assert await tool.on_invoke_tool(ctx, '{"currency": "GBP"}') == "USD/GBP: 2"
+
+    assert calls == ["EUR", "GBP"]
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_not_cached():
+    calls = 0
+
+    @function_tool(cache=ToolCache())
+    def flaky(x: int) -> str:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ValueError("try again")
+        return "ok"
+
+    ctx = RunContextWrapper(None)
+    assert "try again" in await flaky.on_invoke_tool(ctx, '{"x": 1}')
+    assert await flaky.on_invoke_tool(ctx, '{"x": 1}') == "ok"
+    assert await flaky.on_invoke_tool(ctx, '{"x": 1}') == "ok"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_and_are_evicted():
+    memory = InMemoryToolCache(max_entries=2)
+    for key in "abc":
+        await memory.set(key, key.upper(), ttl=None)
+    assert len(memory) == 2
+    assert await memory.get("a") is None
+    assert await memory.get("c") == "C"
+
+    await memory.set("d", "D", ttl=0.01)
+    await asyncio.sleep(0.02)
+    assert await memory.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_run_scoped_results_are_not_shared_between_runs():
+    calls: list[str] = []
+    tool = make_rate_tool(ToolCache(scope="run"), calls)
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[tool])
+
+    for _ in range(2):
+        model.add_multiple_turn_outputs(
+            [
+                [get_function_tool_call("exchange_rate", '{"currency": "EUR"}')],
+                [get_function_tool_call("exchange_rate", '{"currency": "EUR"}')],
+                [get_text_message("done")],
+            ]
+        )
+        await Runner.run(agent, input="rates")
+
+    assert calls == ["EUR", "EUR"]
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_are_recorded_on_function_spans():
+    calls: list[str] = []
+    tool = make_rate_tool(ToolCache(), calls)
+    model = FakeModel(tracing_enabled=True)
+    model.add_multiple_turn_outputs(
+        [
+            [
+                get_function_tool_call("exchange_rate", '{"currency": "EUR"}'),
+                get_function_tool_call("exchange_rate", '{"currency": "JPY"}'),
+            ],
+            [get_function_tool_call("exchange_rate", '{"currency": "EUR"}')],
+            [get_text_message("done")],
+        ]
+    )
+    await Runner.run(Agent(name="test", model=model, tools=[tool]), input="rates")
+
+    function_spans = [
+        span.span_data for span in fetch_ordered_spans() if span.span_data.type == "function"
+    ]
+    assert [span.cache_hit for span in function_spans if isinstance(span, FunctionSpanData)] == [
+        False,
+        False,
+        True,
+    ]
+    assert function_spans[-1].export()["cache_hit"] is True
+    assert calls == ["EUR", "JPY"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_results_survive_restarts(tmp_path: Path):
+    path = tmp_path / "tools.db"
+    calls: list[str] = []
+    backend = SQLiteToolCache(path)
+    tool = make_rate_tool(ToolCache(backend=backend), calls)
+    result = await tool.on_invoke_tool(RunContextWrapper(None), '{"currency": "EUR"}')
+    backend.close()
+
+    restarted = SQLiteToolCache(path)
+    tool = make_rate_tool(ToolCache(backend=restarted), calls)
+    assert await tool.on_invoke_tool(RunContextWrapper(None), '{"currency": "EUR"}') == result
+    assert calls == ["EUR"]
+
+    await restarted.set("expired", {"a": [1]}, ttl=0.01)
+    await restarted.set("not json", object(), ttl=None)
+    await restarted.set("json", {"a": [1]}, ttl=None)
+    await asyncio.sleep(0.02)
+    assert await restarted.get("expired") is None
+    assert await restarted.get("not json") is None
+    assert await restarted.get("json") == {"a": [1]}
+    restarted.close()
+
+
+class BrokenBackend(ToolCacheBackend):
+    async def get(self, key: str) -> Any | None:
+        raise ConnectionError("cache is down")
+
+    async def set(self, key: str, value: Any, ttl: float | None) -> None:
+        raise ConnectionError("cache is down")
+
+
+@pytest.mark.asyncio
+async def test_backend_errors_do_not_fail_tool_calls():
+    calls: list[str] = []
+    tool = make_rate_tool(ToolCache(backend=BrokenBackend()), calls)
+    for _ in range(2):
+        await tool.on_invoke_tool(RunContextWrapper(None), '{"currency": "EUR"}')
+    assert calls == ["EUR", "EUR"]
+
+
+def test_run_scoped_caches_cannot_use_a_backend(tmp_path: Path):
+    with pytest.raises(UserError):
+        ToolCache(scope="run", backend=SQLiteToolCache(tmp_path / "tools.db"))
+    with pytest.raises(UserError):
+        ToolCache(ttl=0)
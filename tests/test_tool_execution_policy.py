@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import pytest
+
+from agents import RunContextWrapper, UserError, function_tool, set_tool_process_pool
+
+
+def current_thread_id() -> int:
+    return threading.get_ident()
+
+
+def thread_id_with_context(ctx: RunContextWrapper[dict[str, Any]]) -> int:
+    ctx.context["seen"] = True
+    return threading.get_ident()
+
+
+def square_in_process(x: int) -> tuple[int, int]:
+    return x * x, os.getpid()
+
+
+square_tool = function_tool(square_in_process, execution="process")
+
+
+@pytest.mark.asyncio
+async def test_sync_tools_run_in_a_thread_by_default():
+    tool = function_tool(current_thread_id)
+    result = await tool.on_invoke_tool(RunContextWrapper(None), "")
+    assert result != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_inline_tools_run_on_the_event_loop():
+    tool = function_tool(current_thread_id, execution="inline")
+    result = await tool.on_invoke_tool(RunContextWrapper(None), "")
+    assert result == threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_thread_tools_get_the_run_context():
+    tool = function_tool(thread_id_with_context)
+    context: dict[str, Any] = {}
+    result = await tool.on_invoke_tool(RunContextWrapper(context), "")
+    assert result != threading.get_ident()
+    assert context == {"seen": True}
+
+
+@pytest.mark.asyncio
+async def test_blocking_sync_tool_does_not_block_the_event_loop():
+    def blocking() -> str:
+        time.sleep(0.2)
+        return "done"
+
+    tool = function_tool(blocking)
+    ticks = 0
+
+    async def tick() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    try:
+        assert await tool.on_invoke_tool(RunContextWrapper(None), "") == "done"
+    finally:
+        ticker.cancel()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_process_tools_run_in_another_process():
+    pool = ProcessPoolExecutor(max_workers=1)
+    set_tool_process_pool(pool)
+    try:
+        result = await square_tool.on_invoke_tool(RunContextWrapper(None), json.dumps({"x": 7}))
+    finally:
+        set_tool_process_pool(None)
+        pool.shutdown()
+
+    value, pid = result
+    assert value == 49
+    assert pid != os.getpid()
+
+
+def test_invalid_execution_policies_raise():
+    async def async_tool() -> str:
+        return "ok"
+
+    with pytest.raises(UserError):
+        function_tool(async_tool, execution="thread")
+
+    def local_tool() -> str:
+        return "ok"
+
+    with pytest.raises(UserError):
+        function_tool(local_tool, execution="process")
+
+    # Inline is always allowed
+    function_tool(async_tool, execution="inline")
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from agents import Agent, FunctionTool, RunConfig, Runner, UserError, function_tool
+
+from .fake_model import FakeModel
+from .test_responses import get_function_tool_call, get_text_message
+
+
+class InFlightCounter:
+    def __init__(self) -> None:
+        self.current = 0
+        self.max = 0
+
+    async def track(self, delay: float = 0.01) -> None:
+        self.current += 1
+        self.max = max(self.max, self.current)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.current -= 1
+
+
+def _make_tool(
+    name: str,
+    counter: InFlightCounter,
+    max_concurrency: int | None = None,
+    resource_key: str | None = None,
+) -> FunctionTool:
+    async def _tool(value: int) -> str:
+        await counter.track()
+        return str(value)
+
+    return function_tool(
+        _tool,
+        name_override=name,
+        max_concurrency=max_concurrency,
+        resource_key=resource_key,
+    )
+
+
+def _calls(name: str, count: int):
+    return [get_function_tool_call(name, json.dumps({"value": i})) for i in range(count)]
+
+
+async def _run(agent: Agent, model: FakeModel, turn, run_config: RunConfig | None = None):
+    model.add_multiple_turn_outputs([turn, [get_text_message("done")]])
+    result = await Runner.run(agent, input="go", run_config=run_config)
+    assert result.final_output == "done"
+    return result
+
+
+@pytest.mark.asyncio
+async def test_calls_are_unlimited_by_default():
+    counter = InFlightCounter()
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[_make_tool("db", counter)])
+
+    await _run(agent, model, _calls("db", 8))
+
+    assert counter.max == 8
+
+
+@pytest.mark.asyncio
+async def test_tool_max_concurrency():
+    counter = InFlightCounter()
+    model = FakeModel()
+    agent = Agent(name="test", model=model, tools=[_make_tool("db", counter, max_concurrency=2)])
+
+    result = await _run(agent, model, _calls("db", 8))
+
+    assert counter.max == 2
+    # Results keep the order of the calls
+    outputs = [item.output for item in result.new_items if item.type == "tool_call_output_item"]
+    assert outputs == [str(i) for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_tool_max_concurrency_is_shared_between_runs():
+    counter = InFlightCounter()
+    tool = _make_tool("db", counter, max_concurrency=3)
+    model_1, model_2 = FakeModel(), FakeModel()
+    agent_1 = Agent(name="one", model=model_1, tools=[tool])
+    agent_2 = Agent(name="two", model=model_2, tools=[tool])
+
+    await asyncio.gather(
+        _run(agent_1, model_1, _calls("db", 5)),
+        _run(agent_2, model_2, _calls("db", 5)),
+    )
+
+    assert counter.max == 3
+
+
+@pytest.mark.asyncio
+async def test_resource_key_serializes_calls_across_tools():
+    locked = InFlightCounter()
+    free = InFlightCounter()
+    model = FakeModel()
+    agent = Agent(
+        name="test",
+        model=model,
+        tools=[
+            _make_tool("read_file", locked, resource_key="file"),
+            _make_tool("write_file", locked, resource_key="file"),
+            _make_tool("search", free),
+        ],
+    )
+
+    await _run(agent, model, _calls("read_file", 3) + _calls("write_file", 3) + _calls("search", 4))
+
+    assert locked.max == 1
+    assert free.max == 4
+
+
+@pytest.mark.asyncio
+async def test_run_wide_limit():
+    counter = InFlightCounter()
+    model = FakeModel()
+    agent = Agent(
+        name="test",
+        model=model,
+        tools=[_make_tool("a", counter), _make_tool("b", counter)],
+    )
+
+    await _run(
+        agent,
+        model,
+        _calls("a", 5) + _calls("b", 5),
+        run_config=RunConfig(max_concurrent_tool_calls=3),
+    )
+
+    assert counter.max == 3
+
+
+@pytest.mark.asyncio
+async def test_invalid_limits_raise():
+    counter = InFlightCounter()
+    # Tool limits are checked when the tool is defined, not when it's first called
+    with pytest.raises(UserError):
+        _make_tool("db", counter, max_concurrency=0)
+    with pytest.raises(UserError):
+        FunctionTool(
+            name="db",
+            description="",
+            params_json_schema={},
+            on_invoke_tool=lambda ctx, args: counter.track(),
+            max_concurrency=-1,
+        )
+
+    agent = Agent(name="test", model=FakeModel(), tools=[_make_tool("db", counter)])
+    with pytest.raises(UserError):
+        await Runner.run(agent, input="go", run_config=RunConfig(max_concurrent_tool_calls=0))
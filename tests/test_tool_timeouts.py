@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from agents import (
+    Agent,
+    FunctionTool,
+    RunConfig,
+    RunContextWrapper,
+    Runner,
+    ToolCallOutputItem,
+    ToolTimeoutError,
+    UserError,
+    function_tool,
+)
+
+from .fake_model import FakeModel
+from .test_responses import get_function_tool_call, get_text_message
+
+
+async def run_tools(
+    tools: list[Any], calls: list[tuple[str, str]], run_config: RunConfig | None = None
+) -> list[Any]:
+    model = FakeModel()
+    model.add_multiple_turn_outputs(
+        [
+            [get_function_tool_call(name, arguments) for name, arguments in calls],
+            [get_text_message("done")],
+        ]
+    )
+    result = await Runner.run(
+        Agent(name="test", model=model, tools=tools), input="go", run_config=run_config
+    )
+    return [item.output for item in result.new_items if isinstance(item, ToolCallOutputItem)]
+
+
+@function_tool
+async def fast(x: int) -> str:
+    return f"fast {x}"
+
+
+@pytest.mark.asyncio
+async def test_tool_timeouts_are_reported_to_the_model():
+    @function_tool(timeout=0.05)
+    async def hangs() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    start = time.monotonic()
+    outputs = await run_tools([hangs, fast], [("hangs", "{}"), ("fast", '{"x": 1}')])
+
+    assert time.monotonic() - start < 5
+    assert "timed out after 0.05 seconds" in outputs[0]
+    assert outputs[1] == "fast 1"
+
+
+@pytest.mark.asyncio
+async def test_run_config_timeout_applies_to_tools_without_their_own():
+    errors: list[Exception] = []
+
+    def report(ctx: RunContextWrapper[Any], error: Exception) -> str:
+        errors.append(error)
+        return "too slow"
+
+    @function_tool(failure_error_function=report)
+    async def slow() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    @function_tool(timeout=5)
+    async def patient() -> str:
+        await asyncio.sleep(0.1)
+        return "finished"
+
+    outputs = await run_tools(
+        [slow, patient], [("slow", "{}"), ("patient", "{}")], RunConfig(tool_timeout=0.05)
+    )
+
+    assert outputs == ["too slow", "finished"]
+    assert len(errors) == 1 and isinstance(errors[0], ToolTimeoutError)
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_raised_without_a_failure_error_function():
+    @function_tool(timeout=0.05, failure_error_function=None)
+    async def hangs() -> str:
+        await asyncio.sleep(10)
+        return "never"
+
+    with pytest.raises(ToolTimeoutError):
+        await run_tools([hangs], [("hangs", "{}")])
+
+
+@pytest.mark.asyncio
+async def test_turn_timeout_cancels_the_calls_still_running():
+    cancelled = asyncio.Event()
+
+    @function_tool
+    async def hangs() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    outputs = await run_tools(
+        [hangs, fast], [("fast", '{"x": 2}'), ("hangs", "{}")], RunConfig(tool_turn_timeout=0.1)
+    )
+
+    assert outputs[0] == "fast 2"
+    assert "timed out after 0.1 seconds" in outputs[1]
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_fatal_errors_cancel_sibling_calls():
+    cancelled = asyncio.Event()
+
+    @function_tool
+    async def hangs() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "never"
+
+    @function_tool(failure_error_function=None)
+    async def breaks() -> str:
+        await asyncio.sleep(0.01)
+        raise ValueError("broken")
+
+    start = time.monotonic()
+    with pytest.raises(UserError, match="broken"):
+        await run_tools([hangs, breaks], [("hangs", "{}"), ("breaks", "{}")])
+
+    assert time.monotonic() - start < 5
+    assert cancelled.is_set()
+
+
+def test_timeouts_must_be_positive():
+    def noop() -> str:
+        return ""
+
+    # Checked when the tool or config is created, not when a run first calls a tool
+    with pytest.raises(UserError):
+        function_tool(noop, timeout=0)
+    with pytest.raises(UserError):
+        FunctionTool(
+            name="noop",
+            description="",
+            params_json_schema={},
+            on_invoke_tool=fast.on_invoke_tool,
+            timeout=-1,
+        )
+    with pytest.raises(UserError):
+        RunConfig(tool_turn_timeout=-1)
+    with pytest.raises(UserError):
+        RunConfig(tool_timeout=0)